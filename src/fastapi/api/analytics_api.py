@@ -1,29 +1,37 @@
 # New dependency injection imports
-from core.dependencies import get_db, get_session_repository
+from core.dependencies import get_db, get_session_repository, get_response_repository
+from core.exceptions import ValidationException
 from core.database import get_db as get_db_session
 from models.enums import SessionType, AnalysisType
-from models.agent import ComplianceAgent
-from models.session import AgentSession
 from models.response import AgentResponse
-from repositories import SessionRepository
+from repositories import SessionRepository, ResponseRepository
 from repositories.test_plan_agent_repository import TestPlanAgentRepository
+from services.analytics_rollup_service import query_session_analytics, utc_now
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import Optional
+from datetime import datetime
 import logging
 
 logger = logging.getLogger("ANALYTICS_API_LOGGER")
 
 analytics_api_router = APIRouter(prefix="/analytics", tags=["analytics"])
 
+# Response-time percentiles reported per agent (label, fraction)
+RESPONSE_TIME_PERCENTILES = [("p50", 0.5), ("p90", 0.9), ("p95", 0.95), ("p99", 0.99)]
+
 
 @analytics_api_router.get("/session-history")
 async def get_agent_session_history(
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
     session_type: Optional[str] = None,
+    collection_name: Optional[str] = None,
+    model_used: Optional[str] = None,
     session_repo: SessionRepository = Depends(get_session_repository)
 ):
-    """Get recent agent session history"""
+    """Get agent session history, newest first, with keyset pagination"""
     try:
         # Convert string to enum if provided
         type_filter = None
@@ -36,11 +44,22 @@ async def get_agent_session_history(
                     detail=f"Invalid session_type. Valid options: {[t.value for t in SessionType]}"
                 )
 
-        history = session_repo.get_history(limit=limit, session_type=type_filter)
+        try:
+            history, next_cursor = session_repo.get_history_page(
+                limit=limit,
+                cursor=cursor,
+                session_type=type_filter,
+                collection_name=collection_name,
+                model_used=model_used
+            )
+        except ValidationException as e:
+            raise HTTPException(status_code=400, detail=e.message)
 
         return {
             "sessions": history,
             "total_returned": len(history),
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
             "available_session_types": [t.value for t in SessionType],
             "available_analysis_types": [t.value for t in AnalysisType]
         }
@@ -53,11 +72,12 @@ async def get_agent_session_history(
 @analytics_api_router.get("/session-details/{session_id}")
 async def get_agent_session_details(
     session_id: str,
+    include_citations: bool = True,
     session_repo: SessionRepository = Depends(get_session_repository)
 ):
     """Get detailed information about a specific session"""
     try:
-        details = session_repo.get_details(session_id)
+        details = session_repo.get_details(session_id, include_citations=include_citations)
 
         if not details:
             raise HTTPException(
@@ -72,6 +92,42 @@ async def get_agent_session_details(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@analytics_api_router.get("/response-search")
+async def search_agent_responses(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    session_id: Optional[str] = None,
+    agent_id: Optional[int] = None,
+    model_used: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    response_repo: ResponseRepository = Depends(get_response_repository)
+):
+    """Full-text search over agent responses, best match first"""
+    try:
+        results, has_more = response_repo.search(
+            q,
+            limit=limit,
+            offset=offset,
+            session_id=session_id,
+            agent_id=agent_id,
+            model_used=model_used,
+            since=since,
+            until=until
+        )
+
+        return {
+            "query": q,
+            "results": results,
+            "total_returned": len(results),
+            "next_offset": offset + len(results) if has_more else None,
+            "has_more": has_more
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @analytics_api_router.get("/agent-performance/{agent_id}")
 async def get_agent_performance_metrics(
     agent_id: int,
@@ -88,11 +144,24 @@ async def get_agent_performance_metrics(
                 detail=f"Agent with ID {agent_id} not found"
             )
 
-        # Get agent response statistics
-        total_responses = db.query(AgentResponse).filter(
+        # Aggregate in the database; count(*) and the included columns let Postgres
+        # answer these from idx_agent_responses_agent_created alone
+        timed = AgentResponse.response_time_ms != 0  # NULLs are skipped by the aggregates
+        stats = db.query(
+            func.count().label('total'),
+            func.count().filter(AgentResponse.rag_used.is_(True)).label('rag'),
+            func.avg(AgentResponse.response_time_ms).filter(timed).label('avg_ms'),
+            *[
+                func.percentile_cont(fraction).within_group(
+                    AgentResponse.response_time_ms.asc()
+                ).filter(timed).label(label)
+                for label, fraction in RESPONSE_TIME_PERCENTILES
+            ]
+        ).filter(
             AgentResponse.agent_id == agent_id
-        ).count()
+        ).one()
 
+        total_responses = stats.total
         if total_responses == 0:
             return {
                 "agent_id": agent_id,
@@ -101,31 +170,35 @@ async def get_agent_performance_metrics(
                 "message": "No response data available for this agent"
             }
 
-        responses = db.query(AgentResponse).filter(
-            AgentResponse.agent_id == agent_id
-        ).all()
-
-        # Response time statistics
-        response_times = [r.response_time_ms for r in responses if r.response_time_ms]
-        avg_response_time = sum(response_times) / len(response_times) if response_times else 0
-
-        # RAG usage statistics
-        rag_responses = [r for r in responses if r.rag_used]
-        rag_usage_rate = len(rag_responses) / total_responses if total_responses > 0 else 0
+        avg_response_time = float(stats.avg_ms or 0)
+        rag_usage_rate = stats.rag / total_responses
 
         # Processing method breakdown
-        method_counts = {}
-        for response in responses:
-            method = response.processing_method
-            method_counts[method] = method_counts.get(method, 0) + 1
+        method_counts = dict(
+            db.query(
+                AgentResponse.processing_method,
+                func.count()
+            ).filter(
+                AgentResponse.agent_id == agent_id
+            ).group_by(AgentResponse.processing_method).all()
+        )
 
-        # Recent activity (last 10 responses)
-        recent_responses = db.query(AgentResponse).filter(
+        # Recent activity (last 10 responses, previews truncated in SQL)
+        recent_responses = db.query(
+            AgentResponse.session_id,
+            AgentResponse.created_at,
+            AgentResponse.processing_method,
+            AgentResponse.response_time_ms,
+            AgentResponse.rag_used,
+            AgentResponse.documents_found,
+            func.left(AgentResponse.response_text, 201).label('response_head')
+        ).filter(
             AgentResponse.agent_id == agent_id
         ).order_by(AgentResponse.created_at.desc()).limit(10).all()
 
         recent_activity = []
         for response in recent_responses:
+            head = response.response_head or ""
             recent_activity.append({
                 "session_id": response.session_id,
                 "created_at": response.created_at,
@@ -133,7 +206,7 @@ async def get_agent_performance_metrics(
                 "response_time_ms": response.response_time_ms,
                 "rag_used": response.rag_used,
                 "documents_found": response.documents_found,
-                "response_preview": response.response_text[:200] + "..." if len(response.response_text) > 200 else response.response_text
+                "response_preview": head[:200] + "..." if len(head) > 200 else head
             })
 
         return {
@@ -143,6 +216,10 @@ async def get_agent_performance_metrics(
             "performance_metrics": {
                 "total_responses": total_responses,
                 "avg_response_time_ms": round(avg_response_time, 2),
+                "response_time_percentiles_ms": {
+                    label: round(float(getattr(stats, label)), 2) if getattr(stats, label) is not None else None
+                    for label, _ in RESPONSE_TIME_PERCENTILES
+                },
                 "rag_usage_rate": round(rag_usage_rate * 100, 2),  # as percentage
                 "processing_method_breakdown": method_counts
             },
@@ -164,90 +241,40 @@ async def get_agent_performance_metrics(
 async def get_session_analytics(days: int = 7, db: Session = Depends(get_db)):
     """Get analytics about agent sessions over the specified number of days"""
     try:
-        from datetime import datetime, timedelta, timezone
-        from sqlalchemy import func
+        from datetime import timedelta, timezone
 
         # Calculate date range
-        end_date = datetime.now(timezone.utc)
+        end_date = utc_now()
         start_date = end_date - timedelta(days=days)
-        
-        # Session counts by type
-        session_counts = db.query(
-            AgentSession.session_type,
-            func.count(AgentSession.id).label('count')
-        ).filter(
-            AgentSession.created_at >= start_date
-        ).group_by(AgentSession.session_type).all()
-        
-        # Session counts by analysis type
-        analysis_counts = db.query(
-            AgentSession.analysis_type,
-            func.count(AgentSession.id).label('count')
-        ).filter(
-            AgentSession.created_at >= start_date
-        ).group_by(AgentSession.analysis_type).all()
-        
-        # Average response times
-        avg_response_time = db.query(
-            func.avg(AgentSession.total_response_time_ms)
-        ).filter(
-            AgentSession.created_at >= start_date,
-            AgentSession.total_response_time_ms.isnot(None)
-        ).scalar()
-        
-        # Most active agents (using unified compliance_agents table)
-        active_agents = db.query(
-            AgentResponse.agent_id,
-            ComplianceAgent.name,
-            func.count(AgentResponse.id).label('response_count')
-        ).join(
-            ComplianceAgent, AgentResponse.agent_id == ComplianceAgent.id
-        ).filter(
-            AgentResponse.created_at >= start_date
-        ).group_by(
-            AgentResponse.agent_id, ComplianceAgent.name
-        ).order_by(
-            func.count(AgentResponse.id).desc()
-        ).limit(10).all()
-        
-        # RAG usage statistics
-        total_responses = db.query(AgentResponse).filter(
-            AgentResponse.created_at >= start_date
-        ).count()
-        
-        rag_responses = db.query(AgentResponse).filter(
-            AgentResponse.created_at >= start_date,
-            AgentResponse.rag_used == True
-        ).count()
-        
+
+        # Whole days/hours come from the rollups; only partial hours hit the raw tables
+        stats = query_session_analytics(db, start_date, end_date)
+
+        total_responses = stats["total_responses"]
+        rag_responses = stats["rag_responses"]
         rag_usage_rate = (rag_responses / total_responses * 100) if total_responses > 0 else 0
-        
+        avg_response_time = stats["avg_response_time_ms"]
+        watermark = stats["rollup_watermark"]
+
         return {
             "analytics_period": {
                 "days": days,
-                "start_date": start_date.isoformat(),
-                "end_date": end_date.isoformat()
+                "start_date": start_date.replace(tzinfo=timezone.utc).isoformat(),
+                "end_date": end_date.replace(tzinfo=timezone.utc).isoformat(),
+                "rollups_complete_until": watermark.replace(tzinfo=timezone.utc).isoformat() if watermark else None
             },
             "session_statistics": {
-                "by_session_type": {sc.session_type.value: sc.count for sc in session_counts},
-                "by_analysis_type": {ac.analysis_type.value: ac.count for ac in analysis_counts},
+                "by_session_type": stats["by_session_type"],
+                "by_analysis_type": stats["by_analysis_type"],
                 "avg_response_time_ms": round(avg_response_time, 2) if avg_response_time else 0
             },
-            "agent_activity": [
-                {
-                    "agent_id": agent.agent_id,
-                    "agent_name": agent.name,
-                    "response_count": agent.response_count
-                }
-                for agent in active_agents
-            ],
+            "agent_activity": stats["agent_activity"],
             "rag_statistics": {
                 "total_responses": total_responses,
                 "rag_responses": rag_responses,
                 "rag_usage_rate": round(rag_usage_rate, 2)
             }
         }
-        
+
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
-    
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
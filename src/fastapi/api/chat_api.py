@@ -1,43 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from typing import Optional, List
 from datetime import datetime
 import time
 import uuid
+import json
 import logging
 import sys
 from pathlib import Path
 
 from schemas.requests import ChatRequest, QueryType
-from schemas.responses import ChatResponse, BaseResponse, DataResponse
+from schemas.responses import ChatResponse, BaseResponse, CursorPaginatedResponse, SearchResponse
 
 # New dependency injection imports
 from core.dependencies import (
-    get_db,
     get_chat_repository,
     get_llm_service,
     get_rag_service
 )
 from repositories import ChatRepository
+from core.exceptions import ValidationException
 from services.llm_service import LLMService
 from services.rag_service import RAGService
 from services.llm_invoker import LLMInvoker
+from services.persistence_queue import persistence_queue
 
 # Add parent directory to path to import llm_config module
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-from llm_config.llm_config import validate_model, get_model_config, llm_env
+from services.chat_cache_service import validate_chat_model, response_cache_key, get_chat_response_cache
 
 logger = logging.getLogger("CHAT_API_LOGGER")
 
 chat_api_router = APIRouter(prefix="/chat", tags=["chat"])
+
+
+def _source_documents(metadata_list: Optional[List[dict]]) -> List[str]:
+    """Distinct source document names of the retrieved chunks, in rank order."""
+    source_documents = []
+    for meta in metadata_list or []:
+        doc_name = meta.get("metadata", {}).get("document_name", "")
+        if doc_name and doc_name not in source_documents:
+            source_documents.append(doc_name)
+    return source_documents
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
     
 @chat_api_router.post("", response_model=ChatResponse)
 def chat(
     request: ChatRequest,
-    chat_repo: ChatRepository = Depends(get_chat_repository),
     llm_service: LLMService = Depends(get_llm_service),
-    rag_service: RAGService = Depends(get_rag_service),
-    db: Session = Depends(get_db)
+    rag_service: RAGService = Depends(get_rag_service)
 ):
     """
     Chat endpoint that handles both direct LLM and RAG-enhanced responses.
@@ -52,21 +68,12 @@ def chat(
 
         # ========================================================================
         # EARLY MODEL VALIDATION - Fail fast if model is unsupported or misconfigured
+        # (memoized per model for CHAT_VALIDATION_CACHE_TTL_SECONDS)
         # ========================================================================
-        is_valid, validation_error = validate_model(request.model_name)
-        if not is_valid:
-            logger.error(f"Model validation failed: {validation_error}")
-            raise HTTPException(status_code=400, detail=validation_error)
-
-        # Validate API keys for the model's provider
-        model_config = get_model_config(request.model_name)
-        keys_valid, key_error = llm_env.validate_provider_keys(model_config.provider)
-        if not keys_valid:
-            logger.error(f"API key validation failed for {model_config.provider}: {key_error}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"{key_error}. Please configure the required API key in your environment."
-            )
+        model_config, error_status, error_detail = validate_chat_model(request.model_name)
+        if error_status is not None:
+            logger.error(f"Model validation failed for {request.model_name}: {error_detail}")
+            raise HTTPException(status_code=error_status, detail=error_detail)
 
         # Determine if RAG is needed based on query_type
         use_rag = request.query_type in [QueryType.RAG, QueryType.RAG_ENHANCED]
@@ -81,8 +88,8 @@ def chat(
                 model_name=request.model_name,
             )
 
-            # Save chat history using repository
-            chat_repo.create_chat_entry(
+            # Chat history is written behind the response
+            persistence_queue.add_chat_entry(
                 user_query=request.query,
                 response=answer,
                 model_used=request.model_name,
@@ -91,15 +98,6 @@ def chat(
                 response_time_ms=response_time,
                 session_id=session_id
             )
-            db.commit()
-
-            # Extract source document names for response
-            source_documents = []
-            if metadata_list:
-                for meta in metadata_list:
-                    doc_name = meta.get("metadata", {}).get("document_name", "")
-                    if doc_name and doc_name not in source_documents:
-                        source_documents.append(doc_name)
 
             # Return standardized ChatResponse
             return ChatResponse(
@@ -111,25 +109,40 @@ def chat(
                 response_time_ms=response_time,
                 session_id=session_id,
                 formatted_citations=formatted_citations,
-                source_documents=source_documents,
+                source_documents=_source_documents(metadata_list),
                 documents_found=len(metadata_list) if metadata_list else 0
             )
         else:
             # Direct LLM mode - Using LLMInvoker utility for simplified invocation
             start_time = time.time()
 
-            # Use LLMInvoker for standardized LLM invocation
-            answer = LLMInvoker.invoke(
-                model_name=request.model_name,
-                prompt=request.query,
-                temperature=request.temperature,
-                retry_count=0
-            )
+            # Repeated direct questions to the same model are answered from the
+            # response cache; a RAG query without a collection is never cached
+            response_cache = get_chat_response_cache()
+            cache_key = None
+            cached = None
+            if request.query_type == QueryType.DIRECT and response_cache.enabled and request.use_cache:
+                cache_key = response_cache_key(request.query, model_config.model_id, request.temperature)
+                cached = response_cache.get(cache_key)
+
+            if cached:
+                answer = cached["response"]
+            else:
+                # Use LLMInvoker for standardized LLM invocation
+                answer = LLMInvoker.invoke(
+                    model_name=request.model_name,
+                    prompt=request.query,
+                    temperature=request.temperature,
+                    retry_count=0
+                )
 
             response_time_ms = int((time.time() - start_time) * 1000)
 
-            # Save chat history using repository
-            chat_repo.create_chat_entry(
+            if cache_key and not cached:
+                response_cache.set(cache_key, answer, response_time_ms)
+
+            # Chat history is written behind the response
+            persistence_queue.add_chat_entry(
                 user_query=request.query,
                 response=answer,
                 model_used=request.model_name,
@@ -138,47 +151,188 @@ def chat(
                 response_time_ms=response_time_ms,
                 session_id=session_id
             )
-            db.commit()
 
             # Return standardized ChatResponse
             return ChatResponse(
                 success=True,
-                message="Query processed successfully",
+                message="Query answered from cache" if cached else "Query processed successfully",
                 response=answer,
                 model_used=request.model_name,
                 query_type=request.query_type.value,
                 response_time_ms=response_time_ms,
                 session_id=session_id,
-                documents_found=0
+                documents_found=0,
+                cached=bool(cached),
+                cached_at=cached["cached_at"] if cached else None,
+                cached_response_time_ms=cached.get("response_time_ms") if cached else None
             )
 
     except ValueError as e:
-        db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        db.rollback()
         logger.error(f"Chat endpoint error: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
     
 
-@chat_api_router.get("/history", response_model=DataResponse)
+@chat_api_router.post("/stream")
+def chat_stream(
+    request: ChatRequest,
+    rag_service: RAGService = Depends(get_rag_service)
+):
+    """
+    Streaming variant of the chat endpoint (Server-Sent Events).
+
+    Model validation and, for RAG queries, document retrieval happen before the
+    stream opens, so those failures still return a regular HTTP error. The
+    answer is then forwarded as the model generates it.
+
+    Events, in order:
+        metadata: session_id, model_used, query_type, cache provenance,
+            formatted_citations, source_documents and documents_found
+        token: {"text": ...} for every chunk of the answer
+        done: {"response_time_ms", "first_token_ms"} once the answer is complete
+        error: {"detail": ...} if generation fails mid-stream (ends the stream)
+
+    Chat history is written once the answer is complete; an aborted or failed
+    stream is not recorded.
+    """
+    session_id = request.session_id or str(uuid.uuid4())
+
+    model_config, error_status, error_detail = validate_chat_model(request.model_name)
+    if error_status is not None:
+        logger.error(f"Model validation failed for {request.model_name}: {error_detail}")
+        raise HTTPException(status_code=error_status, detail=error_detail)
+
+    use_rag = request.query_type in [QueryType.RAG, QueryType.RAG_ENHANCED]
+    collection_name = request.collection_name if use_rag else None
+
+    logger.info(f"Streaming chat request with model={request.model_name}, query_type={request.query_type}")
+
+    start_time = time.time()
+    metadata_list: List[dict] = []
+    formatted_citations = ""
+    response_cache = get_chat_response_cache()
+    cache_key = None
+    cached = None
+
+    try:
+        if collection_name:
+            metadata_list, formatted_citations, tokens = rag_service.stream_query_with_rag(
+                query_text=request.query,
+                collection_name=collection_name,
+                model_name=request.model_name,
+            )
+        else:
+            if request.query_type == QueryType.DIRECT and response_cache.enabled and request.use_cache:
+                cache_key = response_cache_key(request.query, model_config.model_id, request.temperature)
+                cached = response_cache.get(cache_key)
+
+            if cached:
+                tokens = iter([cached["response"]])
+            else:
+                tokens = LLMInvoker.stream(
+                    model_name=request.model_name,
+                    prompt=request.query,
+                    temperature=request.temperature
+                )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Chat stream setup error: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+    def events():
+        yield _sse("metadata", {
+            "session_id": session_id,
+            "model_used": request.model_name,
+            "query_type": request.query_type.value,
+            "cached": bool(cached),
+            "cached_at": cached["cached_at"] if cached else None,
+            "formatted_citations": formatted_citations or None,
+            "source_documents": _source_documents(metadata_list),
+            "documents_found": len(metadata_list),
+        })
+
+        chunks = []
+        first_token_ms = None
+        try:
+            for text in tokens:
+                if first_token_ms is None:
+                    first_token_ms = int((time.time() - start_time) * 1000)
+                chunks.append(text)
+                yield _sse("token", {"text": text})
+        except Exception as e:
+            logger.error(f"Chat stream error: {e}")
+            yield _sse("error", {"detail": str(e)})
+            return
+
+        answer = "".join(chunks)
+        response_time_ms = int((time.time() - start_time) * 1000)
+
+        if cache_key and not cached:
+            response_cache.set(cache_key, answer, response_time_ms)
+
+        # Chat history is written behind the response
+        persistence_queue.add_chat_entry(
+            user_query=request.query,
+            response=answer,
+            model_used=request.model_name,
+            collection_name=collection_name,
+            query_type=request.query_type.value,
+            response_time_ms=response_time_ms,
+            session_id=session_id
+        )
+
+        yield _sse("done", {
+            "response_time_ms": response_time_ms,
+            "first_token_ms": first_token_ms,
+        })
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@chat_api_router.get("/history", response_model=CursorPaginatedResponse)
 def get_chat_history(
-    limit: int = 100,
-    offset: int = 0,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    session_id: Optional[str] = None,
+    model_used: Optional[str] = None,
+    collection_name: Optional[str] = None,
+    query_type: Optional[str] = None,
     chat_repo: ChatRepository = Depends(get_chat_repository)
 ):
     """
-    Get chat history with pagination support.
+    Get chat history, newest first, with keyset pagination.
 
     Args:
         limit: Maximum number of entries to return (default: 100)
-        offset: Number of entries to skip (default: 0)
+        cursor: next_cursor from the previous page (omit for the first page)
+        session_id: Optional session filter
+        model_used: Optional model filter
+        collection_name: Optional collection filter
+        query_type: Optional query type filter
         chat_repo: Chat repository (injected)
 
     Returns:
-        Standardized response with chat history list in data field
+        Standardized response with chat history list in data field and the
+        cursor for the next page
     """
-    history = chat_repo.get_all(skip=offset, limit=limit, order_by="timestamp")
+    try:
+        history, next_cursor = chat_repo.get_history_page(
+            limit=limit,
+            cursor=cursor,
+            session_id=session_id,
+            model_used=model_used,
+            collection_name=collection_name,
+            query_type=query_type
+        )
+    except ValidationException as e:
+        raise HTTPException(status_code=400, detail=e.message)
 
     # Transform to list of dictionaries
     history_data = [
@@ -200,5 +354,63 @@ def get_chat_history(
         "success": True,
         "message": f"Retrieved {len(history_data)} chat history entries",
         "timestamp": datetime.utcnow(),
-        "data": history_data
-    }
\ No newline at end of file
+        "data": history_data,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
+    }
+
+@chat_api_router.get("/search", response_model=SearchResponse)
+def search_chat_history(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    session_id: Optional[str] = None,
+    model_used: Optional[str] = None,
+    collection_name: Optional[str] = None,
+    query_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    chat_repo: ChatRepository = Depends(get_chat_repository)
+):
+    """
+    Full-text search over past chat queries and responses.
+
+    Args:
+        q: Search text ("exact phrase", OR, -excluded words)
+        limit: Maximum number of results (default: 20)
+        offset: next_offset from the previous page (default: 0)
+        session_id: Optional session filter
+        model_used: Optional model filter
+        collection_name: Optional collection filter
+        query_type: Optional query type filter
+        since: Only entries at or after this time (UTC)
+        until: Only entries before this time (UTC)
+        chat_repo: Chat repository (injected)
+
+    Returns:
+        Ranked results with highlighted query/response snippets
+    """
+    results, has_more = chat_repo.search(
+        q,
+        limit=limit,
+        offset=offset,
+        session_id=session_id,
+        model_used=model_used,
+        collection_name=collection_name,
+        query_type=query_type,
+        since=since,
+        until=until
+    )
+
+    for result in results:
+        result["timestamp"] = result["timestamp"].isoformat() if result["timestamp"] else None
+
+    return {
+        "success": True,
+        "message": f"Found {len(results)} matching chat entries",
+        "timestamp": datetime.utcnow(),
+        "query": q,
+        "data": results,
+        "next_offset": offset + len(results) if has_more else None,
+        "has_more": has_more
+    }
@@ -1065,6 +1065,61 @@ async def export_chat_history_to_word(
         logger.error(f"Failed to export chat history to Word: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
+@doc_gen_api_router.post("/export-chat-history-word/stream")
+async def stream_chat_history_to_word(
+    session_id: Optional[str] = None,
+    limit: Optional[int] = None,
+    word_export_service: WordExportService = Depends(WordExportService),
+    chat_repo: ChatRepository = Depends(get_chat_repository)
+):
+    """
+    Stream chat history as a Word document download.
+
+    Unlike /export-chat-history-word this returns the .docx bytes directly and
+    reads records through a server-side cursor while the response is written,
+    so any number of records can be exported with bounded memory.
+
+    Args:
+        session_id: Optional session ID to filter by
+        limit: Optional maximum number of chat records to export (default: all)
+    """
+    from fastapi.responses import StreamingResponse
+    from db.session import get_db_context_no_commit
+    from services.streaming_docx_writer import DOCX_MEDIA_TYPE
+
+    try:
+        session_summaries = chat_repo.get_session_summaries(session_id)
+        total_records = sum(summary["count"] for summary in session_summaries.values())
+        if limit:
+            total_records = min(total_records, limit)
+
+        if not total_records:
+            raise HTTPException(status_code=404, detail="No chat history found")
+
+        def chat_records():
+            # The request-scoped session is released before the body is sent,
+            # so the streaming read runs on its own session.
+            with get_db_context_no_commit() as db:
+                yield from ChatRepository(db).iter_for_export(session_id=session_id, limit=limit)
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        session_suffix = f"_session_{session_id[:8]}" if session_id else ""
+        filename = f"chat_history{session_suffix}_{timestamp}.docx"
+
+        return StreamingResponse(
+            word_export_service.stream_chat_history_to_word(
+                chat_records(), total_records, session_id, session_summaries
+            ),
+            media_type=DOCX_MEDIA_TYPE,
+            headers={"Content-Disposition": f"attachment; filename=\"{filename}\""}
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to stream chat history to Word: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+
 @doc_gen_api_router.post("/export-simulation-word")
 async def export_agent_simulation_to_word(
     simulation_data: Dict[str, Any],
@@ -1809,18 +1864,84 @@ class BulkUpdateTestCardsRequest(BaseModel):
         }
 
 
+class TestCardWriteResult(BaseModel):
+    """Outcome of a single test card write in a bulk operation"""
+    document_id: Optional[str] = None
+    status: str  # updated, created, unchanged, not_found, failed
+    re_embedded: bool = False
+    error: Optional[str] = None
+
+
 class BulkUpdateTestCardsResponse(BaseModel):
     """Response from bulk update operation"""
     updated_count: int
     failed_count: int
     errors: List[str]
+    results: List[TestCardWriteResult] = []
 
     class Config:
         json_schema_extra = {
             "example": {
                 "updated_count": 5,
                 "failed_count": 0,
-                "errors": []
+                "errors": [],
+                "results": [
+                    {
+                        "document_id": "testcard_abc123_TC-001_xyz",
+                        "status": "updated",
+                        "re_embedded": False,
+                        "error": None
+                    }
+                ]
+            }
+        }
+
+
+class BulkUpsertTestCardsRequest(BaseModel):
+    """Request to create or replace many test cards"""
+    collection_name: str = "test_cards"
+    cards: List[Dict[str, Any]]  # List of {document_id, content, metadata}
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "collection_name": "test_cards",
+                "cards": [
+                    {
+                        "document_id": "testcard_abc123_TC-001_xyz",
+                        "content": "| Test ID | Test Title | ... |",
+                        "metadata": {"test_id": "TC-001", "execution_status": "not_executed"}
+                    }
+                ]
+            }
+        }
+
+
+class TestCardExecutionUpdate(BaseModel):
+    """Execution status update for one test card in a bulk request"""
+    document_id: str
+    execution_status: str
+    executed_by: Optional[str] = None
+    notes: Optional[str] = None
+
+
+class BulkUpdateTestCardExecutionRequest(BaseModel):
+    """Request to update execution status on many test cards"""
+    collection_name: str = "test_cards"
+    updates: List[TestCardExecutionUpdate]
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "collection_name": "test_cards",
+                "updates": [
+                    {
+                        "document_id": "testcard_abc123_TC-001_xyz",
+                        "execution_status": "passed",
+                        "executed_by": "John Smith",
+                        "notes": "All criteria met."
+                    }
+                ]
             }
         }
 
@@ -2431,11 +2552,45 @@ async def get_test_card(card_id: str, collection_name: str = "test_cards"):
         raise HTTPException(status_code=500, detail=f"Retrieval failed: {str(e)}")
 
 
+VALID_EXECUTION_STATUSES = ["not_executed", "in_progress", "passed", "failed"]
+
+
+def _execution_metadata_patch(
+    execution_status: str,
+    executed_by: Optional[str] = None,
+    notes: Optional[str] = None
+) -> Dict[str, Any]:
+    """Metadata fields written when a test card's execution status changes."""
+    patch = {
+        "execution_status": execution_status,
+        "passed": execution_status == "passed",
+        "failed": execution_status == "failed",
+        "last_updated": datetime.now().isoformat()
+    }
+    if executed_by:
+        patch["executed_by"] = executed_by
+    if notes:
+        patch["notes"] = notes
+    return patch
+
+
+def _bulk_update_response(results: List[Dict[str, Any]]) -> BulkUpdateTestCardsResponse:
+    """Summarize per-item bulk write results."""
+    failed = [r for r in results if r["status"] in ("failed", "not_found")]
+    return BulkUpdateTestCardsResponse(
+        updated_count=len(results) - len(failed),
+        failed_count=len(failed),
+        errors=[r["error"] for r in failed if r.get("error")],
+        results=[TestCardWriteResult(**r) for r in results]
+    )
+
+
 @doc_gen_api_router.put("/test-cards/{card_id}/execute", response_model=UpdateTestCardExecutionResponse)
 async def update_test_card_execution(
     card_id: str,
     req: UpdateTestCardExecutionRequest,
-    collection_name: str = "test_cards"
+    collection_name: str = "test_cards",
+    test_card_service: TestCardService = Depends(get_test_card_service)
 ):
     """
     Update test card execution status and tracking information.
@@ -2458,76 +2613,34 @@ async def update_test_card_execution(
         logger.info(f"Updating test card execution: {card_id} → {req.execution_status}")
 
         # Validate execution_status
-        valid_statuses = ["not_executed", "in_progress", "passed", "failed"]
-        if req.execution_status not in valid_statuses:
+        if req.execution_status not in VALID_EXECUTION_STATUSES:
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid execution_status. Must be one of: {', '.join(valid_statuses)}"
+                detail=f"Invalid execution_status. Must be one of: {', '.join(VALID_EXECUTION_STATUSES)}"
             )
 
-        # Fetch current test card via FastAPI vectordb API
-        fastapi_url = os.getenv("FASTAPI_URL", "http://localhost:9020")
-        response = requests.get(
-            f"{fastapi_url}/api/vectordb/documents",
-            params={"collection_name": collection_name},
-            timeout=30
-        )
-
-        if not response.ok:
-            logger.error(f"Failed to fetch test cards: {response.status_code} - {response.text}")
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Failed to fetch test cards: {response.text}"
-            )
+        collection = chroma_client.get_collection(name=collection_name)
 
-        data = response.json()
-        ids = data.get("ids", [])
-        documents = data.get("documents", [])
-        metadatas = data.get("metadatas", [])
+        # Metadata-only patch: merged server-side, no re-embedding
+        result = (await run_in_threadpool(
+            test_card_service.bulk_write_test_cards,
+            collection,
+            [{
+                "document_id": card_id,
+                "metadata": _execution_metadata_patch(req.execution_status, req.executed_by, req.notes)
+            }]
+        ))[0]
 
-        # Find the test card
-        try:
-            idx = ids.index(card_id)
-        except ValueError:
+        if result["status"] == "not_found":
             raise HTTPException(
                 status_code=404,
                 detail=f"Test card '{card_id}' not found in collection '{collection_name}'"
             )
-
-        # Update metadata
-        current_metadata = metadatas[idx] or {}
-        updated_metadata = current_metadata.copy()
-
-        updated_metadata["execution_status"] = req.execution_status
-        updated_metadata["passed"] = req.execution_status == "passed"
-        updated_metadata["failed"] = req.execution_status == "failed"
-
-        if req.executed_by:
-            updated_metadata["executed_by"] = req.executed_by
-
-        if req.notes:
-            updated_metadata["notes"] = req.notes
-
-        updated_metadata["last_updated"] = datetime.now().isoformat()
-
-        # Update in ChromaDB via FastAPI vectordb API
-        update_payload = {
-            "collection_name": collection_name,
-            "ids": [card_id],
-            "metadatas": [updated_metadata]
-        }
-
-        update_response = requests.post(
-            f"{fastapi_url}/api/vectordb/documents/update",
-            json=update_payload,
-            timeout=30
-        )
-
-        if not update_response.ok:
-            logger.error(f"Failed to update test card: {update_response.status_code} - {update_response.text}")
+        if result["status"] == "failed":
+            logger.error(f"Failed to update test card: {result['error']}")
             raise HTTPException(
-                status_code=update_response.status_code,
-                detail=f"Failed to update test card: {update_response.text}"
+                status_code=500,
+                detail=f"Failed to update test card: {result['error']}"
             )
 
         logger.info(f"Test card {card_id} updated successfully")
@@ -2545,11 +2658,63 @@ async def update_test_card_execution(
         logger.error(f"Failed to update test card execution: {e}")
         raise HTTPException(status_code=500, detail=f"Update failed: {str(e)}")
 
+
+@doc_gen_api_router.put("/test-cards/execute", response_model=BulkUpdateTestCardsResponse)
+async def bulk_update_test_card_execution(
+    req: BulkUpdateTestCardExecutionRequest,
+    test_card_service: TestCardService = Depends(get_test_card_service)
+):
+    """
+    Update execution status on many test cards at once.
+
+    Validation failures are reported per item; valid updates are written as
+    batched metadata-only updates.
+    """
+    try:
+        logger.info(f"Bulk updating execution status on {len(req.updates)} test cards")
+
+        invalid = {
+            i for i, update in enumerate(req.updates)
+            if update.execution_status not in VALID_EXECUTION_STATUSES
+        }
+        items = [
+            {
+                "document_id": update.document_id,
+                "metadata": _execution_metadata_patch(update.execution_status, update.executed_by, update.notes)
+            }
+            for i, update in enumerate(req.updates) if i not in invalid
+        ]
+
+        collection = chroma_client.get_collection(name=req.collection_name)
+        written = iter(await run_in_threadpool(test_card_service.bulk_write_test_cards, collection, items))
+
+        results = [
+            {
+                "document_id": update.document_id,
+                "status": "failed",
+                "re_embedded": False,
+                "error": f"Invalid execution_status '{update.execution_status}' for {update.document_id}"
+            } if i in invalid else next(written)
+            for i, update in enumerate(req.updates)
+        ]
+
+        return _bulk_update_response(results)
+
+    except Exception as e:
+        logger.error(f"Bulk execution update failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Bulk execution update failed: {str(e)}")
+
+# Page size used when streaming test cards out of ChromaDB for export
+TEST_CARD_EXPORT_PAGE_SIZE = 500
+
+
 @doc_gen_api_router.post("/test-cards/export-docx")
 async def export_test_cards_to_docx(req: QueryTestCardsRequest):
     """
     Export test cards to a DOCX file.
     Filters test cards by test_plan_id and exports them to a downloadable Word document.
+    The document is streamed: test cards are paged out of ChromaDB and written
+    into the zip stream as they arrive, so memory stays bounded for large plans.
 
     Args:
         req: Query parameters (test_plan_id, execution_status, collection_name)
@@ -2557,8 +2722,9 @@ async def export_test_cards_to_docx(req: QueryTestCardsRequest):
     Returns:
         Word document as downloadable file
     """
-    from fastapi.responses import Response
-    
+    from fastapi.responses import StreamingResponse
+    from services.streaming_docx_writer import DOCX_MEDIA_TYPE
+
     try:
         logger.info(f"Exporting test cards to DOCX for test_plan_id={req.test_plan_id}")
 
@@ -2578,52 +2744,40 @@ async def export_test_cards_to_docx(req: QueryTestCardsRequest):
         if req.execution_status:
             where["execution_status"] = req.execution_status
 
-        # Query ChromaDB
-        if where:
-            result = collection.get(
-                where=where,
-                limit=1000,
-                include=["documents", "metadatas"]
-            )
-        else:
-            result = collection.get(
-                limit=100,
-                include=["documents", "metadatas"]
-            )
-
-        ids = result.get("ids", [])
-        documents = result.get("documents", [])
-        metadatas = result.get("metadatas", [])
+        # Fetch the first page up front so missing cards surface as a 404 before streaming starts
+        first_page = collection.get(
+            where=where or None,
+            limit=TEST_CARD_EXPORT_PAGE_SIZE,
+            include=["documents", "metadatas"]
+        )
+        first_metadatas = first_page.get("metadatas", [])
 
-        if not ids:
+        if not first_page.get("ids"):
             raise HTTPException(status_code=404, detail="No test cards found matching filters")
 
-        # Build test cards list for export
-        test_cards = []
-        for doc_id, content, metadata in zip(ids, documents, metadatas):
-            test_cards.append({
-                "document_id": doc_id,
-                "content": content,
-                "metadata": metadata or {}
-            })
+        # Total count (ids only) for the document header
+        total_cards = len(collection.get(where=where, include=[]).get("ids", [])) if where else collection.count()
 
         # Get test plan title
-        test_plan_title = metadatas[0].get("test_plan_title", "Test Plan") if metadatas else "Test Plan"
+        test_plan_title = (first_metadatas[0] or {}).get("test_plan_title", "Test Plan") if first_metadatas else "Test Plan"
 
-        # Export to DOCX
         word_export_service = WordExportService()
-        docx_bytes = word_export_service.export_test_cards_to_word(test_cards, test_plan_title)
+        docx_stream = word_export_service.stream_test_cards_to_word(
+            _iter_test_cards(collection, where, first_page),
+            total_cards,
+            test_plan_title
+        )
 
         # Create filename
         plan_id_safe = req.test_plan_id or "all"
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"test_cards_{plan_id_safe}_{timestamp}.docx"
 
-        logger.info(f"Exported {len(test_cards)} test cards to DOCX: {filename}")
+        logger.info(f"Streaming {total_cards} test cards to DOCX: {filename}")
 
-        return Response(
-            content=docx_bytes,
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        return StreamingResponse(
+            docx_stream,
+            media_type=DOCX_MEDIA_TYPE,
             headers={
                 "Content-Disposition": f"attachment; filename=\"{filename}\""
             }
@@ -2638,6 +2792,30 @@ async def export_test_cards_to_docx(req: QueryTestCardsRequest):
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
 
+def _iter_test_cards(collection, where: Dict[str, Any], first_page: Dict[str, Any]):
+    """Yield test cards page by page from ChromaDB, starting with an already fetched first page."""
+    page = first_page
+    offset = 0
+    while True:
+        ids = page.get("ids", [])
+        for doc_id, content, metadata in zip(ids, page.get("documents", []), page.get("metadatas", [])):
+            yield {
+                "document_id": doc_id,
+                "content": content,
+                "metadata": metadata or {}
+            }
+
+        if len(ids) < TEST_CARD_EXPORT_PAGE_SIZE:
+            return
+        offset += len(ids)
+        page = collection.get(
+            where=where or None,
+            limit=TEST_CARD_EXPORT_PAGE_SIZE,
+            offset=offset,
+            include=["documents", "metadatas"]
+        )
+
+
 @doc_gen_api_router.post("/test-cards/export-markdown")
 async def export_test_cards_to_markdown(req: QueryTestCardsRequest):
     """
@@ -2759,78 +2937,80 @@ async def export_test_cards_to_markdown(req: QueryTestCardsRequest):
 
 
 @doc_gen_api_router.post("/test-cards/bulk-update", response_model=BulkUpdateTestCardsResponse)
-async def bulk_update_test_cards(req: BulkUpdateTestCardsRequest):
+async def bulk_update_test_cards(
+    req: BulkUpdateTestCardsRequest,
+    test_card_service: TestCardService = Depends(get_test_card_service)
+):
     """
     Bulk update test cards in ChromaDB.
     Accepts a list of updates with document IDs and metadata changes.
+
+    Metadata-only changes are written without re-embedding; only cards whose
+    content changed are re-embedded, in one batch. A null value cannot clear
+    a metadata key; such updates are reported as failed and left unwritten.
     """
     try:
         logger.info(f"Bulk updating {len(req.updates)} test cards in collection: {req.collection_name}")
 
         collection = chroma_client.get_collection(name=req.collection_name)
 
-        updated_count = 0
-        failed_count = 0
-        errors = []
-
+        items = []
         for update_item in req.updates:
-            document_id = update_item.get("document_id")
-            updates = update_item.get("updates", {})
-
-            if not document_id:
-                failed_count += 1
-                errors.append("Missing document_id in update item")
-                continue
-
-            try:
-                # Get existing document and metadata
-                existing = collection.get(ids=[document_id], include=["documents", "metadatas"])
-
-                if not existing["ids"]:
-                    failed_count += 1
-                    errors.append(f"Document not found: {document_id}")
-                    continue
-
-                # Separate content updates from metadata updates
-                content_update = updates.pop("content", None)
+            updates = dict(update_item.get("updates", {}))
+            # Separate content updates from metadata updates
+            content_update = updates.pop("content", None)
+            items.append({
+                "document_id": update_item.get("document_id"),
+                "metadata": updates,
+                "content": content_update
+            })
 
-                # Merge existing metadata with updates
-                existing_metadata = existing["metadatas"][0] if existing["metadatas"] else {}
-                updated_metadata = {**existing_metadata, **updates}
+        results = await run_in_threadpool(test_card_service.bulk_write_test_cards, collection, items)
+        response = _bulk_update_response(results)
 
-                # Build update parameters
-                update_params = {
-                    "ids": [document_id],
-                    "metadatas": [updated_metadata]
-                }
+        logger.info(f"Bulk update complete: {response.updated_count} updated, {response.failed_count} failed")
+        return response
 
-                # If content (test procedures) is being updated, include it
-                if content_update is not None:
-                    update_params["documents"] = [content_update]
+    except Exception as e:
+        logger.error(f"Bulk update failed: {e}")
+        import traceback
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Bulk update failed: {str(e)}")
 
-                # Update the document in ChromaDB
-                collection.update(**update_params)
 
-                updated_count += 1
-                logger.debug(f"Updated test card: {document_id}")
+@doc_gen_api_router.post("/test-cards/bulk-upsert", response_model=BulkUpdateTestCardsResponse)
+async def bulk_upsert_test_cards(
+    req: BulkUpsertTestCardsRequest,
+    test_card_service: TestCardService = Depends(get_test_card_service)
+):
+    """
+    Create or update many test cards in ChromaDB.
 
-            except Exception as e:
-                failed_count += 1
-                error_msg = f"Failed to update {document_id}: {str(e)}"
-                errors.append(error_msg)
-                logger.error(error_msg)
+    Existing cards have their metadata merged; content is only re-embedded when
+    it differs from what is stored. Missing cards are created.
+    """
+    try:
+        logger.info(f"Bulk upserting {len(req.cards)} test cards in collection: {req.collection_name}")
 
-        logger.info(f"Bulk update complete: {updated_count} updated, {failed_count} failed")
+        collection = chroma_client.get_or_create_collection(name=req.collection_name)
+        items = [
+            {
+                "document_id": card.get("document_id"),
+                "metadata": card.get("metadata") or {},
+                "content": card.get("content")
+            }
+            for card in req.cards
+        ]
 
-        return BulkUpdateTestCardsResponse(
-            updated_count=updated_count,
-            failed_count=failed_count,
-            errors=errors
+        results = await run_in_threadpool(
+            test_card_service.bulk_write_test_cards,
+            collection,
+            items,
+            create_missing=True
         )
+        return _bulk_update_response(results)
 
     except Exception as e:
-        logger.error(f"Bulk update failed: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
-        raise HTTPException(status_code=500, detail=f"Bulk update failed: {str(e)}")
+        logger.error(f"Bulk upsert failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Bulk upsert failed: {str(e)}")
 
@@ -1,9 +1,10 @@
 from fastapi import Query, BackgroundTasks, UploadFile, File, Request, Response
+from fastapi.responses import FileResponse
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
-from services.document_ingestion_service import run_ingest_job
+from services.document_ingestion_service import run_ingest_job, description_queue, image_store
 from integrations.chromadb_client import get_chroma_client
 
 # Get ChromaDB client instance (backward compatibility)
@@ -18,6 +19,7 @@ import os
 import uuid
 import logging
 import json
+import mimetypes
 
 logger = logging.getLogger("VECTORDB_API")
 
@@ -28,9 +30,8 @@ openai_api_key = os.getenv("OPENAI_API_KEY", "")
 redis_url = os.getenv("REDIS_URL", "redis://redis:6379/0")
 redis_client = redis.from_url(redis_url, decode_responses=True)
 
-# Image storage directory
-IMAGES_DIR = os.path.join(os.getcwd(), "stored_images")
-os.makedirs(IMAGES_DIR, exist_ok=True)
+# Image storage directory (shared with ingestion)
+IMAGES_DIR = image_store.root
 
 # Vision model configuration
 VISION_CONFIG = {
@@ -123,9 +124,11 @@ def delete_collection(collection_name: str = Query(...)):
                 detail=f"Collection '{collection_name}' not found."
             )
 
+        chunk_ids = chroma_client.get_collection(collection_name).get(include=[])["ids"]
         chroma_client.delete_collection(collection_name)
+        freed_images = image_store.release(chunk_ids)
         logger.info(f"Deleted collection: {collection_name}")
-        return {"deleted": collection_name}
+        return {"deleted": collection_name, "freed_images": freed_images}
         
     except HTTPException:
         raise
@@ -254,10 +257,12 @@ def remove_documents(req: DocumentRemoveRequest):
 
         # Delete the specified document(s)
         collection.delete(ids=req.ids)
-        
+        freed_images = image_store.release(req.ids)
+
         return {
             "collection": req.collection_name,
-            "removed_ids": req.ids
+            "removed_ids": req.ids,
+            "freed_images": freed_images
         }
     except HTTPException:
         raise
@@ -266,6 +271,39 @@ def remove_documents(req: DocumentRemoveRequest):
         raise HTTPException(status_code=500, detail=f"Error removing documents: {str(e)}")
 
 
+@vectordb_api_router.delete("/documents/{document_id}")
+def delete_document(document_id: str, collection_name: str = Query(...)):
+    """
+    Delete every chunk of an uploaded document and free images no other chunk uses.
+    """
+    try:
+        if collection_name not in chroma_client.list_collections():
+            raise HTTPException(
+                status_code=404,
+                detail=f"Collection '{collection_name}' not found."
+            )
+
+        collection = chroma_client.get_collection(collection_name)
+        chunk_ids = collection.get(where={"document_id": document_id}, include=[])["ids"]
+        if not chunk_ids:
+            raise HTTPException(status_code=404, detail=f"Document {document_id} not found")
+
+        collection.delete(ids=chunk_ids)
+        freed_images = image_store.release(chunk_ids)
+
+        return {
+            "collection": collection_name,
+            "document_id": document_id,
+            "removed_chunks": len(chunk_ids),
+            "freed_images": freed_images
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error deleting document: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error deleting document: {str(e)}")
+
+
 class DocumentEditRequest(BaseModel):
     collection_name: str
     doc_id: str
@@ -408,6 +446,8 @@ async def upload_and_process_documents(
     model_name: str = Query("none"),
     vision_models: str = Query(""),
     enable_ocr: bool = Query(False),
+    defer_image_descriptions: Optional[bool] = Query(None),
+    chunking_strategy: Optional[str] = Query(None, pattern="^(structure|token|character)$"),
     request: Request = None,
 ):
     # Enhanced logging for debugging
@@ -454,6 +494,8 @@ async def upload_and_process_documents(
         selected_models,
         request.headers.get("X-OpenAI-API-Key") or openai_api_key,
         enable_ocr,
+        defer_image_descriptions,
+        chunking_strategy,
     )
 
     # 5) Return immediately with the job ID
@@ -600,7 +642,8 @@ def hybrid_reconstruct_document(chunks_data: List[Dict], base_image_url: str = "
                         "filename": filename,
                         "storage_path": path,
                         "description": desc,
-                        "exists": os.path.exists(path)
+                        # Referenced content-addressed blobs exist by construction
+                        "exists": image_store.is_content_name(filename) or os.path.exists(path)
                     })
                     image_counter += 1
             except Exception as e:
@@ -662,6 +705,14 @@ def reconstruct_document(document_id: str, collection_name: str = Query(...), re
 
         chunks_data.sort(key=lambda x: x["chunk_index"])
 
+        # Someone is looking at this document: describe its pending images next
+        pending_chunk_ids = [
+            chunk_id for chunk_id, md in zip(results["ids"], results["metadatas"])
+            if md and md.get("image_descriptions_pending")
+        ]
+        if pending_chunk_ids:
+            description_queue.prioritize(collection_name, pending_chunk_ids)
+
         # Build absolute image URL for browser rendering
         # IMPORTANT: Always use localhost for browser access, not Docker internal hostname
         # The request.url.netloc might be "fastapi:9020" (Docker internal) which browsers can't access
@@ -686,7 +737,8 @@ def reconstruct_document(document_id: str, collection_name: str = Query(...), re
             "total_chunks": len(chunks_data),
             "reconstructed_content": result["reconstructed_content"],
             "images": result["images"],
-            "metadata": result["metadata"]
+            "metadata": result["metadata"],
+            "pending_image_descriptions": len(pending_chunk_ids)
         }
 
     except HTTPException:
@@ -695,29 +747,146 @@ def reconstruct_document(document_id: str, collection_name: str = Query(...), re
         raise HTTPException(status_code=500, detail=f"Error reconstructing document: {str(e)}")
 
 
+@vectordb_api_router.post("/documents/{document_id}/describe-images")
+def prioritize_image_descriptions(document_id: str, collection_name: str = Query(...)):
+    """
+    Move a document's pending image descriptions to the front of the description queue.
+
+    Chunks uploaded with deferred image descriptions carry placeholder
+    descriptions until the background queue reaches them.
+    """
+    try:
+        collection = chroma_client.get_collection(name=collection_name)
+        results = collection.get(
+            where={"$and": [
+                {"document_id": document_id},
+                {"image_descriptions_pending": True}
+            ]},
+            include=[]
+        )
+        prioritized = description_queue.prioritize(collection_name, results["ids"])
+
+        return {
+            "document_id": document_id,
+            "pending_chunks": len(results["ids"]),
+            "prioritized_chunks": prioritized,
+            "queue_length": description_queue.pending_count()
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error prioritizing image descriptions: {str(e)}")
+
+
+def _parse_byte_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range "bytes=start-end" header into an inclusive (start, end).
+
+    Returns None for headers we do not serve partially (other units, multiple
+    ranges, malformed values), so the caller sends the whole file.
+
+    Raises:
+        ValueError: If the range lies entirely outside the file
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start_s, sep, end_s = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if start_s:
+            start = int(start_s)
+            end = int(end_s) if end_s else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(0, size - int(end_s))
+            end = size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """True if an If-None-Match header matches etag (weak comparison, per RFC 9110)."""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
 @vectordb_api_router.get("/images/{image_filename}")
-def get_stored_image(image_filename: str):
+def get_stored_image(
+    image_filename: str,
+    request: Request,
+    width: Optional[int] = Query(None, ge=16, le=4096, description="Serve a cached JPEG thumbnail at about this width"),
+):
     """
     Retrieve a stored image file.
+
+    Content-addressed images are immutable: they get their sha256 as a strong
+    ETag and a one-year immutable Cache-Control. Legacy flat files get an
+    mtime/size ETag and must be revalidated. If-None-Match is answered with
+    304, single byte ranges with 206, and ?width= serves a thumbnail rendered
+    once and cached on disk.
     """
-    image_path = os.path.join(IMAGES_DIR, image_filename)
-    
-    if not os.path.exists(image_path):
+    image_path = image_store.resolve(image_filename)
+    if not image_path:
         raise HTTPException(status_code=404, detail="Image not found")
-    
+
     try:
-        with open(image_path, "rb") as f:
-            image_data = f.read()
-        
-        # Determine content type
-        ext = Path(image_filename).suffix.lower()
-        content_type = "image/jpeg" if ext == ".jpg" else "image/png"
-        
-        return Response(content=image_data, media_type=content_type)
-    
+        name = os.path.basename(image_path)
+        if width:
+            image_path = image_store.thumbnail(image_path, width)
+
+        stat = os.stat(image_path)
+        size = stat.st_size
+        if image_store.is_content_name(name):
+            etag = f'"{Path(image_path).stem}"'
+            cache_control = "public, max-age=31536000, immutable"
+        else:
+            etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+            cache_control = "no-cache"
+        headers = {"ETag": etag, "Cache-Control": cache_control, "Accept-Ranges": "bytes"}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+        content_type = mimetypes.guess_type(image_path)[0] or "application/octet-stream"
+        range_header = request.headers.get("range")
+        if range_header:
+            try:
+                byte_range = _parse_byte_range(range_header, size)
+            except ValueError:
+                return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+            if byte_range:
+                start, end = byte_range
+                with open(image_path, "rb") as f:
+                    f.seek(start)
+                    data = f.read(end - start + 1)
+                headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+                return Response(content=data, status_code=206, media_type=content_type, headers=headers)
+
+        # FileResponse streams from disk (zero-copy where the server supports it)
+        return FileResponse(image_path, media_type=content_type, headers=headers, stat_result=stat)
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading image: {str(e)}")
-    
+
+
+@vectordb_api_router.post("/images/gc")
+def collect_image_garbage():
+    """
+    Delete stored images that no chunk references (maintenance).
+    """
+    try:
+        return {"freed_images": image_store.collect_garbage()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error collecting images: {str(e)}")
+
+
 @vectordb_api_router.get("/jobs/{job_id}")
 def get_job_status(job_id: str):
     # status = jobs.get(job_id)
@@ -744,7 +913,8 @@ def get_job_status(job_id: str):
                 "chunks_processed": int(doc_status.get("chunks_processed", 0)),
                 "start_time": doc_status.get("start_time", ""),
                 "end_time": doc_status.get("end_time", ""),
-                "error_message": doc_status.get("error_message", "")
+                "error_message": doc_status.get("error_message", ""),
+                "chunk_token_histogram": json.loads(doc_status.get("chunk_token_histogram") or "{}")
             })
     
     return {
@@ -123,7 +123,8 @@ def init_db() -> None:
     - Restart with volumes: Skips already-applied migrations
     - Volume removed: Re-runs all migrations automatically
 
-    Uses migration tracking table to ensure idempotency.
+    Uses migration tracking table to ensure idempotency, then creates any
+    missing monthly partitions of the partitioned history tables.
     """
     from models import Base
 
@@ -145,6 +146,16 @@ def init_db() -> None:
             # Don't raise exception - allow app to start even if migrations fail
             # This allows for manual intervention
 
+        # Step 3: Monthly partitions for the current and upcoming months (idempotent)
+        from services.partition_service import maintain_partitions
+
+        db = SessionLocal()
+        try:
+            maintain_partitions(db)
+            logger.info(" History table partitions ensured")
+        finally:
+            db.close()
+
     except Exception as e:
         logger.error(f"Error during database initialization: {e}")
         # Re-raise to prevent app startup if critical initialization fails
@@ -0,0 +1,19 @@
+-- ============================================================================
+-- AGENT RESPONSE ANALYTICS INDEX
+-- ============================================================================
+-- Covering index for per-agent performance analytics. The aggregate query
+-- behind /analytics/agent-performance/{agent_id} (count, avg, percentiles,
+-- processing method breakdown) reads only the included columns, so Postgres
+-- answers it with an index-only scan instead of loading every response row.
+-- The (agent_id, created_at) order also serves "latest responses" lookups.
+--
+-- Date: 2026-10-19
+-- Version: 1.0
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_agent_responses_agent_created
+    ON agent_responses (agent_id, created_at)
+    INCLUDE (response_time_ms, rag_used, processing_method);
+
+-- Keep planner statistics current for the new index
+ANALYZE agent_responses;
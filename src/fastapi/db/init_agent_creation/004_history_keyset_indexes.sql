@@ -0,0 +1,37 @@
+-- ============================================================================
+-- HISTORY KEYSET PAGINATION INDEXES
+-- ============================================================================
+-- Session and chat history are paged newest-first with a (timestamp, id)
+-- cursor instead of OFFSET. Each index below lets one filtered page be read
+-- as a short backward range scan, however deep the client has scrolled.
+-- agent_responses (session_id, model_used) serves session detail reads and
+-- the session-history model filter.
+--
+-- Date: 2026-10-19
+-- Version: 1.0
+-- ============================================================================
+
+-- Session history
+CREATE INDEX IF NOT EXISTS idx_agent_sessions_created_id
+    ON agent_sessions (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_agent_sessions_type_created_id
+    ON agent_sessions (session_type, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_agent_sessions_collection_created_id
+    ON agent_sessions (collection_name, created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_agent_responses_session_model
+    ON agent_responses (session_id, model_used);
+
+-- Chat history
+CREATE INDEX IF NOT EXISTS idx_chat_timestamp_id
+    ON chat_history (timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_chat_model_timestamp_id
+    ON chat_history (model_used, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_chat_collection_timestamp_id
+    ON chat_history (collection_name, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_chat_type_timestamp_id
+    ON chat_history (query_type, timestamp, id);
+
+ANALYZE agent_sessions;
+ANALYZE agent_responses;
+ANALYZE chat_history;
@@ -0,0 +1,21 @@
+-- ============================================================================
+-- AGENT PERFORMANCE COUNTERS
+-- ============================================================================
+-- Agent performance is maintained with one atomic UPDATE per agent and batch
+-- (SET total_queries = total_queries + n, ...). Averages cannot be updated
+-- atomically from themselves, so the running sums are stored and
+-- avg_response_time_ms / success_rate are recomputed from them in the same
+-- statement. Existing agents are seeded from their current averages.
+--
+-- Date: 2026-10-19
+-- Version: 1.0
+-- ============================================================================
+
+ALTER TABLE compliance_agents
+    ADD COLUMN IF NOT EXISTS response_time_sum_ms BIGINT DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS success_count INTEGER DEFAULT 0;
+
+UPDATE compliance_agents
+SET response_time_sum_ms = ROUND(COALESCE(avg_response_time_ms, 0) * total_queries),
+    success_count = ROUND(COALESCE(success_rate, 0) * total_queries)
+WHERE COALESCE(total_queries, 0) > 0;
@@ -0,0 +1,146 @@
+-- ============================================================================
+-- MONTHLY PARTITIONS FOR HISTORY TABLES
+-- ============================================================================
+-- agent_responses, rag_citations and chat_history are append-only and grow
+-- without bound. They become range-partitioned by month on their timestamp
+-- (created_at / timestamp): time-bounded reads only scan the matching
+-- partitions and retention drops whole partitions instead of DELETEing rows.
+--
+-- Existing tables are converted in place without copying rows: each table is
+-- renamed to <table>_legacy and attached as the partition holding everything
+-- up to the end of the current month. Monthly partitions after that are
+-- created by services/partition_service.py (at startup and periodically).
+-- Fresh installs already get partitioned tables from the ORM models and are
+-- skipped here.
+--
+-- Postgres cannot reference a partitioned table by id alone (the primary key
+-- becomes (id, created_at)), so the rag_citations -> agent_responses foreign
+-- key is dropped. Citations are re-stamped with their response's created_at
+-- so a citation always lives in the same month as its response. Without the
+-- foreign key, deleting responses no longer cascades to their citations;
+-- AgentRepository.delete_cascade deletes them explicitly.
+--
+-- Legacy rows with a NULL timestamp are stamped with the epoch (1970-01-01).
+--
+-- Date: 2026-10-19
+-- Version: 1.0
+-- ============================================================================
+
+DO $$
+DECLARE
+    tbl TEXT;
+    ts_column TEXT;
+    legacy TEXT;
+    seq TEXT;
+    upper_bound TIMESTAMP;
+    fk RECORD;
+    idx RECORD;
+    pkey TEXT;
+    index_defs TEXT[];
+    fk_defs TEXT[];
+    def TEXT;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_class WHERE oid = to_regclass('agent_responses') AND relkind = 'r') THEN
+        FOR fk IN
+            SELECT conrelid::regclass AS referencing, conname
+            FROM pg_constraint
+            WHERE contype = 'f' AND confrelid = to_regclass('agent_responses')
+        LOOP
+            EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', fk.referencing, fk.conname);
+        END LOOP;
+
+        IF EXISTS (SELECT 1 FROM pg_class WHERE oid = to_regclass('rag_citations') AND relkind = 'r') THEN
+            UPDATE rag_citations c
+            SET created_at = r.created_at
+            FROM agent_responses r
+            WHERE r.id = c.agent_response_id
+              AND c.created_at IS DISTINCT FROM r.created_at;
+        END IF;
+    END IF;
+
+    FOR tbl, ts_column IN
+        SELECT * FROM (VALUES
+            ('agent_responses', 'created_at'),
+            ('rag_citations', 'created_at'),
+            ('chat_history', 'timestamp')
+        ) AS t(tbl, ts_column)
+    LOOP
+        CONTINUE WHEN NOT EXISTS (
+            SELECT 1 FROM pg_class WHERE oid = to_regclass(tbl) AND relkind = 'r'
+        );
+        legacy := tbl || '_legacy';
+
+        -- The partition key must be NOT NULL. Rows without a timestamp get the
+        -- epoch: they stay in the legacy partition and out of every time window
+        -- instead of appearing as current-month activity.
+        EXECUTE format('UPDATE %I SET %I = ''1970-01-01 00:00:00'' WHERE %I IS NULL', tbl, ts_column, ts_column);
+        EXECUTE format('ALTER TABLE %I ALTER COLUMN %I SET NOT NULL', tbl, ts_column);
+
+        -- Remember secondary indexes and foreign keys for the new parent, then
+        -- move the old index names out of the way
+        SELECT array_agg(pg_get_indexdef(indexrelid)) INTO index_defs
+        FROM pg_index
+        WHERE indrelid = to_regclass(tbl) AND NOT indisprimary;
+
+        SELECT array_agg(pg_get_constraintdef(oid)) INTO fk_defs
+        FROM pg_constraint
+        WHERE conrelid = to_regclass(tbl) AND contype = 'f';
+
+        FOR idx IN
+            SELECT c.relname
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE i.indrelid = to_regclass(tbl)
+        LOOP
+            EXECUTE format('ALTER INDEX %I RENAME TO %I', idx.relname, left(idx.relname, 56) || '_legacy');
+        END LOOP;
+
+        -- The legacy partition ends at the first month boundary after its newest row
+        EXECUTE format(
+            'SELECT date_trunc(''month'', GREATEST(max(%I), now() AT TIME ZONE ''UTC'')) + interval ''1 month'' FROM %I',
+            ts_column, tbl
+        ) INTO upper_bound;
+
+        seq := pg_get_serial_sequence(tbl, 'id');
+
+        -- Replaced by the parent's (id, <timestamp>) key when attached
+        SELECT conname INTO pkey
+        FROM pg_constraint
+        WHERE conrelid = to_regclass(tbl) AND contype = 'p';
+        IF pkey IS NOT NULL THEN
+            EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', tbl, pkey);
+        END IF;
+
+        EXECUTE format('ALTER TABLE %I RENAME TO %I', tbl, legacy);
+        EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS) PARTITION BY RANGE (%I)', tbl, legacy, ts_column);
+        EXECUTE format('ALTER TABLE %I ADD PRIMARY KEY (id, %I)', tbl, ts_column);
+
+        -- Keep the id sequence when the legacy partition is eventually dropped
+        IF seq IS NOT NULL THEN
+            EXECUTE format('ALTER SEQUENCE %s OWNED BY %I.id', seq, tbl);
+        END IF;
+
+        EXECUTE format(
+            'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (MINVALUE) TO (%L)',
+            tbl, legacy, upper_bound
+        );
+
+        -- Recreated on the parent; the matching legacy indexes and foreign
+        -- keys are attached instead of being rebuilt
+        IF index_defs IS NOT NULL THEN
+            FOREACH def IN ARRAY index_defs LOOP
+                EXECUTE def;
+            END LOOP;
+        END IF;
+
+        IF fk_defs IS NOT NULL THEN
+            FOREACH def IN ARRAY fk_defs LOOP
+                EXECUTE format('ALTER TABLE %I ADD %s', tbl, def);
+            END LOOP;
+        END IF;
+    END LOOP;
+END $$;
+
+ANALYZE agent_responses;
+ANALYZE rag_citations;
+ANALYZE chat_history;
@@ -0,0 +1,35 @@
+-- ============================================================================
+-- FULL-TEXT SEARCH OVER CHAT AND SESSION HISTORY
+-- ============================================================================
+-- Adds a generated tsvector column with a GIN index to chat_history (user
+-- query weighted above the response) and agent_responses (response text).
+-- Postgres keeps the columns current on every insert/update; the search
+-- endpoints match them with websearch_to_tsquery and rank with ts_rank_cd.
+--
+-- The text search configuration ('english') must match SEARCH_CONFIG in
+-- models/base.py. Both tables are partitioned, so the columns and indexes
+-- are added to every partition.
+--
+-- Date: 2026-10-19
+-- Version: 1.0
+-- ============================================================================
+
+ALTER TABLE chat_history
+    ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(user_query, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(response, '')), 'B')
+    ) STORED;
+
+ALTER TABLE agent_responses
+    ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        to_tsvector('english', coalesce(response_text, ''))
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_chat_search
+    ON chat_history USING gin (search_vector);
+
+CREATE INDEX IF NOT EXISTS idx_agent_responses_search
+    ON agent_responses USING gin (search_vector);
+
+ANALYZE chat_history;
+ANALYZE agent_responses;
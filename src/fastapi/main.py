@@ -17,9 +17,20 @@ from api.vectordb_api import vectordb_api_router
 from api.models_api import models_api_router
 from api.test_plan_agent_api import router as test_plan_agent_router
 from api.agent_set_api import router as agent_set_router
+from services.word_export_service import WordExportService
+from services.document_ingestion_service import description_queue
+from services.analytics_rollup_service import RollupRefresher
+from services.persistence_queue import persistence_queue
+from services.partition_service import PartitionMaintainer
+from core.database import SessionLocal
 
 app = FastAPI()
 
+# Keeps the session analytics rollups current
+rollup_refresher = RollupRefresher(SessionLocal)
+# Creates upcoming monthly partitions and drops expired ones
+partition_maintainer = PartitionMaintainer(SessionLocal)
+
 @app.on_event("startup")
 def on_startup():
     # Configure database initialization loggers to show migration info
@@ -35,6 +46,29 @@ def on_startup():
 
     init_db()
 
+    # Build the Word export style template once so exports only clone it
+    try:
+        WordExportService.get_style_template()
+    except Exception as e:
+        logging.getLogger("uvicorn").warning(f"Failed to prebuild Word style template: {e}")
+
+    # Resume image descriptions deferred by earlier uploads
+    description_queue.start()
+
+    rollup_refresher.start()
+
+    partition_maintainer.start()
+
+    persistence_queue.start()
+
+@app.on_event("shutdown")
+def on_shutdown():
+    description_queue.stop()
+    rollup_refresher.stop()
+    partition_maintainer.stop()
+    # Flush buffered responses, citations and chat history before exit
+    persistence_queue.stop()
+
 app.include_router(chat_api_router, prefix="/api")
 app.include_router(agent_api_router, prefix="/api")
 app.include_router(rag_api_router, prefix="/api")
@@ -22,6 +22,7 @@ from models.sequence import ComplianceSequence
 from models.session import AgentSession, DebateSession
 from models.response import AgentResponse, ComplianceResult
 from models.citation import RAGCitation
+from models.analytics import SessionRollup, ResponseRollup, RollupState
 
 # Configure relationships (bidirectional relationships must be configured after all models are imported)
 from sqlalchemy.orm import relationship
@@ -64,4 +65,7 @@ __all__ = [
     "AgentResponse",
     "ComplianceResult",
     "RAGCitation",
+    "SessionRollup",
+    "ResponseRollup",
+    "RollupState",
 ]
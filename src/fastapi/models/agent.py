@@ -7,7 +7,7 @@ This module contains SQLAlchemy models for agent entities:
 """
 
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, JSON, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Float, Boolean, JSON, DateTime
 from sqlalchemy.orm import relationship
 
 from models.base import Base
@@ -73,6 +73,8 @@ class ComplianceAgent(Base):
 
         # Performance tracking
         total_queries: Total number of queries processed
+        response_time_sum_ms: Sum of response times (avg_response_time_ms numerator)
+        success_count: Successful queries (success_rate numerator)
         avg_response_time_ms: Average response time in milliseconds
         success_rate: Success rate (0.0-1.0)
 
@@ -110,8 +112,10 @@ class ComplianceAgent(Base):
     memory_enabled = Column(Boolean, default=False)
     tools_enabled = Column(JSON, default={})
 
-    # Performance tracking
+    # Performance tracking (averages are derived from the sums in the same UPDATE)
     total_queries = Column(Integer, default=0)
+    response_time_sum_ms = Column(BigInteger, default=0)
+    success_count = Column(Integer, default=0)
     avg_response_time_ms = Column(Float)
     success_rate = Column(Float)
 
@@ -0,0 +1,73 @@
+"""
+Analytics rollup ORM models.
+
+This module contains pre-aggregated tables for the analytics dashboards:
+- SessionRollup: Agent session counts and response times per time bucket
+- ResponseRollup: Agent response counts and RAG usage per time bucket
+- RollupState: How far the rollups have been computed
+"""
+
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Enum
+
+from models.base import Base
+from models.enums import SessionType, AnalysisType
+
+
+class SessionRollup(Base):
+    """
+    Agent session aggregates for one hour or one day.
+
+    Attributes:
+        granularity: Bucket size ('hour' or 'day')
+        bucket_start: Bucket start (UTC, truncated to the hour/day)
+        session_type: Session type (SessionType enum)
+        analysis_type: Analysis type (AnalysisType enum)
+        session_count: Sessions created in the bucket
+        response_time_sum_ms: Sum of total_response_time_ms (sessions that have one)
+        response_time_count: Sessions with a total_response_time_ms
+    """
+    __tablename__ = "agent_session_rollups"
+
+    granularity = Column(String(8), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    session_type = Column(Enum(SessionType), primary_key=True)
+    analysis_type = Column(Enum(AnalysisType), primary_key=True)
+
+    session_count = Column(Integer, nullable=False, default=0)
+    response_time_sum_ms = Column(BigInteger, nullable=False, default=0)
+    response_time_count = Column(Integer, nullable=False, default=0)
+
+
+class ResponseRollup(Base):
+    """
+    Agent response aggregates per agent for one hour or one day.
+
+    Attributes:
+        granularity: Bucket size ('hour' or 'day')
+        bucket_start: Bucket start (UTC, truncated to the hour/day)
+        agent_id: ComplianceAgent id
+        response_count: Responses created in the bucket
+        rag_response_count: Responses that used RAG
+    """
+    __tablename__ = "agent_response_rollups"
+
+    granularity = Column(String(8), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    agent_id = Column(Integer, primary_key=True)
+
+    response_count = Column(Integer, nullable=False, default=0)
+    rag_response_count = Column(Integer, nullable=False, default=0)
+
+
+class RollupState(Base):
+    """
+    Rollup progress marker.
+
+    Attributes:
+        name: Rollup name
+        watermark: Hourly rollups are complete for every hour before this (UTC)
+    """
+    __tablename__ = "analytics_rollup_state"
+
+    name = Column(String, primary_key=True)
+    watermark = Column(DateTime, nullable=False)
@@ -12,6 +12,10 @@ from sqlalchemy.ext.declarative import declarative_base, declared_attr
 # Create base declarative class
 Base = declarative_base()
 
+# Postgres text search configuration used by the search_vector columns and
+# the queries that match them (changing it requires rebuilding the columns)
+SEARCH_CONFIG = "english"
+
 
 class TimestampMixin:
     """
@@ -5,9 +5,11 @@ This module contains the ChatHistory model for storing conversation history.
 """
 
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, Index
+from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 
-from models.base import Base
+from models.base import Base, SEARCH_CONFIG
 
 
 class ChatHistory(Base):
@@ -17,32 +19,53 @@ class ChatHistory(Base):
     This model tracks all chat interactions, including queries, responses,
     model usage, and source documents for RAG queries.
 
+    The table is range-partitioned by month on timestamp, so the primary key
+    is (id, timestamp).
+
     Attributes:
-        id: Primary key
+        id: Primary key (with timestamp)
         user_query: User's original query
         response: System response
         model_used: LLM model identifier
         collection_name: ChromaDB collection used (for RAG queries)
         query_type: Type of query ('direct', 'rag', 'hybrid')
         response_time_ms: Response time in milliseconds
-        timestamp: Query timestamp
+        timestamp: Query timestamp (partition key)
         session_id: Session identifier for grouping related queries
         source_documents: JSON array of source documents used
+        search_vector: Full-text search document over user_query (weight A)
+            and response (weight B), maintained by Postgres; deferred
     """
     __tablename__ = "chat_history"
+    __table_args__ = {"postgresql_partition_by": "RANGE (timestamp)"}
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     user_query = Column(Text)
     response = Column(Text)
     model_used = Column(String)
     collection_name = Column(String)
     query_type = Column(String)
     response_time_ms = Column(Integer)
-    timestamp = Column(DateTime, default=datetime.now(timezone.utc), index=True)
+    timestamp = Column(DateTime, primary_key=True, default=lambda: datetime.now(timezone.utc), index=True)
     session_id = Column(String, index=True)
     source_documents = Column(JSON)
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(user_query, '')), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(response, '')), 'B')",
+            persisted=True
+        )
+    ))
 
 
 # Composite indexes for better query performance
 Index('idx_chat_session_timestamp', ChatHistory.session_id, ChatHistory.timestamp)
 Index('idx_chat_model_type', ChatHistory.model_used, ChatHistory.query_type)
+# Keyset pagination on (timestamp, id), unfiltered and per filter column
+Index('idx_chat_timestamp_id', ChatHistory.timestamp, ChatHistory.id)
+Index('idx_chat_model_timestamp_id', ChatHistory.model_used, ChatHistory.timestamp, ChatHistory.id)
+Index('idx_chat_collection_timestamp_id', ChatHistory.collection_name, ChatHistory.timestamp, ChatHistory.id)
+Index('idx_chat_type_timestamp_id', ChatHistory.query_type, ChatHistory.timestamp, ChatHistory.id)
+# Full-text search (ChatRepository.search)
+Index('idx_chat_search', ChatHistory.search_vector, postgresql_using='gin')
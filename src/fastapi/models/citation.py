@@ -6,7 +6,7 @@ and providing explainability for RAG-enhanced responses.
 """
 
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey, JSON, DateTime, Index
+from sqlalchemy import Column, Integer, String, Text, Float, JSON, DateTime, Index
 from sqlalchemy.orm import relationship
 
 from models.base import Base
@@ -22,9 +22,17 @@ class RAGCitation(Base):
     - Audit trails: Track data lineage for compliance
     - Quality assessment: Evaluate relevance of retrieved documents
 
+    The table is range-partitioned by month on created_at, which is always
+    the owning response's created_at: a citation lands in the same month as
+    its response and (agent_response_id, created_at) identifies the
+    response. Postgres cannot enforce a foreign key to a partitioned table
+    on id alone, so agent_response_id is not a database foreign key;
+    citations are removed with their response by the ORM cascade or when
+    their partition is dropped.
+
     Attributes:
-        id: Primary key
-        agent_response_id: Foreign key to AgentResponse
+        id: Primary key (with created_at)
+        agent_response_id: AgentResponse id
         document_index: Position in retrieved results (1-based)
         distance: ChromaDB distance metric (lower = better match)
         similarity_score: Deprecated similarity score (backward compatibility)
@@ -36,15 +44,16 @@ class RAGCitation(Base):
         section_name: Section or chapter name
         metadata_json: Full metadata object from ChromaDB
         quality_tier: Quality assessment ('Excellent', 'High', 'Good', 'Fair', 'Low')
-        created_at: Citation timestamp
+        created_at: Owning response's created_at (partition key)
 
     Relationships:
         agent_response: The AgentResponse this citation belongs to
     """
     __tablename__ = "rag_citations"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
-    id = Column(Integer, primary_key=True, index=True)
-    agent_response_id = Column(Integer, ForeignKey("agent_responses.id", ondelete="CASCADE"), nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    agent_response_id = Column(Integer, nullable=False)
     document_index = Column(Integer, nullable=False)  # Position in retrieved results (1-based)
 
     # Distance metrics (ChromaDB uses distance, lower is better)
@@ -68,10 +77,17 @@ class RAGCitation(Base):
     quality_tier = Column(String, nullable=True)  # Excellent, High, Good, Fair, Low
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), index=True)
+    created_at = Column(DateTime, primary_key=True, default=lambda: datetime.now(timezone.utc), index=True)
 
     # Relationships
-    agent_response = relationship("AgentResponse", back_populates="citations")
+    agent_response = relationship(
+        "AgentResponse",
+        primaryjoin=(
+            "and_(foreign(RAGCitation.agent_response_id) == AgentResponse.id, "
+            "foreign(RAGCitation.created_at) == AgentResponse.created_at)"
+        ),
+        back_populates="citations"
+    )
 
 
 # Composite indexes for better query performance
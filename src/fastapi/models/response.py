@@ -7,10 +7,11 @@ This module contains SQLAlchemy models for agent responses:
 """
 
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, ForeignKey, DateTime, Index
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, ForeignKey, DateTime, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 
-from models.base import Base
+from models.base import Base, SEARCH_CONFIG
 
 
 class AgentResponse(Base):
@@ -21,8 +22,12 @@ class AgentResponse(Base):
     supporting tracking of multi-agent debates, RAG usage, and
     compliance analysis results.
 
+    The table is range-partitioned by month on created_at (see
+    services/partition_service.py), so the primary key is (id, created_at)
+    and queries that bound created_at only touch the matching partitions.
+
     Attributes:
-        id: Primary key
+        id: Primary key (with created_at)
         session_id: Foreign key to AgentSession
         agent_id: Foreign key to ComplianceAgent
         response_text: Agent's response text
@@ -34,8 +39,10 @@ class AgentResponse(Base):
         rag_context: The retrieved RAG context
         confidence_score: Confidence score (0.0-1.0)
         analysis_summary: Summary of analysis results
-        created_at: Response timestamp
+        created_at: Response timestamp (partition key)
         model_used: LLM model identifier
+        search_vector: Full-text search document over response_text,
+            maintained by Postgres; deferred
 
     Relationships:
         session: The AgentSession this response belongs to
@@ -43,8 +50,9 @@ class AgentResponse(Base):
         citations: RAGCitation records for this response
     """
     __tablename__ = "agent_responses"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     session_id = Column(String, ForeignKey("agent_sessions.session_id", ondelete="CASCADE"), nullable=False)
     agent_id = Column(Integer, ForeignKey("compliance_agents.id", ondelete="CASCADE"), nullable=False)
 
@@ -66,13 +74,28 @@ class AgentResponse(Base):
     analysis_summary = Column(Text, nullable=True)
 
     # Metadata
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), index=True)
+    created_at = Column(DateTime, primary_key=True, default=lambda: datetime.now(timezone.utc), index=True)
     model_used = Column(String, nullable=False)
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{SEARCH_CONFIG}', coalesce(response_text, ''))", persisted=True)
+    ))
 
     # Relationships
     session = relationship("AgentSession", back_populates="agent_responses")
     agent = relationship("ComplianceAgent")
-    citations = relationship("RAGCitation", back_populates="agent_response", cascade="all, delete-orphan")
+    # Citations share their response's created_at, so the join prunes
+    # rag_citations down to the response's month
+    citations = relationship(
+        "RAGCitation",
+        primaryjoin=(
+            "and_(AgentResponse.id == foreign(RAGCitation.agent_response_id), "
+            "AgentResponse.created_at == foreign(RAGCitation.created_at))"
+        ),
+        back_populates="agent_response",
+        cascade="all, delete-orphan",
+        order_by="RAGCitation.document_index"
+    )
 
 
 class ComplianceResult(Base):
@@ -117,5 +140,16 @@ class ComplianceResult(Base):
 
 
 # Composite indexes for better query performance
+# Covers per-agent analytics: aggregates are answered by an index-only scan
+Index(
+    'idx_agent_responses_agent_created',
+    AgentResponse.agent_id,
+    AgentResponse.created_at,
+    postgresql_include=['response_time_ms', 'rag_used', 'processing_method']
+)
+# Session detail reads and the session-history model filter
+Index('idx_agent_responses_session_model', AgentResponse.session_id, AgentResponse.model_used)
+# Full-text search (ResponseRepository.search)
+Index('idx_agent_responses_search', AgentResponse.search_vector, postgresql_using='gin')
 Index('idx_compliance_session_agent', ComplianceResult.session_id, ComplianceResult.agent_id)
 Index('idx_compliance_agent_created', ComplianceResult.agent_id, ComplianceResult.created_at)
@@ -7,7 +7,7 @@ This module contains SQLAlchemy models for tracking agent sessions:
 """
 
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Enum, JSON, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Enum, JSON, DateTime, Index
 from sqlalchemy.orm import relationship
 
 from models.base import Base
@@ -52,7 +52,7 @@ class AgentSession(Base):
     collection_name = Column(String, nullable=True)  # For RAG sessions
 
     # Session metadata
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), index=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
     completed_at = Column(DateTime, nullable=True)
     total_response_time_ms = Column(Integer, nullable=True)
 
@@ -103,3 +103,9 @@ class DebateSession(Base):
 
     # Relationship
     compliance_agent = relationship("ComplianceAgent", back_populates="debate_sessions")
+
+
+# Keyset pagination of session history on (created_at, id), per filter column
+Index('idx_agent_sessions_created_id', AgentSession.created_at, AgentSession.id)
+Index('idx_agent_sessions_type_created_id', AgentSession.session_type, AgentSession.created_at, AgentSession.id)
+Index('idx_agent_sessions_collection_created_id', AgentSession.collection_name, AgentSession.created_at, AgentSession.id)
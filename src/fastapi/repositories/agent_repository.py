@@ -8,6 +8,7 @@ This repository extends BaseRepository to provide standard CRUD operations
 plus agent-specific methods.
 """
 
+from sqlalchemy import select, tuple_
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from typing import List, Optional, Dict, Any
@@ -16,7 +17,8 @@ import logging
 
 from models.agent import ComplianceAgent
 from models.session import DebateSession
-from models.response import ComplianceResult
+from models.response import AgentResponse, ComplianceResult
+from models.citation import RAGCitation
 from repositories.base import BaseRepository
 from core.exceptions import NotFoundException, DuplicateException
 
@@ -173,7 +175,12 @@ class AgentRepository(BaseRepository[ComplianceAgent]):
         This method handles foreign key relationships by deleting:
         1. All DebateSession records referencing this agent
         2. All ComplianceResult records referencing this agent
-        3. The agent itself
+        3. The RAG citations of the agent's responses
+        4. The agent itself (its AgentResponse rows go with it via ON DELETE CASCADE)
+
+        Citations have no foreign key to the partitioned agent_responses table,
+        so the database cascade would leave them behind; they are matched on
+        (agent_response_id, created_at) and deleted first.
 
         Args:
             agent_id: ID of agent to delete
@@ -203,10 +210,19 @@ class AgentRepository(BaseRepository[ComplianceAgent]):
                 ComplianceResult.agent_id == agent_id
             ).delete(synchronize_session=False)
 
+            # Delete the citations of this agent's responses (no FK cascade)
+            agent_responses = select(AgentResponse.id, AgentResponse.created_at).where(
+                AgentResponse.agent_id == agent_id
+            )
+            citations_deleted = self.db.query(RAGCitation).filter(
+                tuple_(RAGCitation.agent_response_id, RAGCitation.created_at).in_(agent_responses)
+            ).delete(synchronize_session=False)
+
             logger.info(
                 f"Cascade deletion for agent {agent_id}: "
-                f"Removed {debate_sessions_deleted} debate sessions and "
-                f"{compliance_results_deleted} compliance results"
+                f"Removed {debate_sessions_deleted} debate sessions, "
+                f"{compliance_results_deleted} compliance results and "
+                f"{citations_deleted} citations"
             )
 
             # Delete the agent
@@ -221,7 +237,8 @@ class AgentRepository(BaseRepository[ComplianceAgent]):
                 "deleted_at": deleted_at,
                 "cleanup_info": {
                     "debate_sessions_deleted": debate_sessions_deleted,
-                    "compliance_results_deleted": compliance_results_deleted
+                    "compliance_results_deleted": compliance_results_deleted,
+                    "citations_deleted": citations_deleted
                 }
             }
 
@@ -273,6 +290,10 @@ class AgentRepository(BaseRepository[ComplianceAgent]):
         """
         Update agent performance metrics (queries, avg response time, success rate).
 
+        Goes through the same atomic counter UPDATE as the persistence queue, so
+        the running sums stay in step with the averages and concurrent callers
+        never overwrite each other's increments.
+
         Args:
             agent_id: Agent identifier
             response_time_ms: Response time in milliseconds
@@ -281,35 +302,28 @@ class AgentRepository(BaseRepository[ComplianceAgent]):
         Returns:
             Updated agent or None if not found
         """
+        # Imported here: services.persistence_queue imports from this package
+        from services.persistence_queue import apply_agent_performance
+
         try:
             agent = self.get(agent_id)
             if not agent:
                 return None
 
-            agent.total_queries = (agent.total_queries or 0) + 1
-
-            # Update average response time
-            if agent.avg_response_time_ms is None:
-                agent.avg_response_time_ms = response_time_ms
-            else:
-                total_time = agent.avg_response_time_ms * (agent.total_queries - 1) + response_time_ms
-                agent.avg_response_time_ms = total_time / agent.total_queries
-
-            # Update success rate
-            if agent.success_rate is None:
-                agent.success_rate = 1.0 if success else 0.0
-            else:
-                total_successes = agent.success_rate * (agent.total_queries - 1) + (1 if success else 0)
-                agent.success_rate = total_successes / agent.total_queries
+            apply_agent_performance(
+                self.db, agent_id, 1, response_time_ms or 0, 1 if success else 0
+            )
+            self.db.commit()
+            self.db.refresh(agent)
 
-            updated_agent = self.update(agent)
             logger.info(
                 f"Updated performance for agent {agent_id}: "
                 f"queries={agent.total_queries}, "
                 f"avg_time={agent.avg_response_time_ms:.1f}ms"
             )
-            return updated_agent
+            return agent
         except Exception as e:
+            self.db.rollback()
             logger.error(f"Error updating performance for agent {agent_id}: {e}")
             return None
 
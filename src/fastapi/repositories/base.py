@@ -6,18 +6,107 @@ common database operations (Create, Read, Update, Delete) for any SQLAlchemy mod
 All domain-specific repositories should extend this base class.
 """
 
-from typing import Generic, TypeVar, Type, List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, asc
+import base64
+from datetime import datetime, timezone
+from typing import Generic, TypeVar, Type, List, Optional, Dict, Any, Tuple
+from sqlalchemy.orm import Session, Query
+from sqlalchemy import desc, asc, tuple_, func, cast, and_, or_
+from sqlalchemy.dialects.postgresql import REGCONFIG
 
-from models.base import Base
-from core.exceptions import NotFoundException, DatabaseException
+from models.base import Base, SEARCH_CONFIG
+from core.exceptions import NotFoundException, DatabaseException, ValidationException
 
 
 # Generic type bound to SQLAlchemy Base
 ModelType = TypeVar("ModelType", bound=Base)
 
 
+def encode_cursor(sort_value: Optional[datetime], id: int) -> str:
+    """
+    Build an opaque keyset cursor from the last row of a page.
+
+    Args:
+        sort_value: Timestamp of the last row (None if the column is NULL)
+        id: Primary key of the last row
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = f"{sort_value.isoformat() if sort_value is not None else ''}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """
+    Parse a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        (timestamp, id) of the last row of the previous page; timestamp is
+        None if that row's sort column was NULL
+
+    Raises:
+        ValidationException: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        sort_value, id = raw.rsplit("|", 1)
+        return (datetime.fromisoformat(sort_value) if sort_value else None), int(id)
+    except Exception as e:
+        raise ValidationException("Invalid pagination cursor", {"cursor": cursor}) from e
+
+
+# ts_headline options for search result snippets (matches wrapped in markdown bold)
+SEARCH_HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=30, MinWords=10, StartSel=**, StopSel=**"
+
+
+def search_query(text: str):
+    """
+    Build a tsquery from user search text.
+
+    Uses websearch_to_tsquery, so quoted phrases, OR and -exclusions work
+    the way users expect and malformed input never raises.
+
+    Args:
+        text: Search text as typed by the user
+
+    Returns:
+        SQL tsquery expression for matching search_vector columns
+    """
+    return func.websearch_to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), text)
+
+
+def naive_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """
+    Convert a datetime to the naive UTC form stored in the timestamp columns.
+
+    Args:
+        moment: Aware datetime (converted to UTC) or naive UTC datetime
+
+    Returns:
+        Naive UTC datetime (None passes through)
+    """
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def search_headline(column, tsquery):
+    """
+    Build a highlighted snippet of a text column for a search result.
+
+    Args:
+        column: Text column to excerpt
+        tsquery: Expression returned by search_query
+
+    Returns:
+        SQL text expression
+    """
+    return func.ts_headline(cast(SEARCH_CONFIG, REGCONFIG), column, tsquery, SEARCH_HEADLINE_OPTIONS)
+
+
 class BaseRepository(Generic[ModelType]):
     """
     Generic base repository with CRUD operations.
@@ -152,6 +241,96 @@ class BaseRepository(Generic[ModelType]):
         except Exception as e:
             raise DatabaseException(f"Failed to filter {self.model.__name__}") from e
 
+    def get_page(
+        self,
+        query: Query,
+        sort_column,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Fetch one page of a query, newest first, by keyset (seek) pagination.
+
+        Rows are ordered by (sort_column, id) descending and the cursor holds
+        the last row's values, so each page is a range scan on a
+        (..., sort_column, id) index no matter how deep the client pages.
+        Rows whose sort_column is NULL come first (Postgres' order for
+        DESC), by id.
+
+        Args:
+            query: Filtered query over this repository's model
+            sort_column: Timestamp column to order by
+            limit: Maximum number of records to return
+            cursor: next_cursor from the previous page (None for the first page)
+
+        Returns:
+            (records, next_cursor); next_cursor is None on the last page
+
+        Raises:
+            ValidationException: If the cursor is malformed
+        """
+        if cursor:
+            sort_value, last_id = decode_cursor(cursor)
+            if sort_value is None:
+                # Rest of the NULL rows, then every dated row
+                query = query.filter(or_(
+                    and_(sort_column.is_(None), self.model.id < last_id),
+                    sort_column.isnot(None)
+                ))
+            else:
+                query = query.filter(
+                    tuple_(sort_column, self.model.id) < tuple_(sort_value, last_id),
+                    # Redundant with the row comparison, but lets Postgres prune
+                    # partitions of time-partitioned tables
+                    sort_column <= sort_value
+                )
+
+        try:
+            rows = query.order_by(
+                desc(sort_column).nullsfirst(), desc(self.model.id)
+            ).limit(limit + 1).all()
+        except Exception as e:
+            raise DatabaseException(f"Failed to page {self.model.__name__}") from e
+
+        if len(rows) <= limit:
+            return rows, None
+        last = rows[limit - 1]
+        return rows[:limit], encode_cursor(getattr(last, sort_column.key), last.id)
+
+    def get_ranked_page(
+        self,
+        query: Query,
+        rank,
+        sort_column,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[List[Any], bool]:
+        """
+        Fetch one page of search results, best match first.
+
+        Ties in rank are broken newest first by (sort_column, id). Ranked
+        results have no stable keyset to seek on, so pages are addressed by
+        offset.
+
+        Args:
+            query: Filtered search query
+            rank: Rank expression (higher is better)
+            sort_column: Timestamp column used to break ties
+            limit: Maximum number of results to return
+            offset: Number of results to skip
+
+        Returns:
+            (rows, has_more)
+        """
+        try:
+            rows = query.order_by(
+                desc(rank), desc(sort_column), desc(self.model.id)
+            ).offset(offset).limit(limit + 1).all()
+        except Exception as e:
+            raise DatabaseException(f"Failed to search {self.model.__name__}") from e
+
+        return rows[:limit], len(rows) > limit
+
     def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
         """
         Count records, optionally with filters.
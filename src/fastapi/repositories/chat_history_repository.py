@@ -14,6 +14,7 @@
 # ============================================================================
 import warnings
 from models.chat import ChatHistory
+from repositories.chat_repository import ChatRepository
 import logging
 
 warnings.warn(
@@ -45,10 +46,10 @@ def save_chat_history(db_session, user_query, response, model_used, query_type,
         logger.error(f"Failed to save chat history: {e}")
         db_session.rollback()
         
-def list_chat_history(db_session):
-    """Retrieves the latest chat history records."""
+def list_chat_history(db_session, limit=100, cursor=None):
+    """Retrieves one page of the latest chat history records (newest first)."""
     try:
-        records = db_session.query(ChatHistory).all()
+        records, _ = ChatRepository(db_session).get_history_page(limit=limit, cursor=cursor)
         return [
         {
             "id": record.id,
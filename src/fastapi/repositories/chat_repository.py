@@ -1,12 +1,12 @@
 
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, func
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 from datetime import datetime, timedelta
 import logging
 
 from models.chat import ChatHistory
-from repositories.base import BaseRepository
+from repositories.base import BaseRepository, naive_utc, search_query, search_headline
 
 logger = logging.getLogger("CHAT_REPOSITORY")
 
@@ -101,6 +101,177 @@ class ChatRepository(BaseRepository[ChatHistory]):
             logger.error(f"Error retrieving chat history for session {session_id}: {e}")
             return []
 
+    def get_history_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        session_id: Optional[str] = None,
+        model_used: Optional[str] = None,
+        collection_name: Optional[str] = None,
+        query_type: Optional[str] = None
+    ) -> Tuple[List[ChatHistory], Optional[str]]:
+        """
+        Get one page of chat history, newest first, using a keyset cursor.
+
+        Args:
+            limit: Maximum number of entries
+            cursor: next_cursor returned with the previous page
+            session_id: Optional session filter
+            model_used: Optional model filter
+            collection_name: Optional collection filter
+            query_type: Optional query type filter ('direct', 'rag', ...)
+
+        Returns:
+            (entries, next_cursor); next_cursor is None on the last page
+
+        Raises:
+            ValidationException: If the cursor is malformed
+        """
+        query = self.db.query(ChatHistory)
+
+        if session_id:
+            query = query.filter(ChatHistory.session_id == session_id)
+        if model_used:
+            query = query.filter(ChatHistory.model_used == model_used)
+        if collection_name:
+            query = query.filter(ChatHistory.collection_name == collection_name)
+        if query_type:
+            query = query.filter(ChatHistory.query_type == query_type)
+
+        return self.get_page(query, ChatHistory.timestamp, limit=limit, cursor=cursor)
+
+    def search(
+        self,
+        text: str,
+        limit: int = 20,
+        offset: int = 0,
+        session_id: Optional[str] = None,
+        model_used: Optional[str] = None,
+        collection_name: Optional[str] = None,
+        query_type: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Full-text search over chat queries and responses, best match first.
+
+        Matches use the GIN-indexed search_vector column; a match in the user
+        query ranks above the same match in the response. since/until bound
+        the timestamp, so only the matching monthly partitions are searched.
+
+        Args:
+            text: Search text (websearch syntax: "phrase", OR, -word)
+            limit: Maximum number of results
+            offset: Number of results to skip
+            session_id: Optional session filter
+            model_used: Optional model filter
+            collection_name: Optional collection filter
+            query_type: Optional query type filter
+            since: Only entries at or after this time
+            until: Only entries before this time
+
+        Returns:
+            (results, has_more); each result has the entry's metadata,
+            highlighted query/response snippets and its rank
+        """
+        tsquery = search_query(text)
+        rank = func.ts_rank_cd(ChatHistory.search_vector, tsquery)
+
+        query = self.db.query(
+            ChatHistory.id,
+            ChatHistory.timestamp,
+            ChatHistory.session_id,
+            ChatHistory.model_used,
+            ChatHistory.collection_name,
+            ChatHistory.query_type,
+            search_headline(ChatHistory.user_query, tsquery).label('query_headline'),
+            search_headline(ChatHistory.response, tsquery).label('response_headline'),
+            rank.label('rank')
+        ).filter(ChatHistory.search_vector.bool_op('@@')(tsquery))
+
+        if session_id:
+            query = query.filter(ChatHistory.session_id == session_id)
+        if model_used:
+            query = query.filter(ChatHistory.model_used == model_used)
+        if collection_name:
+            query = query.filter(ChatHistory.collection_name == collection_name)
+        if query_type:
+            query = query.filter(ChatHistory.query_type == query_type)
+        if since:
+            query = query.filter(ChatHistory.timestamp >= naive_utc(since))
+        if until:
+            query = query.filter(ChatHistory.timestamp < naive_utc(until))
+
+        rows, has_more = self.get_ranked_page(query, rank, ChatHistory.timestamp, limit=limit, offset=offset)
+        return [row._asdict() for row in rows], has_more
+
+    def iter_for_export(
+        self,
+        session_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        batch_size: int = 500
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate chat history for export, grouped by session.
+
+        Rows are fetched in batches of batch_size through a server-side cursor,
+        so memory stays bounded regardless of how many records match.
+
+        Args:
+            session_id: Optional session filter
+            limit: Optional maximum number of records
+            batch_size: Rows fetched per round trip
+
+        Yields:
+            Chat records as dictionaries, ordered by session_id then timestamp
+        """
+        query = self.db.query(ChatHistory)
+        if session_id:
+            query = query.filter(ChatHistory.session_id == session_id)
+        query = query.order_by(ChatHistory.session_id, ChatHistory.timestamp, ChatHistory.id)
+        if limit:
+            query = query.limit(limit)
+
+        for chat in query.yield_per(batch_size):
+            yield {
+                "id": chat.id,
+                "user_query": chat.user_query,
+                "response": chat.response,
+                "model_used": chat.model_used,
+                "query_type": chat.query_type,
+                "response_time_ms": chat.response_time_ms,
+                "timestamp": chat.timestamp,
+                "session_id": chat.session_id,
+            }
+
+    def get_session_summaries(self, session_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Get start/end timestamps and message counts per session in one aggregate query.
+
+        Args:
+            session_id: Optional session filter
+
+        Returns:
+            Mapping of session_id to {"start", "end", "count"}
+        """
+        try:
+            query = self.db.query(
+                ChatHistory.session_id,
+                func.min(ChatHistory.timestamp).label('start'),
+                func.max(ChatHistory.timestamp).label('end'),
+                func.count(ChatHistory.id).label('count')
+            )
+            if session_id:
+                query = query.filter(ChatHistory.session_id == session_id)
+
+            return {
+                row.session_id: {"start": row.start, "end": row.end, "count": row.count}
+                for row in query.group_by(ChatHistory.session_id).all()
+            }
+        except Exception as e:
+            logger.error(f"Error retrieving session summaries: {e}")
+            return {}
+
     def count_by_session(self, session_id: str) -> int:
         """
         Count messages in a session.
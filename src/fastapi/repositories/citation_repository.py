@@ -8,15 +8,95 @@ Handles tracking document citations for explainability and audit trails.
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 from typing import List, Optional, Dict, Any
+from datetime import datetime
 import logging
 
 from models.citation import RAGCitation
 from models.response import AgentResponse
 from repositories.base import BaseRepository
+from repositories.response_repository import session_response_filter
 
 logger = logging.getLogger("CITATION_REPOSITORY")
 
 
+def build_citation(
+    meta: Dict[str, Any],
+    agent_response_id: Optional[int] = None,
+    created_at: Optional[datetime] = None
+) -> RAGCitation:
+    """
+    Build a citation row from RAG service citation metadata.
+
+    Args:
+        meta: Citation metadata dictionary (see bulk_create_citations)
+        agent_response_id: Owning response id (omit when the citation is
+            attached through AgentResponse.citations before the response is flushed)
+        created_at: Owning response's created_at (set together with
+            agent_response_id; the relationship copies both otherwise)
+
+    Returns:
+        Unsaved RAGCitation
+    """
+    doc_metadata = meta.get('metadata', {})
+
+    # Extract page number from multiple possible keys
+    page_num = doc_metadata.get('page_number') or doc_metadata.get('page')
+
+    # Extract section from multiple possible keys
+    section = (
+        doc_metadata.get('section_title') or
+        doc_metadata.get('section_name') or
+        doc_metadata.get('section')
+    )
+
+    # Extract source file/document name
+    source = doc_metadata.get('document_name') or doc_metadata.get('source')
+
+    citation = RAGCitation(
+        agent_response_id=agent_response_id,
+        document_index=meta['document_index'],
+        distance=meta['distance'],
+        similarity_score=meta.get('similarity_score'),
+        similarity_percentage=meta.get('similarity_percentage'),
+        excerpt=meta['excerpt'],
+        full_length=meta['full_length'],
+        source_file=source,
+        page_number=page_num,
+        section_name=section,
+        metadata_json=doc_metadata if doc_metadata else None,
+        quality_tier=meta.get('quality_tier', 'Unknown')
+    )
+    if created_at is not None:
+        citation.created_at = created_at
+    return citation
+
+
+def citation_to_dict(citation: RAGCitation) -> Dict[str, Any]:
+    """
+    Serialize a citation for API responses.
+
+    Args:
+        citation: RAGCitation row
+
+    Returns:
+        Citation dictionary
+    """
+    return {
+        "document_index": citation.document_index,
+        "similarity_score": citation.similarity_score,
+        "similarity_percentage": citation.similarity_percentage,
+        "distance": citation.distance,
+        "excerpt": citation.excerpt,
+        "full_length": citation.full_length,
+        "source_file": citation.source_file,
+        "page_number": citation.page_number,
+        "section_name": citation.section_name,
+        "metadata": citation.metadata_json,
+        "quality_tier": citation.quality_tier,
+        "created_at": citation.created_at
+    }
+
+
 class CitationRepository(BaseRepository[RAGCitation]):
     """
     Repository for managing RAGCitation database operations.
@@ -69,39 +149,18 @@ class CitationRepository(BaseRepository[RAGCitation]):
             }
         """
         try:
-            citations = []
-            for meta in metadata_list:
-                doc_metadata = meta.get('metadata', {})
-
-                # Extract page number from multiple possible keys
-                page_num = doc_metadata.get('page_number') or doc_metadata.get('page')
-
-                # Extract section from multiple possible keys
-                section = (
-                    doc_metadata.get('section_title') or
-                    doc_metadata.get('section_name') or
-                    doc_metadata.get('section')
-                )
-
-                # Extract source file/document name
-                source = doc_metadata.get('document_name') or doc_metadata.get('source')
-
-                citation = RAGCitation(
-                    agent_response_id=agent_response_id,
-                    document_index=meta['document_index'],
-                    distance=meta['distance'],
-                    similarity_score=meta.get('similarity_score'),
-                    similarity_percentage=meta.get('similarity_percentage'),
-                    excerpt=meta['excerpt'],
-                    full_length=meta['full_length'],
-                    source_file=source,
-                    page_number=page_num,
-                    section_name=section,
-                    metadata_json=doc_metadata if doc_metadata else None,
-                    quality_tier=meta.get('quality_tier', 'Unknown')
-                )
-                citations.append(citation)
-
+            # Citations take their response's created_at (same partition, pruned joins)
+            response = self.db.query(AgentResponse.created_at).filter(
+                AgentResponse.id == agent_response_id
+            ).first()
+            if not response:
+                logger.error(f"Cannot log citations: response {agent_response_id} not found")
+                return False
+
+            citations = [
+                build_citation(meta, agent_response_id, response.created_at)
+                for meta in metadata_list
+            ]
             self.bulk_create(citations)
             logger.info(f"Successfully logged {len(citations)} citations for response {agent_response_id}")
             return True
@@ -125,24 +184,7 @@ class CitationRepository(BaseRepository[RAGCitation]):
                 RAGCitation.agent_response_id == agent_response_id
             ).order_by(RAGCitation.document_index).all()
 
-            result = []
-            for citation in citations:
-                result.append({
-                    "document_index": citation.document_index,
-                    "similarity_score": citation.similarity_score,
-                    "similarity_percentage": citation.similarity_percentage,
-                    "distance": citation.distance,
-                    "excerpt": citation.excerpt,
-                    "full_length": citation.full_length,
-                    "source_file": citation.source_file,
-                    "page_number": citation.page_number,
-                    "section_name": citation.section_name,
-                    "metadata": citation.metadata_json,
-                    "quality_tier": citation.quality_tier,
-                    "created_at": citation.created_at
-                })
-
-            return result
+            return [citation_to_dict(citation) for citation in citations]
         except Exception as e:
             logger.error(f"Error retrieving RAG citations for response {agent_response_id}: {e}")
             return []
@@ -159,35 +201,23 @@ class CitationRepository(BaseRepository[RAGCitation]):
         """
         try:
             # Join citations with responses to get session context
-            citations = self.db.query(RAGCitation, AgentResponse).join(
-                AgentResponse, RAGCitation.agent_response_id == AgentResponse.id
+            citations = self.db.query(RAGCitation, AgentResponse.agent_id).join(
+                RAGCitation.agent_response
             ).filter(
-                AgentResponse.session_id == session_id
+                session_response_filter(session_id)
             ).order_by(
                 AgentResponse.created_at,
                 RAGCitation.document_index
             ).all()
 
-            result = []
-            for citation, response in citations:
-                result.append({
+            return [
+                {
                     "agent_response_id": citation.agent_response_id,
-                    "agent_id": response.agent_id,
-                    "document_index": citation.document_index,
-                    "similarity_score": citation.similarity_score,
-                    "similarity_percentage": citation.similarity_percentage,
-                    "distance": citation.distance,
-                    "excerpt": citation.excerpt,
-                    "full_length": citation.full_length,
-                    "source_file": citation.source_file,
-                    "page_number": citation.page_number,
-                    "section_name": citation.section_name,
-                    "metadata": citation.metadata_json,
-                    "quality_tier": citation.quality_tier,
-                    "created_at": citation.created_at
-                })
-
-            return result
+                    "agent_id": agent_id,
+                    **citation_to_dict(citation)
+                }
+                for citation, agent_id in citations
+            ]
         except Exception as e:
             logger.error(f"Error retrieving session citations for {session_id}: {e}")
             return []
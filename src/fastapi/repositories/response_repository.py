@@ -6,15 +6,47 @@ Handles logging agent responses and compliance results.
 """
 
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timezone
+from sqlalchemy import and_, select, func
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime, timedelta, timezone
 import logging
 
+from models.agent import ComplianceAgent
 from models.response import AgentResponse, ComplianceResult
-from repositories.base import BaseRepository
+from models.session import AgentSession
+from repositories.base import BaseRepository, naive_utc, search_query, search_headline
 
 logger = logging.getLogger("RESPONSE_REPOSITORY")
 
+# Responses are never older than their session; the margin only absorbs
+# clock/default skew in rows written before timestamps were stamped per row
+SESSION_RESPONSE_MARGIN = timedelta(days=1)
+
+
+def session_response_filter(session_id, started_at=None):
+    """
+    Filter clause selecting a session's responses.
+
+    The session's start bounds created_at from below so Postgres skips
+    agent_responses partitions older than the session.
+
+    Args:
+        session_id: Session identifier (or a correlated AgentSession column)
+        started_at: Session created_at when already loaded; otherwise it is
+            read with a scalar subquery (pruned at execution time)
+
+    Returns:
+        SQLAlchemy boolean clause
+    """
+    if started_at is None:
+        started_at = select(AgentSession.created_at).where(
+            AgentSession.session_id == session_id
+        ).scalar_subquery()
+    return and_(
+        AgentResponse.session_id == session_id,
+        AgentResponse.created_at >= started_at - SESSION_RESPONSE_MARGIN
+    )
+
 
 class ResponseRepository(BaseRepository[AgentResponse]):
     """
@@ -104,7 +136,7 @@ class ResponseRepository(BaseRepository[AgentResponse]):
         """
         try:
             return self.db.query(AgentResponse).filter(
-                AgentResponse.session_id == session_id
+                session_response_filter(session_id)
             ).order_by(
                 AgentResponse.sequence_order.asc(),
                 AgentResponse.created_at.asc()
@@ -126,6 +158,68 @@ class ResponseRepository(BaseRepository[AgentResponse]):
         """
         return self.get_by_filter({"agent_id": agent_id}, limit=limit, order_by="created_at")
 
+    def search(
+        self,
+        text: str,
+        limit: int = 20,
+        offset: int = 0,
+        session_id: Optional[str] = None,
+        agent_id: Optional[int] = None,
+        model_used: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Full-text search over agent responses, best match first.
+
+        Matches use the GIN-indexed search_vector column. since/until bound
+        created_at, so only the matching monthly partitions are searched.
+
+        Args:
+            text: Search text (websearch syntax: "phrase", OR, -word)
+            limit: Maximum number of results
+            offset: Number of results to skip
+            session_id: Optional session filter
+            agent_id: Optional agent filter
+            model_used: Optional model filter
+            since: Only responses at or after this time
+            until: Only responses before this time
+
+        Returns:
+            (results, has_more); each result has the response's metadata,
+            agent name, a highlighted snippet and its rank
+        """
+        tsquery = search_query(text)
+        rank = func.ts_rank_cd(AgentResponse.search_vector, tsquery)
+
+        query = self.db.query(
+            AgentResponse.id.label('agent_response_id'),
+            AgentResponse.session_id,
+            AgentResponse.agent_id,
+            ComplianceAgent.name.label('agent_name'),
+            AgentResponse.model_used,
+            AgentResponse.processing_method,
+            AgentResponse.created_at,
+            search_headline(AgentResponse.response_text, tsquery).label('headline'),
+            rank.label('rank')
+        ).outerjoin(
+            ComplianceAgent, ComplianceAgent.id == AgentResponse.agent_id
+        ).filter(AgentResponse.search_vector.bool_op('@@')(tsquery))
+
+        if session_id:
+            query = query.filter(session_response_filter(session_id))
+        if agent_id is not None:
+            query = query.filter(AgentResponse.agent_id == agent_id)
+        if model_used:
+            query = query.filter(AgentResponse.model_used == model_used)
+        if since:
+            query = query.filter(AgentResponse.created_at >= naive_utc(since))
+        if until:
+            query = query.filter(AgentResponse.created_at < naive_utc(until))
+
+        rows, has_more = self.get_ranked_page(query, rank, AgentResponse.created_at, limit=limit, offset=offset)
+        return [row._asdict() for row in rows], has_more
+
 
 class ComplianceRepository(BaseRepository[ComplianceResult]):
     """
@@ -5,9 +5,9 @@ This module provides data access layer for AgentSession operations.
 Handles session tracking, history retrieval, and completion tracking.
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy import desc
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timezone
 import logging
 
@@ -15,6 +15,8 @@ from models.session import AgentSession
 from models.response import AgentResponse
 from models.enums import SessionType, AnalysisType
 from repositories.base import BaseRepository
+from repositories.citation_repository import citation_to_dict
+from repositories.response_repository import session_response_filter
 from core.exceptions import NotFoundException
 
 logger = logging.getLogger("SESSION_REPOSITORY")
@@ -166,12 +168,62 @@ class SessionRepository(BaseRepository[AgentSession]):
             logger.error(f"Error retrieving session history: {e}")
             return []
 
-    def get_details(self, session_id: str) -> Optional[Dict[str, Any]]:
+    def get_history_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        session_type: Optional[SessionType] = None,
+        collection_name: Optional[str] = None,
+        model_used: Optional[str] = None
+    ) -> Tuple[List[AgentSession], Optional[str]]:
+        """
+        Get one page of session history, newest first, using a keyset cursor.
+
+        Args:
+            limit: Maximum number of sessions
+            cursor: next_cursor returned with the previous page
+            session_type: Filter by session type
+            collection_name: Filter by ChromaDB collection
+            model_used: Only sessions with at least one response from this model
+
+        Returns:
+            (sessions, next_cursor); next_cursor is None on the last page
+
+        Raises:
+            ValidationException: If the cursor is malformed
+        """
+        query = self.db.query(AgentSession)
+
+        if session_type:
+            query = query.filter(AgentSession.session_type == session_type)
+        if collection_name:
+            query = query.filter(AgentSession.collection_name == collection_name)
+        if model_used:
+            query = query.filter(
+                self.db.query(AgentResponse.id).filter(
+                    session_response_filter(AgentSession.session_id, AgentSession.created_at),
+                    AgentResponse.model_used == model_used
+                ).exists()
+            )
+
+        return self.get_page(query, AgentSession.created_at, limit=limit, cursor=cursor)
+
+    def get_details(
+        self,
+        session_id: str,
+        include_citations: bool = False
+    ) -> Optional[Dict[str, Any]]:
         """
         Get detailed information about a session including all responses.
 
+        Runs a fixed number of queries regardless of session size: the session,
+        its responses joined to their agents, and (optionally) one batched
+        query for the citations of all responses.
+
         Args:
             session_id: Session identifier
+            include_citations: Attach each response's citations and a flat
+                session-wide citation list
 
         Returns:
             Dictionary with session info and responses, or None if not found
@@ -181,9 +233,14 @@ class SessionRepository(BaseRepository[AgentSession]):
             if not session:
                 return None
 
-            # Get all agent responses for this session
-            responses = self.db.query(AgentResponse).filter(
-                AgentResponse.session_id == session_id
+            # Agent names come from a join; citations from one IN query
+            query = self.db.query(AgentResponse).options(
+                joinedload(AgentResponse.agent)
+            )
+            if include_citations:
+                query = query.options(selectinload(AgentResponse.citations))
+            responses = query.filter(
+                session_response_filter(session_id, session.created_at)
             ).order_by(
                 AgentResponse.sequence_order.asc(),
                 AgentResponse.created_at.asc()
@@ -209,6 +266,7 @@ class SessionRepository(BaseRepository[AgentSession]):
 
             for response in responses:
                 response_data = {
+                    "agent_response_id": response.id,
                     "agent_id": response.agent_id,
                     "agent_name": response.agent.name if response.agent else "Unknown",
                     "response_text": response.response_text,
@@ -221,8 +279,26 @@ class SessionRepository(BaseRepository[AgentSession]):
                     "model_used": response.model_used,
                     "created_at": response.created_at
                 }
+                if include_citations:
+                    response_data["citations"] = [
+                        citation_to_dict(citation) for citation in response.citations
+                    ]
                 session_data["agent_responses"].append(response_data)
 
+            if include_citations:
+                # Same shape and order as CitationRepository.get_by_session_id
+                session_data["citations"] = [
+                    {
+                        "agent_response_id": response["agent_response_id"],
+                        "agent_id": response["agent_id"],
+                        **citation
+                    }
+                    for response in sorted(
+                        session_data["agent_responses"], key=lambda r: r["created_at"]
+                    )
+                    for citation in response["citations"]
+                ]
+
             return session_data
         except Exception as e:
             logger.error(f"Error retrieving session details for {session_id}: {e}")
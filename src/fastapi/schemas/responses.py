@@ -81,6 +81,9 @@ class ChatResponse(BaseResponse):
     formatted_citations: Optional[str] = Field(None, description="Formatted citation text")
     source_documents: Optional[List[str]] = Field(None, description="Source document names")
     documents_found: int = Field(0, description="Number of documents retrieved")
+    cached: bool = Field(False, description="Whether the response was served from the response cache")
+    cached_at: Optional[datetime] = Field(None, description="When the cached response was generated")
+    cached_response_time_ms: Optional[int] = Field(None, description="LLM response time of the cached response")
 
     model_config = ConfigDict(json_schema_extra={
         "example": {
@@ -319,3 +322,18 @@ class PaginatedResponse(BaseResponse):
     """Response with pagination"""
     data: List[Any] = Field(..., description="Page data")
     pagination: PaginationMeta = Field(..., description="Pagination metadata")
+
+
+class CursorPaginatedResponse(BaseResponse):
+    """Response with keyset (cursor) pagination"""
+    data: List[Any] = Field(..., description="Page data")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page (None on the last page)")
+    has_more: bool = Field(..., description="Whether another page exists")
+
+
+class SearchResponse(BaseResponse):
+    """Ranked full-text search results (offset pagination)"""
+    query: str = Field(..., description="Search text")
+    data: List[Any] = Field(..., description="Results, best match first")
+    next_offset: Optional[int] = Field(None, description="Offset of the next page (None on the last page)")
+    has_more: bool = Field(..., description="Whether another page exists")
@@ -0,0 +1,426 @@
+"""
+Analytics Rollup Service
+Maintains hourly/daily rollups of agent sessions and responses, and answers
+dashboard queries from them.
+
+A background thread re-aggregates recently closed hours from the raw tables
+(INSERT ... SELECT ... GROUP BY date_trunc('hour', created_at)) and rebuilds the
+affected days from the hourly rows. Only hours after the watermark (minus a
+short lookback for late updates such as session completion times) are
+recomputed, so each refresh touches a bounded number of rows no matter how
+large the history grows.
+
+Queries split the requested window into day, hour and raw segments: whole days
+come from daily rollups, edge hours from hourly rollups, and only the partial
+hours at either end (and anything after the watermark) are read from the raw
+tables.
+"""
+
+import os
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, delete, insert, func, literal, literal_column, union_all
+from sqlalchemy.orm import Session
+
+from models.agent import ComplianceAgent
+from models.analytics import SessionRollup, ResponseRollup, RollupState
+from models.response import AgentResponse
+from models.session import AgentSession
+
+logger = logging.getLogger("ANALYTICS_ROLLUP_SERVICE")
+
+ANALYTICS_ROLLUP_INTERVAL_SECONDS = int(os.getenv("ANALYTICS_ROLLUP_INTERVAL_SECONDS", "300"))
+# Closed hours re-aggregated on every refresh (picks up late updates)
+ANALYTICS_ROLLUP_LOOKBACK_HOURS = int(os.getenv("ANALYTICS_ROLLUP_LOOKBACK_HOURS", "2"))
+
+ROLLUP_STATE_NAME = "session_analytics"
+# pg advisory lock key: one refresher at a time across API processes
+_ROLLUP_LOCK_KEY = 0x5E55A11
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+
+
+def utc_now() -> datetime:
+    """Current UTC time as a naive datetime (the timestamp columns are naive UTC)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _floor(moment: datetime, unit: timedelta) -> datetime:
+    if unit == DAY:
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _ceil(moment: datetime, unit: timedelta) -> datetime:
+    floored = _floor(moment, unit)
+    return floored if floored == moment else floored + unit
+
+
+def _truncate(unit: str, column):
+    # Inline the unit so SELECT and GROUP BY render the same expression
+    return func.date_trunc(literal_column(f"'{unit}'"), column)
+
+
+def rollup_segments(
+    start: datetime,
+    end: datetime,
+    covered_end: Optional[datetime]
+) -> List[Tuple[str, datetime, datetime]]:
+    """
+    Split [start, end) into segments answered by daily rollups, hourly rollups
+    or raw rows.
+
+    Args:
+        start: Window start (naive UTC)
+        end: Window end (naive UTC)
+        covered_end: Rollup watermark (hour-aligned); None if nothing is rolled up
+
+    Returns:
+        (source, segment_start, segment_end) with source 'day', 'hour' or 'raw'
+    """
+    covered_end = min(covered_end, _floor(end, HOUR)) if covered_end else start
+    first_hour = _ceil(start, HOUR)
+    if first_hour >= covered_end:
+        return [("raw", start, end)]
+
+    segments = []
+    if start < first_hour:
+        segments.append(("raw", start, first_hour))
+
+    first_day = _ceil(first_hour, DAY)
+    last_day = _floor(covered_end, DAY)
+    if first_day < last_day:
+        if first_hour < first_day:
+            segments.append(("hour", first_hour, first_day))
+        segments.append(("day", first_day, last_day))
+        if last_day < covered_end:
+            segments.append(("hour", last_day, covered_end))
+    else:
+        segments.append(("hour", first_hour, covered_end))
+
+    if covered_end < end:
+        segments.append(("raw", covered_end, end))
+    return segments
+
+
+def get_rollup_watermark(db: Session) -> Optional[datetime]:
+    """Hour before which the rollups are complete, or None before the first refresh."""
+    state = db.get(RollupState, ROLLUP_STATE_NAME)
+    return state.watermark if state else None
+
+
+def refresh_rollups(db: Session, now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Bring the hourly and daily rollups up to the last closed hour.
+
+    The first run backfills the whole history; later runs recompute the hours
+    since the watermark (plus ANALYTICS_ROLLUP_LOOKBACK_HOURS) and the days
+    containing them. Skips if another process is refreshing.
+
+    Args:
+        db: Database session (committed on success)
+        now: Current time (naive UTC); defaults to utc_now()
+
+    Returns:
+        New watermark, or None if another refresh holds the lock
+    """
+    to_hour = _floor(now or utc_now(), HOUR)
+
+    if not db.execute(select(func.pg_try_advisory_xact_lock(_ROLLUP_LOCK_KEY))).scalar():
+        return None
+
+    state = db.get(RollupState, ROLLUP_STATE_NAME)
+    if state:
+        from_hour = state.watermark - timedelta(hours=ANALYTICS_ROLLUP_LOOKBACK_HOURS)
+    else:
+        earliest = [
+            db.execute(select(func.min(AgentSession.created_at))).scalar(),
+            db.execute(select(func.min(AgentResponse.created_at))).scalar(),
+        ]
+        earliest = [moment for moment in earliest if moment is not None]
+        from_hour = _floor(min(earliest), HOUR) if earliest else to_hour
+
+    if from_hour < to_hour:
+        _rebuild_hours(db, from_hour, to_hour)
+        _rebuild_days(db, _floor(from_hour, DAY), to_hour)
+
+    if state:
+        state.watermark = to_hour
+    else:
+        db.add(RollupState(name=ROLLUP_STATE_NAME, watermark=to_hour))
+    db.commit()
+
+    logger.info(f"Analytics rollups refreshed from {from_hour.isoformat()} to {to_hour.isoformat()}")
+    return to_hour
+
+
+def _rebuild_hours(db: Session, from_hour: datetime, to_hour: datetime) -> None:
+    for model in (SessionRollup, ResponseRollup):
+        db.execute(delete(model).where(
+            model.granularity == "hour",
+            model.bucket_start >= from_hour,
+            model.bucket_start < to_hour
+        ))
+
+    session_bucket = _truncate("hour", AgentSession.created_at)
+    db.execute(insert(SessionRollup).from_select(
+        ["granularity", "bucket_start", "session_type", "analysis_type",
+         "session_count", "response_time_sum_ms", "response_time_count"],
+        select(
+            literal("hour"),
+            session_bucket,
+            AgentSession.session_type,
+            AgentSession.analysis_type,
+            func.count(),
+            func.coalesce(func.sum(AgentSession.total_response_time_ms), 0),
+            func.count(AgentSession.total_response_time_ms)
+        ).where(
+            AgentSession.created_at >= from_hour,
+            AgentSession.created_at < to_hour
+        ).group_by(session_bucket, AgentSession.session_type, AgentSession.analysis_type)
+    ))
+
+    response_bucket = _truncate("hour", AgentResponse.created_at)
+    db.execute(insert(ResponseRollup).from_select(
+        ["granularity", "bucket_start", "agent_id", "response_count", "rag_response_count"],
+        select(
+            literal("hour"),
+            response_bucket,
+            AgentResponse.agent_id,
+            func.count(),
+            func.count().filter(AgentResponse.rag_used.is_(True))
+        ).where(
+            AgentResponse.created_at >= from_hour,
+            AgentResponse.created_at < to_hour
+        ).group_by(response_bucket, AgentResponse.agent_id)
+    ))
+
+
+def _rebuild_days(db: Session, from_day: datetime, to_hour: datetime) -> None:
+    """Re-derive daily rows from hourly rows (the day of to_hour stays partial)."""
+    for model in (SessionRollup, ResponseRollup):
+        db.execute(delete(model).where(
+            model.granularity == "day",
+            model.bucket_start >= from_day
+        ))
+
+    session_day = _truncate("day", SessionRollup.bucket_start)
+    db.execute(insert(SessionRollup).from_select(
+        ["granularity", "bucket_start", "session_type", "analysis_type",
+         "session_count", "response_time_sum_ms", "response_time_count"],
+        select(
+            literal("day"),
+            session_day,
+            SessionRollup.session_type,
+            SessionRollup.analysis_type,
+            func.sum(SessionRollup.session_count),
+            func.sum(SessionRollup.response_time_sum_ms),
+            func.sum(SessionRollup.response_time_count)
+        ).where(
+            SessionRollup.granularity == "hour",
+            SessionRollup.bucket_start >= from_day,
+            SessionRollup.bucket_start < to_hour
+        ).group_by(session_day, SessionRollup.session_type, SessionRollup.analysis_type)
+    ))
+
+    response_day = _truncate("day", ResponseRollup.bucket_start)
+    db.execute(insert(ResponseRollup).from_select(
+        ["granularity", "bucket_start", "agent_id", "response_count", "rag_response_count"],
+        select(
+            literal("day"),
+            response_day,
+            ResponseRollup.agent_id,
+            func.sum(ResponseRollup.response_count),
+            func.sum(ResponseRollup.rag_response_count)
+        ).where(
+            ResponseRollup.granularity == "hour",
+            ResponseRollup.bucket_start >= from_day,
+            ResponseRollup.bucket_start < to_hour
+        ).group_by(response_day, ResponseRollup.agent_id)
+    ))
+
+
+def _session_segment(source: str, start: datetime, end: datetime):
+    if source == "raw":
+        return select(
+            AgentSession.session_type.label("session_type"),
+            AgentSession.analysis_type.label("analysis_type"),
+            func.count().label("sessions"),
+            func.coalesce(func.sum(AgentSession.total_response_time_ms), 0).label("rt_sum"),
+            func.count(AgentSession.total_response_time_ms).label("rt_count")
+        ).where(
+            AgentSession.created_at >= start,
+            AgentSession.created_at < end
+        ).group_by(AgentSession.session_type, AgentSession.analysis_type)
+
+    return select(
+        SessionRollup.session_type.label("session_type"),
+        SessionRollup.analysis_type.label("analysis_type"),
+        func.sum(SessionRollup.session_count).label("sessions"),
+        func.sum(SessionRollup.response_time_sum_ms).label("rt_sum"),
+        func.sum(SessionRollup.response_time_count).label("rt_count")
+    ).where(
+        SessionRollup.granularity == source,
+        SessionRollup.bucket_start >= start,
+        SessionRollup.bucket_start < end
+    ).group_by(SessionRollup.session_type, SessionRollup.analysis_type)
+
+
+def _response_segment(source: str, start: datetime, end: datetime):
+    if source == "raw":
+        return select(
+            AgentResponse.agent_id.label("agent_id"),
+            func.count().label("responses"),
+            func.count().filter(AgentResponse.rag_used.is_(True)).label("rag_responses")
+        ).where(
+            AgentResponse.created_at >= start,
+            AgentResponse.created_at < end
+        ).group_by(AgentResponse.agent_id)
+
+    return select(
+        ResponseRollup.agent_id.label("agent_id"),
+        func.sum(ResponseRollup.response_count).label("responses"),
+        func.sum(ResponseRollup.rag_response_count).label("rag_responses")
+    ).where(
+        ResponseRollup.granularity == source,
+        ResponseRollup.bucket_start >= start,
+        ResponseRollup.bucket_start < end
+    ).group_by(ResponseRollup.agent_id)
+
+
+def query_session_analytics(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    top_agents: int = 10
+) -> Dict[str, Any]:
+    """
+    Session and response statistics for [start, end), read from the rollups.
+
+    Args:
+        db: Database session
+        start: Window start (naive UTC)
+        end: Window end (naive UTC)
+        top_agents: Number of most active agents to return
+
+    Returns:
+        Dict with by_session_type, by_analysis_type, avg_response_time_ms,
+        agent_activity, total_responses, rag_responses and rollup_watermark
+    """
+    watermark = get_rollup_watermark(db)
+    segments = rollup_segments(start, end, watermark)
+
+    # One round trip per table: UNION ALL of the segments, summed per group
+    sessions = union_all(*[_session_segment(*segment) for segment in segments]).subquery()
+    session_rows = db.execute(
+        select(
+            sessions.c.session_type,
+            sessions.c.analysis_type,
+            func.sum(sessions.c.sessions),
+            func.sum(sessions.c.rt_sum),
+            func.sum(sessions.c.rt_count)
+        ).group_by(sessions.c.session_type, sessions.c.analysis_type)
+    ).all()
+
+    by_session_type: Dict[str, int] = {}
+    by_analysis_type: Dict[str, int] = {}
+    rt_sum = rt_count = 0
+    for session_type, analysis_type, count, type_rt_sum, type_rt_count in session_rows:
+        by_session_type[session_type.value] = by_session_type.get(session_type.value, 0) + int(count)
+        by_analysis_type[analysis_type.value] = by_analysis_type.get(analysis_type.value, 0) + int(count)
+        rt_sum += int(type_rt_sum or 0)
+        rt_count += int(type_rt_count or 0)
+
+    responses = union_all(*[_response_segment(*segment) for segment in segments]).subquery()
+    response_rows = db.execute(
+        select(
+            responses.c.agent_id,
+            func.sum(responses.c.responses).label("responses"),
+            func.sum(responses.c.rag_responses).label("rag_responses")
+        ).group_by(responses.c.agent_id)
+    ).all()
+
+    total_responses = sum(int(row.responses) for row in response_rows)
+    rag_responses = sum(int(row.rag_responses) for row in response_rows)
+
+    # Most active agents (using unified compliance_agents table)
+    agent_names = dict(db.execute(
+        select(ComplianceAgent.id, ComplianceAgent.name).where(
+            ComplianceAgent.id.in_([row.agent_id for row in response_rows])
+        )
+    ).all()) if response_rows else {}
+    active = sorted(
+        (row for row in response_rows if row.agent_id in agent_names),
+        key=lambda row: row.responses,
+        reverse=True
+    )[:top_agents]
+
+    return {
+        "by_session_type": by_session_type,
+        "by_analysis_type": by_analysis_type,
+        "avg_response_time_ms": rt_sum / rt_count if rt_count else None,
+        "agent_activity": [
+            {
+                "agent_id": row.agent_id,
+                "agent_name": agent_names[row.agent_id],
+                "response_count": int(row.responses)
+            }
+            for row in active
+        ],
+        "total_responses": total_responses,
+        "rag_responses": rag_responses,
+        "rollup_watermark": watermark
+    }
+
+
+class RollupRefresher:
+    """
+    Background thread that refreshes the rollups every
+    ANALYTICS_ROLLUP_INTERVAL_SECONDS (first refresh right after start).
+    """
+
+    def __init__(self, session_factory, interval_seconds: int = ANALYTICS_ROLLUP_INTERVAL_SECONDS):
+        """
+        Initialize the refresher.
+
+        Args:
+            session_factory: Callable returning a new database session
+            interval_seconds: Seconds between refreshes
+        """
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Start the refresh thread for this process if it is not running."""
+        pid = os.getpid()
+        with self._lock:
+            if self._thread is None or self._thread_pid != pid or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="analytics-rollup-refresher", daemon=True)
+                self._thread_pid = pid
+                self._thread.start()
+                logger.info("Analytics rollup refresher started")
+
+    def stop(self) -> None:
+        """Ask the refresh thread to exit."""
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            db = self.session_factory()
+            try:
+                refresh_rollups(db)
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Analytics rollup refresh failed: {e}")
+            finally:
+                db.close()
+            self._stop.wait(self.interval_seconds)
@@ -0,0 +1,211 @@
+"""
+Chat Cache Service
+Memoized model/API key validation and an optional response cache for direct
+(non-RAG) chat.
+
+Every chat request resolves its model and checks the provider's API key before
+invoking the LLM. Both only change when the process is reconfigured, so the
+outcome is kept in process for CHAT_VALIDATION_CACHE_TTL_SECONDS.
+
+Direct chat has no retrieval context and no conversation memory, so the same
+question to the same model at the same temperature can be answered from an
+earlier response. Queries are normalized (case, Unicode form, whitespace and
+trailing punctuation) before hashing, so trivially different spellings of an
+FAQ share an entry. Symbols inside the query are kept: "x > y" and "x < y",
+"C++" and "C#" are different questions. Only QueryType.DIRECT requests are
+cached; a RAG query without a collection is answered directly but never
+cached. The response cache lives in Redis and is off unless
+CHAT_RESPONSE_CACHE_ENABLED=true.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+import unicodedata
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+import redis
+
+from llm_config.llm_config import validate_model, get_model_config, llm_env
+
+logger = logging.getLogger("CHAT_CACHE_SERVICE")
+
+CHAT_VALIDATION_CACHE_TTL_SECONDS = int(os.getenv("CHAT_VALIDATION_CACHE_TTL_SECONDS", "60"))
+
+# Cached direct-chat answers expire after this many seconds (default 1 day)
+CHAT_RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("CHAT_RESPONSE_CACHE_TTL_SECONDS", str(24 * 3600)))
+CHAT_RESPONSE_CACHE_ENABLED = os.getenv("CHAT_RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+
+# Unknown model names are memoized too; bound the map against junk requests
+_VALIDATION_CACHE_MAX_ENTRIES = 256
+
+_TRAILING_PUNCTUATION = re.compile(r"[\s.,;:!?]+$")
+_WHITESPACE = re.compile(r"\s+")
+
+# model name -> ((model_config, error_status, error_detail), checked_at)
+_validation_cache: Dict[str, Tuple[Tuple[Any, Optional[int], str], float]] = {}
+_validation_lock = threading.Lock()
+
+
+def validate_chat_model(model_name: str) -> Tuple[Any, Optional[int], str]:
+    """
+    Resolve a model and check its provider's API key, memoized per model name.
+
+    Args:
+        model_name: Model identifier or display name from the request
+
+    Returns:
+        Tuple of (model_config, error_status, error_detail). error_status is
+        None when the model can be used, otherwise the HTTP status to fail with.
+    """
+    now = time.time()
+    cached = _validation_cache.get(model_name)
+    if cached is not None and now - cached[1] <= CHAT_VALIDATION_CACHE_TTL_SECONDS:
+        return cached[0]
+
+    is_valid, validation_error = validate_model(model_name)
+    if not is_valid:
+        result = (None, 400, validation_error)
+    else:
+        model_config = get_model_config(model_name)
+        keys_valid, key_error = llm_env.validate_provider_keys(model_config.provider)
+        if keys_valid:
+            result = (model_config, None, "")
+        else:
+            result = (
+                model_config,
+                500,
+                f"{key_error}. Please configure the required API key in your environment."
+            )
+
+    with _validation_lock:
+        if len(_validation_cache) >= _VALIDATION_CACHE_MAX_ENTRIES:
+            _validation_cache.clear()
+        _validation_cache[model_name] = (result, now)
+    return result
+
+
+def clear_validation_cache() -> None:
+    """Forget memoized validation results (e.g. after API keys change)."""
+    with _validation_lock:
+        _validation_cache.clear()
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query for cache lookups.
+
+    Args:
+        query: Raw user query
+
+    Returns:
+        Case-folded NFKC text with whitespace collapsed and sentence punctuation
+        at the end removed; everything else is kept as typed
+    """
+    text = unicodedata.normalize("NFKC", query).casefold()
+    text = _WHITESPACE.sub(" ", text).strip()
+    return _TRAILING_PUNCTUATION.sub("", text)
+
+
+def response_cache_key(query: str, model_id: str, temperature: Optional[float]) -> str:
+    """
+    Cache key for a direct chat answer.
+
+    Args:
+        query: Raw user query
+        model_id: Canonical model ID
+        temperature: Requested temperature (None for the model default)
+
+    Returns:
+        "chat_response:{model_id}:{temperature}:{sha256 of the normalized query}"
+    """
+    digest = hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
+    temp = "default" if temperature is None else f"{temperature:g}"
+    return f"chat_response:{model_id}:{temp}:{digest}"
+
+
+class ChatResponseCache:
+    """
+    Redis-backed cache of direct chat answers.
+
+    Keys:
+        chat_response:{model_id}:{temperature}:{query hash} -> JSON
+        {"response", "cached_at", "response_time_ms"}
+    """
+
+    def __init__(self, redis_client: Optional[redis.Redis], ttl_seconds: int = CHAT_RESPONSE_CACHE_TTL_SECONDS):
+        """
+        Initialize the cache.
+
+        Args:
+            redis_client: Redis client (decode_responses=True); None disables the cache
+            ttl_seconds: Expiry for cached answers
+        """
+        self.redis = redis_client
+        self.ttl_seconds = ttl_seconds
+
+    @property
+    def enabled(self) -> bool:
+        return self.redis is not None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Cached answer for a key, if any.
+
+        Returns:
+            Dict with response, cached_at (aware UTC datetime) and the
+            response_time_ms of the original LLM call, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        try:
+            raw = self.redis.get(key)
+            if not raw:
+                return None
+            entry = json.loads(raw)
+            entry["cached_at"] = datetime.fromisoformat(entry["cached_at"])
+            return entry
+        except Exception as e:
+            logger.warning(f"Chat response cache read failed: {e}")
+            return None
+
+    def set(self, key: str, response: Optional[str], response_time_ms: int) -> None:
+        """Store a successful answer (empty responses are not cached)."""
+        if not (self.enabled and response and response.strip()):
+            return
+        entry = {
+            "response": response,
+            "cached_at": datetime.now(timezone.utc).isoformat(),
+            "response_time_ms": response_time_ms,
+        }
+        try:
+            self.redis.set(key, json.dumps(entry), ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Chat response cache write failed: {e}")
+
+
+_cache: Optional[ChatResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_chat_response_cache() -> ChatResponseCache:
+    """
+    Process-wide cache backed by REDIS_URL (disabled unless CHAT_RESPONSE_CACHE_ENABLED=true).
+
+    Returns:
+        ChatResponseCache instance
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                client = None
+                if CHAT_RESPONSE_CACHE_ENABLED:
+                    client = redis.from_url(os.getenv("REDIS_URL", "redis://redis:6379/0"), decode_responses=True)
+                _cache = ChatResponseCache(client)
+    return _cache
@@ -0,0 +1,136 @@
+"""
+Chunk Embedding Queue
+Embeds and stores chunks on a background thread while they are still being produced.
+
+The ingest job feeds chunks from a generator; a writer thread drains the queue
+in batches, embeds each batch with one encode() call and stores it with one
+collection.add(). Chunking of the rest of the document overlaps with embedding
+and storage, and the bounded queue caps how many chunks sit in memory.
+"""
+
+import queue
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger("CHUNK_EMBEDDING_QUEUE")
+
+_CLOSE = object()
+
+
+@dataclass
+class PendingChunk:
+    """A chunk waiting to be embedded and stored"""
+    chunk_id: str
+    text: str
+    metadata: Dict[str, Any]
+    image_paths: List[str] = field(default_factory=list)
+
+
+class ChunkEmbeddingQueue:
+    """
+    Bounded producer/consumer queue that embeds and stores chunks in batches.
+
+    Callbacks run on the writer thread, after the chunk is stored (on_stored)
+    or after it failed on its own (on_failed). A failed batch is retried chunk
+    by chunk, so one bad chunk does not drop its neighbours.
+    """
+
+    def __init__(
+        self,
+        collection,
+        encode: Callable[[List[str]], List[List[float]]],
+        batch_size: int = 32,
+        max_pending: int = 128,
+        on_stored: Optional[Callable[[PendingChunk], None]] = None,
+        on_failed: Optional[Callable[[PendingChunk, Exception], None]] = None
+    ):
+        """
+        Start the writer thread.
+
+        Args:
+            collection: ChromaDB collection to add chunks to
+            encode: Embeds a list of texts
+            batch_size: Maximum chunks per encode()/add() call
+            max_pending: Queue bound; put() blocks when this many chunks wait
+            on_stored: Called with each stored chunk
+            on_failed: Called with each chunk that could not be stored
+        """
+        self.collection = collection
+        self.encode = encode
+        self.batch_size = max(1, batch_size)
+        self.on_stored = on_stored
+        self.on_failed = on_failed
+        self.stored_ids: List[str] = []
+        self.failed = 0
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_pending))
+        self._thread = threading.Thread(target=self._run, name="chunk-embedding-queue", daemon=True)
+        self._thread.start()
+
+    def put(self, chunk: PendingChunk) -> None:
+        """Queue a chunk (blocks while the queue is full)."""
+        self._queue.put(chunk)
+
+    def close(self) -> None:
+        """Wait until every queued chunk is stored or has failed."""
+        self._queue.put(_CLOSE)
+        self._thread.join()
+
+    def _run(self) -> None:
+        closed = False
+        while not closed:
+            batch = [self._queue.get()]
+            if batch[0] is _CLOSE:
+                return
+            # Take whatever else is already waiting, up to a full batch
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _CLOSE:
+                    closed = True
+                    break
+                batch.append(item)
+            self._store_batch(batch)
+
+    def _store_batch(self, batch: List[PendingChunk]) -> None:
+        try:
+            self._add(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                self._fail(batch[0], e)
+                return
+            logger.warning(f"Storing a batch of {len(batch)} chunks failed, retrying one by one: {e}")
+            for chunk in batch:
+                try:
+                    self._add([chunk])
+                except Exception as chunk_error:
+                    self._fail(chunk, chunk_error)
+
+    def _add(self, batch: List[PendingChunk]) -> None:
+        texts = [chunk.text for chunk in batch]
+        self.collection.add(
+            documents=texts,
+            embeddings=self.encode(texts),
+            metadatas=[chunk.metadata for chunk in batch],
+            ids=[chunk.chunk_id for chunk in batch],
+        )
+        for chunk in batch:
+            self.stored_ids.append(chunk.chunk_id)
+            if self.on_stored:
+                self._callback(self.on_stored, chunk)
+
+    def _fail(self, chunk: PendingChunk, error: Exception) -> None:
+        self.failed += 1
+        if self.on_failed:
+            self._callback(self.on_failed, chunk, error)
+
+    @staticmethod
+    def _callback(callback: Callable, *args) -> None:
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.warning(f"Chunk queue callback failed: {e}")
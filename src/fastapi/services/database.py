@@ -70,6 +70,11 @@ from sqlalchemy.orm import sessionmaker, relationship, Session
 from datetime import datetime, timezone
 import enum
 
+from models.enums import SessionType as ModelSessionType
+from repositories.session_repository import SessionRepository
+from repositories.citation_repository import CitationRepository
+from services.persistence_queue import persistence_queue
+
 # Issue deprecation warning when this module is imported
 warnings.warn(
     "services.database is deprecated. Use the new architecture: "
@@ -216,14 +221,15 @@ Base = declarative_base()
 # Tables
 class ChatHistory(Base):
     __tablename__ = "chat_history"
-    id = Column(Integer, primary_key=True, index=True)
+    __table_args__ = {"postgresql_partition_by": "RANGE (timestamp)"}
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     user_query = Column(Text)
     response = Column(Text)
     model_used = Column(String)
     collection_name = Column(String)
     query_type = Column(String)
     response_time_ms = Column(Integer)
-    timestamp = Column(DateTime, default=datetime.now(timezone.utc), index=True)
+    timestamp = Column(DateTime, primary_key=True, default=lambda: datetime.now(timezone.utc), index=True)
     session_id = Column(String, index=True)
     source_documents = Column(JSON)
 
@@ -334,7 +340,7 @@ class AgentSession(Base):
     collection_name = Column(String, nullable=True)  # For RAG sessions
     
     # Session metadata
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), index=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
     completed_at = Column(DateTime, nullable=True)
     total_response_time_ms = Column(Integer, nullable=True)
     
@@ -352,8 +358,9 @@ class AgentSession(Base):
 # Individual agent responses within a session
 class AgentResponse(Base):
     __tablename__ = "agent_responses"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     session_id = Column(String, ForeignKey("agent_sessions.session_id", ondelete="CASCADE"), nullable=False)
     agent_id = Column(Integer, ForeignKey("compliance_agents.id", ondelete="CASCADE"), nullable=False)
 
@@ -376,21 +383,30 @@ class AgentResponse(Base):
     analysis_summary = Column(Text, nullable=True)
 
     # Metadata
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), index=True)
+    created_at = Column(DateTime, primary_key=True, default=lambda: datetime.now(timezone.utc), index=True)
     model_used = Column(String, nullable=False)
 
     # Relationships
     session = relationship("AgentSession", back_populates="agent_responses")
     agent = relationship("ComplianceAgent")
-    citations = relationship("RAGCitation", back_populates="agent_response", cascade="all, delete-orphan")
+    citations = relationship(
+        "RAGCitation",
+        primaryjoin=(
+            "and_(AgentResponse.id == foreign(RAGCitation.agent_response_id), "
+            "AgentResponse.created_at == foreign(RAGCitation.created_at))"
+        ),
+        back_populates="agent_response",
+        cascade="all, delete-orphan"
+    )
 
 
 # RAG Citation tracking for explainability and audit trail
 class RAGCitation(Base):
     __tablename__ = "rag_citations"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
-    id = Column(Integer, primary_key=True, index=True)
-    agent_response_id = Column(Integer, ForeignKey("agent_responses.id", ondelete="CASCADE"), nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    agent_response_id = Column(Integer, nullable=False)  # No FK: agent_responses is partitioned
     document_index = Column(Integer, nullable=False)  # Position in retrieved results (1-based)
 
     # Distance metrics (ChromaDB uses distance, lower is better)
@@ -413,11 +429,18 @@ class RAGCitation(Base):
     # Quality assessment (no threshold filtering, all docs included)
     quality_tier = Column(String, nullable=True)  # Excellent, High, Good, Fair, Low
 
-    # Timestamps
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), index=True)
+    # Timestamps (always the owning response's created_at)
+    created_at = Column(DateTime, primary_key=True, default=lambda: datetime.now(timezone.utc), index=True)
 
     # Relationships
-    agent_response = relationship("AgentResponse", back_populates="citations")
+    agent_response = relationship(
+        "AgentResponse",
+        primaryjoin=(
+            "and_(foreign(RAGCitation.agent_response_id) == AgentResponse.id, "
+            "foreign(RAGCitation.created_at) == AgentResponse.created_at)"
+        ),
+        back_populates="citations"
+    )
 
 # Utilities
 # DEPRECATED: This init_db() is no longer used. Use core.database.init_db() instead.
@@ -432,30 +455,8 @@ def get_db():
         db.close()
 
 def update_agent_performance(agent_id: int, response_time_ms: int, success: bool = True):
-    """Update agent performance metrics with optimized database access"""
-    try:
-        with SessionLocal() as db:  # Use context manager
-            agent = db.query(ComplianceAgent).filter(ComplianceAgent.id == agent_id).first()
-            if agent:
-                agent.total_queries = (agent.total_queries or 0) + 1
-                
-                if agent.avg_response_time_ms is None:
-                    agent.avg_response_time_ms = response_time_ms
-                else:
-                    total_time = agent.avg_response_time_ms * (agent.total_queries - 1) + response_time_ms
-                    agent.avg_response_time_ms = total_time / agent.total_queries
-
-                if agent.success_rate is None:
-                    agent.success_rate = 1.0 if success else 0.0
-                else:
-                    total_successes = agent.success_rate * (agent.total_queries - 1) + (1 if success else 0)
-                    agent.success_rate = total_successes / agent.total_queries
-
-                db.commit()
-                print(f"Updated performance for agent {agent_id}: queries={agent.total_queries}, avg_time={agent.avg_response_time_ms:.1f}ms")
-    except Exception as e:
-        print(f"Performance update error for agent {agent_id}: {e}")
-        # No need for explicit rollback with context manager
+    """Update agent performance metrics (batched per agent by the write-behind queue)"""
+    persistence_queue.add_performance(agent_id, response_time_ms, success)
 
 
 def log_compliance_result(agent_id: int, data_sample: str,
@@ -568,17 +569,21 @@ def complete_agent_session(session_id: str, overall_result: dict, agent_count: i
     finally:
         db.close()
 
-def get_session_history(limit: int = 50, session_type: SessionType = None):
-    """Get recent agent session history"""
+def get_session_history(limit: int = 50, session_type: SessionType = None, cursor: str = None,
+                        collection_name: str = None, model_used: str = None):
+    """Get recent agent session history (one keyset page; see SessionRepository.get_history_page)"""
     db = SessionLocal()
     try:
-        query = db.query(AgentSession).order_by(AgentSession.created_at.desc())
-        
-        if session_type:
-            query = query.filter(AgentSession.session_type == session_type)
-            
-        sessions = query.limit(limit).all()
-        
+        # The legacy enum is a separate class; the repository filters on the shared value
+        type_filter = ModelSessionType(session_type.value) if session_type else None
+        sessions, _ = SessionRepository(db).get_history_page(
+            limit=limit,
+            cursor=cursor,
+            session_type=type_filter,
+            collection_name=collection_name,
+            model_used=model_used
+        )
+
         result = []
         for session in sessions:
             session_data = {
@@ -602,58 +607,12 @@ def get_session_history(limit: int = 50, session_type: SessionType = None):
     finally:
         db.close()
 
-def get_session_details(session_id: str):
+def get_session_details(session_id: str, include_citations: bool = False):
     """Get detailed information about a specific session"""
     db = SessionLocal()
     try:
-        session = db.query(AgentSession).filter(AgentSession.session_id == session_id).first()
-        if not session:
-            return None
-
-        # Get all agent responses for this session
-        responses = db.query(AgentResponse).filter(
-            AgentResponse.session_id == session_id
-        ).order_by(AgentResponse.sequence_order.asc(), AgentResponse.created_at.asc()).all()
-
-        session_data = {
-            "session_info": {
-                "session_id": session.session_id,
-                "session_type": session.session_type.value,
-                "analysis_type": session.analysis_type.value,
-                "user_query": session.user_query,
-                "collection_name": session.collection_name,
-                "created_at": session.created_at,
-                "completed_at": session.completed_at,
-                "status": session.status,
-                "error_message": session.error_message,
-                "overall_result": session.overall_result,
-                "agent_count": session.agent_count,
-                "total_response_time_ms": session.total_response_time_ms
-            },
-            "agent_responses": []
-        }
-
-        for response in responses:
-            response_data = {
-                "agent_id": response.agent_id,
-                "agent_name": response.agent.name if response.agent else "Unknown",
-                "response_text": response.response_text,
-                "processing_method": response.processing_method,
-                "response_time_ms": response.response_time_ms,
-                "sequence_order": response.sequence_order,
-                "rag_used": response.rag_used,
-                "documents_found": response.documents_found,
-                # "compliant": response.compliant,
-                "confidence_score": response.confidence_score,
-                "model_used": response.model_used,
-                "created_at": response.created_at
-            }
-            session_data["agent_responses"].append(response_data)
-
-        return session_data
-    except Exception as e:
-        print(f"Error getting session details: {e}")
-        return None
+        # Shared eager-loading read path (fixed number of queries per session)
+        return SessionRepository(db).get_details(session_id, include_citations=include_citations)
     finally:
         db.close()
 
@@ -672,6 +631,14 @@ def log_rag_citations(agent_response_id: int, metadata_list: List[Dict[str, Any]
     """
     db = SessionLocal()
     try:
+        # Citations share their response's created_at (partition key)
+        response = db.query(AgentResponse.created_at).filter(
+            AgentResponse.id == agent_response_id
+        ).first()
+        if not response:
+            print(f"Error logging RAG citations: response {agent_response_id} not found")
+            return False
+
         citations = []
         for meta in metadata_list:
             doc_metadata = meta.get('metadata', {})
@@ -698,7 +665,8 @@ def log_rag_citations(agent_response_id: int, metadata_list: List[Dict[str, Any]
                 page_number=page_num,
                 section_name=section,
                 metadata_json=doc_metadata if doc_metadata else None,
-                quality_tier=meta.get('quality_tier', 'Unknown')
+                quality_tier=meta.get('quality_tier', 'Unknown'),
+                created_at=response.created_at
             )
             citations.append(citation)
 
@@ -767,39 +735,7 @@ def get_session_citations(session_id: str) -> List[Dict[str, Any]]:
     """
     db = SessionLocal()
     try:
-        # Join citations with responses to get session context
-        citations = db.query(RAGCitation, AgentResponse).join(
-            AgentResponse, RAGCitation.agent_response_id == AgentResponse.id
-        ).filter(
-            AgentResponse.session_id == session_id
-        ).order_by(
-            AgentResponse.created_at,
-            RAGCitation.document_index
-        ).all()
-
-        result = []
-        for citation, response in citations:
-            result.append({
-                "agent_response_id": citation.agent_response_id,
-                "agent_id": response.agent_id,
-                "document_index": citation.document_index,
-                "similarity_score": citation.similarity_score,
-                "similarity_percentage": citation.similarity_percentage,
-                "distance": citation.distance,
-                "excerpt": citation.excerpt,
-                "full_length": citation.full_length,
-                "source_file": citation.source_file,
-                "page_number": citation.page_number,
-                "section_name": citation.section_name,
-                "metadata": citation.metadata_json,
-                "quality_tier": citation.quality_tier,
-                "created_at": citation.created_at
-            })
-
-        return result
-    except Exception as e:
-        print(f"Error retrieving session citations: {e}")
-        return []
+        return CitationRepository(db).get_by_session_id(session_id)
     finally:
         db.close()
 
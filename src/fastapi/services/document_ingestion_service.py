@@ -7,7 +7,8 @@ Handles document processing, chunking, and embedding generation
 import os
 import chromadb
 from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+import bisect
 import redis
 import json
 import uuid
@@ -27,6 +28,7 @@ from dotenv import load_dotenv
 import cv2
 import asyncio
 import functools
+import threading
 from zipfile import ZipFile
 from bs4 import BeautifulSoup
 
@@ -36,24 +38,34 @@ from .position_aware_extraction import (
     add_text_anchors_to_images
 )
 from .position_aware_chunking import (
-    page_based_chunking_with_positions
+    iter_page_chunks
 )
+from .local_vision_worker import LocalVisionWorker, get_local_vision_worker
+from .image_description_cache import (
+    ImageDescriptionCache,
+    image_content_hash,
+    IMAGE_CACHE_ENABLED
+)
+from .image_store import ImageStore
+from .chunk_embedding_queue import ChunkEmbeddingQueue, PendingChunk
+from .token_aware_chunking import (
+    TokenAwareChunker,
+    token_histogram,
+    TOKEN_CHUNK_MAX_TOKENS
+)
+from .image_description_queue import (
+    ImageDescriptionQueue,
+    DEFER_IMAGE_DESCRIPTIONS,
+    IMAGE_DESCRIPTION_PENDING,
+    IMAGE_DESCRIPTION_FAILED
+)
+from .vision_config import VISION_CONFIG
 
 logger = logging.getLogger("DOC_INGESTION_SERVICE")
 
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
 
-VISION_CONFIG = {
-            "openai_enabled": bool(openai_api_key),
-            "ollama_enabled": True,
-            "huggingface_enabled": True,
-            "enhanced_local_enabled": True,
-            "ollama_url": os.getenv("OLLAMA_URL", "http://ollama:11434"),
-            "ollama_model": os.getenv("OLLAMA_VISION_MODEL", "llava"),
-            "huggingface_model": os.getenv("HUGGINGFACE_VISION_MODEL", "Salesforce/blip-image-captioning-base")
-        }
-
 # Image storage directory
 IMAGES_DIR = os.getenv("IMAGES_STORAGE_DIR", os.path.join(os.getcwd(), "stored_images"))
 try:
@@ -69,8 +81,6 @@ except PermissionError as e:
     logger.info(f"Using fallback directory: {IMAGES_DIR}")
     os.makedirs(IMAGES_DIR, exist_ok=True)
 
-_hf_processor = None
-_hf_model = None
 
 
 # =============================================================================
@@ -93,16 +103,32 @@ EMBEDDING_MODEL_NAME = os.getenv(
 )
 embedding_model = SentenceTransformer(EMBEDDING_MODEL_NAME)
 
+# Token-aware chunking measures chunks with the embedding model's own tokenizer
+token_chunker = TokenAwareChunker(
+    embedding_model.tokenizer,
+    max_tokens=TOKEN_CHUNK_MAX_TOKENS or (embedding_model.max_seq_length - 2)
+)
+
 # Redis for job tracking
 REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
 redis_client = redis.from_url(REDIS_URL, decode_responses=True)
 
+# Content-hash cache of image descriptions and stored files (shared across jobs)
+image_cache = ImageDescriptionCache(redis_client if IMAGE_CACHE_ENABLED else None)
+
+# Content-addressed image blobs, reference counted per chunk
+image_store = ImageStore(IMAGES_DIR, redis_client)
+
 # ChromaDB persistence directory (for legacy compatibility)
 PERSIST_DIR = os.getenv("PERSIST_DIRECTORY", "/chroma/chroma")
 
 # Feature flag for position-aware extraction and chunking
 USE_POSITION_AWARE = os.getenv("USE_POSITION_AWARE_EXTRACTION", "true").lower() == "true"
 
+# Chunks embedded per encode()/add() call, and chunks buffered ahead of the embedder
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_QUEUE_SIZE = int(os.getenv("EMBEDDING_QUEUE_SIZE", "128"))
+
 logger.info("Document Ingestion Service initialized")
 logger.info(f"ChromaDB: {CHROMA_HOST}:{CHROMA_PORT}")
 logger.info(f"Embedding model: {EMBEDDING_MODEL_NAME}")
@@ -234,7 +260,7 @@ def describe_with_ollama_vision(image_path: str) -> Optional[str]:
 
 
 def describe_with_huggingface_vision(image_path: str) -> Optional[str]:
-    """Use Hugging Face vision model for image description"""
+    """Use Hugging Face vision model for image description (batched by the local vision worker)"""
     try:
         if not VISION_CONFIG["huggingface_enabled"]:
             return None
@@ -242,28 +268,9 @@ def describe_with_huggingface_vision(image_path: str) -> Optional[str]:
         if not os.path.exists(image_path):
             logger.error(f"Image file not found: {image_path}")
             return None
-            
-        global _hf_processor, _hf_model
-        
-        # Load models once and cache them
-        if _hf_processor is None or _hf_model is None:
-            from transformers import BlipProcessor, BlipForConditionalGeneration
-            logger.info(f"Loading HuggingFace model: {VISION_CONFIG['huggingface_model']}")
-            _hf_processor = BlipProcessor.from_pretrained(VISION_CONFIG['huggingface_model'])
-            _hf_model = BlipForConditionalGeneration.from_pretrained(VISION_CONFIG['huggingface_model'])
-        
-        # Process image
-        image = Image.open(image_path)
-        inputs = _hf_processor(image, return_tensors="pt")
-        
-        # Generate description
-        out = _hf_model.generate(**inputs, max_length=50, num_beams=4)
-        description = _hf_processor.decode(out[0], skip_special_tokens=True)
-        
-        if description and len(description) > 5:
-            return f"HuggingFace BLIP: {description}"
-        
-        return None
+
+        worker = get_local_vision_worker()
+        return _format_huggingface_caption(worker, worker.describe(image_path))
         
     except Exception as e:
         logger.warning(f"HuggingFace vision model failed for {image_path}: {e}")
@@ -271,6 +278,16 @@ def describe_with_huggingface_vision(image_path: str) -> Optional[str]:
         VISION_CONFIG["huggingface_enabled"] = False
         return None
 
+
+def _format_huggingface_caption(worker: LocalVisionWorker, description: Optional[str]) -> Optional[str]:
+    """Prefix a BLIP caption, disabling the backend if the model could not be loaded."""
+    if worker.failed:
+        VISION_CONFIG["huggingface_enabled"] = False
+        return None
+    if description and len(description) > 5:
+        return f"HuggingFace BLIP: {description}"
+    return None
+
 def enhanced_local_image_analysis(image_path: str) -> str:
     """Enhanced local image analysis using OpenCV and PIL"""
     try:
@@ -421,6 +438,120 @@ def basic_image_analysis(image_path: str) -> str:
         logger.error(f"Basic image analysis failed for {image_path}: {e}")
         return f"Image file: {Path(image_path).name} (analysis failed)"
 
+# Backend order used for first-success fallback and combined descriptions
+VISION_BACKEND_ORDER = ["openai", "ollama", "huggingface", "enhanced_local"]
+
+_VISION_LABELS = {
+    "openai": "OpenAI",
+    "ollama": "Ollama",
+    "huggingface": "HuggingFace",
+    "enhanced_local": "Enhanced Local",
+}
+
+# Blocking backends run on per-backend pools (HuggingFace goes through the batching worker)
+_VISION_BACKENDS = {
+    "ollama": describe_with_ollama_vision,
+    "enhanced_local": enhanced_local_image_analysis,
+    "basic": basic_image_analysis,
+}
+
+# Max in-flight descriptions per backend. Blocking backends share one pool per
+# process, so the limit holds across documents ingested in parallel.
+VISION_CONCURRENCY = {
+    "openai": int(os.getenv("VISION_OPENAI_CONCURRENCY", "8")),
+    "ollama": int(os.getenv("VISION_OLLAMA_CONCURRENCY", "2")),
+    "enhanced_local": int(os.getenv("VISION_LOCAL_CONCURRENCY", str(os.cpu_count() or 2))),
+    "basic": int(os.getenv("VISION_LOCAL_CONCURRENCY", str(os.cpu_count() or 2))),
+}
+
+_vision_executors: Dict[str, ThreadPoolExecutor] = {}
+_vision_executors_lock = threading.Lock()
+
+
+def _get_vision_executor(model: str) -> ThreadPoolExecutor:
+    """Shared thread pool for a blocking vision backend."""
+    executor = _vision_executors.get(model)
+    if executor is None:
+        with _vision_executors_lock:
+            executor = _vision_executors.get(model)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=max(1, VISION_CONCURRENCY[model]),
+                    thread_name_prefix=f"vision-{model}"
+                )
+                _vision_executors[model] = executor
+    return executor
+
+
+def _vision_cache_model(model: str) -> str:
+    """Cache namespace for a backend, including the concrete model where it varies."""
+    if model == "ollama":
+        return f"ollama:{VISION_CONFIG['ollama_model']}"
+    if model == "huggingface":
+        return f"huggingface:{VISION_CONFIG['huggingface_model']}"
+    if model == "openai":
+        return "openai:gpt-4o-mini"
+    return model
+
+
+async def _describe_with_backend(
+    model: str,
+    img_path: str,
+    image_hash: Optional[str],
+    api_key_override,
+    openai_semaphore: asyncio.Semaphore
+) -> Optional[str]:
+    """Run one vision backend for one image under that backend's concurrency limit, via the cache."""
+    cache_model = _vision_cache_model(model)
+    cached = image_cache.get_description(image_hash, cache_model)
+    if cached:
+        return cached
+
+    if model == "openai":
+        async with openai_semaphore:
+            d = await describe_with_openai_markitdown(img_path, api_key_override)
+    elif model == "huggingface":
+        # Submitted straight to the batching worker so concurrent images share forward passes
+        d = None
+        if VISION_CONFIG["huggingface_enabled"] and os.path.exists(img_path):
+            worker = get_local_vision_worker()
+            d = _format_huggingface_caption(worker, await asyncio.wrap_future(worker.submit(img_path)))
+    else:
+        loop = asyncio.get_running_loop()
+        d = await loop.run_in_executor(_get_vision_executor(model), _VISION_BACKENDS[model], img_path)
+
+    image_cache.set_description(image_hash, cache_model, d)
+    return d
+
+
+async def _describe_image(
+    img_path: str,
+    image_hash: Optional[str],
+    api_key_override,
+    run_all_models: bool,
+    models: List[str],
+    openai_semaphore: asyncio.Semaphore
+) -> str:
+    """Describe one image with the enabled backends (all at once, or first success in order)."""
+    if run_all_models:
+        results = await asyncio.gather(*(
+            _describe_with_backend(model, img_path, image_hash, api_key_override, openai_semaphore)
+            for model in models
+        ))
+        all_desc = {_VISION_LABELS[model]: d for model, d in zip(models, results) if d}
+
+        # always include basic fallback
+        all_desc["Basic Fallback"] = await _describe_with_backend("basic", img_path, image_hash, None, openai_semaphore)
+        return create_combined_description(all_desc, Path(img_path).name)
+
+    # first‐success only among enabled & flagged
+    for model in models:
+        d = await _describe_with_backend(model, img_path, image_hash, api_key_override, openai_semaphore)
+        if d:
+            return d
+    return await _describe_with_backend("basic", img_path, image_hash, None, openai_semaphore)
+
+
 async def describe_images_for_pages(
     pages_data: List[Dict],
     api_key_override=None,
@@ -428,6 +559,20 @@ async def describe_images_for_pages(
     enabled_models: set[str] = frozenset(),
     vision_flags: dict[str,bool] = {}
 ) -> List[Dict]:
+    """
+    Describe every image in the document concurrently.
+
+    All images across all pages are submitted at once. OpenAI calls are bounded
+    by a per-call semaphore; HuggingFace requests are queued to the batching
+    local vision worker; other blocking backends (Ollama, local analysis) run
+    on shared per-backend thread pools, which also bound them across documents
+    ingested in parallel. Descriptions are written back to
+    page["image_descriptions"] in the original page/image order.
+    """
+    models = [m for m in VISION_BACKEND_ORDER if m in enabled_models and vision_flags.get(m, False)]
+    openai_semaphore = asyncio.Semaphore(VISION_CONCURRENCY["openai"])
+
+    pending = []
     for page in pages_data:
         descs = []
         for img_item in page["images"]:
@@ -444,42 +589,226 @@ async def describe_images_for_pages(
                 descs.append("No image path available")
                 continue
 
-            if run_all_models:
-                all_desc = {}
-                if "openai" in enabled_models and vision_flags.get("openai", False):
-                    d = await describe_with_openai_markitdown(img_path, api_key_override)
-                    if d:
-                        all_desc["OpenAI"] = d
-                if "ollama" in enabled_models and vision_flags.get("ollama", False):
-                    d = describe_with_ollama_vision(img_path)
-                    if d: all_desc["Ollama"] = d
-                if "huggingface" in enabled_models and vision_flags.get("huggingface", False):
-                    d = describe_with_huggingface_vision(img_path)
-                    if d: all_desc["HuggingFace"] = d
-                if "enhanced_local" in enabled_models and vision_flags.get("enhanced_local", False):
-                    d = enhanced_local_image_analysis(img_path)
-                    if d: all_desc["Enhanced Local"] = d
-
-                # always include basic fallback
-                all_desc["Basic Fallback"] = basic_image_analysis(img_path)
-                descs.append(create_combined_description(all_desc, Path(img_path).name))
+            descs.append(None)
+            image_hash = img_item.get("image_hash") if isinstance(img_item, dict) else None
+            pending.append((descs, len(descs) - 1, img_path, image_hash))
+
+        page["image_descriptions"] = descs
+
+    if not pending:
+        return pages_data
+
+    # Hash any images the extractor did not already hash
+    loop = asyncio.get_running_loop()
+    hashes = await asyncio.gather(*(
+        loop.run_in_executor(_get_vision_executor("basic"), image_content_hash, img_path) if image_hash is None
+        else asyncio.sleep(0, result=image_hash)
+        for _, _, img_path, image_hash in pending
+    ))
+
+    # Describe each distinct image once; duplicates share the result
+    unique: Dict[str, tuple] = {}
+    keys = []
+    for (_, _, img_path, _), image_hash in zip(pending, hashes):
+        key = image_hash or f"path:{img_path}"
+        unique.setdefault(key, (img_path, image_hash))
+        keys.append(key)
+
+    logger.info(
+        f"Describing {len(unique)} distinct images ({len(pending)} total) with "
+        f"{models or ['basic']} (run_all_models={run_all_models})"
+    )
+    results = await asyncio.gather(
+        *(_describe_image(img_path, image_hash, api_key_override, run_all_models, models, openai_semaphore)
+          for img_path, image_hash in unique.values()),
+        return_exceptions=True
+    )
+    described = dict(zip(unique.keys(), results))
+
+    for (descs, i, img_path, _), key in zip(pending, keys):
+        result = described[key]
+        if isinstance(result, Exception):
+            logger.warning(f"Image description failed for {img_path}: {result}")
+            result = basic_image_analysis(img_path)
+        descs[i] = result
+
+    return pages_data
+
+
+def dedupe_stored_images(pages_data: List[Dict]) -> List[Dict]:
+    """
+    Collapse stored images that are exact duplicates onto one file.
+
+    Each image is hashed; if an image with the same pixel size and decoded
+    pixels was already stored by this or an earlier ingest job, the image
+    entry points at the existing file. Near-duplicates (re-encoded or rescaled
+    copies) are kept as separate images. The new blob is left in place
+    (another document may share it) and is freed by image store garbage
+    collection if unreferenced. Position-aware image dicts also get an
+    "image_hash" field so description lookups can skip re-hashing.
+
+    Args:
+        pages_data: Page data from any of the image extractors
 
+    Returns:
+        The same pages_data, updated in place
+    """
+    reused = 0
+    for page in pages_data:
+        images = page.get("images", [])
+        for i, img_item in enumerate(images):
+            img_path = img_item.get("storage_path", "") if isinstance(img_item, dict) else img_item
+            if not img_path:
+                continue
+
+            image_hash = image_content_hash(img_path)
+            canonical = image_cache.claim_stored_file(image_hash, img_path)
+
+            if canonical != img_path:
+                reused += 1
+
+            if isinstance(img_item, dict):
+                img_item["image_hash"] = image_hash or ""
+                img_item["storage_path"] = canonical
+                img_item["filename"] = Path(canonical).name
             else:
-                # first‐success only among enabled & flagged
-                d = None
-                if "openai" in enabled_models and vision_flags.get("openai", False):
-                    d = await describe_with_openai_markitdown(img_path, api_key_override)
-                if not d and "ollama" in enabled_models and vision_flags.get("ollama", False):
-                    d = describe_with_ollama_vision(img_path)
-                if not d and "huggingface" in enabled_models and vision_flags.get("huggingface", False):
-                    d = describe_with_huggingface_vision(img_path)
-                if not d and "enhanced_local" in enabled_models and vision_flags.get("enhanced_local", False):
-                    d = enhanced_local_image_analysis(img_path)
-                descs.append(d or basic_image_analysis(img_path))
+                images[i] = canonical
 
-        page["image_descriptions"] = descs
+    if reused:
+        logger.info(f"Reused {reused} previously stored duplicate images")
+    return pages_data
+
+
+def vision_models_from_descriptions(descriptions: List[str]) -> set:
+    """Derive which vision models produced descriptions from their prefixes."""
+    models_used = set()
+    for d in descriptions:
+        if not d:
+            continue
+        ld = d.lower()
+        if ld.startswith("openai vision"):
+            models_used.add("openai")
+        elif ld.startswith("ollama vision"):
+            models_used.add("ollama")
+        elif ld.startswith("huggingface blip"):
+            models_used.add("huggingface")
+        elif ld.startswith("enhanced local"):
+            models_used.add("enhanced_local")
+        elif ld.startswith("basic fallback"):
+            models_used.add("basic")
+    return models_used
+
+
+def mark_image_descriptions_pending(pages_data: List[Dict]) -> List[Dict]:
+    """
+    Give every image a placeholder description so chunks can be stored before vision runs.
+
+    Args:
+        pages_data: Page data from any of the image extractors
+
+    Returns:
+        The same pages_data, updated in place
+    """
+    for page in pages_data:
+        images = page.get("images", [])
+        page["image_descriptions"] = [IMAGE_DESCRIPTION_PENDING] * len(images)
+        for img in images:
+            if isinstance(img, dict):
+                img["description"] = IMAGE_DESCRIPTION_PENDING
     return pages_data
 
+
+def describe_deferred_chunk(collection_name: str, chunk_id: str, vision_models: List[str]) -> None:
+    """
+    Describe the images of a chunk stored with placeholder descriptions.
+
+    Runs on the image description queue worker. Only the chunk metadata is
+    updated: deferred chunks are PDF pages, whose embedded text never includes
+    image descriptions, so the stored embedding stays valid. The worker has no
+    request headers, so OpenAI uses the server's OPENAI_API_KEY.
+
+    Args:
+        collection_name: ChromaDB collection holding the chunk
+        chunk_id: Chunk id
+        vision_models: Vision models selected for the upload
+    """
+    coll = chroma_client.get_collection(name=collection_name)
+    result = coll.get(ids=[chunk_id], include=["metadatas"])
+    if not result["ids"]:
+        logger.info(f"Chunk {chunk_id} no longer exists, skipping image descriptions")
+        return
+
+    meta = result["metadatas"][0] or {}
+    if not meta.get("image_descriptions_pending"):
+        return
+
+    paths = json.loads(meta.get("image_storage_paths", "[]"))
+    pages_data = asyncio.run(
+        describe_images_for_pages(
+            [{"images": list(paths)}],
+            run_all_models=len(vision_models) > 1,
+            enabled_models=set(vision_models),
+            vision_flags={m: True for m in vision_models},
+        )
+    )
+    descs = pages_data[0]["image_descriptions"]
+    by_path = dict(zip(paths, descs))
+
+    positions = json.loads(meta.get("image_positions", "[]"))
+    for pos in positions:
+        pos["description"] = by_path.get(pos.get("storage_path"), pos.get("description", ""))
+
+    # Only the changed keys are sent (Chroma merges them): writing the whole
+    # metadata back would undo concurrent patches such as total_chunks
+    models_used = vision_models_from_descriptions(descs)
+    coll.update(ids=[chunk_id], metadatas=[{
+        "image_descriptions": json.dumps(descs),
+        "image_positions": json.dumps(positions),
+        "vision_models_used": json.dumps(sorted(models_used)),
+        "openai_api_used": "openai" in models_used,
+        "image_descriptions_pending": False,
+    }])
+    logger.info(f"Stored {len(descs)} deferred image descriptions for {chunk_id}")
+
+
+def fail_deferred_chunk(collection_name: str, chunk_id: str) -> None:
+    """
+    Replace the pending placeholders of a chunk whose description task was given up.
+
+    Args:
+        collection_name: ChromaDB collection holding the chunk
+        chunk_id: Chunk id
+    """
+    coll = chroma_client.get_collection(name=collection_name)
+    result = coll.get(ids=[chunk_id], include=["metadatas"])
+    if not result["ids"]:
+        return
+
+    meta = result["metadatas"][0] or {}
+    if not meta.get("image_descriptions_pending"):
+        return
+
+    descs = [
+        IMAGE_DESCRIPTION_FAILED if d == IMAGE_DESCRIPTION_PENDING else d
+        for d in json.loads(meta.get("image_descriptions", "[]"))
+    ]
+    positions = json.loads(meta.get("image_positions", "[]"))
+    for pos in positions:
+        if pos.get("description") == IMAGE_DESCRIPTION_PENDING:
+            pos["description"] = IMAGE_DESCRIPTION_FAILED
+
+    coll.update(ids=[chunk_id], metadatas=[{
+        "image_descriptions": json.dumps(descs),
+        "image_positions": json.dumps(positions),
+        "image_descriptions_pending": False,
+    }])
+    logger.warning(f"Marked image descriptions of {chunk_id} as unavailable")
+
+
+description_queue = ImageDescriptionQueue(
+    redis_client, describe_deferred_chunk, on_give_up=fail_deferred_chunk
+)
+
 def extract_and_store_images_from_file(file_content: bytes, filename: str, temp_dir: str, doc_id: str) -> List[Dict]:
     """Fixed image extraction from PDF with better error handling"""
     pages_data = []
@@ -565,9 +894,9 @@ def extract_and_store_images_from_file(file_content: bytes, filename: str, temp_
                                 else:
                                     img_ext = 'png'  # Default to PNG
                                 
-                                # Create filename
+                                # Create filename (scratch copy; verified images move to the image store)
                                 img_filename = f"{doc_id}_page_{page_num}_{obj_name[1:]}.{img_ext}"
-                                img_storage_path = os.path.join(IMAGES_DIR, img_filename)
+                                img_storage_path = os.path.join(temp_dir, img_filename)
                                 
                                 # Save image
                                 with open(img_storage_path, "wb") as img_file:
@@ -592,7 +921,7 @@ def extract_and_store_images_from_file(file_content: bytes, filename: str, temp_
                                     try:
                                         with Image.open(img_storage_path) as test_img:
                                             test_img.verify()
-                                        page_images.append(img_storage_path)
+                                        page_images.append(image_store.put_file(img_storage_path))
                                         logger.info(f"Successfully stored and verified image: {img_filename}")
                                     except Exception as img_verify_error:
                                         logger.warning(f"Invalid image file created: {img_filename}, error: {img_verify_error}")
@@ -699,6 +1028,15 @@ def use_structure_preserving_upload() -> bool:
     """Check if we should use structure-preserving upload instead of chunking"""
     return os.getenv("USE_STRUCTURE_PRESERVING_UPLOAD", "true").lower() == "true"
 
+CHUNKING_STRATEGIES = ("structure", "token", "character")
+
+def default_chunking_strategy() -> str:
+    """Chunking strategy for non-PDF documents: CHUNKING_STRATEGY, else the legacy upload flag"""
+    strategy = os.getenv("CHUNKING_STRATEGY", "").lower()
+    if strategy in CHUNKING_STRATEGIES:
+        return strategy
+    return "structure" if use_structure_preserving_upload() else "character"
+
 def structure_preserving_process(content: str, images_data: List[Dict], document_name: str) -> List[Dict]:
     """Process document while preserving its natural structure (sections, pages, etc.)
 
@@ -789,54 +1127,64 @@ def structure_preserving_process(content: str, images_data: List[Dict], document
     logger.info(f"Structure-preserving processing created {len(chunks)} chunks for {document_name}")
     return chunks
 
-def extract_document_sections_from_content(content: str) -> Dict[str, str]:
-    """Extract logical sections from document content based on headers"""
+def _section_header(line_clean: str) -> bool:
+    """Check for section headers - various patterns for military standards"""
     import re
-    
-    sections = {}
-    lines = content.split('\n')
-    current_section_title = "Introduction"
-    current_section_content = []
-    
-    for line in lines:
+
+    if not line_clean:
+        return False
+    # Pattern 1: Numbered sections (4.1, 5.1.13, etc.)
+    if re.match(r'^\d+(\.\d+)*\.?\s+[A-Z]', line_clean):
+        return True
+    # Pattern 2: ALL CAPS headers
+    if line_clean.isupper() and len(line_clean.split()) <= 8 and len(line_clean) > 5:
+        return True
+    # Pattern 3: APPENDIX headers
+    if line_clean.startswith(('APPENDIX', 'CHAPTER', 'SECTION', 'PART')):
+        return True
+    # Pattern 4: Headers with specific keywords
+    if any(keyword in line_clean.upper() for keyword in ['REQUIREMENTS', 'SPECIFICATIONS', 'PROCEDURES', 'TESTING', 'CONFIGURATION']):
+        return len(line_clean.split()) <= 10
+    return False
+
+def iter_document_section_spans(content: str) -> Iterator[Tuple[str, int, int, int]]:
+    """
+    Yield the logical sections of document content as offsets.
+
+    Yields:
+        (title, header_start, body_start, body_end): the header line spans
+        [header_start, body_start) and the section text [body_start, body_end).
+        The leading "Introduction" section has no header line.
+    """
+    title = "Introduction"
+    header_start = body_start = 0
+    has_content = False
+    pos = 0
+
+    for line in content.split('\n'):
+        line_end = pos + len(line)
         line_clean = line.strip()
-        
-        # Check for section headers - various patterns for military standards
-        is_section_header = False
-        header_title = ""
-        
-        if line_clean:
-            # Pattern 1: Numbered sections (4.1, 5.1.13, etc.)
-            if re.match(r'^\d+(\.\d+)*\.?\s+[A-Z]', line_clean):
-                is_section_header = True
-                header_title = line_clean
-            # Pattern 2: ALL CAPS headers
-            elif line_clean.isupper() and len(line_clean.split()) <= 8 and len(line_clean) > 5:
-                is_section_header = True
-                header_title = line_clean
-            # Pattern 3: APPENDIX headers
-            elif line_clean.startswith(('APPENDIX', 'CHAPTER', 'SECTION', 'PART')):
-                is_section_header = True
-                header_title = line_clean
-            # Pattern 4: Headers with specific keywords
-            elif any(keyword in line_clean.upper() for keyword in ['REQUIREMENTS', 'SPECIFICATIONS', 'PROCEDURES', 'TESTING', 'CONFIGURATION']):
-                if len(line_clean.split()) <= 10:
-                    is_section_header = True
-                    header_title = line_clean
-        
-        if is_section_header and current_section_content:
-            # Save previous section
-            sections[current_section_title] = '\n'.join(current_section_content)
-            current_section_title = header_title
-            current_section_content = []
+
+        if _section_header(line_clean) and has_content:
+            # Close the previous section (without the newline before this header)
+            yield title, header_start, body_start, pos - 1
+            title = line_clean
+            header_start, body_start = pos, line_end + 1
+            has_content = False
         else:
-            current_section_content.append(line)
-    
+            has_content = True
+        pos = line_end + 1
+
     # Add the last section
-    if current_section_content:
-        sections[current_section_title] = '\n'.join(current_section_content)
-    
-    return sections
+    if has_content:
+        yield title, header_start, body_start, len(content)
+
+def extract_document_sections_from_content(content: str) -> Dict[str, str]:
+    """Extract logical sections from document content based on headers"""
+    return {
+        title: content[body_start:body_end]
+        for title, _header_start, body_start, body_end in iter_document_section_spans(content)
+    }
 
 def extract_section_title_from_content(content: str) -> str:
     """Extract a meaningful title from section content"""
@@ -873,76 +1221,71 @@ def find_images_for_section(section_content: str, images_data: List[Dict]) -> Li
     
     return section_images
 
-def smart_chunk_with_context(content: str, images_data: List[Dict], chunk_size: int = 1000, overlap: int = 200) -> List[Dict]:
-    """Enhanced chunking that preserves image context and references"""
-    
-    chunks = []
-    
-    # Find all image marker positions in the content
-    image_positions = {}
+def iter_smart_chunks(content: str, images_data: List[Dict], chunk_size: int = 1000, overlap: int = 200) -> Iterator[Dict]:
+    """
+    Yield context-preserving chunks with their image references.
+
+    Boundaries are found with offset arithmetic on the full text, so each
+    chunk's text is copied once, when it is yielded.
+    """
+    # Find all image marker positions in the content (sorted for range lookups)
+    marker_positions = []
     for img in images_data:
         marker = img['position_marker']
         pos = content.find(marker)
         if pos != -1:
-            image_positions[pos] = img
+            marker_positions.append((pos, img))
             logger.info(f"Found image marker '{marker}' at position {pos}")
         else:
             logger.warning(f"Image marker '{marker}' not found in content")
-    
-    logger.info(f"Found {len(image_positions)} image markers in content")
-    
-    # Split content into chunks
+    marker_positions.sort(key=lambda p: p[0])
+    offsets = [pos for pos, _ in marker_positions]
+
+    logger.info(f"Found {len(marker_positions)} image markers in content")
+
+    length = len(content)
     start = 0
     chunk_index = 0
-    
-    while start < len(content):
-        end = start + chunk_size
-        chunk_text = content[start:end]
-        
-        # Adjust boundaries to preserve context (avoid breaking sentences/paragraphs)
-        if end < len(content):
-            # Try to break at sentence or paragraph boundaries
-            last_period = chunk_text.rfind('.')
-            last_newline = chunk_text.rfind('\n\n')
-            last_single_newline = chunk_text.rfind('\n')
-            
-            # Choose the best break point
-            break_point = max(last_period, last_newline, last_single_newline)
-            
-            if break_point > start + chunk_size // 2:  # Only use break point if it's not too early
-                chunk_text = content[start:break_point + 1]
+
+    while start < length:
+        end = min(start + chunk_size, length)
+
+        # Adjust boundaries to preserve context (avoid breaking sentences/paragraphs),
+        # only using a break point in the second half of the window
+        if end < length:
+            floor = start + chunk_size // 2 + 1
+            break_point = max(content.rfind('.', floor, end), content.rfind('\n', floor, end))
+            if break_point != -1:
                 end = break_point + 1
-        
+
         # Find images that appear in this chunk
-        chunk_images = []
-        for pos, img_data in image_positions.items():
-            if start <= pos < end:
-                chunk_images.append(img_data)
-                logger.info(f"Chunk {chunk_index}: Including image {img_data['filename']}")
-        
-        # Create chunk metadata
-        chunk_data = {
-            "content": chunk_text.strip(),
+        chunk_images = [img for _, img in marker_positions[bisect.bisect_left(offsets, start):bisect.bisect_left(offsets, end)]]
+        for img_data in chunk_images:
+            logger.info(f"Chunk {chunk_index}: Including image {img_data['filename']}")
+
+        logger.info(f"Chunk {chunk_index}: {end - start} chars, {len(chunk_images)} images")
+
+        yield {
+            "content": content[start:end].strip(),
             "chunk_index": chunk_index,
             "start_position": start,
             "end_position": end,
             "images": chunk_images,
             "has_images": len(chunk_images) > 0
         }
-        
-        chunks.append(chunk_data)
-        
-        # Log chunk info
-        logger.info(f"Chunk {chunk_index}: {len(chunk_text)} chars, {len(chunk_images)} images")
-        
         chunk_index += 1
-        start = end - overlap
-        
-        if start >= len(content):
+
+        # The last window reached the end; another would only repeat its overlap
+        if end >= length:
             break
-    
-    logger.info(f"Created {len(chunks)} chunks total")
-    return chunks
+        start = max(end - overlap, start + 1)
+
+    logger.info(f"Created {chunk_index} chunks total")
+
+
+def smart_chunk_with_context(content: str, images_data: List[Dict], chunk_size: int = 1000, overlap: int = 200) -> List[Dict]:
+    """Enhanced chunking that preserves image context and references (see iter_smart_chunks)"""
+    return list(iter_smart_chunks(content, images_data, chunk_size, overlap))
 
     
 def create_combined_description(all_descriptions: dict, filename: str) -> str:
@@ -1013,6 +1356,7 @@ def process_document_with_context_multi_model(file_content: bytes,
     if file_extension == '.pdf':
         # 1) extract images synchronously
         pages_data = extract_and_store_images_from_file(file_content, filename, temp_dir, doc_id)
+        pages_data = dedupe_stored_images(pages_data)
 
         # 2) run async describer on its own loop
         loop = asyncio.new_event_loop()
@@ -1125,7 +1469,7 @@ def process_document_with_context_multi_model(file_content: bytes,
 
 
 
-def create_chunks_with_position_support(
+def iter_chunks_with_position_support(
     ext: str,
     pages_data: List[Dict],
     fname: str,
@@ -1136,10 +1480,14 @@ def create_chunks_with_position_support(
     chunk_size: int,
     chunk_overlap: int,
     enable_ocr: bool,
-    use_positions: bool = True
-) -> List[Dict[str, Any]]:
+    use_positions: bool = True,
+    chunking_strategy: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
     """
-    Create chunks with optional position preservation.
+    Yield chunks with optional position preservation.
+
+    Chunks are produced as the text is scanned, so the caller can embed and
+    store early chunks while later ones are still being cut.
 
     For PDFs with position-aware extraction enabled, uses position-aware chunking.
     Otherwise, falls back to legacy chunking logic.
@@ -1156,22 +1504,27 @@ def create_chunks_with_position_support(
         chunk_overlap: Chunk overlap for text splitting
         enable_ocr: Whether OCR is enabled
         use_positions: Whether to use position-aware chunking
+        chunking_strategy: Non-PDF chunking: "structure", "token" (embedding-model
+            tokens; chunk_size/chunk_overlap do not apply) or "character"
+            (default: default_chunking_strategy())
 
-    Returns:
-        List of chunk dictionaries
+    Yields:
+        Chunk dictionaries
     """
     # Check if we should use position-aware chunking
     if use_positions and USE_POSITION_AWARE and ext == ".pdf":
         logger.info(f"Using position-aware chunking for {fname}")
+        yielded = 0
         try:
             # Use position-aware chunking from the new module
-            chunks = page_based_chunking_with_positions(
-                pages_data=pages_data,
-                document_name=fname
-            )
-            logger.info(f"Position-aware chunking created {len(chunks)} chunks for {fname}")
-            return chunks
+            for chunk in iter_page_chunks(pages_data=pages_data, document_name=fname):
+                yielded += 1
+                yield chunk
+            return
         except Exception as e:
+            if yielded:
+                # Chunks already handed out cannot be replaced by a fallback run
+                raise
             logger.error(f"Position-aware chunking failed for {fname}, falling back to legacy: {e}")
             # Fall through to legacy chunking
 
@@ -1185,7 +1538,7 @@ def create_chunks_with_position_support(
         page_texts = extract_text_by_page(content, fname, tmp_dir)
         page_text_map = {p["page"]: (p.get("text") or "") for p in page_texts}
 
-        chunks = []
+        count = 0
         for page in pages_data:
             pg = page.get("page") or 0
             pg_text = page_text_map.get(pg, "")
@@ -1214,7 +1567,8 @@ def create_chunks_with_position_support(
             # Ensure we have some minimal content to embed
             if not (pg_text or "").strip():
                 pg_text = f"Page {pg}: [no extractable text]"
-            chunks.append({
+            count += 1
+            yield {
                 "content": pg_text.strip(),
                 "chunk_index": max(0, int(pg) - 1),
                 "images": img_list,
@@ -1225,8 +1579,8 @@ def create_chunks_with_position_support(
                 "ocr_used": page_ocr_used,
                 "start_position": 0,
                 "end_position": len(pg_text or ""),
-            })
-        logger.info(f"Legacy page-based chunking created {len(chunks)} chunks for {fname}")
+            }
+        logger.info(f"Legacy page-based chunking created {count} chunks for {fname}")
     else:
         # full-document processing for non-PDF files
         doc_data = process_document_with_context_multi_model(
@@ -1240,28 +1594,51 @@ def create_chunks_with_position_support(
             vision_flags={m: (m in vision_models) for m in vision_models},
         )
 
+        strategy = chunking_strategy or default_chunking_strategy()
+
+        if strategy == "token":
+            logger.info(f"Using token-aware chunking for {fname}")
+            yielded = 0
+            try:
+                for chunk in token_chunker.iter_chunks(
+                    doc_data["content"],
+                    iter_document_section_spans(doc_data["content"]),
+                    doc_data["images_data"],
+                    fname
+                ):
+                    yielded += 1
+                    yield chunk
+                return
+            except Exception as e:
+                if yielded:
+                    raise
+                logger.error(f"Token-aware chunking failed for {fname}, falling back: {e}")
+
         # Structure-preserving processing → embed → insert
-        try:
-            if use_structure_preserving_upload():
+        elif strategy == "structure":
+            try:
                 logger.info(f"Using structure-preserving upload for {fname}")
                 chunks = structure_preserving_process(doc_data["content"],
                                                     doc_data["images_data"],
                                                     fname)
                 logger.info(f"Structure-preserving processing completed: {len(chunks)} chunks")
-            else:
-                # Fallback to original chunking
-                logger.info(f"Using traditional chunking for {fname}")
-                chunks = smart_chunk_with_context(doc_data["content"],
-                                              doc_data["images_data"],
-                                              chunk_size, chunk_overlap)
-                logger.info(f"Traditional chunking completed: {len(chunks)} chunks")
-        except Exception as e:
-            logger.error(f"Structure-preserving processing failed for {fname}, falling back: {e}")
-            chunks = smart_chunk_with_context(doc_data["content"],
-                                          doc_data["images_data"],
-                                          chunk_size, chunk_overlap)
+            except Exception as e:
+                logger.error(f"Structure-preserving processing failed for {fname}, falling back: {e}")
+                chunks = None
+            if chunks is not None:
+                yield from chunks
+                return
 
-    return chunks
+        # Original chunking (also the fallback of the other strategies)
+        logger.info(f"Using traditional chunking for {fname}")
+        yield from iter_smart_chunks(doc_data["content"],
+                                     doc_data["images_data"],
+                                     chunk_size, chunk_overlap)
+
+
+def create_chunks_with_position_support(*args, **kwargs) -> List[Dict[str, Any]]:
+    """Create chunks with optional position preservation (see iter_chunks_with_position_support)."""
+    return list(iter_chunks_with_position_support(*args, **kwargs))
 
 
 def run_ingest_job(
@@ -1274,7 +1651,12 @@ def run_ingest_job(
     vision_models: List[str],
     openai_api_key: Optional[str],
     enable_ocr: bool,
+    defer_image_descriptions: Optional[bool] = None,
+    chunking_strategy: Optional[str] = None,
 ):
+    if defer_image_descriptions is None:
+        defer_image_descriptions = DEFER_IMAGE_DESCRIPTIONS
+
     # initialize a hash: status + zeroed counters
     progress_key = f"job:{job_id}:progress"
     redis_client.set(job_id, "running")
@@ -1347,16 +1729,26 @@ def run_ingest_job(
                     # txt, csv, pptx, etc → no images
                     pages_data = [{"page": 1, "images": [], "text": None}]
 
-                # 2) describe images
-                pages_data = asyncio.new_event_loop().run_until_complete(
-                    describe_images_for_pages(
-                        pages_data,
-                        api_key_override=openai_api_key,
-                        run_all_models=len(vision_models) > 1,
-                        enabled_models=set(vision_models),
-                        vision_flags={m: (m in vision_models) for m in vision_models},
+                # 1b) reuse stored files for duplicate images
+                pages_data = dedupe_stored_images(pages_data)
+
+                # 2) describe images, or leave placeholders for the description queue
+                # (only PDF chunks keep descriptions out of the embedded text, so
+                # other formats are always described inline)
+                defer_descriptions = defer_image_descriptions and ext == ".pdf"
+                if defer_descriptions:
+                    pages_data = mark_image_descriptions_pending(pages_data)
+                else:
+                    # (each document thread runs its own short-lived loop)
+                    pages_data = asyncio.run(
+                        describe_images_for_pages(
+                            pages_data,
+                            api_key_override=openai_api_key,
+                            run_all_models=len(vision_models) > 1,
+                            enabled_models=set(vision_models),
+                            vision_flags={m: (m in vision_models) for m in vision_models},
+                        )
                     )
-                )
 
                 # 2b) Merge descriptions back into image dicts for position-aware chunking
                 for page in pages_data:
@@ -1368,8 +1760,9 @@ def run_ingest_job(
                         if isinstance(img, dict) and i < len(descriptions):
                             img["description"] = descriptions[i]
 
-                # 3) Build chunks using position-aware wrapper
-                chunks = create_chunks_with_position_support(
+                # 3) Stream chunks from the position-aware wrapper into a background
+                # embedder, so embedding/storage overlaps with chunking
+                chunks = iter_chunks_with_position_support(
                     ext=ext,
                     pages_data=pages_data,
                     fname=fname,
@@ -1380,139 +1773,168 @@ def run_ingest_job(
                     chunk_size=chunk_size,
                     chunk_overlap=chunk_overlap,
                     enable_ocr=enable_ocr,
-                    use_positions=True
+                    use_positions=True,
+                    chunking_strategy=chunking_strategy
                 )
 
-                # Validate chunks were created
-                if not chunks:
-                    msg = f"No chunks created for {fname}, skipping document"
-                    logger.error(msg)
-                    redis_client.hset(doc_status_key, mapping={
-                        "status": "failed",
-                        "end_time": datetime.now().isoformat(),
-                        "error_message": msg
-                    })
-                    # Raise to abort processing this document (continue is invalid here)
-                    raise RuntimeError(msg)
+                coll = get_chromadb_collection()
 
-                # Update document chunk count
-                redis_client.hset(doc_status_key, "chunks_total", len(chunks))
+                # Queued once total_chunks has been patched in (see below)
+                deferred_ids: List[str] = []
+
+                def on_stored(pending: PendingChunk):
+                    image_store.add_refs(pending.chunk_id, pending.image_paths)
+                    if pending.metadata["image_descriptions_pending"]:
+                        deferred_ids.append(pending.chunk_id)
+                    redis_client.hincrby(progress_key, "processed_chunks", 1)
+                    redis_client.hincrby(doc_status_key, "chunks_processed", 1)
+                    logger.info(f"[{job_id}] Ingested chunk {pending.metadata['chunk_index']} for {fname} with {len(pending.image_paths)} images")
+
+                def on_failed(pending: PendingChunk, error: Exception):
+                    logger.error(f"[{job_id}] Error processing chunk {pending.metadata.get('chunk_index', 'unknown')} for {fname}: {error}")
+                    redis_client.hincrby(doc_status_key, "chunks_failed", 1)
+
+                writer = ChunkEmbeddingQueue(
+                    coll,
+                    encode=lambda texts: embedding_model.encode(
+                        texts, convert_to_numpy=True, batch_size=len(texts)
+                    ).tolist(),
+                    batch_size=EMBEDDING_BATCH_SIZE,
+                    max_pending=EMBEDDING_QUEUE_SIZE,
+                    on_stored=on_stored,
+                    on_failed=on_failed
+                )
 
-                # bump our total_chunks counter by however many we're about to insert
-                redis_client.hincrby(progress_key, "total_chunks", len(chunks))
-                coll = get_chromadb_collection()
-                
-                for c in chunks:
+                try:
+                    # total_chunks is only known once the generator is exhausted; it is
+                    # patched into the stored chunks' metadata afterwards
+                    total_chunks = 0
+                    token_counts = []
                     try:
-                        text = c["content"]
-                        # Debug: Log available fields in chunk
-                        logger.debug(f"[{job_id}] Chunk {c.get('chunk_index', 'unknown')} fields: {list(c.keys())}")
-                        # build metadata dict for this chunk - ChromaDB only accepts str, int, float, bool (NO None values)
-                        meta = {
-                            "document_id": document_id,
-                            "document_name": fname,
-                            "file_type": ext,
-                            "chunk_index": c.get("chunk_index", 0),
-                            "total_chunks": len(chunks),
-                            # New structure-preserving metadata - ensuring no None values
-                            "section_title": c.get("section_title", ""),
-                            "section_type": c.get("section_type", "chunk"),
-                            "page_number": c.get("page_number", -1),  # Use -1 instead of None
-                            "section_number": c.get("section_number", -1),  # Use -1 instead of None
-                            "has_images": c.get("has_images", False),
-                            "image_count": len(c.get("images", [])),
-                            "start_position": c.get("start_position", 0),
-                            "end_position": c.get("end_position", len(text)),
-                            "images_stored": store_images,
-                            "timestamp": datetime.now().isoformat(),
-                        }
-                        
-                        # Safe extraction of image metadata (handles both string paths and dict objects)
-                        images_list = c.get("images", [])
-                        filenames = []
-                        paths = []
-                        descs = []
-
-                        for img in images_list:
-                            if isinstance(img, dict):
-                                filenames.append(img.get("filename", ""))
-                                paths.append(img.get("storage_path", ""))
-                                descs.append(img.get("description", ""))
-                            elif isinstance(img, str):
-                                # Legacy: img is a path string (Path is imported at top of file)
-                                filenames.append(Path(img).name)
-                                paths.append(img)
-                                descs.append("")
-                            else:
-                                logger.warning(f"Unexpected image type: {type(img)}")
-                                continue
-
-                        meta["image_filenames"]     = json.dumps(filenames)
-                        meta["image_storage_paths"] = json.dumps(paths)
-                        meta["image_descriptions"]  = json.dumps(descs)
-
-                        # Store image positions if available (from position-aware chunking)
-                        if "image_positions" in c:
-                            meta["image_positions"] = json.dumps(c["image_positions"])
-                            logger.debug(f"[{job_id}] Stored {len(c['image_positions'])} image positions for chunk {c.get('chunk_index', 0)}")
-                        else:
-                            # Legacy chunks without position data
-                            meta["image_positions"] = json.dumps([])
-
-                        # Derive which vision models were used from description prefixes
-                        models_used = set()
-                        for d in descs:
-                            if not d:
-                                continue
-                            ld = d.lower()
-                            if ld.startswith("openai vision"):
-                                models_used.add("openai")
-                            elif ld.startswith("ollama vision"):
-                                models_used.add("ollama")
-                            elif ld.startswith("huggingface blip"):
-                                models_used.add("huggingface")
-                            elif ld.startswith("enhanced local"):
-                                models_used.add("enhanced_local")
-                            elif ld.startswith("basic fallback"):
-                                models_used.add("basic")
-                        meta["vision_models_used"] = json.dumps(sorted(models_used))
-                        meta["openai_api_used"] = ("openai" in models_used)
-                        meta["ocr_used"] = bool(c.get("ocr_used", False))
+                        for c in chunks:
+                            total_chunks += 1
+                            if "token_count" in c:
+                                token_counts.append(c["token_count"])
+                            # bump the totals as chunks are produced
+                            redis_client.hincrby(progress_key, "total_chunks", 1)
+                            redis_client.hincrby(doc_status_key, "chunks_total", 1)
+                            try:
+                                text = c["content"]
+                                # Debug: Log available fields in chunk
+                                logger.debug(f"[{job_id}] Chunk {c.get('chunk_index', 'unknown')} fields: {list(c.keys())}")
+                                # build metadata dict for this chunk - ChromaDB only accepts str, int, float, bool (NO None values)
+                                meta = {
+                                    "document_id": document_id,
+                                    "document_name": fname,
+                                    "file_type": ext,
+                                    "chunk_index": c.get("chunk_index", 0),
+                                    "total_chunks": 0,
+                                    # New structure-preserving metadata - ensuring no None values
+                                    "section_title": c.get("section_title", ""),
+                                    "section_type": c.get("section_type", "chunk"),
+                                    "page_number": c.get("page_number", -1),  # Use -1 instead of None
+                                    "section_number": c.get("section_number", -1),  # Use -1 instead of None
+                                    "has_images": c.get("has_images", False),
+                                    "image_count": len(c.get("images", [])),
+                                    "start_position": c.get("start_position", 0),
+                                    "end_position": c.get("end_position", len(text)),
+                                    "token_count": c.get("token_count", -1),  # Token-aware chunks only
+                                    "images_stored": store_images,
+                                    "timestamp": datetime.now().isoformat(),
+                                }
+
+                                # Safe extraction of image metadata (handles both string paths and dict objects)
+                                images_list = c.get("images", [])
+                                filenames = []
+                                paths = []
+                                descs = []
+
+                                for img in images_list:
+                                    if isinstance(img, dict):
+                                        filenames.append(img.get("filename", ""))
+                                        paths.append(img.get("storage_path", ""))
+                                        descs.append(img.get("description", ""))
+                                    elif isinstance(img, str):
+                                        # Legacy: img is a path string (Path is imported at top of file)
+                                        filenames.append(Path(img).name)
+                                        paths.append(img)
+                                        descs.append("")
+                                    else:
+                                        logger.warning(f"Unexpected image type: {type(img)}")
+                                        continue
+
+                                meta["image_filenames"]     = json.dumps(filenames)
+                                meta["image_storage_paths"] = json.dumps(paths)
+                                meta["image_descriptions"]  = json.dumps(descs)
+
+                                # Store image positions if available (from position-aware chunking)
+                                if "image_positions" in c:
+                                    meta["image_positions"] = json.dumps(c["image_positions"])
+                                    logger.debug(f"[{job_id}] Stored {len(c['image_positions'])} image positions for chunk {c.get('chunk_index', 0)}")
+                                else:
+                                    # Legacy chunks without position data
+                                    meta["image_positions"] = json.dumps([])
+
+                                # Derive which vision models were used from description prefixes
+                                models_used = vision_models_from_descriptions(descs)
+                                meta["vision_models_used"] = json.dumps(sorted(models_used))
+                                meta["openai_api_used"] = ("openai" in models_used)
+                                meta["ocr_used"] = bool(c.get("ocr_used", False))
+                                meta["image_descriptions_pending"] = defer_descriptions and bool(paths)
                         
-                        # Validate metadata to ensure ChromaDB compatibility (no None values)
-                        validated_meta = {}
-                        for key, value in meta.items():
-                            if value is None:
-                                logger.warning(f"[{job_id}] Replacing None value for key '{key}' with empty string")
-                                validated_meta[key] = ""
-                            elif isinstance(value, (str, int, float, bool)):
-                                validated_meta[key] = value
-                            else:
-                                logger.warning(f"[{job_id}] Converting non-standard type {type(value)} for key '{key}' to string")
-                                validated_meta[key] = str(value)
-                        meta = validated_meta
+                                # Validate metadata to ensure ChromaDB compatibility (no None values)
+                                validated_meta = {}
+                                for key, value in meta.items():
+                                    if value is None:
+                                        logger.warning(f"[{job_id}] Replacing None value for key '{key}' with empty string")
+                                        validated_meta[key] = ""
+                                    elif isinstance(value, (str, int, float, bool)):
+                                        validated_meta[key] = value
+                                    else:
+                                        logger.warning(f"[{job_id}] Converting non-standard type {type(value)} for key '{key}' to string")
+                                        validated_meta[key] = str(value)
+                                meta = validated_meta
                         
-                        # embed one chunk at a time
-                        emb = embedding_model.encode([text], 
-                                                    convert_to_numpy=True, 
-                                                    batch_size=1).tolist()
-                        chunk_id = f"{document_id}_chunk_{c.get('chunk_index', 0)}"
-                        meta["chunk_id"] = chunk_id
-                        coll.add(
-                            documents=[text],
-                            embeddings=emb,
-                            metadatas=[meta],
-                            ids=[chunk_id],
-                        )
-                        redis_client.hincrby(progress_key, "processed_chunks", 1)
-                        redis_client.hincrby(doc_status_key, "chunks_processed", 1)
-                        logger.info(f"[{job_id}] Ingested chunk {c['chunk_index']} for {fname} with {len(c.get('images', []))} images")
-                    
-                    except Exception as chunk_error:
-                        logger.error(f"[{job_id}] Error processing chunk {c.get('chunk_index', 'unknown')} for {fname}: {chunk_error}")
-                        # Mark this chunk as failed but continue with others
-                        redis_client.hincrby(doc_status_key, "chunks_failed", 1)
-                        continue
+                                chunk_id = f"{document_id}_chunk_{c.get('chunk_index', 0)}"
+                                meta["chunk_id"] = chunk_id
+                                writer.put(PendingChunk(chunk_id=chunk_id, text=text, metadata=meta, image_paths=paths))
+
+                            except Exception as chunk_error:
+                                logger.error(f"[{job_id}] Error processing chunk {c.get('chunk_index', 'unknown')} for {fname}: {chunk_error}")
+                                # Mark this chunk as failed but continue with others
+                                redis_client.hincrby(doc_status_key, "chunks_failed", 1)
+                                continue
+                    finally:
+                        # wait for the embedder to drain (also when chunking raised)
+                        writer.close()
+
+                    # Validate chunks were created
+                    if not total_chunks:
+                        msg = f"No chunks created for {fname}, skipping document"
+                        logger.error(msg)
+                        redis_client.hset(doc_status_key, mapping={
+                            "status": "failed",
+                            "end_time": datetime.now().isoformat(),
+                            "error_message": msg
+                        })
+                        # Raise to abort processing this document (continue is invalid here)
+                        raise RuntimeError(msg)
+
+                    # Report the chunk-size distribution with the document status
+                    if token_counts:
+                        redis_client.hset(doc_status_key, "chunk_token_histogram",
+                                          json.dumps(token_histogram(token_counts)))
+
+                    # Patch the final chunk count into the stored chunks (metadata is merged)
+                    for i in range(0, len(writer.stored_ids), 1000):
+                        ids = writer.stored_ids[i:i + 1000]
+                        coll.update(ids=ids, metadatas=[{"total_chunks": total_chunks}] * len(ids))
+                finally:
+                    # Deferred descriptions start only after the count is stamped, so a
+                    # worker never reads a chunk before its total_chunks is final. They
+                    # are queued on failure too, so no stored chunk stays pending.
+                    for chunk_id in deferred_ids:
+                        description_queue.enqueue(collection_name, chunk_id, vision_models)
 
             # Document completed successfully
             redis_client.hset(doc_status_key, mapping={
@@ -1557,10 +1979,7 @@ def extract_images_from_docx(file_content: bytes, filename: str, _temp_dir: str,
         for member in z.namelist():
             if member.startswith("word/media/"):
                 data = z.read(member)
-                name = f"{doc_id}_{Path(member).name}"
-                out  = os.path.join(IMAGES_DIR, name)
-                with open(out, "wb") as imgf:
-                    imgf.write(data)
+                out  = image_store.put(data, Path(member).suffix)
                 pages_data[0]["images"].append(out)
     return pages_data
 
@@ -1575,10 +1994,7 @@ def extract_images_from_xlsx(file_content: bytes, filename: str, _temp_dir: str,
         for m in z.namelist():
             if m.startswith("xl/media/"):
                 data = z.read(m)
-                name = f"{doc_id}_{Path(m).name}"
-                out  = os.path.join(IMAGES_DIR, name)
-                with open(out, "wb") as imgf:
-                    imgf.write(data)
+                out  = image_store.put(data, Path(m).suffix)
                 pages_data[0]["images"].append(out)
     return pages_data
 
@@ -1591,15 +2007,11 @@ def extract_images_from_html(html_bytes, _filename, _temp_dir, doc_id):
         if src.startswith("data:image/"):
             header, b64 = src.split(",",1)
             ext = header.split(";")[0].split("/")[1]
-            name = f"{doc_id}_{i}.{ext}"
-            out  = os.path.join(IMAGES_DIR, name)
-            with open(out,"wb") as f: f.write(base64.b64decode(b64))
+            out  = image_store.put(base64.b64decode(b64), ext)
         elif src.startswith("http"):
             resp = requests.get(src, timeout=10)
-            ext  = Path(src).suffix or ".jpg"
-            name = f"{doc_id}_{i}{ext}"
-            out  = os.path.join(IMAGES_DIR, name)
-            with open(out,"wb") as f: f.write(resp.content)
+            ext  = Path(src.split("?",1)[0]).suffix or ".jpg"
+            out  = image_store.put(resp.content, ext)
         else:
             continue
         pages[0]["images"].append(out)
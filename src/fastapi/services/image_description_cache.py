@@ -0,0 +1,144 @@
+"""
+Image Description Cache
+Content-hash keyed cache of vision model descriptions and stored image files.
+
+Specs repeat the same logos, headers and diagrams on many pages and across
+documents. Images are keyed by their pixel size and a digest of their decoded
+pixels, so the same picture stored in a different lossless file format shares
+a key. Matching is exact: a re-encoded JPEG, a rescaled copy or an image that
+differs in a single pixel gets its own key and its own description. (A
+perceptual hash would also match near-copies, but it collides on sparse
+images such as blank pages, thin rules and short captions.) The cache lives in
+Redis and therefore persists across ingest jobs and worker processes.
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from typing import Optional
+
+import redis
+from PIL import Image
+
+logger = logging.getLogger("IMAGE_DESCRIPTION_CACHE")
+
+# Cached descriptions/stored files expire after this many seconds (default 30 days)
+IMAGE_CACHE_TTL_SECONDS = int(os.getenv("IMAGE_DESCRIPTION_CACHE_TTL", str(30 * 24 * 3600)))
+IMAGE_CACHE_ENABLED = os.getenv("IMAGE_DESCRIPTION_CACHE_ENABLED", "true").lower() == "true"
+
+
+def image_content_hash(image_path: str) -> Optional[str]:
+    """
+    Compute the exact-match key for an image file.
+
+    Args:
+        image_path: Path to the image
+
+    Returns:
+        "<width>x<height>-<32 hex sha256 of the RGBA pixels>", or None if the
+        image cannot be read
+    """
+    try:
+        with Image.open(image_path) as img:
+            width, height = img.size
+            digest = hashlib.sha256(img.convert("RGBA").tobytes()).hexdigest()[:32]
+        return f"{width}x{height}-{digest}"
+    except Exception as e:
+        logger.debug(f"Could not hash image {image_path}: {e}")
+        return None
+
+
+class ImageDescriptionCache:
+    """
+    Redis-backed cache of image descriptions and canonical stored files.
+
+    Keys:
+        image_desc:{model}:{image_hash} -> description text
+        image_file:{image_hash}         -> storage path of the first stored copy
+    """
+
+    def __init__(self, redis_client: Optional[redis.Redis], ttl_seconds: int = IMAGE_CACHE_TTL_SECONDS):
+        """
+        Initialize the cache.
+
+        Args:
+            redis_client: Redis client (decode_responses=True); None disables the cache
+            ttl_seconds: Expiry for cached entries
+        """
+        self.redis = redis_client
+        self.ttl_seconds = ttl_seconds
+
+    @property
+    def enabled(self) -> bool:
+        return self.redis is not None
+
+    def get_description(self, image_hash: Optional[str], model: str) -> Optional[str]:
+        """Cached description of an image by a model, if any."""
+        if not (self.enabled and image_hash):
+            return None
+        try:
+            return self.redis.get(f"image_desc:{model}:{image_hash}")
+        except Exception as e:
+            logger.warning(f"Image description cache read failed: {e}")
+            return None
+
+    def set_description(self, image_hash: Optional[str], model: str, description: Optional[str]) -> None:
+        """Store a successful description (empty/None results are not cached)."""
+        if not (self.enabled and image_hash and description):
+            return
+        try:
+            self.redis.set(f"image_desc:{model}:{image_hash}", description, ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Image description cache write failed: {e}")
+
+    def claim_stored_file(self, image_hash: Optional[str], storage_path: str) -> str:
+        """
+        Register storage_path as the canonical file for image_hash, or return the existing one.
+
+        Args:
+            image_hash: Content hash of the image
+            storage_path: Path of the freshly stored copy
+
+        Returns:
+            The canonical storage path (storage_path itself if it is the first copy
+            or the previously registered file no longer exists)
+        """
+        if not (self.enabled and image_hash):
+            return storage_path
+        key = f"image_file:{image_hash}"
+        try:
+            if self.redis.set(key, storage_path, nx=True, ex=self.ttl_seconds):
+                return storage_path
+
+            existing = self.redis.get(key)
+            if existing and existing != storage_path and os.path.exists(existing):
+                self.redis.expire(key, self.ttl_seconds)
+                return existing
+
+            self.redis.set(key, storage_path, ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Stored image registry failed: {e}")
+        return storage_path
+
+
+_cache: Optional[ImageDescriptionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_image_description_cache() -> ImageDescriptionCache:
+    """
+    Process-wide cache backed by REDIS_URL (disabled if IMAGE_DESCRIPTION_CACHE_ENABLED=false).
+
+    Returns:
+        ImageDescriptionCache instance
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                client = None
+                if IMAGE_CACHE_ENABLED:
+                    client = redis.from_url(os.getenv("REDIS_URL", "redis://redis:6379/0"), decode_responses=True)
+                _cache = ImageDescriptionCache(client)
+    return _cache
@@ -0,0 +1,281 @@
+"""
+Image Description Queue
+Redis-backed priority queue for describing images after their chunks are stored.
+
+With deferred descriptions an ingest job stores chunks straight away with
+placeholder image descriptions and enqueues one task per chunk. A background
+thread pops tasks in score order and hands them to a processor callback that
+describes the images and patches the chunk metadata. Background tasks are
+scored by enqueue time; prioritized tasks (e.g. a user opened the document)
+are re-scored below every background task so they run next.
+
+The queue lives in Redis, so tasks survive restarts and every API process can
+run a worker against the same queue. A worker claims a task by moving it
+atomically from the queue to a processing set scored by its lease expiry, and
+acknowledges it only after the processor has finished. Tasks whose lease ran
+out (the worker crashed or was redeployed mid-task) are put back in the queue
+when a worker starts and whenever a worker is idle. A task that fails
+IMAGE_DESCRIPTION_MAX_ATTEMPTS times is dropped and handed to a give-up
+callback, which replaces the pending placeholders so the chunk does not stay
+pending forever.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Callable, Iterable, List, Optional
+
+import redis
+
+logger = logging.getLogger("IMAGE_DESCRIPTION_QUEUE")
+
+# Store chunks first and describe their images in the background (PDF uploads)
+DEFER_IMAGE_DESCRIPTIONS = os.getenv("DEFER_IMAGE_DESCRIPTIONS", "false").lower() == "true"
+IMAGE_DESCRIPTION_MAX_ATTEMPTS = int(os.getenv("IMAGE_DESCRIPTION_MAX_ATTEMPTS", "3"))
+# A claimed task returns to the queue if it is not acknowledged within this time
+IMAGE_DESCRIPTION_LEASE_SECONDS = int(os.getenv("IMAGE_DESCRIPTION_LEASE_SECONDS", "900"))
+
+# Placeholder stored in chunk metadata until the real description is ready
+IMAGE_DESCRIPTION_PENDING = "[Image description pending]"
+# Stored instead once the task has been given up
+IMAGE_DESCRIPTION_FAILED = "[Image description unavailable]"
+
+QUEUE_KEY = "image_desc:queue"
+PROCESSING_KEY = "image_desc:processing"
+TASK_KEY_PREFIX = "image_desc:task:"
+
+# Prioritized scores sit this far below any enqueue timestamp
+_PRIORITY_OFFSET = 1e10
+_POLL_INTERVAL_SECONDS = 1
+
+# Pop the next task and lease it in one step: KEYS = queue, processing; ARGV = lease expiry
+_CLAIM_SCRIPT = """
+local popped = redis.call('ZPOPMIN', KEYS[1])
+if #popped == 0 then
+    return false
+end
+redis.call('ZADD', KEYS[2], ARGV[1], popped[1])
+return popped[1]
+"""
+
+# Move expired leases back to the queue, counting the lost run as an attempt so
+# a task that kills its worker is eventually dropped.
+# KEYS = queue, processing; ARGV = now, task key prefix, max attempts
+# Returns {number of expired leases, dropped member...}
+_REQUEUE_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+local result = {#expired}
+for _, member in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], member)
+    local task_key = ARGV[2] .. member
+    if redis.call('HINCRBY', task_key, 'attempts', 1) < tonumber(ARGV[3]) then
+        redis.call('ZADD', KEYS[1], 'NX', ARGV[1], member)
+    else
+        redis.call('DEL', task_key)
+        table.insert(result, member)
+    end
+end
+return result
+"""
+
+# processor(collection_name, chunk_id, vision_models)
+DescriptionProcessor = Callable[[str, str, List[str]], None]
+# on_give_up(collection_name, chunk_id)
+GiveUpHandler = Callable[[str, str], None]
+
+
+class ImageDescriptionQueue:
+    """
+    Priority queue of chunks whose image descriptions are still pending.
+
+    Keys:
+        image_desc:queue                        -> sorted set of "{collection}|{chunk_id}"
+        image_desc:processing                   -> sorted set of claimed members by lease expiry
+        image_desc:task:{collection}|{chunk_id} -> hash with vision_models and attempts
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        processor: DescriptionProcessor,
+        lease_seconds: int = IMAGE_DESCRIPTION_LEASE_SECONDS,
+        on_give_up: Optional[GiveUpHandler] = None
+    ):
+        """
+        Initialize the queue (the worker thread starts on first enqueue or start()).
+
+        Args:
+            redis_client: Redis client (decode_responses=True)
+            processor: Callback that describes one chunk's images and updates the chunk
+            lease_seconds: Time a claimed task may take before it is handed out again
+            on_give_up: Callback for a chunk whose task was dropped after
+                IMAGE_DESCRIPTION_MAX_ATTEMPTS (e.g. to clear its pending flag)
+        """
+        self.redis = redis_client
+        self.processor = processor
+        self.on_give_up = on_give_up
+        self.lease_seconds = lease_seconds
+        self._claim_script = redis_client.register_script(_CLAIM_SCRIPT)
+        self._requeue_script = redis_client.register_script(_REQUEUE_SCRIPT)
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    @staticmethod
+    def _member(collection_name: str, chunk_id: str) -> str:
+        return f"{collection_name}|{chunk_id}"
+
+    def enqueue(self, collection_name: str, chunk_id: str, vision_models: List[str]) -> None:
+        """
+        Queue a chunk for background description (no-op if it is already queued).
+
+        Args:
+            collection_name: ChromaDB collection holding the chunk
+            chunk_id: Chunk id
+            vision_models: Vision models selected for the upload
+        """
+        member = self._member(collection_name, chunk_id)
+        pipe = self.redis.pipeline()
+        pipe.hset(TASK_KEY_PREFIX + member, mapping={
+            "vision_models": json.dumps(vision_models),
+            "attempts": 0
+        })
+        pipe.zadd(QUEUE_KEY, {member: time.time()}, nx=True)
+        pipe.execute()
+        self.start()
+
+    def prioritize(self, collection_name: str, chunk_ids: Iterable[str]) -> int:
+        """
+        Move already queued chunks to the front of the queue.
+
+        Args:
+            collection_name: ChromaDB collection holding the chunks
+            chunk_ids: Chunk ids to describe next
+
+        Returns:
+            Number of chunks that were still queued
+        """
+        members = [self._member(collection_name, chunk_id) for chunk_id in chunk_ids]
+        if not members:
+            return 0
+
+        scores = self.redis.zmscore(QUEUE_KEY, members)
+        score = time.time() - _PRIORITY_OFFSET
+        queued = {m: score for m, s in zip(members, scores) if s is not None}
+        if queued:
+            # XX: never resurrect finished tasks; LT: never demote an earlier priority
+            self.redis.zadd(QUEUE_KEY, queued, xx=True, lt=True)
+            self.start()
+        return len(queued)
+
+    def pending_count(self) -> int:
+        """Number of chunks waiting for descriptions."""
+        return self.redis.zcard(QUEUE_KEY)
+
+    def start(self) -> None:
+        """Start the worker thread for this process if it is not running."""
+        pid = os.getpid()
+        if self._thread is not None and self._thread_pid == pid and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or self._thread_pid != pid or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="image-description-queue", daemon=True)
+                self._thread_pid = pid
+                self._thread.start()
+                logger.info("Image description queue worker started")
+
+    def stop(self) -> None:
+        """Ask the worker thread to exit after its current task."""
+        self._stop.set()
+
+    def claim(self) -> Optional[str]:
+        """
+        Take the next task and lease it to this worker.
+
+        Returns:
+            The task member ("{collection}|{chunk_id}"), or None if the queue is empty
+        """
+        return self._claim_script(
+            keys=[QUEUE_KEY, PROCESSING_KEY],
+            args=[time.time() + self.lease_seconds]
+        )
+
+    def requeue_expired(self) -> int:
+        """
+        Put tasks whose lease has expired back in the queue (or drop them once
+        they have used up IMAGE_DESCRIPTION_MAX_ATTEMPTS).
+
+        Returns:
+            Number of expired leases released
+        """
+        expired, *dropped = self._requeue_script(
+            keys=[QUEUE_KEY, PROCESSING_KEY],
+            args=[time.time(), TASK_KEY_PREFIX, IMAGE_DESCRIPTION_MAX_ATTEMPTS]
+        )
+        if expired:
+            logger.warning(f"Released {expired} image description tasks with expired leases")
+        for member in dropped:
+            logger.error(f"Giving up on image descriptions for {member} after its worker was lost repeatedly")
+            self._give_up(member)
+        return expired
+
+    def _run(self) -> None:
+        recover = True
+        while not self._stop.is_set():
+            try:
+                if recover:
+                    # Tasks left behind by a worker that died mid-task
+                    self.requeue_expired()
+                member = self.claim()
+            except Exception as e:
+                logger.warning(f"Image description queue unavailable: {e}")
+                self._stop.wait(_POLL_INTERVAL_SECONDS * 5)
+                continue
+            if member:
+                recover = False
+                self._process(member)
+            else:
+                recover = True
+                self._stop.wait(_POLL_INTERVAL_SECONDS)
+
+    def _process(self, member: str) -> None:
+        task_key = TASK_KEY_PREFIX + member
+        collection_name, _, chunk_id = member.partition("|")
+        task = self.redis.hgetall(task_key)
+
+        try:
+            vision_models = json.loads(task.get("vision_models", "[]"))
+            self.processor(collection_name, chunk_id, vision_models)
+            self._ack(member, task_key)
+        except Exception as e:
+            attempts = self.redis.hincrby(task_key, "attempts", 1)
+            if attempts < IMAGE_DESCRIPTION_MAX_ATTEMPTS:
+                logger.warning(f"Describing images for {chunk_id} failed (attempt {attempts}), requeueing: {e}")
+                pipe = self.redis.pipeline()
+                pipe.zrem(PROCESSING_KEY, member)
+                pipe.zadd(QUEUE_KEY, {member: time.time()}, nx=True)
+                pipe.execute()
+            else:
+                logger.error(f"Giving up on image descriptions for {chunk_id} after {attempts} attempts: {e}")
+                self._ack(member, task_key)
+                self._give_up(member)
+
+    def _give_up(self, member: str) -> None:
+        if self.on_give_up is None:
+            return
+        collection_name, _, chunk_id = member.partition("|")
+        try:
+            self.on_give_up(collection_name, chunk_id)
+        except Exception as e:
+            logger.warning(f"Could not mark image descriptions of {chunk_id} as failed: {e}")
+
+    def _ack(self, member: str, task_key: str) -> None:
+        """Finish a claimed task: release its lease and drop its task hash."""
+        pipe = self.redis.pipeline()
+        pipe.zrem(PROCESSING_KEY, member)
+        pipe.delete(task_key)
+        pipe.execute()
@@ -17,6 +17,14 @@ from pathlib import Path
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from .local_vision_worker import get_local_vision_worker
+from .vision_config import VISION_CONFIG
+from .image_description_cache import (
+    ImageDescriptionCache,
+    get_image_description_cache,
+    image_content_hash
+)
+
 logger = logging.getLogger(__name__)
 
 # Try to import MarkItDown
@@ -65,7 +73,9 @@ class ImageDescriptionService:
         llm_model: str = "gpt-4o",  # GPT-4 with vision
         max_workers: int = 4,  # Parallel processing
         fallback_to_filename: bool = True,
-        api_key: Optional[str] = None
+        api_key: Optional[str] = None,
+        cache: Optional[ImageDescriptionCache] = None,
+        local_fallback: bool = os.getenv("IMAGE_DESCRIPTION_LOCAL_FALLBACK", "true").lower() == "true"
     ):
         """
         Initialize image description service.
@@ -75,6 +85,8 @@ class ImageDescriptionService:
             max_workers: Maximum concurrent description requests
             fallback_to_filename: If True, use filename-based descriptions on failure
             api_key: OpenAI API key (uses env var if not provided)
+            cache: Content-hash description cache (defaults to the shared Redis cache)
+            local_fallback: If True, caption with the local batched BLIP worker when MarkItDown fails
         """
         if not HAS_MARKITDOWN:
             raise ImportError(
@@ -91,6 +103,8 @@ class ImageDescriptionService:
         self.llm_model = llm_model
         self.max_workers = max_workers
         self.fallback_to_filename = fallback_to_filename
+        self.cache = cache or get_image_description_cache()
+        self.local_fallback = local_fallback
 
         # Initialize OpenAI client
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
@@ -228,12 +242,19 @@ class ImageDescriptionService:
         try:
             logger.debug(f"Describing image: {image_path}")
 
-            # Use MarkItDown to describe the image
-            result = self.markitdown.convert(image_path)
+            # Reuse the description of an identical image if one is cached
+            image_hash = image_content_hash(image_path)
+            cache_model = f"markitdown:{self.llm_model}"
+            description_text = self.cache.get_description(image_hash, cache_model)
 
-            if result and result.text_content:
-                description_text = result.text_content.strip()
+            if not description_text:
+                # Use MarkItDown to describe the image
+                result = self.markitdown.convert(image_path)
+                if result and result.text_content:
+                    description_text = result.text_content.strip()
+                    self.cache.set_description(image_hash, cache_model, description_text)
 
+            if description_text:
                 # Enhance description with context if provided
                 if context and description_text:
                     description_text = self._enhance_description_with_context(
@@ -253,24 +274,44 @@ class ImageDescriptionService:
 
             else:
                 logger.warning(f"MarkItDown returned empty description for {image_path}")
-
-                # Fallback to filename-based description
-                if self.fallback_to_filename:
-                    return self._filename_based_description(
-                        extracted_image,
-                        page_number
-                    )
-
-                return None
+                return self._fallback_description(extracted_image, page_number)
 
         except Exception as e:
             logger.error(f"Image description failed for {image_path}: {e}")
+            return self._fallback_description(extracted_image, page_number)
+
+    def _fallback_description(
+        self,
+        extracted_image,  # ExtractedImage
+        page_number: int
+    ) -> Optional[ImageDescription]:
+        """
+        Describe an image without MarkItDown: local BLIP caption, then filename.
+
+        Local captions go through the shared batching worker, so failures from
+        concurrent description threads are captioned together. The worker is
+        skipped while HuggingFace vision is disabled in VISION_CONFIG.
+        """
+        if self.local_fallback and VISION_CONFIG["huggingface_enabled"]:
+            try:
+                caption = get_local_vision_worker().describe(extracted_image.image_path)
+                if caption:
+                    return ImageDescription(
+                        image_path=extracted_image.image_path,
+                        description=caption,
+                        page_number=page_number,
+                        image_type=extracted_image.image_type,
+                        model_used="huggingface-blip",
+                        confidence="low"
+                    )
+            except Exception as e:
+                logger.warning(f"Local vision fallback failed for {extracted_image.image_path}: {e}")
 
-            # Fallback
-            if self.fallback_to_filename:
-                return self._filename_based_description(extracted_image, page_number)
+        # Fallback to filename-based description
+        if self.fallback_to_filename:
+            return self._filename_based_description(extracted_image, page_number)
 
-            return None
+        return None
 
     def _enhance_description_with_context(
         self,
@@ -7,14 +7,18 @@ Capabilities:
 - Inline image block detection
 - Vector drawing detection
 - Visual probing (non-text visual content detection)
-- Page rasterization for complex content
+- Adaptive rasterization: drawing regions are clip-rendered at full DPI,
+  probe-only pages at a lower DPI, within a per-document time/byte budget
 """
 
 import os
+import time
 import logging
 from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from .pdf_extraction_engine import extract_page_images
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +47,32 @@ except ImportError:
     logger.warning("NumPy not available - visual probing disabled")
 
 
+# Per-document rasterization budget (0 disables the limit)
+RASTER_TIME_BUDGET_SECONDS = float(os.getenv("IMAGE_RASTER_TIME_BUDGET_SECONDS", "120"))
+RASTER_BYTE_BUDGET_MB = float(os.getenv("IMAGE_RASTER_BYTE_BUDGET_MB", "256"))
+
+
+@dataclass
+class RasterBudget:
+    """Time and output bytes spent on probing/rasterizing one document"""
+    max_seconds: float = RASTER_TIME_BUDGET_SECONDS
+    max_bytes: int = int(RASTER_BYTE_BUDGET_MB * 1024 * 1024)
+    seconds_used: float = 0.0
+    bytes_used: int = 0
+    pages_skipped: List[int] = field(default_factory=list)
+
+    @property
+    def exhausted(self) -> bool:
+        return (
+            (self.max_seconds > 0 and self.seconds_used >= self.max_seconds) or
+            (self.max_bytes > 0 and self.bytes_used >= self.max_bytes)
+        )
+
+    def charge(self, started: float, nbytes: int = 0) -> None:
+        self.seconds_used += time.monotonic() - started
+        self.bytes_used += nbytes
+
+
 @dataclass
 class ExtractedImage:
     """Metadata for an extracted image"""
@@ -73,9 +103,16 @@ class ImageExtractionService:
         detect_inline_blocks: bool = True,
         detect_drawings: bool = True,
         min_drawing_area: float = 2000.0,  # pixels²
-        probe_dpi: int = 72,  # DPI for visual probing
+        probe_dpi: int = 36,  # DPI for visual probing
         probe_threshold: float = 0.01,  # 1% non-white pixels
-        raster_dpi: int = 144  # DPI for page rasterization
+        raster_dpi: int = 144,  # DPI for drawing/inline image regions
+        probe_raster_dpi: int = 96,  # DPI for pages only the visual probe flagged
+        raster_format: str = "jpeg",  # "jpeg" or "png"
+        raster_quality: int = 80,  # JPEG quality
+        region_padding: float = 8.0,  # points added around clip regions
+        max_regions_per_page: int = 4,
+        raster_time_budget_s: float = RASTER_TIME_BUDGET_SECONDS,
+        raster_byte_budget_mb: float = RASTER_BYTE_BUDGET_MB
     ):
         """
         Initialize image extraction service.
@@ -87,7 +124,14 @@ class ImageExtractionService:
             min_drawing_area: Minimum area (px²) to consider a drawing significant
             probe_dpi: DPI for visual probing pixmap
             probe_threshold: Minimum non-white pixel ratio to trigger rasterization
-            raster_dpi: DPI for full page rasterization
+            raster_dpi: DPI for clip-rendering drawing and inline image regions
+            probe_raster_dpi: DPI for pages where only the visual probe found content
+            raster_format: Output format for rasterized content ("jpeg" or "png")
+            raster_quality: JPEG quality (ignored for PNG)
+            region_padding: Padding (points) around each clip region
+            max_regions_per_page: Above this many regions, render their union instead
+            raster_time_budget_s: Per-document probe/raster time limit (0 = unlimited)
+            raster_byte_budget_mb: Per-document raster output limit (0 = unlimited)
         """
         if not HAS_PYMUPDF:
             raise ImportError(
@@ -102,6 +146,13 @@ class ImageExtractionService:
         self.probe_dpi = probe_dpi
         self.probe_threshold = probe_threshold
         self.raster_dpi = raster_dpi
+        self.probe_raster_dpi = probe_raster_dpi
+        self.raster_format = "png" if raster_format.lower() == "png" else "jpeg"
+        self.raster_quality = raster_quality
+        self.region_padding = region_padding
+        self.max_regions_per_page = max(1, max_regions_per_page)
+        self.raster_time_budget_s = raster_time_budget_s
+        self.raster_byte_budget_mb = raster_byte_budget_mb
 
         logger.info(
             f"ImageExtractionService initialized with "
@@ -132,6 +183,32 @@ class ImageExtractionService:
             }
         """
         logger.info(f"Extracting images from PDF: {pdf_path}")
+        try:
+            with open(pdf_path, "rb") as f:
+                file_content = f.read()
+        except OSError as e:
+            logger.error(f"Image extraction failed for {pdf_path}: {e}")
+            return {}
+
+        return self.extract_images_from_bytes(file_content, document_id, Path(pdf_path).stem)
+
+    def extract_images_from_bytes(
+        self,
+        file_content: bytes,
+        document_id: str,
+        base_name: str
+    ) -> Dict[int, List[ExtractedImage]]:
+        """
+        Extract all images from in-memory PDF bytes (no temp file).
+
+        Args:
+            file_content: PDF file bytes
+            document_id: Unique identifier for this document
+            base_name: Base filename for saved images
+
+        Returns:
+            Dictionary mapping page_number -> list of ExtractedImage objects
+        """
         logger.info(f"Document ID: {document_id}")
 
         # Create output directory
@@ -141,12 +218,17 @@ class ImageExtractionService:
 
         page_images = {}
         total_images = 0
+        budget = RasterBudget(
+            max_seconds=self.raster_time_budget_s,
+            max_bytes=int(self.raster_byte_budget_mb * 1024 * 1024)
+        )
 
         try:
-            doc = fitz.open(pdf_path)
-            base_name = Path(pdf_path).stem
+            doc = fitz.open(stream=file_content, filetype="pdf")
+            page_count = len(doc)
+            encoded_cache = {}
 
-            logger.info(f"Processing {len(doc)} pages...")
+            logger.info(f"Processing {page_count} pages...")
 
             for page_num in range(len(doc)):
                 page = doc[page_num]
@@ -155,38 +237,18 @@ class ImageExtractionService:
 
                 # Method 1: Extract XObject images (most common)
                 xobject_images = self._extract_xobject_images(
-                    doc, page, page_idx, base_name, output_dir
+                    doc, page, page_idx, base_name, output_dir, encoded_cache
                 )
                 images.extend(xobject_images)
 
-                # Method 2-4: If no XObjects found, check for other visual content
+                # Method 2-4: If no XObjects found, rasterize other visual content
                 if not xobject_images:
-                    # Check for inline image blocks
-                    has_inline = False
-                    if self.detect_inline_blocks and self._has_inline_images(page):
-                        logger.info(f"Page {page_idx}: Detected inline image blocks")
-                        has_inline = True
-
-                    # Check for vector drawings
-                    has_drawings = False
-                    if self.detect_drawings and self._has_drawings(page):
-                        logger.info(f"Page {page_idx}: Detected vector drawings")
-                        has_drawings = True
-
-                    # Visual probe for any non-text content
-                    has_visual_content = False
-                    if HAS_NUMPY and self._visual_probe_has_content(page):
-                        logger.info(f"Page {page_idx}: Visual probe detected non-text content")
-                        has_visual_content = True
-
-                    # If any visual content detected, rasterize the page
-                    if has_inline or has_drawings or has_visual_content:
-                        raster_image = self._rasterize_page(
-                            page, page_idx, base_name, output_dir
-                        )
-                        if raster_image:
-                            images.append(raster_image)
-                            logger.info(f"Page {page_idx}: Rasterized to capture visual content")
+                    if budget.exhausted:
+                        budget.pages_skipped.append(page_idx)
+                    else:
+                        images.extend(self._rasterize_visual_content(
+                            page, page_idx, base_name, output_dir, budget
+                        ))
 
                 # Store images for this page
                 if images:
@@ -196,14 +258,20 @@ class ImageExtractionService:
 
             doc.close()
 
+            if budget.pages_skipped:
+                logger.warning(
+                    f"Rasterization budget exhausted: skipped visual content checks on "
+                    f"{len(budget.pages_skipped)} page(s) starting at page {budget.pages_skipped[0]}"
+                )
             logger.info(
                 f"Extraction complete: {total_images} images from "
-                f"{len(page_images)} pages (out of {len(doc)} total pages)"
+                f"{len(page_images)} pages (out of {page_count} total pages); "
+                f"rasterization used {budget.seconds_used:.1f}s, {budget.bytes_used / 1e6:.1f} MB"
             )
             return page_images
 
         except Exception as e:
-            logger.error(f"Image extraction failed for {pdf_path}: {e}", exc_info=True)
+            logger.error(f"Image extraction failed for {document_id}: {e}", exc_info=True)
             return {}
 
     def _extract_xobject_images(
@@ -212,18 +280,23 @@ class ImageExtractionService:
         page: 'fitz.Page',
         page_idx: int,
         base_name: str,
-        output_dir: Path
+        output_dir: Path,
+        encoded_cache: Optional[Dict] = None
     ) -> List[ExtractedImage]:
         """
         Extract XObject images from page.
         XObjects are the standard way images are embedded in PDFs.
 
+        Decoding is shared with the PDF extraction engine, which already
+        normalizes non-JPEG images to RGB/grayscale PNG.
+
         Args:
             doc: PyMuPDF document
             page: PyMuPDF page
             page_idx: Page number (1-indexed)
             base_name: Base filename for saved images
             output_dir: Directory to save images
+            encoded_cache: Optional xref -> encoded image cache shared across pages
 
         Returns:
             List of extracted image metadata
@@ -231,114 +304,185 @@ class ImageExtractionService:
         images = []
 
         try:
-            page_images = page.get_images(full=True)
-            logger.debug(f"Page {page_idx}: Found {len(page_images)} XObject image(s)")
-
-            for img_idx, img in enumerate(page_images):
-                xref = img[0]
+            for img_idx, pdf_image in enumerate(extract_page_images(doc, page, encoded_cache)):
+                xref = pdf_image.xref
+                out_path = output_dir / f"{base_name}_p{page_idx}_img{img_idx}_xref{xref}.{pdf_image.ext}"
 
                 try:
-                    # Extract image bytes
-                    info = doc.extract_image(xref)
-                    ext = info.get("ext", "png")
-                    width = info.get("width")
-                    height = info.get("height")
-
-                    # Create output filename
-                    out_path = output_dir / f"{base_name}_p{page_idx}_img{img_idx}_xref{xref}.{ext}"
-
-                    # Save image
                     with open(out_path, "wb") as f:
-                        f.write(info["image"])
-
-                    # Normalize PNG mode if PIL available
-                    if ext.lower() == "png" and HAS_PIL:
-                        try:
-                            with Image.open(out_path) as im:
-                                # Convert to RGB or grayscale for better compatibility
-                                if im.mode not in ("L", "RGB", "RGBA"):
-                                    im = im.convert("RGB")
-                                    im.save(out_path)
-                        except Exception as e:
-                            logger.warning(f"PNG normalization failed for xref {xref}: {e}")
-
-                    images.append(ExtractedImage(
-                        image_path=str(out_path),
-                        page_number=page_idx,
-                        image_type="xobject",
-                        width=width,
-                        height=height,
-                        xref=xref
-                    ))
-
-                    logger.debug(
-                        f"Extracted XObject: page={page_idx}, xref={xref}, "
-                        f"size={width}x{height}, format={ext}"
-                    )
-
-                except Exception as e:
-                    logger.warning(f"Failed to extract xref {xref} on page {page_idx}: {e}")
+                        f.write(pdf_image.data)
+                except OSError as e:
+                    logger.warning(f"Failed to save xref {xref} on page {page_idx}: {e}")
+                    continue
+
+                images.append(ExtractedImage(
+                    image_path=str(out_path),
+                    page_number=page_idx,
+                    image_type="xobject",
+                    width=pdf_image.width_px,
+                    height=pdf_image.height_px,
+                    xref=xref
+                ))
+
+                logger.debug(
+                    f"Extracted XObject: page={page_idx}, xref={xref}, "
+                    f"size={pdf_image.width_px}x{pdf_image.height_px}, format={pdf_image.ext}"
+                )
 
         except Exception as e:
             logger.warning(f"Failed to get XObject images for page {page_idx}: {e}")
 
         return images
 
-    def _has_inline_images(self, page: 'fitz.Page') -> bool:
+    def _rasterize_visual_content(
+        self,
+        page: 'fitz.Page',
+        page_idx: int,
+        base_name: str,
+        output_dir: Path,
+        budget: RasterBudget
+    ) -> List[ExtractedImage]:
         """
-        Check if page contains inline image blocks.
-        Inline images are embedded directly in the content stream.
+        Adaptive rasterization for a page without XObject images.
+
+        Vector drawings and inline image blocks are located without rendering
+        anything; only their (merged, padded) regions are rendered, at
+        raster_dpi. Pages with no such regions get a cheap low-DPI visual
+        probe, and only pages the probe flags are rendered whole, at
+        probe_raster_dpi.
 
         Args:
             page: PyMuPDF page
+            page_idx: Page number (1-indexed)
+            base_name: Base filename
+            output_dir: Output directory
+            budget: Per-document rasterization budget (charged here)
 
         Returns:
-            True if inline images detected
+            Rasterized images for this page (possibly empty)
         """
-        try:
-            raw = page.get_text("rawdict") or {}
-            blocks = raw.get("blocks", []) if isinstance(raw, dict) else []
+        drawing_regions = self._drawing_regions(page) if self.detect_drawings else []
+        inline_regions = self._inline_image_regions(page) if self.detect_inline_blocks else []
+        regions = drawing_regions + inline_regions
+
+        if regions:
+            image_type = "drawing" if drawing_regions else "inline"
+            clips = self._merge_regions(regions, page.rect)
+            logger.info(f"Page {page_idx}: Rendering {len(clips)} drawing/inline image region(s)")
+            images = []
+            for region_idx, clip in enumerate(clips):
+                image = self._rasterize_page(
+                    page, page_idx, base_name, output_dir, budget,
+                    clip=clip, dpi=self.raster_dpi,
+                    suffix=f"region{region_idx}", image_type=image_type
+                )
+                if image:
+                    images.append(image)
+            return images
+
+        started = time.monotonic()
+        has_visual_content = HAS_NUMPY and self._visual_probe_has_content(page)
+        budget.charge(started)
+        if not has_visual_content:
+            return []
+
+        logger.info(f"Page {page_idx}: Visual probe detected non-text content")
+        image = self._rasterize_page(
+            page, page_idx, base_name, output_dir, budget, dpi=self.probe_raster_dpi
+        )
+        return [image] if image else []
+
+    def _inline_image_regions(self, page: 'fitz.Page') -> List['fitz.Rect']:
+        """
+        Bounding boxes of inline image blocks.
+        Inline images are embedded directly in the content stream.
 
-            for block in blocks:
-                if block.get("type") == 1:  # type=1 indicates image block
-                    return True
+        Args:
+            page: PyMuPDF page
 
+        Returns:
+            Rectangles of image blocks (empty if none)
+        """
+        regions = []
+        try:
+            # Only called for pages without XObjects, so every image here is inline;
+            # get_image_info reports placements without decoding image data
+            for info in page.get_image_info() or []:
+                regions.append(fitz.Rect(info["bbox"]))
         except Exception as e:
             logger.debug(f"Inline image detection failed: {e}")
 
-        return False
+        return regions
 
-    def _has_drawings(self, page: 'fitz.Page') -> bool:
+    def _drawing_regions(self, page: 'fitz.Page') -> List['fitz.Rect']:
         """
-        Check if page contains significant vector drawings.
+        Bounding boxes of significant vector drawings.
         Identifies diagrams, charts, schematics rendered as vector paths.
 
         Args:
             page: PyMuPDF page
 
         Returns:
-            True if significant drawings detected
+            Rectangles of drawings at least min_drawing_area in size
         """
+        regions = []
         try:
-            drawings = page.get_drawings() or []
-
-            for drawing in drawings:
+            for drawing in page.get_drawings() or []:
                 rect = drawing.get("rect")
                 if isinstance(rect, fitz.Rect):
                     # Calculate drawing area
                     area = max(0.0, (rect.x1 - rect.x0) * (rect.y1 - rect.y0))
-
                     if area >= self.min_drawing_area:
-                        logger.debug(
-                            f"Detected significant drawing: area={area:.0f}px², "
-                            f"threshold={self.min_drawing_area}px²"
-                        )
-                        return True
+                        regions.append(rect)
+
+            if regions:
+                logger.debug(
+                    f"Detected {len(regions)} significant drawing(s), "
+                    f"threshold={self.min_drawing_area}px²"
+                )
 
         except Exception as e:
             logger.debug(f"Drawing detection failed: {e}")
 
-        return False
+        return regions
+
+    def _merge_regions(self, regions: List['fitz.Rect'], page_rect: 'fitz.Rect') -> List['fitz.Rect']:
+        """
+        Pad regions, merge overlapping ones, and clip them to the page.
+
+        Args:
+            regions: Raw drawing/inline image rectangles
+            page_rect: Page bounds
+
+        Returns:
+            Disjoint clip rectangles (their union if there are more than max_regions_per_page)
+        """
+        pad = self.region_padding
+        merged = []
+        for rect in regions:
+            rect = fitz.Rect(rect.x0 - pad, rect.y0 - pad, rect.x1 + pad, rect.y1 + pad) & page_rect
+            if rect.is_empty:
+                continue
+            # Absorb every existing region this one touches (repeat until stable)
+            changed = True
+            while changed:
+                changed = False
+                for other in merged:
+                    if rect.intersects(other):
+                        rect |= other
+                        merged.remove(other)
+                        changed = True
+                        break
+            merged.append(rect)
+
+        if len(merged) > self.max_regions_per_page:
+            union = fitz.Rect(merged[0])
+            for rect in merged[1:]:
+                union |= rect
+            merged = [union]
+
+        # Top-to-bottom, left-to-right
+        return sorted(merged, key=lambda r: (r.y0, r.x0))
 
     def _visual_probe_has_content(self, page: 'fitz.Page') -> bool:
         """
@@ -346,7 +490,7 @@ class ImageExtractionService:
         This catches visual content not detected by other methods.
 
         Method:
-        1. Render page at low DPI
+        1. Render page in grayscale at low DPI
         2. Mask out text regions
         3. Check remaining pixels for non-white content
         4. If >threshold non-white, consider it visual content
@@ -365,34 +509,33 @@ class ImageExtractionService:
             text_rects = []
             for block in page.get_text("blocks") or []:
                 # Text blocks: (x0, y0, x1, y1, text, block_no, block_type, ...)
-                if len(block) >= 8 and block[6] == 0:  # block_type=0 is text
+                if len(block) >= 7 and block[6] == 0:  # block_type=0 is text
                     text_rects.append(fitz.Rect(block[0], block[1], block[2], block[3]))
 
-            # Render page at probe resolution
+            # Render page at probe resolution (one gray channel is enough)
             scale = self.probe_dpi / 72.0
             mat = fitz.Matrix(scale, scale)
-            pix = page.get_pixmap(matrix=mat, alpha=False)
+            pix = page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
 
             w, h = pix.width, pix.height
             if w == 0 or h == 0:
                 return False
 
-            # Convert pixmap to numpy array
-            img = np.frombuffer(pix.samples, dtype=np.uint8).reshape(h, w, pix.n)
+            # Convert pixmap to numpy array (copy: the samples buffer is read-only)
+            img = np.frombuffer(pix.samples, dtype=np.uint8).reshape(h, pix.stride)[:, :w].copy()
 
             # Mask text regions (set to white)
             for rect in text_rects:
                 x0 = max(0, int(rect.x0 * scale))
                 y0 = max(0, int(rect.y0 * scale))
-                x1 = min(w, int(rect.x1 * scale))
-                y1 = min(h, int(rect.y1 * scale))
+                x1 = min(w, int(rect.x1 * scale) + 1)
+                y1 = min(h, int(rect.y1 * scale) + 1)
 
                 if x1 > x0 and y1 > y0:
-                    img[y0:y1, x0:x1, :] = 255  # white out text regions
+                    img[y0:y1, x0:x1] = 255  # white out text regions
 
             # Count non-white pixels
-            nonwhite_pixels = np.any(img < 250, axis=2)  # <250 to catch near-white
-            nonwhite_ratio = nonwhite_pixels.sum() / (w * h)
+            nonwhite_ratio = np.count_nonzero(img < 250) / (w * h)  # <250 to catch near-white
 
             logger.debug(
                 f"Visual probe: {nonwhite_ratio*100:.2f}% non-white pixels "
@@ -410,10 +553,15 @@ class ImageExtractionService:
         page: 'fitz.Page',
         page_idx: int,
         base_name: str,
-        output_dir: Path
+        output_dir: Path,
+        budget: RasterBudget,
+        clip: Optional['fitz.Rect'] = None,
+        dpi: Optional[int] = None,
+        suffix: str = "raster",
+        image_type: str = "raster"
     ) -> Optional[ExtractedImage]:
         """
-        Rasterize entire page to PNG.
+        Rasterize a page, or a clip region of it, to JPEG/PNG.
         Used when other methods detect visual content but can't extract it cleanly.
 
         Args:
@@ -421,34 +569,54 @@ class ImageExtractionService:
             page_idx: Page number (1-indexed)
             base_name: Base filename
             output_dir: Output directory
+            budget: Per-document rasterization budget (charged here)
+            clip: Region to render (whole page if None)
+            dpi: Render resolution (raster_dpi if None)
+            suffix: Filename suffix identifying the render
+            image_type: ExtractedImage type ("raster", "drawing" or "inline")
 
         Returns:
-            ExtractedImage metadata or None if rasterization fails
+            ExtractedImage metadata or None if rasterization fails or the budget is spent
         """
+        if budget.exhausted:
+            if page_idx not in budget.pages_skipped[-1:]:
+                budget.pages_skipped.append(page_idx)
+            return None
+
+        started = time.monotonic()
         try:
-            # Render at higher DPI for quality
-            scale = self.raster_dpi / 72.0
+            dpi = dpi or self.raster_dpi
+            scale = dpi / 72.0
             mat = fitz.Matrix(scale, scale)
-            pix = page.get_pixmap(matrix=mat)
+            pix = page.get_pixmap(matrix=mat, clip=clip, alpha=False)
+
+            if self.raster_format == "jpeg":
+                data = pix.tobytes("jpeg", jpg_quality=self.raster_quality)
+                ext = "jpg"
+            else:
+                data = pix.tobytes("png")
+                ext = "png"
 
-            # Save as PNG
-            out_path = output_dir / f"{base_name}_p{page_idx}_raster.png"
-            pix.save(str(out_path))
+            out_path = output_dir / f"{base_name}_p{page_idx}_{suffix}.{ext}"
+            with open(out_path, "wb") as f:
+                f.write(data)
+            budget.charge(started, len(data))
 
             logger.debug(
-                f"Rasterized page {page_idx}: {pix.width}x{pix.height} pixels "
-                f"at {self.raster_dpi} DPI"
+                f"Rasterized page {page_idx} ({suffix}): {pix.width}x{pix.height} pixels "
+                f"at {dpi} DPI, {len(data) / 1024:.0f} KB"
             )
 
             return ExtractedImage(
                 image_path=str(out_path),
                 page_number=page_idx,
-                image_type="raster",
+                image_type=image_type,
                 width=pix.width,
                 height=pix.height
             )
 
         except Exception as e:
+            budget.charge(started)
             logger.error(f"Page rasterization failed for page {page_idx}: {e}")
             return None
 
@@ -0,0 +1,299 @@
+"""
+Image Store
+Content-addressed storage for extracted document images.
+
+Each image is stored once as <sha256>.<ext> in a two-level sharded directory
+(root/ab/cd/abcd....png), so identical images from any document share one
+file and no directory grows beyond a few hundred entries. Blob names are
+stable and unique, which makes them safe to serve with strong ETags.
+
+Reference counting lives in Redis and is keyed by chunk id (the unit ChromaDB
+deletes). Releasing a chunk removes it from the referrer set of each blob it
+used; blobs with no referrers left are deleted. Blobs modified within the
+grace period are never deleted, because an ingest job writes blobs before it
+stores the chunks that reference them.
+
+Legacy flat files ({doc_id}_page_{n}_{obj}.{ext} in the root directory) are
+still resolved, but they are not reference counted.
+
+Thumbnails are rendered on demand into root/thumbnails/ab/<name>_w<width>.jpg
+at a fixed set of widths, and deleted together with their blob. The source
+extension stays in the name, so legacy foo.png and foo.jpg get separate
+thumbnails.
+"""
+
+import os
+import re
+import time
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Iterable, Optional
+
+import redis
+from PIL import Image
+
+logger = logging.getLogger("IMAGE_STORE")
+
+# Unreferenced blobs younger than this are kept (in-flight ingest jobs)
+IMAGE_STORE_GC_GRACE_SECONDS = int(os.getenv("IMAGE_STORE_GC_GRACE_SECONDS", "3600"))
+
+# Thumbnail requests are rounded up to one of these widths (bounds the cache)
+THUMBNAIL_WIDTHS = (128, 256, 512, 1024)
+THUMBNAIL_QUALITY = int(os.getenv("IMAGE_THUMBNAIL_QUALITY", "80"))
+
+_CONTENT_NAME = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]{1,5}$")
+_EXT_ALIASES = {"jpeg": "jpg", "tif": "tiff"}
+
+
+class ImageStore:
+    """
+    Content-addressed image blobs with per-chunk reference counts.
+
+    Keys:
+        image_store:refs:{name}      -> set of chunk ids referencing the blob
+        image_store:chunk:{chunk_id} -> set of blob names the chunk references
+    """
+
+    def __init__(self, root: str, redis_client: Optional[redis.Redis] = None):
+        """
+        Initialize the store.
+
+        Args:
+            root: Images directory (legacy flat files live directly in it)
+            redis_client: Redis client (decode_responses=True) for reference
+                counts; None makes the store write/resolve-only
+        """
+        self.root = root
+        self.redis = redis_client
+
+    @staticmethod
+    def is_content_name(name: str) -> bool:
+        """True if name is a content-addressed blob name (<sha256>.<ext>)."""
+        return bool(_CONTENT_NAME.match(name or ""))
+
+    @staticmethod
+    def normalize_ext(ext: str) -> str:
+        ext = (ext or "png").lower().lstrip(".")
+        return _EXT_ALIASES.get(ext, ext)
+
+    def path_for(self, name: str) -> str:
+        """Sharded storage path of a blob name."""
+        return os.path.join(self.root, name[:2], name[2:4], name)
+
+    def put(self, data: bytes, ext: str) -> str:
+        """
+        Store image bytes (no-op if an identical blob exists).
+
+        Args:
+            data: Encoded image bytes
+            ext: File extension describing the encoding
+
+        Returns:
+            Storage path of the blob
+        """
+        name = f"{hashlib.sha256(data).hexdigest()}.{self.normalize_ext(ext)}"
+        path = self.path_for(name)
+
+        if os.path.exists(path):
+            # Refresh mtime so a concurrent release cannot collect it before it is referenced
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return path
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return path
+
+    def put_file(self, file_path: str, ext: Optional[str] = None) -> str:
+        """
+        Store the contents of an existing file and remove the original.
+
+        Args:
+            file_path: Image file (e.g. written and normalized in a temp directory)
+            ext: File extension (defaults to the file's own)
+
+        Returns:
+            Storage path of the blob
+        """
+        with open(file_path, "rb") as f:
+            data = f.read()
+        path = self.put(data, ext or Path(file_path).suffix)
+        if os.path.abspath(file_path) != os.path.abspath(path):
+            os.remove(file_path)
+        return path
+
+    def resolve(self, filename: str) -> Optional[str]:
+        """
+        Path of a stored image by filename (content-addressed or legacy flat).
+
+        Args:
+            filename: Blob name or legacy filename (any directory part is ignored)
+
+        Returns:
+            Existing file path, or None
+        """
+        name = os.path.basename(filename or "")
+        if not name:
+            return None
+        path = self.path_for(name) if self.is_content_name(name) else os.path.join(self.root, name)
+        return path if os.path.isfile(path) else None
+
+    def thumbnail(self, image_path: str, width: int) -> str:
+        """
+        Path of a cached JPEG thumbnail of a stored image, rendering it if needed.
+
+        Args:
+            image_path: Resolved path of the source image
+            width: Requested width in pixels (rounded up to a THUMBNAIL_WIDTHS
+                entry; images narrower than that are only re-encoded)
+
+        Returns:
+            Thumbnail file path
+        """
+        width = next((w for w in THUMBNAIL_WIDTHS if w >= width), THUMBNAIL_WIDTHS[-1])
+        thumb_path = self._thumbnail_path(Path(image_path).name, width)
+        if os.path.isfile(thumb_path) and (
+            # Blob contents never change (put() only refreshes their mtime)
+            self.is_content_name(Path(image_path).name) or
+            os.path.getmtime(thumb_path) >= os.path.getmtime(image_path)
+        ):
+            return thumb_path
+
+        os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+        with Image.open(image_path) as im:
+            im.thumbnail((width, width * 4))
+            if im.mode not in ("RGB", "L"):
+                im = im.convert("RGB")
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(thumb_path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    im.save(f, format="JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+                os.replace(tmp_path, thumb_path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return thumb_path
+
+    def add_refs(self, chunk_id: str, storage_paths: Iterable[str]) -> None:
+        """
+        Record that a chunk references the given blobs.
+
+        Args:
+            chunk_id: Chunk id
+            storage_paths: Blob storage paths or names (legacy paths are ignored)
+        """
+        names = {os.path.basename(p) for p in storage_paths if p}
+        names = [n for n in names if self.is_content_name(n)]
+        if not (self.redis and names):
+            return
+        pipe = self.redis.pipeline()
+        pipe.sadd(f"image_store:chunk:{chunk_id}", *names)
+        for name in names:
+            pipe.sadd(f"image_store:refs:{name}", chunk_id)
+        pipe.execute()
+
+    def release(self, chunk_ids: Iterable[str]) -> int:
+        """
+        Drop the references of deleted chunks and delete blobs nobody references.
+
+        Args:
+            chunk_ids: Ids of chunks that were deleted
+
+        Returns:
+            Number of blob files deleted
+        """
+        if not self.redis:
+            return 0
+
+        freed = 0
+        for chunk_id in chunk_ids:
+            chunk_key = f"image_store:chunk:{chunk_id}"
+            names = self.redis.smembers(chunk_key)
+            if not names:
+                continue
+
+            pipe = self.redis.pipeline()
+            for name in names:
+                pipe.srem(f"image_store:refs:{name}", chunk_id)
+                pipe.scard(f"image_store:refs:{name}")
+            pipe.delete(chunk_key)
+            results = pipe.execute()
+
+            remaining = results[1:-1:2]
+            for name, count in zip(names, remaining):
+                if count == 0 and self._delete_blob(name):
+                    freed += 1
+
+        if freed:
+            logger.info(f"Freed {freed} unreferenced image blobs")
+        return freed
+
+    def collect_garbage(self) -> int:
+        """
+        Delete every blob without referrers that is older than the grace period.
+
+        Catches blobs that were written but never referenced (failed ingests,
+        near-duplicates replaced during deduplication). Walks the whole store,
+        so it is meant for occasional maintenance runs.
+
+        Returns:
+            Number of blob files deleted
+        """
+        if not self.redis:
+            return 0
+
+        freed = 0
+        thumbnails_dir = os.path.join(self.root, "thumbnails")
+        for shard, dirs, files in os.walk(self.root):
+            if shard == self.root:
+                # Legacy flat files are not reference counted; thumbnails go with their blob
+                dirs[:] = [d for d in dirs if os.path.join(shard, d) != thumbnails_dir]
+                continue
+            names = [f for f in files if self.is_content_name(f)]
+            if not names:
+                continue
+            pipe = self.redis.pipeline()
+            for name in names:
+                pipe.exists(f"image_store:refs:{name}")
+            for name, referenced in zip(names, pipe.execute()):
+                if not referenced and self._delete_blob(name):
+                    freed += 1
+
+        logger.info(f"Image store garbage collection freed {freed} blobs")
+        return freed
+
+    def _thumbnail_path(self, name: str, width: int) -> str:
+        return os.path.join(self.root, "thumbnails", name[:2], f"{name}_w{width}.jpg")
+
+    def _delete_blob(self, name: str) -> bool:
+        path = self.path_for(name)
+        try:
+            if time.time() - os.path.getmtime(path) < IMAGE_STORE_GC_GRACE_SECONDS:
+                return False
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.warning(f"Could not delete image blob {name}: {e}")
+            return False
+
+        for width in THUMBNAIL_WIDTHS:
+            try:
+                os.remove(self._thumbnail_path(name, width))
+            except OSError:
+                pass
+        return True
+
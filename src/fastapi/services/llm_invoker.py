@@ -7,7 +7,7 @@ with consistent error handling, response normalization, and token tracking.
 
 import logging
 import time
-from typing import Optional, Dict, Any, List, Union
+from typing import Optional, Dict, Any, Iterator, List, Union
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 from services.llm_utils import get_llm
 from services.error_handling import LLMServiceError
@@ -120,6 +120,80 @@ class LLMInvoker:
                 # Wait before retry (exponential backoff)
                 time.sleep(2 ** attempts)
 
+    @staticmethod
+    def stream(
+        model_name: str,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[int] = None,
+        log_timing: bool = True
+    ) -> Iterator[str]:
+        """
+        Invoke an LLM and yield the response text as it is generated.
+
+        Unlike invoke() there are no retries: once text has been yielded a
+        retry would repeat it.
+
+        Args:
+            model_name: Name of the model to use
+            prompt: User prompt/query text
+            system_prompt: Optional system prompt to set context
+            temperature: Optional temperature override
+            max_tokens: Optional max tokens override
+            timeout: Optional timeout in seconds
+            log_timing: Whether to log time to first token and total time
+
+        Yields:
+            Non-empty text chunks in generation order
+
+        Raises:
+            LLMServiceError: If LLM invocation fails
+        """
+        start_time = time.time()
+        first_token_ms = None
+
+        try:
+            llm = get_llm(
+                model_name=model_name,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            if timeout is not None:
+                llm.request_timeout = timeout
+
+            messages = []
+            if system_prompt:
+                messages.append(SystemMessage(content=system_prompt))
+            messages.append(HumanMessage(content=prompt))
+
+            for chunk in llm.stream(messages):
+                text = LLMInvoker.normalize_chunk(chunk)
+                if not text:
+                    continue
+                if first_token_ms is None:
+                    first_token_ms = int((time.time() - start_time) * 1000)
+                yield text
+
+        except Exception as e:
+            elapsed_ms = int((time.time() - start_time) * 1000)
+            logger.error(f"LLM streaming failed after {elapsed_ms}ms: {e}")
+            raise LLMServiceError(
+                f"LLM streaming failed: {str(e)}",
+                error_code="LLM_STREAM_FAILED",
+                details={
+                    "model_name": model_name,
+                    "elapsed_ms": elapsed_ms
+                }
+            )
+
+        if log_timing:
+            elapsed_ms = int((time.time() - start_time) * 1000)
+            logger.info(
+                f"LLM stream completed in {elapsed_ms}ms, first token after {first_token_ms}ms (model: {model_name})"
+            )
+
     @staticmethod
     def invoke_with_template(
         model_name: str,
@@ -243,6 +317,31 @@ class LLMInvoker:
         else:
             return str(response)
 
+    @staticmethod
+    def normalize_chunk(chunk: Any) -> str:
+        """
+        Text of a streamed chunk.
+
+        Message chunks carry either a string or (for some providers) a list of
+        content blocks; only the text blocks are kept.
+
+        Args:
+            chunk: Raw chunk from llm.stream() or chain.stream()
+
+        Returns:
+            Chunk text (may be empty)
+        """
+        content = chunk.content if hasattr(chunk, 'content') else chunk
+        if isinstance(content, str):
+            return content
+        if isinstance(content, list):
+            return "".join(
+                block if isinstance(block, str) else block.get("text", "")
+                for block in content
+                if isinstance(block, (str, dict))
+            )
+        return str(content) if content is not None else ""
+
     @staticmethod
     def get_response_with_timing(
         model_name: str,
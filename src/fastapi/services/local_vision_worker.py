@@ -0,0 +1,207 @@
+"""
+Local Vision Worker
+Batched, in-process image captioning with a HuggingFace BLIP-style model.
+
+The model is loaded once per process and a single background thread drains a
+queue of image requests, running them through the model in batches. Callers
+from any thread (or asyncio via asyncio.wrap_future) submit images and get a
+Future back, so concurrent requests are coalesced into one forward pass
+instead of one generate() call per image.
+"""
+
+import os
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+from PIL import Image
+
+logger = logging.getLogger("LOCAL_VISION_WORKER")
+
+HF_VISION_MODEL = os.getenv("HUGGINGFACE_VISION_MODEL", "Salesforce/blip-image-captioning-base")
+HF_VISION_BATCH_SIZE = int(os.getenv("HF_VISION_BATCH_SIZE", "8"))
+HF_VISION_MAX_WAIT_MS = int(os.getenv("HF_VISION_MAX_WAIT_MS", "50"))
+HF_VISION_TIMEOUT_SECONDS = int(os.getenv("HF_VISION_TIMEOUT_SECONDS", "300"))
+
+_STOP = object()
+
+
+class LocalVisionWorker:
+    """
+    Background batching worker around a BLIP captioning model.
+
+    Requests wait at most max_wait_ms for a batch to fill before the batch is
+    run. The processor resizes every image to the model's input resolution, so
+    mixed-size images stack into one tensor.
+    """
+
+    def __init__(
+        self,
+        model_name: str = HF_VISION_MODEL,
+        batch_size: int = HF_VISION_BATCH_SIZE,
+        max_wait_ms: int = HF_VISION_MAX_WAIT_MS
+    ):
+        """
+        Initialize the worker (the model is loaded lazily by the worker thread).
+
+        Args:
+            model_name: HuggingFace model id
+            batch_size: Maximum images per forward pass
+            max_wait_ms: Maximum time to wait for a batch to fill
+        """
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max(0, max_wait_ms) / 1000.0
+        self.failed = False
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._processor = None
+        self._model = None
+        self._thread = threading.Thread(target=self._run, name="local-vision-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, image_path: str) -> "Future[Optional[str]]":
+        """
+        Queue an image for captioning.
+
+        Args:
+            image_path: Path to the image
+
+        Returns:
+            Future resolving to the caption, or None if captioning failed
+        """
+        future: "Future[Optional[str]]" = Future()
+        if self.failed:
+            future.set_result(None)
+        else:
+            self._queue.put((image_path, future))
+            if self.failed:
+                # Raced with a model load failure; don't leave the request stranded
+                self._fail_pending()
+        return future
+
+    def describe(self, image_path: str, timeout: Optional[float] = HF_VISION_TIMEOUT_SECONDS) -> Optional[str]:
+        """Caption one image, blocking until its batch completes."""
+        return self.submit(image_path).result(timeout=timeout)
+
+    def describe_many(self, image_paths: List[str], timeout: Optional[float] = HF_VISION_TIMEOUT_SECONDS) -> List[Optional[str]]:
+        """Caption several images, returning captions in input order."""
+        futures = [self.submit(path) for path in image_paths]
+        return [future.result(timeout=timeout) for future in futures]
+
+    def stop(self) -> None:
+        """Stop the worker thread after the queued requests drain."""
+        self._queue.put(_STOP)
+
+    def _load_model(self) -> bool:
+        if self._model is not None:
+            return True
+        try:
+            from transformers import BlipProcessor, BlipForConditionalGeneration
+            logger.info(f"Loading HuggingFace model: {self.model_name}")
+            self._processor = BlipProcessor.from_pretrained(self.model_name)
+            self._model = BlipForConditionalGeneration.from_pretrained(self.model_name)
+            self._model.eval()
+            return True
+        except Exception as e:
+            logger.warning(f"HuggingFace vision model failed to load: {e}")
+            self.failed = True
+            return False
+
+    def _next_batch(self) -> Tuple[List[Tuple[str, Future]], bool]:
+        """Block for one request, then collect more until the batch is full or max_wait elapses."""
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+
+        batch = [item]
+        stop = False
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            batch.append(item)
+        return batch, stop
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch, stop = self._next_batch()
+            if not batch:
+                continue
+
+            if not self._load_model():
+                for _, future in batch:
+                    future.set_result(None)
+                self._fail_pending()
+                return
+
+            self._caption_batch(batch)
+
+    def _caption_batch(self, batch: List[Tuple[str, Future]]) -> None:
+        images, futures = [], []
+        for image_path, future in batch:
+            try:
+                with Image.open(image_path) as img:
+                    images.append(img.convert("RGB"))
+                futures.append(future)
+            except Exception as e:
+                logger.warning(f"HuggingFace vision could not open {image_path}: {e}")
+                future.set_result(None)
+
+        if not images:
+            return
+
+        try:
+            import torch
+            inputs = self._processor(images=images, return_tensors="pt")
+            with torch.inference_mode():
+                out = self._model.generate(**inputs, max_length=50, num_beams=4)
+            captions = self._processor.batch_decode(out, skip_special_tokens=True)
+            logger.debug(f"Captioned batch of {len(images)} images")
+        except Exception as e:
+            logger.warning(f"HuggingFace vision batch of {len(images)} failed: {e}")
+            captions = [None] * len(images)
+
+        for future, caption in zip(futures, captions):
+            future.set_result(caption.strip() if caption else None)
+
+    def _fail_pending(self) -> None:
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP and not item[1].done():
+                item[1].set_result(None)
+
+
+_worker: Optional[LocalVisionWorker] = None
+_worker_pid: Optional[int] = None
+_worker_lock = threading.Lock()
+
+
+def get_local_vision_worker() -> LocalVisionWorker:
+    """
+    Process-wide worker (recreated after fork, since threads do not survive it).
+
+    Returns:
+        LocalVisionWorker instance
+    """
+    global _worker, _worker_pid
+    pid = os.getpid()
+    if _worker is None or _worker_pid != pid:
+        with _worker_lock:
+            if _worker is None or _worker_pid != pid:
+                _worker = LocalVisionWorker()
+                _worker_pid = pid
+    return _worker
@@ -29,6 +29,12 @@ import time
 import asyncio
 from string import Formatter
 
+from services.test_plan_parser import (
+    parse_test_plan,
+    extract_requirement_statements,
+    extract_test_procedure_statements,
+)
+
 # Import LLMInvoker for direct invocation with system prompt support
 from services.llm_invoker import LLMInvoker
 
@@ -1458,7 +1464,9 @@ Create a comprehensive markdown document that consolidates all {len(section_resu
         Add structured Requirements and Test Procedures tables to the test plan.
 
         Extracts requirements and test procedures from narrative text and formats them
-        into structured markdown tables with proper headers and IDs.
+        into structured markdown tables with proper headers and IDs. The markdown is
+        parsed once (and cached by content hash); each block's statements are extracted
+        a single time and shared by the tables and the summary.
 
         Args:
             markdown: The consolidated test plan markdown
@@ -1466,183 +1474,82 @@ Create a comprehensive markdown document that consolidates all {len(section_resu
         Returns:
             Enhanced markdown with structured tables
         """
-        import re
-        from typing import List, Dict, Any
-
         logger.info("Adding structured Requirements and Test Procedures tables...")
 
-        # Split into sections
-        sections = re.split(r'\n(?=#+\s+\d+\.)', markdown)
-
         enhanced_sections = []
         req_counter = 1
         test_counter = 1
 
-        for section in sections:
-            if not section.strip():
-                continue
-
-            # Extract section header
-            lines = section.split('\n')
-            section_header = lines[0] if lines else ""
-            section_content = '\n'.join(lines[1:]) if len(lines) > 1 else ""
-
-            # Extract requirements from section
-            requirements = self._extract_requirements_from_section(section_content, req_counter)
+        for block in parse_test_plan(markdown).numbered_blocks:
+            requirements = self._number_requirements(block.requirements, req_counter)
             req_counter += len(requirements)
 
-            # Extract test procedures from section
-            test_procedures = self._extract_test_procedures_from_section(section_content, test_counter)
+            test_procedures = self._number_test_procedures(block.test_procedures, test_counter)
             test_counter += len(test_procedures)
 
-            # Build enhanced section
-            enhanced_section = section_header + '\n\n'
+            parts = [block.header, '\n\n']
 
             # Add Requirements table if any found
             if requirements:
-                enhanced_section += "### Requirements\n\n"
-                enhanced_section += "| Req ID | Requirement Description | Source | Priority | Testable |\n"
-                enhanced_section += "|--------|------------------------|--------|----------|----------|\n"
+                parts.append("### Requirements\n\n")
+                parts.append("| Req ID | Requirement Description | Source | Priority | Testable |\n")
+                parts.append("|--------|------------------------|--------|----------|----------|\n")
                 for req in requirements:
-                    enhanced_section += f"| {req['id']} | {req['description'][:100]} | {req['source']} | {req['priority']} | {req['testable']} |\n"
-                enhanced_section += "\n"
+                    parts.append(f"| {req['id']} | {req['description'][:100]} | {req['source']} | {req['priority']} | {req['testable']} |\n")
+                parts.append("\n")
 
             # Add original section content
-            enhanced_section += section_content + '\n\n'
+            parts.append(block.content + '\n\n')
 
             # Add Test Procedures table if any found
             if test_procedures:
-                enhanced_section += "### Test Procedures\n\n"
-                enhanced_section += "| Test ID | Test Description | Steps | Expected Result | Acceptance Criteria | Req ID |\n"
-                enhanced_section += "|---------|-----------------|-------|-----------------|---------------------|--------|\n"
+                parts.append("### Test Procedures\n\n")
+                parts.append("| Test ID | Test Description | Steps | Expected Result | Acceptance Criteria | Req ID |\n")
+                parts.append("|---------|-----------------|-------|-----------------|---------------------|--------|\n")
                 for test in test_procedures:
                     steps = '; '.join(test['steps'][:3]) if test['steps'] else 'N/A'
-                    enhanced_section += f"| {test['id']} | {test['description'][:80]} | {steps[:60]} | {test['expected_result'][:60]} | {test['acceptance_criteria'][:60]} | {test['req_id']} |\n"
-                enhanced_section += "\n"
+                    parts.append(f"| {test['id']} | {test['description'][:80]} | {steps[:60]} | {test['expected_result'][:60]} | {test['acceptance_criteria'][:60]} | {test['req_id']} |\n")
+                parts.append("\n")
 
-            enhanced_sections.append(enhanced_section)
+            enhanced_sections.append(''.join(parts))
 
         result = '\n'.join(enhanced_sections)
-
-        # Add summary tables at the beginning
-        all_requirements = []
-        all_tests = []
-        req_counter = 1
-        test_counter = 1
-
-        for section in sections:
-            if not section.strip():
-                continue
-            lines = section.split('\n')
-            section_content = '\n'.join(lines[1:]) if len(lines) > 1 else ""
-
-            reqs = self._extract_requirements_from_section(section_content, req_counter)
-            req_counter += len(reqs)
-            all_requirements.extend(reqs)
-
-            tests = self._extract_test_procedures_from_section(section_content, test_counter)
-            test_counter += len(tests)
-            all_tests.extend(tests)
+        total_requirements = req_counter - 1
+        total_tests = test_counter - 1
 
         # Prepend summary
         summary = "# Requirements and Test Procedures Summary\n\n"
-        summary += f"**Total Requirements:** {len(all_requirements)}\n\n"
-        summary += f"**Total Test Procedures:** {len(all_tests)}\n\n"
+        summary += f"**Total Requirements:** {total_requirements}\n\n"
+        summary += f"**Total Test Procedures:** {total_tests}\n\n"
         summary += "---\n\n"
 
-        logger.info(f"Added {len(all_requirements)} requirements and {len(all_tests)} test procedures to tables")
+        logger.info(f"Added {total_requirements} requirements and {total_tests} test procedures to tables")
 
         return summary + result
 
     def _extract_requirements_from_section(self, content: str, start_id: int) -> List[Dict[str, Any]]:
         """Extract requirements from section content"""
-        requirements = []
-
-        # Pattern matching for requirement keywords
-        requirement_patterns = [
-            r'(?i)(must|shall|should|required?)\s+(.{20,200}?)(?:\.|;|\n)',
-            r'(?i)requirement:?\s*(.{20,200}?)(?:\.|;|\n)',
-            r'(?i)the\s+(?:system|device|implementation|software)\s+(must|shall|should)\s+(.{20,200}?)(?:\.|;|\n)',
-        ]
-
-        for pattern in requirement_patterns:
-            matches = re.finditer(pattern, content, re.IGNORECASE | re.MULTILINE)
-            for match in matches:
-                if len(match.groups()) >= 2:
-                    desc = match.group(2).strip() if len(match.group(2)) > len(match.group(1)) else match.group(1).strip()
-                else:
-                    desc = match.group(1).strip()
-
-                # Clean up description
-                desc = desc.replace('\n', ' ').strip()
-                if len(desc) < 20 or len(desc) > 300:
-                    continue
-
-                # Check if already added
-                if any(req['description'] == desc for req in requirements):
-                    continue
-
-                # Determine priority based on keywords
-                priority = "High" if "must" in match.group(0).lower() or "shall" in match.group(0).lower() else "Medium"
-
-                requirements.append({
-                    'id': f'REQ-{start_id + len(requirements):03d}',
-                    'description': desc,
-                    'source': 'Section Analysis',
-                    'priority': priority,
-                    'testable': 'Yes'
-                })
-
-                if len(requirements) >= 10:  # Limit per section
-                    break
-
-        return requirements
+        return self._number_requirements(extract_requirement_statements(content), start_id)
 
     def _extract_test_procedures_from_section(self, content: str, start_id: int) -> List[Dict[str, Any]]:
         """Extract test procedures from section content"""
-        test_procedures = []
-
-        # Pattern matching for test procedures
-        test_patterns = [
-            r'(?i)test(?:\s+procedure)?:?\s*(.{20,200}?)(?:\.|;|\n)',
-            r'(?i)verify(?:\s+that)?\s+(.{20,200}?)(?:\.|;|\n)',
-            r'(?i)(?:check|confirm|ensure|validate)\s+(?:that\s+)?(.{20,200}?)(?:\.|;|\n)',
-            r'\d+\.\s+(.{20,200}?)(?:\.|;|\n)',  # Numbered lists
+        return self._number_test_procedures(extract_test_procedure_statements(content), start_id)
+
+    @staticmethod
+    def _number_requirements(requirements: List[Dict[str, Any]], start_id: int) -> List[Dict[str, Any]]:
+        """Assign sequential REQ ids to parsed requirement statements."""
+        return [
+            {'id': f'REQ-{start_id + i:03d}', **req}
+            for i, req in enumerate(requirements)
         ]
 
-        for pattern in test_patterns:
-            matches = re.finditer(pattern, content, re.IGNORECASE | re.MULTILINE)
-            for match in matches:
-                desc = match.group(1).strip()
-
-                # Clean up description
-                desc = desc.replace('\n', ' ').strip()
-                if len(desc) < 15 or len(desc) > 300:
-                    continue
-
-                # Check if already added
-                if any(test['description'] == desc for test in test_procedures):
-                    continue
-
-                # Extract steps if bulleted/numbered list follows
-                steps = []
-                # Simple step extraction (can be enhanced)
-                step_matches = re.findall(r'(?:^|\n)\s*[-•]\s*(.+?)(?=\n|$)', content[match.end():match.end()+500])
-                steps = [s.strip() for s in step_matches[:5]]
-
-                test_procedures.append({
-                    'id': f'TC-{start_id + len(test_procedures):03d}',
-                    'description': desc,
-                    'steps': steps if steps else ['Setup test environment', 'Execute test', 'Verify results'],
-                    'expected_result': 'Test passes all criteria',
-                    'acceptance_criteria': 'All requirements met',
-                    'req_id': f'REQ-{start_id:03d}'  # Link to first requirement in section
-                })
-
-                if len(test_procedures) >= 10:  # Limit per section
-                    break
-
-        return test_procedures
+    @staticmethod
+    def _number_test_procedures(test_procedures: List[Dict[str, Any]], start_id: int) -> List[Dict[str, Any]]:
+        """Assign sequential TC ids to parsed test procedures, linked to the section's first requirement."""
+        return [
+            {'id': f'TC-{start_id + i:03d}', **test, 'req_id': f'REQ-{start_id:03d}'}
+            for i, test in enumerate(test_procedures)
+        ]
 
     def _extract_dependencies_from_markdown(self, markdown: str) -> List[str]:
         """Extract dependencies from markdown format"""
@@ -0,0 +1,237 @@
+"""
+Partition Maintenance Service
+Keeps the monthly range partitions of the append-only history tables
+(agent_responses, rag_citations, chat_history) ahead of the clock and drops
+whole partitions once they fall out of the retention window.
+
+Partitions are named <table>_pYYYYMM and cover [first of month, first of next
+month). Tables converted from an unpartitioned install keep their old rows in
+a single <table>_legacy partition (see migration 006), which is dropped like
+any other partition once all of it is older than the retention window.
+
+Maintenance runs once from init_db (so inserts always have a partition) and
+then periodically from a background thread.
+"""
+
+import os
+import re
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, func, text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger("PARTITION_SERVICE")
+
+# Tables range-partitioned by month (see the ORM models' __table_args__)
+PARTITIONED_TABLES = ("agent_responses", "rag_citations", "chat_history")
+
+# Months of partitions kept ready beyond the current one
+PARTITION_PREMAKE_MONTHS = int(os.getenv("PARTITION_PREMAKE_MONTHS", "3"))
+# Whole months of history kept before the current month (0 keeps everything)
+PARTITION_RETENTION_MONTHS = int(os.getenv("PARTITION_RETENTION_MONTHS", "0"))
+PARTITION_MAINTENANCE_INTERVAL_SECONDS = int(os.getenv("PARTITION_MAINTENANCE_INTERVAL_SECONDS", "21600"))
+
+# pg advisory lock key: one maintainer at a time across API processes
+_PARTITION_LOCK_KEY = 0x9A271
+
+_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+
+def _month_start(moment: datetime) -> datetime:
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _is_partitioned(db: Session, table: str) -> bool:
+    return db.execute(
+        text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": table}
+    ).scalar() is True
+
+
+def list_partitions(db: Session, table: str) -> List[Tuple[str, Optional[datetime]]]:
+    """
+    List a table's partitions with their upper bounds.
+
+    Args:
+        db: Database session
+        table: Partitioned table name
+
+    Returns:
+        (partition name, exclusive upper bound) pairs; the bound is None for
+        a DEFAULT partition
+    """
+    rows = db.execute(
+        text("""
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(:table)
+        """),
+        {"table": table}
+    ).all()
+
+    partitions = []
+    for name, bound in rows:
+        match = _UPPER_BOUND.search(bound or "")
+        partitions.append((name, datetime.fromisoformat(match.group(1)) if match else None))
+    return partitions
+
+
+def ensure_partitions(db: Session, table: str, now: Optional[datetime] = None) -> List[str]:
+    """
+    Create the partitions for the current month and the next
+    PARTITION_PREMAKE_MONTHS months that do not exist yet.
+
+    Months already covered by an existing partition (such as the legacy
+    partition) are skipped.
+
+    Args:
+        db: Database session (caller commits)
+        table: Partitioned table name
+        now: Current time (naive UTC); defaults to the clock
+
+    Returns:
+        Names of the partitions created
+    """
+    current = _month_start(now or datetime.now(timezone.utc).replace(tzinfo=None))
+    covered_until = max(
+        (upper for _, upper in list_partitions(db, table) if upper is not None),
+        default=None
+    )
+
+    created = []
+    for offset in range(PARTITION_PREMAKE_MONTHS + 1):
+        lower = _add_months(current, offset)
+        upper = _add_months(lower, 1)
+        if covered_until is not None and upper <= covered_until:
+            continue
+        if covered_until is not None and lower < covered_until:
+            lower = covered_until
+
+        name = f"{table}_p{lower:%Y%m}"
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{lower.isoformat(sep=' ')}') TO ('{upper.isoformat(sep=' ')}')"
+        ))
+        created.append(name)
+    return created
+
+
+def drop_expired_partitions(db: Session, table: str, now: Optional[datetime] = None) -> List[str]:
+    """
+    Drop partitions whose rows are all older than PARTITION_RETENTION_MONTHS
+    whole months. Dropping a partition replaces a bulk DELETE: no dead tuples,
+    no vacuum, and the space is returned immediately.
+
+    Args:
+        db: Database session (caller commits)
+        table: Partitioned table name
+        now: Current time (naive UTC); defaults to the clock
+
+    Returns:
+        Names of the partitions dropped
+    """
+    if PARTITION_RETENTION_MONTHS <= 0:
+        return []
+
+    current = _month_start(now or datetime.now(timezone.utc).replace(tzinfo=None))
+    cutoff = _add_months(current, -PARTITION_RETENTION_MONTHS)
+
+    dropped = []
+    for name, upper in list_partitions(db, table):
+        if upper is not None and upper <= cutoff:
+            db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            dropped.append(name)
+    return dropped
+
+
+def maintain_partitions(db: Session, now: Optional[datetime] = None) -> Optional[Dict[str, Dict[str, List[str]]]]:
+    """
+    Create upcoming partitions and drop expired ones for every partitioned table.
+
+    Tables that are not partitioned yet (migration 006 not applied) are skipped.
+
+    Args:
+        db: Database session
+        now: Current time (naive UTC); defaults to the clock
+
+    Returns:
+        {table: {"created": [...], "dropped": [...]}}, or None if another
+        process is maintaining the partitions right now
+    """
+    if not db.execute(select(func.pg_try_advisory_xact_lock(_PARTITION_LOCK_KEY))).scalar():
+        return None
+
+    changes = {}
+    for table in PARTITIONED_TABLES:
+        if not _is_partitioned(db, table):
+            continue
+        changes[table] = {
+            "created": ensure_partitions(db, table, now),
+            "dropped": drop_expired_partitions(db, table, now),
+        }
+    db.commit()
+
+    for table, change in changes.items():
+        if change["created"] or change["dropped"]:
+            logger.info(
+                f"Partitions of {table}: created {change['created']}, dropped {change['dropped']}"
+            )
+    return changes
+
+
+class PartitionMaintainer:
+    """
+    Background thread that runs maintain_partitions every
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS.
+    """
+
+    def __init__(self, session_factory, interval_seconds: int = PARTITION_MAINTENANCE_INTERVAL_SECONDS):
+        """
+        Initialize the maintainer.
+
+        Args:
+            session_factory: Callable returning a new database session
+            interval_seconds: Seconds between maintenance runs
+        """
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Start the maintenance thread for this process if it is not running."""
+        pid = os.getpid()
+        with self._lock:
+            if self._thread is None or self._thread_pid != pid or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="partition-maintainer", daemon=True)
+                self._thread_pid = pid
+                self._thread.start()
+                logger.info("Partition maintainer started")
+
+    def stop(self) -> None:
+        """Ask the maintenance thread to exit."""
+        self._stop.set()
+
+    def _run(self) -> None:
+        # init_db has just maintained the partitions; wait one interval first
+        while not self._stop.wait(self.interval_seconds):
+            db = self.session_factory()
+            try:
+                maintain_partitions(db)
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Partition maintenance failed: {e}")
+            finally:
+                db.close()
@@ -0,0 +1,241 @@
+"""
+PDF Extraction Engine
+Single-pass PDF parsing with PyMuPDF: page text, embedded image bytes and
+image bounding boxes.
+
+Documents are opened from memory (no temp file). Large documents are split
+into contiguous page ranges parsed in parallel worker processes; each worker
+opens its own copy of the document, since PyMuPDF documents cannot be shared
+across threads or processes. Pages come back in document order.
+"""
+
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("PDF_EXTRACTION_ENGINE")
+
+# Try to import PyMuPDF
+try:
+    import fitz  # PyMuPDF
+    HAS_PYMUPDF = True
+except ImportError:
+    HAS_PYMUPDF = False
+    logger.warning("PyMuPDF not available - PDF extraction engine disabled")
+
+PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Documents shorter than this are parsed in-process (worker start-up would dominate)
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+
+# Byte translation table mapping alpha to gray (opaque -> black)
+_INVERT_BYTES = bytes(range(255, -1, -1))
+
+
+@dataclass
+class PdfImage:
+    """An image placed on a PDF page"""
+    xref: int
+    name: str  # XObject name without the leading slash, e.g. "Im1"
+    ext: str  # "jpg" (original DCT stream) or "png" (decoded, RGB or grayscale)
+    data: bytes
+    width_px: int
+    height_px: int
+    bbox: List[float]  # [x0, y0, x1, y1] in PDF space (origin bottom-left); zeros if unplaced
+    page_sequence: int
+
+
+@dataclass
+class PdfPage:
+    """Text and images of one PDF page"""
+    page_number: int  # 1-indexed
+    text: str
+    width: float
+    height: float
+    images: List[PdfImage] = field(default_factory=list)
+
+
+def _encode_image(doc: 'fitz.Document', xref: int) -> Tuple[str, bytes, int, int]:
+    """
+    Encoded bytes for an image XObject.
+
+    JPEGs are passed through untouched; everything else (Flate, JPX, JBIG2,
+    CMYK, indexed...) is decoded and re-encoded as an RGB/grayscale PNG so
+    downstream PIL and vision code can read it. Stencil masks (/ImageMask)
+    decode to a pixmap that is nothing but alpha, which PyMuPDF can neither
+    strip nor convert; they are rendered as black-on-white grayscale instead.
+    """
+    info = doc.extract_image(xref)
+    if info and info.get("ext") in ("jpeg", "jpg") and info.get("colorspace", 3) in (1, 3):
+        return "jpg", info["image"], info.get("width", 0), info.get("height", 0)
+
+    pix = fitz.Pixmap(doc, xref)
+    if pix.colorspace is None and pix.alpha:
+        # Painted (opaque) mask pixels become black, the rest white
+        pix = fitz.Pixmap(fitz.csGRAY, pix.width, pix.height, pix.samples.translate(_INVERT_BYTES), False)
+    elif pix.alpha:
+        pix = fitz.Pixmap(pix, 0)
+    if pix.colorspace is None or pix.colorspace.n not in (1, 3):
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+    return "png", pix.tobytes("png"), pix.width, pix.height
+
+
+def extract_page_images(
+    doc: 'fitz.Document',
+    page: 'fitz.Page',
+    encoded_cache: Optional[Dict[int, Tuple[str, bytes, int, int]]] = None
+) -> List[PdfImage]:
+    """
+    Extract the image XObjects of one page with their placement.
+
+    Args:
+        doc: PyMuPDF document
+        page: PyMuPDF page
+        encoded_cache: Optional xref -> encoded image cache shared across pages,
+            so images repeated on many pages (logos, headers) are decoded once
+
+    Returns:
+        Images in page order
+    """
+    images = []
+    page_height = page.rect.height
+
+    for xref, _smask, _w, _h, _bpc, _cs, _alt_cs, name, *_ in page.get_images(full=True):
+        try:
+            encoded = encoded_cache.get(xref) if encoded_cache is not None else None
+            if encoded is None:
+                encoded = _encode_image(doc, xref)
+                if encoded_cache is not None:
+                    encoded_cache[xref] = encoded
+            ext, data, width_px, height_px = encoded
+
+            rects = page.get_image_rects(xref)
+            if rects:
+                r = rects[0]
+                bbox = [r.x0, page_height - r.y1, r.x1, page_height - r.y0]
+            else:
+                bbox = [0, 0, 0, 0]
+
+            images.append(PdfImage(
+                xref=xref,
+                name=name or f"xref{xref}",
+                ext=ext,
+                data=data,
+                width_px=width_px,
+                height_px=height_px,
+                bbox=bbox,
+                page_sequence=len(images)
+            ))
+        except Exception as e:
+            logger.warning(f"Failed to extract xref {xref} on page {page.number + 1}: {e}")
+
+    return images
+
+
+def _parse_pages(doc: 'fitz.Document', start: int, stop: int) -> List[PdfPage]:
+    encoded_cache: Dict[int, Tuple[str, bytes, int, int]] = {}
+    pages = []
+    for page_index in range(start, stop):
+        page = doc[page_index]
+        try:
+            text = page.get_text(sort=True)
+        except Exception as e:
+            logger.warning(f"Text extraction failed for page {page_index + 1}: {e}")
+            text = ""
+
+        pages.append(PdfPage(
+            page_number=page_index + 1,
+            text=text,
+            width=page.rect.width,
+            height=page.rect.height,
+            images=extract_page_images(doc, page, encoded_cache)
+        ))
+    return pages
+
+
+def _parse_page_range(file_content: bytes, start: int, stop: int) -> List[PdfPage]:
+    """Worker-process entry point: open the document and parse pages [start, stop)."""
+    with fitz.open(stream=file_content, filetype="pdf") as doc:
+        return _parse_pages(doc, start, stop)
+
+
+def _page_ranges(page_count: int, parts: int) -> List[Tuple[int, int]]:
+    size, extra = divmod(page_count, parts)
+    ranges, start = [], 0
+    for i in range(parts):
+        stop = start + size + (1 if i < extra else 0)
+        if stop > start:
+            ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Shared worker pool (spawned, since ingestion calls this from threads)."""
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                _pool = ProcessPoolExecutor(
+                    max_workers=PDF_EXTRACTION_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                _pool_pid = pid
+    return _pool
+
+
+def _reset_process_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def parse_pdf(file_content: bytes, max_workers: Optional[int] = None) -> List[PdfPage]:
+    """
+    Parse a PDF's text, images and image positions in one pass.
+
+    Args:
+        file_content: PDF file bytes
+        max_workers: Page-range workers (default PDF_EXTRACTION_WORKERS; 1 = in-process)
+
+    Returns:
+        One PdfPage per page, in document order
+    """
+    if not HAS_PYMUPDF:
+        raise ImportError(
+            "PyMuPDF (fitz) is required for the PDF extraction engine. "
+            "Install with: pip install pymupdf"
+        )
+
+    workers = min(max_workers or PDF_EXTRACTION_WORKERS, PDF_EXTRACTION_WORKERS)
+    with fitz.open(stream=file_content, filetype="pdf") as doc:
+        page_count = doc.page_count
+        if workers <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+            return _parse_pages(doc, 0, page_count)
+
+    ranges = _page_ranges(page_count, workers)
+    logger.info(f"Parsing {page_count} pages in {len(ranges)} worker processes")
+    try:
+        pool = _get_process_pool()
+        futures = [pool.submit(_parse_page_range, file_content, start, stop) for start, stop in ranges]
+        pages = []
+        for future in futures:
+            pages.extend(future.result())
+        return pages
+    except BrokenProcessPool as e:
+        logger.warning(f"PDF worker pool failed, parsing in-process: {e}")
+        _reset_process_pool()
+        with fitz.open(stream=file_content, filetype="pdf") as doc:
+            return _parse_pages(doc, 0, doc.page_count)
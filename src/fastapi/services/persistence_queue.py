@@ -0,0 +1,425 @@
+"""
+Write-Behind Persistence Queue
+Takes audit and history inserts off the request path.
+
+Agent responses (with their RAG citations), compliance results, agent
+performance updates and chat history entries are put on a bounded in-process
+buffer. A background thread writes them in periodic multi-row transactions:
+records are collected for up to PERSISTENCE_FLUSH_INTERVAL_MS (or until
+PERSISTENCE_BATCH_SIZE are waiting) and committed together. Performance
+updates are summed per agent within a batch and applied as one atomic
+increment, so a burst of responses from one agent costs one row update
+instead of one per response.
+
+Nothing is dropped: when the buffer is full the caller writes its record
+synchronously, a failed batch is retried record by record, and stop() drains
+the buffer on shutdown. With PERSISTENCE_WRITE_BEHIND=false every record is
+written immediately on the caller's thread.
+
+Rows become visible to readers up to one flush interval after the request
+that produced them; created_at/timestamp are stamped at enqueue time.
+"""
+
+import os
+import time
+import queue
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import update, func, cast, Float
+from sqlalchemy.orm import Session
+
+from core.database import SessionLocal
+from models.agent import ComplianceAgent
+from models.chat import ChatHistory
+from models.response import AgentResponse, ComplianceResult
+from repositories.citation_repository import build_citation
+
+logger = logging.getLogger("PERSISTENCE_QUEUE")
+
+PERSISTENCE_WRITE_BEHIND = os.getenv("PERSISTENCE_WRITE_BEHIND", "true").lower() == "true"
+PERSISTENCE_QUEUE_SIZE = int(os.getenv("PERSISTENCE_QUEUE_SIZE", "1000"))
+PERSISTENCE_BATCH_SIZE = int(os.getenv("PERSISTENCE_BATCH_SIZE", "200"))
+PERSISTENCE_FLUSH_INTERVAL_MS = int(os.getenv("PERSISTENCE_FLUSH_INTERVAL_MS", "500"))
+# How long a caller waits for buffer space before writing synchronously
+PERSISTENCE_ENQUEUE_TIMEOUT_SECONDS = float(os.getenv("PERSISTENCE_ENQUEUE_TIMEOUT_SECONDS", "0.05"))
+
+# Seconds stop() waits for the writer to drain the buffer
+_STOP_TIMEOUT_SECONDS = 30
+
+AGENT_RESPONSE = "agent_response"
+COMPLIANCE_RESULT = "compliance_result"
+CHAT_ENTRY = "chat_entry"
+PERFORMANCE = "performance"
+
+
+@dataclass
+class PendingRecord:
+    kind: str
+    values: Dict[str, Any]
+    citations: Optional[List[Dict[str, Any]]] = None
+
+
+def apply_agent_performance(
+    db: Session,
+    agent_id: int,
+    count: int,
+    response_time_sum_ms: int,
+    successes: int
+) -> None:
+    """
+    Fold a batch of responses into an agent's performance counters.
+
+    A single atomic UPDATE increments the counters and recomputes the averages
+    from the running sums (SET expressions see the old row), so concurrent
+    writers never read-modify-write the row or lose increments.
+
+    Args:
+        db: SQLAlchemy database session (caller commits)
+        agent_id: ComplianceAgent id
+        count: Number of responses in the batch
+        response_time_sum_ms: Sum of their response times
+        successes: How many of them succeeded
+    """
+    total = func.coalesce(ComplianceAgent.total_queries, 0) + count
+    time_sum = func.coalesce(ComplianceAgent.response_time_sum_ms, 0) + response_time_sum_ms
+    success_count = func.coalesce(ComplianceAgent.success_count, 0) + successes
+
+    db.execute(
+        update(ComplianceAgent)
+        .where(ComplianceAgent.id == agent_id)
+        .values(
+            total_queries=total,
+            response_time_sum_ms=time_sum,
+            success_count=success_count,
+            avg_response_time_ms=cast(time_sum, Float) / total,
+            success_rate=cast(success_count, Float) / total
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def write_records(db: Session, records: List[PendingRecord]) -> None:
+    """
+    Add a batch of records to a session (caller commits).
+
+    Args:
+        db: SQLAlchemy database session
+        records: Records to write
+    """
+    # agent_id -> [count, response_time_sum_ms, successes]
+    performance: Dict[int, List[int]] = {}
+
+    def count_performance(agent_id: int, response_time_ms: Optional[int], success: bool) -> None:
+        totals = performance.setdefault(agent_id, [0, 0, 0])
+        totals[0] += 1
+        totals[1] += response_time_ms or 0
+        totals[2] += 1 if success else 0
+
+    for record in records:
+        if record.kind == AGENT_RESPONSE:
+            response = AgentResponse(**record.values)
+            # Citations are flushed with their response, so no id round trip is needed
+            response.citations = [build_citation(meta) for meta in record.citations or []]
+            db.add(response)
+        elif record.kind == COMPLIANCE_RESULT:
+            db.add(ComplianceResult(**record.values))
+            count_performance(record.values["agent_id"], record.values["response_time_ms"], True)
+        elif record.kind == CHAT_ENTRY:
+            db.add(ChatHistory(**record.values))
+        elif record.kind == PERFORMANCE:
+            count_performance(**record.values)
+
+    # Lock agent rows in id order so concurrent writers cannot deadlock
+    for agent_id in sorted(performance):
+        count, response_time_sum_ms, successes = performance[agent_id]
+        apply_agent_performance(db, agent_id, count, response_time_sum_ms, successes)
+
+
+class PersistenceQueue:
+    """
+    Bounded write-behind buffer with one writer thread per process.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        max_pending: int = PERSISTENCE_QUEUE_SIZE,
+        batch_size: int = PERSISTENCE_BATCH_SIZE,
+        flush_interval_ms: int = PERSISTENCE_FLUSH_INTERVAL_MS,
+        enabled: bool = PERSISTENCE_WRITE_BEHIND
+    ):
+        """
+        Initialize the queue (the writer thread starts on first use or start()).
+
+        Args:
+            session_factory: Callable returning a new database session
+            max_pending: Records buffered before callers write synchronously
+            batch_size: Maximum records per transaction
+            flush_interval_ms: How long records are collected before a flush
+            enabled: False writes every record immediately
+        """
+        self.session_factory = session_factory
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(1, flush_interval_ms) / 1000
+        self.enabled = enabled
+        self._queue: "queue.Queue[PendingRecord]" = queue.Queue(maxsize=max(1, max_pending))
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Producers
+    # ------------------------------------------------------------------
+
+    def add_agent_response(
+        self,
+        session_id: str,
+        agent_id: int,
+        response_text: str,
+        processing_method: str,
+        response_time_ms: int,
+        model_used: str,
+        sequence_order: Optional[int] = None,
+        rag_used: bool = False,
+        documents_found: int = 0,
+        rag_context: Optional[str] = None,
+        confidence_score: Optional[float] = None,
+        analysis_summary: Optional[str] = None,
+        citations: Optional[List[Dict[str, Any]]] = None
+    ) -> None:
+        """
+        Queue an agent response and its RAG citations.
+
+        The session row must already exist (log the session synchronously first).
+
+        Args:
+            session_id: AgentSession id
+            agent_id: ComplianceAgent id
+            response_text: Agent's response text
+            processing_method: Method used
+            response_time_ms: Response time in milliseconds
+            model_used: LLM model identifier
+            sequence_order: Order in a debate sequence
+            rag_used: Whether RAG was used
+            documents_found: Number of documents retrieved
+            rag_context: The retrieved context
+            confidence_score: Confidence score (0.0-1.0)
+            analysis_summary: Summary of analysis results
+            citations: Citation metadata from the RAG service
+        """
+        self._put(PendingRecord(AGENT_RESPONSE, {
+            "session_id": session_id,
+            "agent_id": agent_id,
+            "response_text": response_text,
+            "processing_method": processing_method,
+            "response_time_ms": response_time_ms,
+            "sequence_order": sequence_order,
+            "rag_used": rag_used,
+            "documents_found": documents_found,
+            "rag_context": rag_context,
+            "confidence_score": confidence_score,
+            "analysis_summary": analysis_summary,
+            "model_used": model_used,
+            "created_at": datetime.now(timezone.utc)
+        }, citations))
+
+    def add_compliance_result(
+        self,
+        agent_id: int,
+        data_sample: str,
+        confidence_score: Optional[float],
+        reason: str,
+        raw_response: str,
+        processing_method: str,
+        response_time_ms: int,
+        model_used: str,
+        session_id: Optional[str] = None
+    ) -> None:
+        """
+        Queue a compliance result (also counted in the agent's performance).
+
+        Args:
+            agent_id: ComplianceAgent id
+            data_sample: Input data that was checked
+            confidence_score: Confidence score (0.0-1.0)
+            reason: Reasoning/explanation for the result
+            raw_response: Raw LLM response
+            processing_method: Method used
+            response_time_ms: Response time in milliseconds
+            model_used: LLM model identifier
+            session_id: Session identifier
+        """
+        self._put(PendingRecord(COMPLIANCE_RESULT, {
+            "session_id": session_id,
+            "agent_id": agent_id,
+            "data_sample": data_sample,
+            "confidence_score": confidence_score,
+            "reason": reason,
+            "raw_response": raw_response,
+            "processing_method": processing_method,
+            "response_time_ms": response_time_ms,
+            "model_used": model_used,
+            "created_at": datetime.now(timezone.utc)
+        }))
+
+    def add_chat_entry(
+        self,
+        user_query: str,
+        response: str,
+        model_used: str,
+        collection_name: Optional[str],
+        query_type: str,
+        response_time_ms: int,
+        session_id: str,
+        source_documents: Optional[List[Dict[str, Any]]] = None
+    ) -> None:
+        """
+        Queue a chat history entry.
+
+        Args:
+            user_query: User's query
+            response: System response
+            model_used: Model identifier
+            collection_name: ChromaDB collection (if RAG)
+            query_type: Type of query
+            response_time_ms: Response time in milliseconds
+            session_id: Session identifier
+            source_documents: Source documents (if RAG)
+        """
+        self._put(PendingRecord(CHAT_ENTRY, {
+            "user_query": user_query,
+            "response": response,
+            "model_used": model_used,
+            "collection_name": collection_name,
+            "query_type": query_type,
+            "response_time_ms": response_time_ms,
+            "session_id": session_id,
+            "source_documents": source_documents,
+            "timestamp": datetime.now(timezone.utc)
+        }))
+
+    def add_performance(self, agent_id: int, response_time_ms: int, success: bool = True) -> None:
+        """
+        Queue one response for an agent's performance counters.
+
+        Args:
+            agent_id: ComplianceAgent id
+            response_time_ms: Response time in milliseconds
+            success: Whether the response succeeded
+        """
+        self._put(PendingRecord(PERFORMANCE, {
+            "agent_id": agent_id,
+            "response_time_ms": response_time_ms,
+            "success": success
+        }))
+
+    def pending_count(self) -> int:
+        """Number of records waiting to be written."""
+        return self._queue.qsize()
+
+    # ------------------------------------------------------------------
+    # Writer
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the writer thread for this process if it is not running."""
+        if not self.enabled:
+            return
+        pid = os.getpid()
+        if self._thread is not None and self._thread_pid == pid and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or self._thread_pid != pid or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="persistence-queue", daemon=True)
+                self._thread_pid = pid
+                self._thread.start()
+                logger.info("Persistence queue writer started")
+
+    def stop(self) -> None:
+        """Flush everything buffered, then stop the writer thread."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and self._thread_pid == os.getpid():
+            thread.join(_STOP_TIMEOUT_SECONDS)
+
+        # Anything the writer did not get to (or queued after it exited)
+        leftover = self._drain(self.batch_size)
+        while leftover:
+            self._write(leftover)
+            leftover = self._drain(self.batch_size)
+        logger.info("Persistence queue flushed")
+
+    def _put(self, record: PendingRecord) -> None:
+        if not self.enabled or self._stop.is_set():
+            self._write([record])
+            return
+
+        self.start()
+        try:
+            self._queue.put(record, timeout=PERSISTENCE_ENQUEUE_TIMEOUT_SECONDS)
+        except queue.Full:
+            logger.warning("Persistence buffer full; writing record synchronously")
+            self._write([record])
+
+    def _drain(self, limit: int) -> List[PendingRecord]:
+        records = []
+        while len(records) < limit:
+            try:
+                records.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return records
+
+    def _next_batch(self) -> List[PendingRecord]:
+        """Wait for a record, then collect more until the interval ends or the batch is full."""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                batch.extend(self._drain(self.batch_size - len(batch)))
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+
+    def _write(self, records: List[PendingRecord]) -> None:
+        db = self.session_factory()
+        try:
+            write_records(db, records)
+            db.commit()
+            return
+        except Exception as e:
+            db.rollback()
+            if len(records) == 1:
+                logger.error(f"Failed to persist {records[0].kind} record: {e}")
+                return
+            logger.warning(f"Batch of {len(records)} records failed ({e}); retrying individually")
+        finally:
+            db.close()
+
+        # One bad record must not take the rest of the batch with it
+        for record in records:
+            self._write([record])
+
+
+# Shared by the API process (started on app startup, flushed on shutdown)
+persistence_queue = PersistenceQueue(SessionLocal)
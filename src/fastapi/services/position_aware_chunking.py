@@ -4,25 +4,25 @@ Preserves image positions when splitting documents into chunks
 """
 
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 import json
 
 logger = logging.getLogger("POSITION_AWARE_CHUNKING")
 
 
-def page_based_chunking_with_positions(
+def iter_page_chunks(
     pages_data: List[Dict[str, Any]],
     document_name: str
-) -> List[Dict[str, Any]]:
+) -> Iterator[Dict[str, Any]]:
     """
-    Create one chunk per page, preserving image positions.
+    Yield one chunk per page, preserving image positions.
 
     Each chunk contains:
     - Full page text
     - All images on that page with complete position metadata
     - Page-level metadata
     """
-    chunks = []
+    count = 0
 
     for page_data in pages_data:
         page_num = page_data.get("page", 1)
@@ -70,10 +70,18 @@ def page_based_chunking_with_positions(
             "images": sorted_images
         }
 
-        chunks.append(chunk)
+        count += 1
+        yield chunk
 
-    logger.info(f"Page-based chunking created {len(chunks)} chunks for {document_name}")
-    return chunks
+    logger.info(f"Page-based chunking created {count} chunks for {document_name}")
+
+
+def page_based_chunking_with_positions(
+    pages_data: List[Dict[str, Any]],
+    document_name: str
+) -> List[Dict[str, Any]]:
+    """Create one chunk per page, preserving image positions (see iter_page_chunks)."""
+    return list(iter_page_chunks(pages_data, document_name))
 
 
 def section_based_chunking_with_positions(
@@ -174,18 +182,20 @@ def section_based_chunking_with_positions(
     return chunks
 
 
-def fixed_size_chunking_with_positions(
+def iter_fixed_size_chunks(
     content: str,
     images_data: List[Dict],
     chunk_size: int = 1000,
     overlap: int = 200
-) -> List[Dict[str, Any]]:
+) -> Iterator[Dict[str, Any]]:
     """
-    Create fixed-size chunks while preserving image positions.
+    Yield fixed-size chunks while preserving image positions.
 
+    Boundaries are found with offset arithmetic on the full text (no window
+    copies), so each chunk's text is copied exactly once, when it is yielded.
     Images are assigned to chunks based on their char_offset.
     """
-    chunks = []
+    length = len(content)
     start = 0
     chunk_index = 0
 
@@ -193,20 +203,15 @@ def fixed_size_chunking_with_positions(
     sorted_images = sorted(images_data, key=lambda img: img.get("char_offset", 0))
     image_idx = 0
 
-    while start < len(content):
-        end = min(start + chunk_size, len(content))
-
-        # Adjust to sentence/paragraph boundary
-        if end < len(content):
-            # Try to break at sentence or paragraph
-            last_period = content[start:end].rfind('. ')
-            last_newline = content[start:end].rfind('\n\n')
+    while start < length:
+        end = min(start + chunk_size, length)
 
-            break_point = max(last_period, last_newline)
-            if break_point > chunk_size // 2:  # Only use if not too early
-                end = start + break_point + 1
-
-        chunk_text = content[start:end]
+        # Adjust to sentence/paragraph boundary in the second half of the window
+        if end < length:
+            floor = start + chunk_size // 2 + 1  # Only use if not too early
+            break_point = max(content.rfind('. ', floor, end), content.rfind('\n\n', floor, end))
+            if break_point != -1:
+                end = break_point + 1
 
         # Find images in this chunk
         chunk_images = []
@@ -240,8 +245,8 @@ def fixed_size_chunking_with_positions(
                 "description": img.get("description", "")
             })
 
-        chunk = {
-            "content": chunk_text.strip(),
+        yield {
+            "content": content[start:end].strip(),
             "chunk_index": chunk_index,
             "section_type": "fixed_chunk",
             "section_title": f"Chunk {chunk_index + 1}",
@@ -252,18 +257,26 @@ def fixed_size_chunking_with_positions(
             "end_position": end,
             "images": chunk_images  # Legacy compatibility
         }
-
-        chunks.append(chunk)
         chunk_index += 1
 
-        # Move start position with overlap
-        start = end - overlap
-
-        if start >= len(content):
+        # The last window reached the end; another would only repeat its overlap
+        if end >= length:
             break
 
-    logger.info(f"Fixed-size chunking created {len(chunks)} chunks")
-    return chunks
+        # Move start position with overlap (always forward)
+        start = max(end - overlap, start + 1)
+
+    logger.info(f"Fixed-size chunking created {chunk_index} chunks")
+
+
+def fixed_size_chunking_with_positions(
+    content: str,
+    images_data: List[Dict],
+    chunk_size: int = 1000,
+    overlap: int = 200
+) -> List[Dict[str, Any]]:
+    """Create fixed-size chunks while preserving image positions (see iter_fixed_size_chunks)."""
+    return list(iter_fixed_size_chunks(content, images_data, chunk_size, overlap))
 
 
 def merge_images_with_descriptions(
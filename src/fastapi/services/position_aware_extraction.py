@@ -5,12 +5,16 @@ Captures precise image positions from PDFs for accurate document reconstruction
 
 import os
 import logging
+import tempfile
 from typing import List, Dict, Any, Tuple
 from pathlib import Path
 from PyPDF2 import PdfReader
 from PIL import Image
 import io
 
+from .pdf_extraction_engine import parse_pdf, HAS_PYMUPDF
+from .image_store import ImageStore
+
 logger = logging.getLogger("POSITION_AWARE_EXTRACTION")
 
 
@@ -44,16 +48,84 @@ def extract_images_with_positions(
             }
         ]
     }
+
+    Uses the PyMuPDF extraction engine (one in-memory pass, page ranges
+    parsed in parallel) when available, otherwise PyPDF2.
     """
+    if HAS_PYMUPDF:
+        try:
+            return _extract_with_engine(file_content, filename, doc_id, images_dir)
+        except Exception as e:
+            logger.error(f"PyMuPDF extraction failed for {filename}, falling back to PyPDF2: {e}")
+
+    return _extract_with_pypdf(file_content, filename, doc_id, images_dir)
+
+
+def _extract_with_engine(
+    file_content: bytes,
+    filename: str,
+    doc_id: str,
+    images_dir: str
+) -> List[Dict[str, Any]]:
+    """Store images parsed by the PDF extraction engine and build page_data dicts."""
+    pdf_pages = parse_pdf(file_content)
+    logger.info(f"Extracting images with positions from {filename} ({len(pdf_pages)} pages)")
+    store = ImageStore(images_dir)
+
     pages_data = []
+    for pdf_page in pdf_pages:
+        page_num = pdf_page.page_number
+        page_data = {
+            "page": page_num,
+            "text": pdf_page.text,
+            "images": []
+        }
 
-    try:
-        # Save PDF to temp file
-        temp_pdf_path = os.path.join(temp_dir, filename)
-        with open(temp_pdf_path, 'wb') as f:
-            f.write(file_content)
+        for img in pdf_page.images:
+            try:
+                img_storage_path = store.put(img.data, img.ext)
+            except OSError as e:
+                logger.error(f"Failed to store image {img.name} from page {page_num}: {e}")
+                continue
+            img_filename = os.path.basename(img_storage_path)
+
+            page_data["images"].append({
+                "filename": img_filename,
+                "storage_path": img_storage_path,
+                "page_number": page_num,
+                "page_sequence": len(page_data["images"]),
+                "bbox": img.bbox,
+                "width_pts": img.bbox[2] - img.bbox[0],
+                "height_pts": img.bbox[3] - img.bbox[1],
+                "width_px": img.width_px,
+                "height_px": img.height_px,
+                "char_offset": estimate_char_offset(img.bbox, pdf_page.text, pdf_page.height),
+                "text_before": "",  # Will be filled during chunking
+                "text_after": "",   # Will be filled during chunking
+                "placement_hint": determine_placement_hint(img.bbox, pdf_page.width, pdf_page.height)
+            })
+
+        if page_data["images"]:
+            logger.info(f"Page {page_num}: Extracted {len(page_data['images'])} images with positions")
+        pages_data.append(page_data)
+
+    logger.info(f"Total images extracted with positions: {sum(len(p['images']) for p in pages_data)}")
+    return pages_data
+
+
+def _extract_with_pypdf(
+    file_content: bytes,
+    filename: str,
+    doc_id: str,
+    images_dir: str
+) -> List[Dict[str, Any]]:
+    """PyPDF2 fallback: serial page walk with XObject decoding (no real image placement)."""
+    pages_data = []
+    store = ImageStore(images_dir)
+    scratch_dir = tempfile.TemporaryDirectory()
 
-        reader = PdfReader(temp_pdf_path)
+    try:
+        reader = PdfReader(io.BytesIO(file_content))
         logger.info(f"Extracting images with positions from {filename} ({len(reader.pages)} pages)")
 
         for page_num, page in enumerate(reader.pages, 1):
@@ -124,9 +196,9 @@ def extract_images_with_positions(
                         else:
                             img_ext = 'png'
 
-                        # Create filename and save image
+                        # Save image to scratch space for normalization/verification
                         img_filename = f"{doc_id}_page_{page_num}_{obj_name[1:]}.{img_ext}"
-                        img_storage_path = os.path.join(images_dir, img_filename)
+                        img_storage_path = os.path.join(scratch_dir.name, img_filename)
 
                         with open(img_storage_path, "wb") as img_file:
                             img_file.write(data)
@@ -154,6 +226,10 @@ def extract_images_with_positions(
                                 os.remove(img_storage_path)
                             continue
 
+                        # Move the verified image into the content-addressed store
+                        img_storage_path = store.put_file(img_storage_path)
+                        img_filename = os.path.basename(img_storage_path)
+
                         # Extract position information from PDF
                         position_data = extract_image_position_from_pdf(
                             page=page,
@@ -207,6 +283,8 @@ def extract_images_with_positions(
 
     except Exception as e:
         logger.error(f"Error extracting images from {filename}: {e}")
+    finally:
+        scratch_dir.cleanup()
 
     logger.info(f"Total images extracted with positions: {sum(len(p['images']) for p in pages_data)}")
     return pages_data
@@ -300,9 +378,9 @@ def determine_placement_hint(
     width = x1 - x0
     height = y1 - y0
 
-    # Calculate position ratios
+    # Calculate position ratios (y_ratio measured from the top; PDF y grows upwards)
     x_ratio = x0 / page_width if page_width > 0 else 0.5
-    y_ratio = y0 / page_height if page_height > 0 else 0.5
+    y_ratio = 1 - (y1 / page_height) if page_height > 0 else 0.5
     width_ratio = width / page_width if page_width > 0 else 0.5
 
     # Full-width images
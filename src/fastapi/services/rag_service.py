@@ -4,7 +4,7 @@ import time
 import hashlib
 import json
 import logging
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 from sqlalchemy.orm import Session
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import lru_cache
@@ -23,14 +23,11 @@ from repositories.response_repository import ResponseRepository, ComplianceRepos
 from repositories.citation_repository import CitationRepository
 # Note: Function calls to log_agent_session, log_agent_response, etc.
 # need to be migrated to use repository methods (similar to agent_service.py)
-from repositories.chat_repository import ChatRepository
 from services.database import (
     log_agent_session,
-    complete_agent_session,
-    log_agent_response,
-    log_compliance_result,
-    log_rag_citations
+    complete_agent_session
 )
+from services.persistence_queue import persistence_queue
 
 logger = logging.getLogger("RAG_SERVICE_LOGGER")
 
@@ -360,6 +357,34 @@ class RAGService:
             return False
         return True
 
+    def _build_rag_chain(self, model_name: str):
+        """
+        Build the 'stuff'-style QA chain: documents are joined into the prompt
+        context and answered by the model.
+
+        The chain takes {"documents": [Document, ...], "question": str}.
+        """
+        llm = get_llm(model_name=model_name)
+
+        # Create prompt template for question answering
+        prompt = ChatPromptTemplate.from_template("""Answer the question based on the following context:
+
+{context}
+
+Question: {question}
+
+Answer:""")
+
+        # Create the chain using LCEL (LangChain Expression Language)
+        return (
+            {
+                "context": lambda x: "\n\n".join([doc.page_content for doc in x["documents"]]),
+                "question": lambda x: x["question"]
+            }
+            | prompt
+            | llm
+        )
+
     def run_rag_chain(
         self,
         query: str,
@@ -400,26 +425,7 @@ class RAGService:
         lc_docs = [Document(page_content=d) for d in docs]
 
         # 3) build a modern LCEL QA chain
-        llm = get_llm(model_name=model_name)
-
-        # Create prompt template for question answering
-        prompt = ChatPromptTemplate.from_template("""Answer the question based on the following context:
-
-{context}
-
-Question: {question}
-
-Answer:""")
-
-        # Create the chain using LCEL (LangChain Expression Language)
-        chain = (
-            {
-                "context": lambda x: "\n\n".join([doc.page_content for doc in x["documents"]]),
-                "question": lambda x: x["question"]
-            }
-            | prompt
-            | llm
-        )
+        chain = self._build_rag_chain(model_name)
 
         start = time.time()
         result = chain.invoke({"documents": lc_docs, "question": query})
@@ -473,9 +479,58 @@ Answer:""")
         logger.info(f"RAG response in rag_service: {answer[:200]}... (took {rt_ms} ms)")
 
         return answer, rt_ms, metadata_list, formatted_citations
-        
-        
-        
+
+    def stream_query_with_rag(
+        self,
+        query_text: str,
+        collection_name: str,
+        model_name: str,
+        top_k: Optional[int] = None,
+        where: Optional[Dict] = None,
+        include_citations: bool = True
+    ) -> Tuple[List[Dict[str, Any]], str, Iterator[str]]:
+        """
+        Streaming counterpart of process_query_with_rag.
+
+        Retrieval runs immediately so the citations are known before the first
+        token; generation only starts when the returned iterator is consumed.
+
+        Args:
+            query_text: The user query
+            collection_name: Name of the collection to search
+            model_name: LLM model to use
+            top_k: Number of documents to retrieve (optional)
+            where: Optional filter dict for document filtering
+            include_citations: If True, returns document citations separately
+
+        Returns:
+            Tuple of (metadata_list, formatted_citations, answer chunk iterator)
+        """
+        docs, found, metadata_list = self.get_relevant_documents(
+            query=query_text,
+            collection_name=collection_name,
+            top_k=top_k,
+            where=where,
+            include_metadata=True
+        )
+        if not found:
+            return [], "", iter(["No relevant documents found."])
+
+        formatted_citations = ""
+        if include_citations and metadata_list:
+            formatted_citations = self._format_document_citations(metadata_list)
+
+        lc_docs = [Document(page_content=d) for d in docs]
+        chain = self._build_rag_chain(model_name)
+
+        def tokens() -> Iterator[str]:
+            for chunk in chain.stream({"documents": lc_docs, "question": query_text}):
+                text = LLMInvoker.normalize_chunk(chunk)
+                if text:
+                    yield text
+
+        return metadata_list, formatted_citations, tokens()
+
     def test_connection(self) -> bool:
         """Test ChromaDB connection"""
         try:
@@ -597,7 +652,7 @@ Answer:""")
             raise ValueError(f"Unsupported model: {model_name}")
 
         
-    def process_agent_with_rag(self, agent: Dict[str, Any], query_text: str, collection_name: str, session_id: str, db: Session, include_citations: bool = True) -> Dict[str, Any]:
+    def process_agent_with_rag(self, agent: Dict[str, Any], query_text: str, collection_name: str, session_id: str, db: Session, include_citations: bool = True, sequence_order: Optional[int] = None) -> Dict[str, Any]:
         """
         Process query with agent using RAG via API with document citations.
 
@@ -608,6 +663,7 @@ Answer:""")
             session_id: Session ID for logging
             db: Database session
             include_citations: If True, includes document citations with similarity scores
+            sequence_order: Position in a debate sequence (stored with the response)
 
         Returns:
             Dict with agent response and metadata
@@ -677,25 +733,22 @@ INSTRUCTIONS:
                 direct_info = f"\n\n---\n**Direct LLM Information**: No relevant documents found in collection '{collection_name}'. Used {agent['model_name']} model directly."
                 final_response = final_response + direct_info
 
-            # Log agent response and get the response ID
-            agent_response_id = log_agent_response(
+            # Response, citations and compliance result are written behind the request
+            persistence_queue.add_agent_response(
                 session_id=session_id,
                 agent_id=agent["id"],
                 response_text=final_response,
                 processing_method=processing_method,
                 response_time_ms=response_time_ms,
                 model_used=agent["model_name"],
+                sequence_order=sequence_order,
                 rag_used=docs_found,
                 documents_found=len(relevant_docs) if docs_found else 0,
-                rag_context=context if docs_found and relevant_docs else None
+                rag_context=context if docs_found and relevant_docs else None,
+                citations=metadata_list if include_citations and metadata_list else None
             )
 
-            # Log RAG citations if available and response was logged
-            if agent_response_id and include_citations and metadata_list:
-                log_rag_citations(agent_response_id, metadata_list)
-                logger.info(f"Logged {len(metadata_list)} citations for agent response {agent_response_id}")
-
-            log_compliance_result(
+            persistence_queue.add_compliance_result(
                 agent_id=agent["id"],
                 data_sample=query_text,
                 confidence_score=None,
@@ -773,31 +826,22 @@ INSTRUCTIONS:
         )
 
         # Save to chat history for unified history tracking
-        try:
-            chat_repo = ChatRepository(db)
+        model_names = list(set([agent["model_name"] for agent in self.compliance_agents]))
 
-            # Format response for history display
-            model_names = list(set([agent["model_name"] for agent in self.compliance_agents]))
+        response_summary = f"**RAG Agent Analysis** ({len(agent_ids)} agents, collection: {collection_name})\n\n"
+        for idx, (agent_name, response_text) in enumerate(results.items(), 1):
+            response_summary += f"**{idx}. {agent_name}:**\n{response_text}\n\n"
 
-            response_summary = f"**RAG Agent Analysis** ({len(agent_ids)} agents, collection: {collection_name})\n\n"
-            for idx, (agent_name, response_text) in enumerate(results.items(), 1):
-                response_summary += f"**{idx}. {agent_name}:**\n{response_text}\n\n"
-
-            chat_repo.create_chat_entry(
-                user_query=query_text,
-                response=response_summary,
-                model_used=", ".join(model_names),
-                collection_name=collection_name,
-                query_type="rag_agent",
-                response_time_ms=total_time,
-                session_id=session_id,
-                source_documents=None
-            )
-            db.commit()
-        except Exception as e:
-            logger.warning(f"Failed to save RAG agent check to chat history: {e}")
-            # Don't fail the entire operation if chat history save fails
-            db.rollback()
+        persistence_queue.add_chat_entry(
+            user_query=query_text,
+            response=response_summary,
+            model_used=", ".join(model_names),
+            collection_name=collection_name,
+            query_type="rag_agent",
+            response_time_ms=total_time,
+            session_id=session_id,
+            source_documents=None
+        )
 
         return {
             "agent_responses": results,
@@ -849,9 +893,7 @@ INSTRUCTIONS:
             current_input = cumulative_context if i > 0 else query_text
             
             # Process with RAG
-            result = self.process_agent_with_rag(agent, current_input, collection_name, session_id, db)
-            
-            agent_response_id = self._update_agent_response_sequence_order(session_id, agent["id"], i + 1)
+            result = self.process_agent_with_rag(agent, current_input, collection_name, session_id, db, sequence_order=i + 1)
             
             debate_chain.append({
                 "agent_id": agent["id"],
@@ -879,33 +921,24 @@ INSTRUCTIONS:
         )
 
         # Save to chat history for unified history tracking
-        try:
-            chat_repo = ChatRepository(db)
-
-            # Format response for history display
-            model_names = list(set([agent["model_name"] for agent in debate_agents]))
+        model_names = list(set([agent["model_name"] for agent in debate_agents]))
 
-            response_summary = f"**RAG Debate Sequence** ({len(agent_ids)} agents, collection: {collection_name})\n\n"
-            for idx, round_result in enumerate(debate_chain, 1):
-                agent_name = round_result.get('agent_name', 'Unknown Agent')
-                response_text = round_result.get('response', 'No response')
-                response_summary += f"**Round {idx}: {agent_name}**\n{response_text}\n\n"
+        response_summary = f"**RAG Debate Sequence** ({len(agent_ids)} agents, collection: {collection_name})\n\n"
+        for idx, round_result in enumerate(debate_chain, 1):
+            agent_name = round_result.get('agent_name', 'Unknown Agent')
+            response_text = round_result.get('response', 'No response')
+            response_summary += f"**Round {idx}: {agent_name}**\n{response_text}\n\n"
 
-            chat_repo.create_chat_entry(
-                user_query=query_text,
-                response=response_summary,
-                model_used=", ".join(model_names),
-                collection_name=collection_name,
-                query_type="rag_debate_sequence",
-                response_time_ms=total_time,
-                session_id=session_id,
-                source_documents=None
-            )
-            db.commit()
-        except Exception as e:
-            logger.warning(f"Failed to save RAG debate sequence to chat history: {e}")
-            # Don't fail the entire operation if chat history save fails
-            db.rollback()
+        persistence_queue.add_chat_entry(
+            user_query=query_text,
+            response=response_summary,
+            model_used=", ".join(model_names),
+            collection_name=collection_name,
+            query_type="rag_debate_sequence",
+            response_time_ms=total_time,
+            session_id=session_id,
+            source_documents=None
+        )
 
         return session_id, debate_chain
 
@@ -954,28 +987,6 @@ INSTRUCTIONS:
         finally:
             session.close()
     
-    def _update_agent_response_sequence_order(self, session_id: str, agent_id: int, sequence_order: int):
-        """Update the sequence order for an agent response in a debate"""
-        db = SessionLocal()
-        try:
-            # Find the most recent response for this agent in this session
-            from models.response import AgentResponse
-            response = db.query(AgentResponse).filter(
-                AgentResponse.session_id == session_id,
-                AgentResponse.agent_id == agent_id
-            ).order_by(AgentResponse.created_at.desc()).first()
-            
-            if response:
-                response.sequence_order = sequence_order
-                db.commit()
-                return response.id
-        except Exception as e:
-            print(f"Error updating sequence order: {e}")
-            db.rollback()
-        finally:
-            db.close()
-        return None
-
     def query_collection_info(self, collection_name: str) -> Dict:
         """Get collection information"""
         try:
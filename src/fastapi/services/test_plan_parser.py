@@ -0,0 +1,482 @@
+"""
+Test Plan Parser
+Single-pass structured parser for generated test-plan markdown.
+
+A test plan is scanned once into an AST of sections, test rules (with their
+procedures, expected results, acceptance criteria and dependencies) and
+numbered heading blocks. Parsed documents are cached by content hash so the
+test card extractors and the structured-table builder share one parse.
+"""
+
+import re
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger("TEST_PLAN_PARSER")
+
+MAX_SECTION_CHARS = 50000      # Sections larger than this are truncated before rule parsing
+MAX_RULES_PER_SECTION = 20
+MAX_PROCEDURES_PER_RULE = 10
+MAX_BLOCK_ITEMS = 10           # Requirements / test procedures per numbered block
+PARSE_CACHE_SIZE = 32
+
+# Line classifiers (compiled once, applied once per line)
+_TOP_HEADING = re.compile(r'^#{1,2} ')
+_NUMBERED_HEADING = re.compile(r'^#+\s+\d+\.')
+_TEST_RULES_MARKER = re.compile(r'\*\*Test Rules:\*\*\s*$', re.IGNORECASE)
+_NUMBERED_RULE = re.compile(r'^(\d+)\.\s+(.+)')
+_RULE_NUMBER_PREFIX = re.compile(r'^\d+\.\s+')
+_SUB_STEP = re.compile(r'^\s*([a-z]\)|\d+\))\s+(.+?)$', re.IGNORECASE)
+_BULLET = re.compile(r'^\s*[-•]\s+(.+?)$')
+_EXPECTED_LABEL = re.compile(r'(?:expected|result|outcome|output):\s*(.*)', re.IGNORECASE)
+_ACCEPTANCE_LABEL = re.compile(r'(?:acceptance|pass|fail|criteria):\s*(.*)', re.IGNORECASE)
+
+_PROCEDURE_KEYWORDS = ('verify', 'test', 'measure', 'check', 'ensure', 'configure', 'setup', 'execute')
+_PRIORITY_KEYWORDS = ('critical', 'mandatory', 'must')
+_EQUIPMENT_KEYWORDS = ('calibrated', 'meter', 'analyzer', 'scope', 'generator', 'equipment', 'chamber')
+
+_SENTENCE_SPLIT = re.compile(r'[.!]\s+')
+_SENTENCE_SPLIT_Q = re.compile(r'[.!?]\s+')
+_REQUIREMENT_STATEMENTS = [
+    re.compile(rf'\b{keyword}\b.+?[.!]', re.IGNORECASE)
+    for keyword in ('shall', 'must', 'should', 'will', 'required to')
+]
+_OUTCOME_KEYWORDS = ('meets', 'complies', 'within', 'between', 'exceeds', 'achieves')
+_NUMERIC_SENTENCE = re.compile(r'[^.!?]*\b\d+(?:\.\d+)?\s*(?:±|%|dB|Hz|V|A|W|Ω|°C|°F|mm|cm|m|kg|g|lb)\b[^.!?]*[.!?]')
+_RANGE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'(?:±|plus or minus)\s*[\d.]+\s*[%°CFHzdBVAWΩmkglb]*',
+        r'(?:less than|<|≤)\s*[\d.]+\s*[%°CFHzdBVAWΩmkglb]+',
+        r'(?:greater than|>|≥)\s*[\d.]+\s*[%°CFHzdBVAWΩmkglb]+',
+        r'[\d.]+\s*(?:to|through|-)\s*[\d.]+\s*[%°CFHzdBVAWΩmkglb]+',
+        r'between\s+[\d.]+\s+and\s+[\d.]+\s*[%°CFHzdBVAWΩmkglb]*',
+        r'within\s+[\d.]+\s*[%°CFHzdBVAWΩmkglb]+',
+        r'(?:minimum|maximum|min|max)\s*[:=]?\s*[\d.]+\s*[%°CFHzdBVAWΩmkglb]+',
+    )
+]
+_CONSTRAINT_STATEMENTS = [
+    re.compile(rf'\b{keyword}\b.+?[.!]', re.IGNORECASE)
+    for keyword in ('shall not exceed', 'must not exceed', 'must be', 'should be', 'required to be')
+]
+_MEASURED_VALUE = re.compile(r'\b\d+(?:\.\d+)?\s*(?:%|±|dB|Hz|V|A|W|Ω|°C|°F|mm|cm|m|kg|g|lb)\b')
+
+# Narrative patterns used by the structured Requirements / Test Procedures tables
+_REQUIREMENT_PATTERNS = [
+    re.compile(r'(must|shall|should|required?)\s+(.{20,200}?)(?:\.|;|\n)', re.IGNORECASE | re.MULTILINE),
+    re.compile(r'requirement:?\s*(.{20,200}?)(?:\.|;|\n)', re.IGNORECASE | re.MULTILINE),
+    re.compile(r'the\s+(?:system|device|implementation|software)\s+(must|shall|should)\s+(.{20,200}?)(?:\.|;|\n)', re.IGNORECASE | re.MULTILINE),
+]
+_TEST_PROCEDURE_PATTERNS = [
+    re.compile(r'test(?:\s+procedure)?:?\s*(.{20,200}?)(?:\.|;|\n)', re.IGNORECASE | re.MULTILINE),
+    re.compile(r'verify(?:\s+that)?\s+(.{20,200}?)(?:\.|;|\n)', re.IGNORECASE | re.MULTILINE),
+    re.compile(r'(?:check|confirm|ensure|validate)\s+(?:that\s+)?(.{20,200}?)(?:\.|;|\n)', re.IGNORECASE | re.MULTILINE),
+    re.compile(r'\d+\.\s+(.{20,200}?)(?:\.|;|\n)', re.IGNORECASE | re.MULTILINE),
+]
+_FOLLOWING_BULLETS = re.compile(r'(?:^|\n)\s*[-•]\s*(.+?)(?=\n|$)')
+
+
+@dataclass
+class TestRule:
+    """A numbered test rule and the fields extracted from it."""
+    number: int
+    text: str
+    title: str
+    procedures: List[str]
+    expected_results: str
+    acceptance_criteria: str
+    dependencies: List[str]
+
+    @property
+    def requirement_id(self) -> str:
+        return f"REQ-{self.number:03d}"
+
+    @property
+    def priority(self) -> str:
+        return 'high' if any(kw in self.text.lower() for kw in _PRIORITY_KEYWORDS) else 'medium'
+
+    def to_test_dict(self) -> Dict[str, Any]:
+        """Test procedure dict in the shape consumed by TestCardService."""
+        return {
+            'title': self.title or f"Test Rule {self.number}",
+            'procedures': self.procedures,
+            'expected_results': self.expected_results,
+            'acceptance_criteria': self.acceptance_criteria,
+            'dependencies': self.dependencies,
+            'requirement_id': self.requirement_id,
+            'requirement_text': self.text.strip()[:500],  # First 500 chars of rule
+            'test_type': 'functional',
+            'category': 'compliance',
+            'priority': self.priority,
+            'estimated_duration': 30 + (len(self.procedures) * 10)  # Base 30 min + 10 min per procedure
+        }
+
+
+@dataclass
+class TestPlanSection:
+    """A top-level (# or ##) section of a test plan."""
+    title: str
+    index: int
+    content: str
+
+    @cached_property
+    def rules(self) -> List[TestRule]:
+        return parse_test_rules(self.content)
+
+
+@dataclass
+class NumberedBlock:
+    """A block starting at a numbered heading (e.g. '## 4.2 Power'), as used by structured tables."""
+    header: str
+    content: str
+
+    @cached_property
+    def requirements(self) -> List[Dict[str, Any]]:
+        """Requirement statements found in the block (without IDs)."""
+        return extract_requirement_statements(self.content)
+
+    @cached_property
+    def test_procedures(self) -> List[Dict[str, Any]]:
+        """Test procedure statements found in the block (without IDs)."""
+        return extract_test_procedure_statements(self.content)
+
+
+@dataclass
+class ParsedTestPlan:
+    """Parsed test plan AST."""
+    content_hash: str
+    sections: List[TestPlanSection] = field(default_factory=list)
+    numbered_blocks: List[NumberedBlock] = field(default_factory=list)
+
+
+_parse_cache: "OrderedDict[str, ParsedTestPlan]" = OrderedDict()
+_parse_cache_lock = threading.Lock()
+
+
+def content_hash(content: str) -> str:
+    """sha256 of the markdown content, used as the parse cache key."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def parse_test_plan(content: str) -> ParsedTestPlan:
+    """
+    Parse test-plan markdown into sections and numbered blocks, cached by content hash.
+
+    Args:
+        content: Test plan markdown
+
+    Returns:
+        ParsedTestPlan: Shared, read-only parse result
+    """
+    content = content or ""
+    key = content_hash(content)
+    with _parse_cache_lock:
+        cached = _parse_cache.get(key)
+        if cached is not None:
+            _parse_cache.move_to_end(key)
+            return cached
+
+    parsed = _parse_document(content, key)
+
+    with _parse_cache_lock:
+        _parse_cache[key] = parsed
+        while len(_parse_cache) > PARSE_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+    return parsed
+
+
+def _parse_document(content: str, key: str) -> ParsedTestPlan:
+    """One pass over the lines, tracking both section and numbered-block boundaries."""
+    lines = content.split('\n')
+    parsed = ParsedTestPlan(content_hash=key)
+
+    section_start: Optional[int] = None
+    block_start = 0
+
+    def close_section(end: int):
+        title_line = lines[section_start]
+        body = lines[section_start + 1:end]
+        parsed.sections.append(TestPlanSection(
+            title=title_line.replace('##', '').replace('#', '').strip()[:200],  # Limit title length
+            index=len(parsed.sections) + 1,
+            content='\n'.join(body) + '\n' if body else ''
+        ))
+
+    def close_block(end: int):
+        block_lines = lines[block_start:end]
+        if '\n'.join(block_lines).strip():
+            parsed.numbered_blocks.append(NumberedBlock(
+                header=block_lines[0],
+                content='\n'.join(block_lines[1:])
+            ))
+
+    for i, line in enumerate(lines):
+        if line.startswith('#'):
+            if _TOP_HEADING.match(line):
+                if section_start is not None:
+                    close_section(i)
+                section_start = i
+            if i > 0 and _NUMBERED_HEADING.match(line):
+                close_block(i)
+                block_start = i
+
+    if section_start is not None:
+        close_section(len(lines))
+    close_block(len(lines))
+
+    logger.debug(f"Parsed test plan {key[:12]}: {len(parsed.sections)} sections, {len(parsed.numbered_blocks)} numbered blocks")
+    return parsed
+
+
+def parse_test_rules(section_content: str) -> List[TestRule]:
+    """
+    Extract numbered test rules from a section.
+
+    Uses the '**Test Rules:**' block when present, otherwise any numbered list
+    in the section.
+
+    Args:
+        section_content: Section markdown
+
+    Returns:
+        List of TestRule (max MAX_RULES_PER_SECTION)
+    """
+    if len(section_content) > MAX_SECTION_CHARS:
+        logger.warning(f"Section content too large ({len(section_content)} chars), truncating to 50KB")
+        section_content = section_content[:MAX_SECTION_CHARS]
+
+    lines = section_content.split('\n')
+
+    # Locate the **Test Rules:** block; it ends at the next bold label or heading line
+    rule_lines = lines
+    for i, line in enumerate(lines):
+        if _TEST_RULES_MARKER.search(line):
+            end = i + 1
+            while end < len(lines) and not lines[end].startswith(('**', '##')):
+                end += 1
+            rule_lines = lines[i + 1:end]
+            break
+
+    rules: List[TestRule] = []
+    current_num: Optional[int] = None
+    current_lines: List[str] = []
+
+    for line in rule_lines:
+        match = _NUMBERED_RULE.match(line)
+        if match:
+            if current_num is not None and current_lines:
+                rules.append(build_test_rule(current_num, '\n'.join(current_lines)))
+                if len(rules) >= MAX_RULES_PER_SECTION:
+                    logger.warning(f"Reached maximum test limit ({MAX_RULES_PER_SECTION}) for section")
+                    return rules
+            current_num = int(match.group(1))
+            current_lines = [line]
+        elif current_num is not None:
+            current_lines.append(line)
+
+    if current_num is not None and current_lines:
+        rules.append(build_test_rule(current_num, '\n'.join(current_lines)))
+
+    return rules
+
+
+def build_test_rule(rule_num: int, rule_text: str) -> TestRule:
+    """
+    Build a TestRule from its text with a single scan of the rule lines.
+
+    Args:
+        rule_num: Rule number (e.g. 1, 2, 3)
+        rule_text: Full rule text including the numbered line
+
+    Returns:
+        TestRule
+    """
+    lines = rule_text.split('\n')
+
+    # Extract title from first line (remove numbering)
+    title = _RULE_NUMBER_PREFIX.sub('', lines[0]).strip()
+    if len(title) > 100:
+        title = title[:97] + "..."
+
+    sub_steps: List[str] = []
+    bullets: List[str] = []
+    keyword_lines: List[str] = []
+    expected_label: Optional[str] = None
+    expected_open = False
+    acceptance_lines: Optional[List[str]] = None
+    acceptance_open = False
+
+    for line in lines:
+        step = _SUB_STEP.match(line)
+        if step and step.group(2).strip():
+            sub_steps.append(step.group(2).strip())
+        bullet = _BULLET.match(line)
+        if bullet and bullet.group(1).strip():
+            bullets.append(bullet.group(1).strip())
+
+        stripped = line.strip()
+        if 10 < len(stripped) < 300 and any(kw in stripped.lower() for kw in _PROCEDURE_KEYWORDS):
+            keyword_lines.append(stripped)
+
+        # The expected result follows its label, on the same line or else on
+        # the next non-empty line
+        if expected_open:
+            if stripped:
+                expected_label = stripped[:300]
+                expected_open = False
+        elif expected_label is None:
+            label = _EXPECTED_LABEL.search(line)
+            if label:
+                expected_label = label.group(1).strip()[:300] or None
+                expected_open = expected_label is None
+
+        # Acceptance criteria run from their label (or the first non-empty line
+        # after an empty label) to the next blank line
+        if acceptance_open:
+            if line == '' and any(part.strip() for part in acceptance_lines):
+                acceptance_open = False
+            else:
+                acceptance_lines.append(line)
+        elif acceptance_lines is None:
+            label = _ACCEPTANCE_LABEL.search(line)
+            if label:
+                acceptance_lines = [label.group(1)]
+                acceptance_open = True
+
+    procedures = sub_steps or bullets or keyword_lines
+    if not procedures:
+        sentences = _SENTENCE_SPLIT.split(rule_text)
+        procedures = [s.strip() for s in sentences if 20 < len(s.strip()) < 300][:5]
+    if not procedures:
+        procedures = ["Execute test as per requirement specification"]
+
+    acceptance_label = '\n'.join(acceptance_lines).strip() if acceptance_lines is not None else None
+
+    return TestRule(
+        number=rule_num,
+        text=rule_text,
+        title=title,
+        procedures=procedures[:MAX_PROCEDURES_PER_RULE],
+        expected_results=expected_label or _derive_expected_results(rule_text),
+        acceptance_criteria=_derive_acceptance_criteria(rule_text, acceptance_label),
+        dependencies=_extract_dependencies(rule_text),
+    )
+
+
+def _derive_expected_results(text: str) -> str:
+    """Fallback expected results when the rule has no explicit 'Expected:' line."""
+    # Look for "shall", "must", "should" statements
+    for pattern in _REQUIREMENT_STATEMENTS:
+        match = pattern.search(text)
+        if match:
+            result = match.group(0).strip()
+            if len(result) < 500:
+                return result
+
+    # Look for statements with "meets", "complies", "within", "between"
+    lowered = text.lower()
+    for keyword in _OUTCOME_KEYWORDS:
+        if keyword in lowered:
+            for sent in _SENTENCE_SPLIT_Q.split(text):
+                if keyword in sent.lower() and len(sent.strip()) > 20:
+                    return sent.strip()[:300]
+
+    # Look for sentences with specific numeric values
+    match = _NUMERIC_SENTENCE.search(text)
+    if match:
+        return match.group(0).strip()[:300]
+
+    return "System meets all specified requirements and performance criteria"
+
+
+def _derive_acceptance_criteria(text: str, label_text: Optional[str]) -> str:
+    """Acceptance criteria from an explicit label, numeric thresholds or constraint statements."""
+    if label_text and len(label_text) < 500:
+        return label_text
+
+    # Pattern: "± X", "< X", "> X", "X to Y", "between X and Y", "within X%"
+    found_criteria = []
+    for pattern in _RANGE_PATTERNS:
+        found_criteria.extend(pattern.findall(text)[:2])  # Limit matches per pattern
+    if found_criteria:
+        return "Pass if: " + "; ".join(found_criteria[:5])
+
+    for pattern in _CONSTRAINT_STATEMENTS:
+        match = pattern.search(text)
+        if match:
+            return match.group(0).strip()[:300]
+
+    if _MEASURED_VALUE.search(text):
+        return "Measured values must meet specification limits (see requirement details)"
+
+    return "All test procedures complete successfully with results within specified tolerance"
+
+
+def _extract_dependencies(text: str) -> List[str]:
+    """Equipment mentions with surrounding context."""
+    dependencies = []
+    lowered = text.lower()
+    for keyword in _EQUIPMENT_KEYWORDS:
+        idx = lowered.find(keyword)
+        if idx != -1:
+            dependencies.append(text[max(0, idx - 20):min(len(text), idx + 50)].strip())
+    return dependencies[:3]
+
+
+def extract_requirement_statements(content: str) -> List[Dict[str, Any]]:
+    """Requirement statements for the structured Requirements table."""
+    requirements: List[Dict[str, Any]] = []
+    seen = set()
+
+    for pattern in _REQUIREMENT_PATTERNS:
+        for match in pattern.finditer(content):
+            if len(match.groups()) >= 2:
+                desc = match.group(2).strip() if len(match.group(2)) > len(match.group(1)) else match.group(1).strip()
+            else:
+                desc = match.group(1).strip()
+
+            desc = desc.replace('\n', ' ').strip()
+            if len(desc) < 20 or len(desc) > 300 or desc in seen:
+                continue
+            seen.add(desc)
+
+            keyword_text = match.group(0).lower()
+            requirements.append({
+                'description': desc,
+                'source': 'Section Analysis',
+                'priority': "High" if "must" in keyword_text or "shall" in keyword_text else "Medium",
+                'testable': 'Yes'
+            })
+            if len(requirements) >= MAX_BLOCK_ITEMS:
+                break
+
+    return requirements
+
+
+def extract_test_procedure_statements(content: str) -> List[Dict[str, Any]]:
+    """Test procedure statements (with any following bullet steps) for the Test Procedures table."""
+    procedures: List[Dict[str, Any]] = []
+    seen = set()
+
+    for pattern in _TEST_PROCEDURE_PATTERNS:
+        for match in pattern.finditer(content):
+            desc = match.group(1).strip().replace('\n', ' ').strip()
+            if len(desc) < 15 or len(desc) > 300 or desc in seen:
+                continue
+            seen.add(desc)
+
+            steps = [s.strip() for s in _FOLLOWING_BULLETS.findall(content[match.end():match.end() + 500])[:5]]
+            procedures.append({
+                'description': desc,
+                'steps': steps if steps else ['Setup test environment', 'Execute test', 'Verify results'],
+                'expected_result': 'Test passes all criteria',
+                'acceptance_criteria': 'All requirements met',
+            })
+            if len(procedures) >= MAX_BLOCK_ITEMS:
+                break
+
+    return procedures
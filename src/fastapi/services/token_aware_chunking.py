@@ -0,0 +1,290 @@
+"""
+Token-Aware Semantic Chunking
+Sizes chunks in embedding-model tokens instead of characters.
+
+Documents are split along structural section boundaries first; each section
+is broken into blocks (runs of non-blank lines, so tables and requirement
+lists stay whole), blocks are counted with the embedding model's fast
+tokenizer in batches, and blocks are packed greedily up to the token budget.
+Blocks that are too large on their own are split at line, then sentence,
+then token boundaries. A heading is never emitted on its own: when its first
+body block does not fit beside it, that block is split so its start does.
+Fragments below the minimum size are merged with a neighbour from the same
+section when the result still fits the budget; chunks never span sections.
+
+Every chunk is a contiguous slice of the original text, located by offsets.
+"""
+
+import os
+import re
+import bisect
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("TOKEN_AWARE_CHUNKING")
+
+# 0 = the embedding model's max_seq_length (minus special tokens)
+TOKEN_CHUNK_MAX_TOKENS = int(os.getenv("TOKEN_CHUNK_MAX_TOKENS", "0"))
+TOKEN_CHUNK_OVERLAP_TOKENS = int(os.getenv("TOKEN_CHUNK_OVERLAP_TOKENS", "32"))
+TOKEN_CHUNK_MIN_TOKENS = int(os.getenv("TOKEN_CHUNK_MIN_TOKENS", "48"))
+TOKEN_HISTOGRAM_BUCKET = int(os.getenv("TOKEN_HISTOGRAM_BUCKET", "64"))
+
+# Texts per tokenizer call
+_COUNT_BATCH_SIZE = 256
+
+# A run of non-blank lines, from its first to its last non-space character
+_BLOCK = re.compile(r'\S(?:[^\n]*\S)?(?:\n[ \t]*\S(?:[^\n]*\S)?)*')
+# Split points for oversized blocks: rows/list items first, then sentences
+_LINE_BREAK = re.compile(r'\n')
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?;:])\s+')
+
+# (title, header_start, body_start, body_end) as yielded by iter_document_section_spans
+SectionSpan = Tuple[str, int, int, int]
+
+
+@dataclass
+class _Span:
+    start: int
+    end: int
+    tokens: int
+    title: str = ""
+    section_number: int = 0
+
+
+def token_histogram(token_counts: Iterable[int], bucket_size: int = TOKEN_HISTOGRAM_BUCKET) -> Dict[str, int]:
+    """
+    Histogram of chunk sizes.
+
+    Args:
+        token_counts: Token count per chunk
+        bucket_size: Bucket width in tokens
+
+    Returns:
+        Ordered mapping of "low-high" bucket labels to chunk counts
+    """
+    buckets: Dict[int, int] = {}
+    for count in token_counts:
+        bucket = count // bucket_size
+        buckets[bucket] = buckets.get(bucket, 0) + 1
+    return {
+        f"{b * bucket_size}-{(b + 1) * bucket_size - 1}": buckets[b]
+        for b in sorted(buckets)
+    }
+
+
+class TokenAwareChunker:
+    """
+    Packs structural blocks into chunks measured in embedding-model tokens.
+    """
+
+    def __init__(
+        self,
+        tokenizer,
+        max_tokens: int,
+        overlap_tokens: int = TOKEN_CHUNK_OVERLAP_TOKENS,
+        min_tokens: int = TOKEN_CHUNK_MIN_TOKENS
+    ):
+        """
+        Initialize the chunker.
+
+        Args:
+            tokenizer: Hugging Face tokenizer of the embedding model (a fast
+                tokenizer is used in batch mode and for exact token splits)
+            max_tokens: Token budget per chunk
+            overlap_tokens: Trailing blocks up to this size are repeated at the
+                start of the next chunk of the same section
+            min_tokens: Chunks smaller than this are merged with a neighbour
+                in the same section
+        """
+        self.tokenizer = tokenizer
+        self.max_tokens = max(8, max_tokens)
+        self.overlap_tokens = max(0, min(overlap_tokens, self.max_tokens // 2))
+        self.min_tokens = max(0, min(min_tokens, self.max_tokens // 2))
+
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        """Token counts of texts (no special tokens), tokenized in batches."""
+        counts: List[int] = []
+        for i in range(0, len(texts), _COUNT_BATCH_SIZE):
+            encoded = self.tokenizer(
+                texts[i:i + _COUNT_BATCH_SIZE],
+                add_special_tokens=False,
+                return_attention_mask=False,
+                return_token_type_ids=False,
+                verbose=False
+            )
+            counts.extend(len(ids) for ids in encoded["input_ids"])
+        return counts
+
+    def iter_chunks(
+        self,
+        content: str,
+        sections: Iterable[SectionSpan],
+        images_data: Optional[List[Dict]] = None,
+        document_name: str = ""
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield token-sized chunks of a document.
+
+        Args:
+            content: Full document text (with image position markers)
+            sections: Structural section spans covering the text, in order
+            images_data: Images with a position_marker found in the text
+            document_name: Name used in log messages
+
+        Yields:
+            Chunk dictionaries (with token_count)
+        """
+        marker_positions = []
+        for img in images_data or []:
+            pos = content.find(img.get("position_marker", "") or "\0")
+            if pos != -1:
+                marker_positions.append((pos, img))
+        marker_positions.sort(key=lambda p: p[0])
+        offsets = [pos for pos, _ in marker_positions]
+
+        chunk_index = 0
+        token_counts: List[int] = []
+        pending: Optional[_Span] = None
+
+        def emit(span: _Span) -> Dict[str, Any]:
+            chunk_images = [
+                img for _, img in
+                marker_positions[bisect.bisect_left(offsets, span.start):bisect.bisect_left(offsets, span.end)]
+            ]
+            return {
+                "content": content[span.start:span.end],
+                "chunk_index": chunk_index,
+                "section_number": span.section_number,
+                "section_type": "token_chunk",
+                "section_title": span.title,
+                "token_count": span.tokens,
+                "images": chunk_images,
+                "has_images": len(chunk_images) > 0,
+                "start_position": span.start,
+                "end_position": span.end
+            }
+
+        for section_number, (title, header_start, body_start, body_end) in enumerate(sections, 1):
+            for span in self._pack_section(content, header_start, body_start, body_end):
+                span.title, span.section_number = title, section_number
+                if pending is None:
+                    pending = span
+                elif self._mergeable(pending, span):
+                    pending = _Span(pending.start, span.end, pending.tokens + span.tokens,
+                                    pending.title, pending.section_number)
+                else:
+                    yield emit(pending)
+                    token_counts.append(pending.tokens)
+                    chunk_index += 1
+                    pending = span
+
+        if pending is not None:
+            yield emit(pending)
+            token_counts.append(pending.tokens)
+            chunk_index += 1
+
+        if token_counts:
+            logger.info(
+                f"Token-aware chunking created {chunk_index} chunks for {document_name} "
+                f"(max {self.max_tokens} tokens, mean {sum(token_counts) / len(token_counts):.0f}); "
+                f"histogram: {token_histogram(token_counts)}"
+            )
+
+    def _mergeable(self, first: _Span, second: _Span) -> bool:
+        # Only disjoint neighbours of one section (overlapping chunks would
+        # double-count the overlap; a merged span keeps the first one's section)
+        return (
+            first.section_number == second.section_number and
+            second.start >= first.end and
+            (first.tokens < self.min_tokens or second.tokens < self.min_tokens) and
+            first.tokens + second.tokens <= self.max_tokens
+        )
+
+    def _pack_section(self, content: str, start: int, body_start: int, end: int) -> Iterator[_Span]:
+        blocks = [(m.start(), m.end()) for m in _BLOCK.finditer(content, start, end)]
+        if not blocks:
+            return
+        counts = self.count_tokens([content[s:e] for s, e in blocks])
+
+        units: List[_Span] = []
+        for (s, e), tokens in zip(blocks, counts):
+            units.extend(self._split(content, _Span(s, e, tokens)))
+        units.reverse()  # consumed from the end
+
+        current: List[_Span] = []
+        total = 0
+        while units:
+            unit = units.pop()
+            if current and total + unit.tokens > self.max_tokens:
+                budget = self.max_tokens - total
+                if current[-1].end <= body_start and budget > 0:
+                    # Only the heading so far: split the body block so its start fits beside it
+                    pieces = self._split(content, unit, budget)
+                    if len(pieces) > 1:
+                        units.extend(reversed(pieces))
+                        continue
+                yield _Span(current[0].start, current[-1].end, total)
+                # Carry trailing blocks into the next chunk as overlap
+                carry: List[_Span] = []
+                carried = 0
+                for prev in reversed(current):
+                    if carried + prev.tokens > self.overlap_tokens or \
+                            carried + prev.tokens + unit.tokens > self.max_tokens:
+                        break
+                    carry.insert(0, prev)
+                    carried += prev.tokens
+                current, total = carry, carried
+            current.append(unit)
+            total += unit.tokens
+        if current:
+            yield _Span(current[0].start, current[-1].end, total)
+
+    def _split(self, content: str, unit: _Span, limit: Optional[int] = None) -> List[_Span]:
+        """Split a block that exceeds limit (default max_tokens) at the coarsest boundary that works."""
+        limit = limit or self.max_tokens
+        if unit.tokens <= limit:
+            return [unit]
+
+        for pattern in (_LINE_BREAK, _SENTENCE_BREAK):
+            pieces = self._pieces(content, unit.start, unit.end, pattern)
+            if len(pieces) > 1:
+                counts = self.count_tokens([content[s:e] for s, e in pieces])
+                result: List[_Span] = []
+                for (s, e), tokens in zip(pieces, counts):
+                    result.extend(self._split(content, _Span(s, e, tokens), limit))
+                return result
+
+        return self._split_tokens(content, unit, limit)
+
+    @staticmethod
+    def _pieces(content: str, start: int, end: int, pattern: re.Pattern) -> List[Tuple[int, int]]:
+        pieces = []
+        piece_start = start
+        for match in pattern.finditer(content, start, end):
+            if content[piece_start:match.start()].strip():
+                pieces.append((piece_start, match.start()))
+            piece_start = match.end()
+        if piece_start < end and content[piece_start:end].strip():
+            pieces.append((piece_start, end))
+        return pieces
+
+    def _split_tokens(self, content: str, unit: _Span, limit: int) -> List[_Span]:
+        """Last resort: cut every limit tokens (by character ratio without a fast tokenizer)."""
+        text = content[unit.start:unit.end]
+        if getattr(self.tokenizer, "is_fast", False):
+            offsets = self.tokenizer(
+                text, add_special_tokens=False, return_offsets_mapping=True, verbose=False
+            )["offset_mapping"]
+            spans = []
+            for i in range(0, len(offsets), limit):
+                window = offsets[i:i + limit]
+                spans.append(_Span(unit.start + window[0][0], unit.start + window[-1][1], len(window)))
+            return spans
+
+        step = max(1, len(text) * limit // max(1, unit.tokens))
+        return [
+            _Span(unit.start + i, unit.start + min(i + step, len(text)),
+                  min(limit, unit.tokens - (i // step) * limit))
+            for i in range(0, len(text), step)
+        ]
@@ -0,0 +1,26 @@
+"""
+Vision Backend Configuration
+Which image description backends are enabled, shared by every module that
+describes images.
+
+Kept free of heavy imports so lightweight callers (such as the image
+description service's local fallback) can read it without loading the
+ingestion pipeline. Backends that fail at runtime are switched off here for
+the rest of the process.
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+VISION_CONFIG = {
+    "openai_enabled": bool(os.getenv("OPENAI_API_KEY")),
+    "ollama_enabled": True,
+    "huggingface_enabled": True,
+    "enhanced_local_enabled": True,
+    "ollama_url": os.getenv("OLLAMA_URL", "http://ollama:11434"),
+    "ollama_model": os.getenv("OLLAMA_VISION_MODEL", "llava"),
+    "huggingface_model": os.getenv("HUGGINGFACE_VISION_MODEL", "Salesforce/blip-image-captioning-base")
+}
@@ -7,7 +7,7 @@ import os
 import base64
 import uuid
 from datetime import datetime, timezone
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Union, Iterable, Iterator
 from io import BytesIO
 from docx import Document
 from docx.shared import Inches, Pt
@@ -19,25 +19,47 @@ from models.agent import ComplianceAgent
 from models.chat import ChatHistory
 from models.response import AgentResponse
 from models.session import DebateSession
+from services.streaming_docx_writer import (
+    StreamingDocxWriter,
+    paragraph_xml,
+    heading_xml,
+    page_break_xml,
+    table_open_xml,
+    table_row_xml,
+    table_close_xml,
+    key_value_table_xml,
+)
 import logging
 import tempfile
 import subprocess
+import threading
 
 logger = logging.getLogger("WORD_EXPORT_SERVICE")
 
+# Styled empty package shared by all exports in this process (see WordExportService.get_style_template)
+_STYLE_TEMPLATE_BYTES: Optional[bytes] = None
+_STYLE_TEMPLATE_LOCK = threading.Lock()
+_STREAMING_WRITER: Optional[StreamingDocxWriter] = None
+
 class WordExportService:
     """
     Service for exporting various application data to Word documents.
     Enhanced with streaming capabilities and performance optimizations.
     """
-    
+
+    # Columns: Test ID | Test Title | Requirement ID | Requirement | Test Procedures | Status | Pass | Fail | Notes
+    TEST_CARD_HEADERS = ['Test ID', 'Test Title', 'Requirement ID', 'Requirement', 'Test Procedures',
+                         'Status', 'Pass', 'Fail', 'Notes']
+    TEST_CARD_INSTRUCTIONS = ("Instructions: Update the Status field, fill in Pass/Fail checkboxes (☐/☑), "
+                              "and add notes during test execution.")
+    TEST_CARD_STATUS_VALUES = "Status values: Not Executed, In Progress, Completed, Failed"
+
     def __init__(self, enable_streaming: bool = True, chunk_size: int = 50):
         self.temp_dir = os.path.join(os.getcwd(), "temp_exports")
         os.makedirs(self.temp_dir, exist_ok=True)
         self.enable_streaming = enable_streaming
         self.chunk_size = chunk_size  # Number of items to process per chunk
-        self._doc_cache = {}  # Cache for frequently used document styles
-    
+
     def export_agents_to_word(self, agents: List[Dict[str, Any]], export_format: str = "detailed") -> bytes:
         """
         Export agent configurations to a Word document.
@@ -53,11 +75,13 @@ class WordExportService:
         try:
             start_time = datetime.now()
             logger.info(f"Starting Word export for {len(agents)} agents in {export_format} format")
-            
-            doc = Document()
-            
-            # Set up document styles with caching
-            self._setup_document_styles_optimized(doc)
+
+            # Large exports are written straight into the zip stream instead of a Document tree
+            if self.enable_streaming and len(agents) > self.chunk_size:
+                logger.info(f"Using streaming export for {len(agents)} agents")
+                return b"".join(self.stream_agents_to_word(agents, export_format))
+
+            doc = self._new_document()
             
             # Title
             title = doc.add_heading('Agent Configurations Export', 0)
@@ -72,37 +96,64 @@ class WordExportService:
             # Agents section
             doc.add_heading('Agent Details', level=1)
             
-            # Process agents in chunks for better memory management
-            if self.enable_streaming and len(agents) > self.chunk_size:
-                return self._export_agents_streaming(doc, agents, export_format)
-            else:
-                return self._export_agents_traditional(doc, agents, export_format)
-                
+            return self._export_agents_traditional(doc, agents, export_format)
+
         except Exception as e:
             logger.error(f"Failed to export agents to Word: {str(e)}")
             raise e
-    
-    def _export_agents_streaming(self, doc: Document, agents: List[Dict[str, Any]], export_format: str) -> bytes:
-        """Export agents using streaming approach for better performance"""
-        logger.info(f"Using streaming export for {len(agents)} agents")
-        
-        chunks = [agents[i:i + self.chunk_size] for i in range(0, len(agents), self.chunk_size)]
-        
-        for chunk_idx, chunk in enumerate(chunks):
-            logger.debug(f"Processing chunk {chunk_idx + 1}/{len(chunks)} ({len(chunk)} agents)")
-            
-            for i, agent in enumerate(chunk, chunk_idx * self.chunk_size + 1):
-                self._add_agent_to_document(doc, agent, i, export_format)
-                
-                # Add page break between agents (except last one)
+
+    def stream_agents_to_word(self, agents: List[Dict[str, Any]], export_format: str = "detailed") -> Iterator[bytes]:
+        """
+        Stream agent configurations as a Word document without building a Document tree.
+
+        Args:
+            agents: List of agent dictionaries
+            export_format: "summary" or "detailed"
+
+        Returns:
+            Iterator[bytes]: Consecutive chunks of the .docx package
+        """
+        def fragments():
+            yield heading_xml('Agent Configurations Export', 0)
+            yield paragraph_xml(f"Export Date: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')}")
+            yield paragraph_xml(f"Total Agents: {len(agents)}")
+            yield paragraph_xml(f"Export Format: {export_format.title()}")
+            yield paragraph_xml("")
+            yield heading_xml('Agent Details', 1)
+
+            for i, agent in enumerate(agents, 1):
+                yield from self._agent_fragments(agent, i, export_format)
+
+                # Page break between agents (except last one)
                 if i < len(agents):
-                    doc.add_page_break()
-        
-        # Convert to bytes
-        doc_bytes = self._document_to_bytes(doc)
-        logger.info(f"Streaming export completed for {len(agents)} agents")
-        return doc_bytes
-    
+                    yield page_break_xml()
+
+            logger.info(f"Streaming export completed for {len(agents)} agents")
+
+        return self._streaming_writer().iter_bytes(fragments())
+
+    def _agent_fragments(self, agent: Dict[str, Any], agent_num: int, export_format: str) -> Iterator[str]:
+        """Streaming counterpart of _add_agent_to_document."""
+        yield heading_xml(f"{agent_num}. {agent.get('name', 'Unknown Agent')}", 2)
+        yield key_value_table_xml(self._agent_basic_info_rows(agent))
+        yield paragraph_xml("")
+
+        if export_format == "detailed":
+            system_prompt = agent.get('system_prompt', 'No system prompt defined')
+            if system_prompt and len(system_prompt.strip()) > 0:
+                yield heading_xml('System Prompt', 3)
+                yield paragraph_xml(system_prompt[:1000] + "..." if len(system_prompt) > 1000 else system_prompt, style='Quote')
+
+            user_prompt = agent.get('user_prompt_template', 'No user prompt template defined')
+            if user_prompt and len(user_prompt.strip()) > 0:
+                yield heading_xml('User Prompt Template', 3)
+                yield paragraph_xml(user_prompt[:1000] + "..." if len(user_prompt) > 1000 else user_prompt, style='Quote')
+
+            if agent.get('total_queries', 0) > 0:
+                yield heading_xml('Performance Metrics', 3)
+                yield key_value_table_xml(self._agent_performance_rows(agent))
+                yield paragraph_xml("")
+
     def _export_agents_traditional(self, doc: Document, agents: List[Dict[str, Any]], export_format: str) -> bytes:
         """Traditional export approach for smaller datasets"""
         logger.debug(f"Using traditional export for {len(agents)} agents")
@@ -159,8 +210,7 @@ class WordExportService:
             bytes: Word document content
         """
         try:
-            doc = Document()
-            self._setup_document_styles(doc)
+            doc = self._new_document()
             
             # Title
             title = doc.add_heading('Chat History Export', 0)
@@ -208,7 +258,67 @@ class WordExportService:
         except Exception as e:
             logger.error(f"Failed to export chat history to Word: {str(e)}")
             raise e
-    
+
+    def stream_chat_history_to_word(
+        self,
+        chat_records: Iterable[Dict[str, Any]],
+        total_records: int,
+        session_filter: Optional[str] = None,
+        session_summaries: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Iterator[bytes]:
+        """
+        Stream chat history as a Word document with bounded memory.
+
+        Records are consumed lazily and must arrive grouped by session (e.g. ordered
+        by session_id, timestamp); a new session section starts whenever the
+        session_id changes.
+
+        Args:
+            chat_records: Iterable of chat history records
+            total_records: Total number of records, shown in the header
+            session_filter: Optional session ID the export was filtered by
+            session_summaries: Optional {session_id: {"start", "end", "count"}} computed up front
+
+        Returns:
+            Iterator[bytes]: Consecutive chunks of the .docx package
+        """
+        session_summaries = session_summaries or {}
+
+        def fragments():
+            yield heading_xml('Chat History Export', 0)
+            yield paragraph_xml(f"Export Date: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')}")
+            yield paragraph_xml(f"Total Conversations: {total_records}")
+            if session_filter:
+                yield paragraph_xml(f"Session Filter: {session_filter}")
+            yield paragraph_xml("")
+
+            current_session = None
+            interaction_num = 0
+            exported = 0
+            for chat in chat_records:
+                session_id = chat.get('session_id', 'unknown')
+                if session_id != current_session:
+                    # Page break between sessions
+                    if current_session is not None:
+                        yield page_break_xml()
+                    current_session = session_id
+                    interaction_num = 0
+
+                    yield heading_xml(f'Session: {session_id}', 1)
+                    summary = session_summaries.get(session_id)
+                    if summary:
+                        yield paragraph_xml(f"Session Duration: {summary.get('start')} to {summary.get('end')}")
+                        yield paragraph_xml(f"Total Interactions: {summary.get('count')}")
+                        yield paragraph_xml("")
+
+                interaction_num += 1
+                exported += 1
+                yield from self._chat_interaction_fragments(chat, interaction_num)
+
+            logger.info(f"Streamed {exported} chat records to Word document")
+
+        return self._streaming_writer().iter_bytes(fragments())
+
     def export_agent_simulation_to_word(self, simulation_data: Dict[str, Any]) -> bytes:
         """
         Export agent simulation results to a Word document.
@@ -220,8 +330,7 @@ class WordExportService:
             bytes: Word document content
         """
         try:
-            doc = Document()
-            self._setup_document_styles(doc)
+            doc = self._new_document()
             
             # Title
             title = doc.add_heading('AI Agent Simulation Report', 0)
@@ -296,8 +405,7 @@ class WordExportService:
             bytes: Word document content
         """
         try:
-            doc = Document()
-            self._setup_document_styles(doc)
+            doc = self._new_document()
             
             # Title
             title = doc.add_heading('RAG Assessment Report', 0)
@@ -362,8 +470,7 @@ class WordExportService:
             import requests
             from docx.shared import Inches
 
-            doc = Document()
-            self._setup_document_styles(doc)
+            doc = self._new_document()
 
             title_text = reconstructed.get('document_name') or 'Reconstructed Document'
             title = doc.add_heading(title_text, 0)
@@ -513,8 +620,7 @@ class WordExportService:
             bytes: Word document content
         """
         try:
-            doc = Document()
-            self._setup_document_styles(doc)
+            doc = self._new_document()
 
             # Title
             title = doc.add_heading('Legal Research Report', 0)
@@ -629,8 +735,7 @@ class WordExportService:
     def export_markdown_to_word(self, title: str, markdown_content: str) -> bytes:
         """Export generic markdown-like content to a Word document."""
         try:
-            doc = Document()
-            self._setup_document_styles(doc)
+            doc = self._new_document()
 
             # Title
             if title:
@@ -672,7 +777,8 @@ class WordExportService:
             logger.error(f"Failed to export markdown to Word: {str(e)}")
             raise e
     
-    def _setup_document_styles(self, doc: Document):
+    @staticmethod
+    def _setup_document_styles(doc: Document):
         """Set up custom styles for professional-looking document."""
         try:
             # Set document-wide font defaults
@@ -747,84 +853,63 @@ class WordExportService:
             logger.warning(f"Failed to set up document styles: {e}")
             pass  # Ignore styling errors
     
-    def _setup_document_styles_optimized(self, doc: Document):
-        """Set up custom styles for the document with caching."""
-        doc_id = id(doc)
-        
-        if doc_id in self._doc_cache:
-            logger.debug("Using cached document styles")
-            return
-        
-        try:
-            # Create custom styles
-            styles = doc.styles
-            
-            # Quote style
-            if 'Quote' not in [style.name for style in styles]:
-                quote_style = styles.add_style('Quote', WD_STYLE_TYPE.PARAGRAPH)
-                quote_font = quote_style.font
-                quote_font.italic = True
-                quote_font.size = Pt(10)
-                quote_style.paragraph_format.left_indent = Inches(0.5)
-                quote_style.paragraph_format.right_indent = Inches(0.5)
-                
-                # Cache the setup
-                self._doc_cache[doc_id] = True
-                logger.debug("Document styles cached")
-        except Exception as e:
-            logger.warning(f"Failed to set up document styles: {e}")
-    
     def _add_agent_basic_info_optimized(self, doc: Document, agent: Dict[str, Any]):
         """Add basic agent information as a table (optimized version)."""
         table = doc.add_table(rows=6, cols=2)
         table.style = 'Table Grid'
-        
-        # Prepare data more efficiently
+
+        rows_data = self._agent_basic_info_rows(agent)
+
+        # Batch fill table cells
+        for i, (label, value) in enumerate(rows_data):
+            row = table.rows[i]
+            row.cells[0].text = label
+            row.cells[1].text = value
+
+        doc.add_paragraph("")
+
+    def _agent_basic_info_rows(self, agent: Dict[str, Any]) -> List[tuple]:
+        """Label/value rows for the agent basic information table."""
         created_at = agent.get('created_at', 'Unknown')
         if isinstance(created_at, str) and len(created_at) > 10:
             created_at = created_at[:10]  # Just date part
-        
-        rows_data = [
+
+        return [
             ('Agent ID', str(agent.get('id', 'N/A'))),
             ('Model', agent.get('model_name', 'Unknown')),
-            ('Created', created_at),
+            ('Created', created_at or 'Unknown'),
             ('Status', 'Active' if agent.get('is_active', True) else 'Inactive'),
             ('Temperature', str(agent.get('temperature', 'N/A'))),
             ('Max Tokens', str(agent.get('max_tokens', 'N/A')))
         ]
-        
+
+    def _add_agent_performance_metrics_optimized(self, doc: Document, agent: Dict[str, Any]):
+        """Add agent performance metrics as a table (optimized version)."""
+        table = doc.add_table(rows=4, cols=2)
+        table.style = 'Table Grid'
+
+        rows_data = self._agent_performance_rows(agent)
+
         # Batch fill table cells
         for i, (label, value) in enumerate(rows_data):
             row = table.rows[i]
             row.cells[0].text = label
             row.cells[1].text = value
-        
+
         doc.add_paragraph("")
-    
-    def _add_agent_performance_metrics_optimized(self, doc: Document, agent: Dict[str, Any]):
-        """Add agent performance metrics as a table (optimized version)."""
-        table = doc.add_table(rows=4, cols=2)
-        table.style = 'Table Grid'
-        
-        # Pre-calculate metrics
+
+    def _agent_performance_rows(self, agent: Dict[str, Any]) -> List[tuple]:
+        """Label/value rows for the agent performance metrics table."""
         success_rate = agent.get('success_rate', 0)
         success_rate_str = f"{success_rate*100:.1f}%" if success_rate else 'N/A'
-        
-        rows_data = [
+
+        return [
             ('Total Queries', str(agent.get('total_queries', 0))),
             ('Average Response Time', f"{agent.get('avg_response_time_ms', 0):.0f}ms"),
             ('Success Rate', success_rate_str),
             ('Chain Type', agent.get('chain_type', 'basic'))
         ]
-        
-        # Batch fill table cells
-        for i, (label, value) in enumerate(rows_data):
-            row = table.rows[i]
-            row.cells[0].text = label
-            row.cells[1].text = value
-        
-        doc.add_paragraph("")
-    
+
     def _add_agent_basic_info(self, doc: Document, agent: Dict[str, Any]):
         """Add basic agent information as a table."""
         table = doc.add_table(rows=6, cols=2)
@@ -892,9 +977,30 @@ class WordExportService:
         # Response time
         if chat.get('response_time_ms'):
             doc.add_paragraph(f"Response Time: {chat['response_time_ms']/1000:.2f} seconds")
-        
+
         doc.add_paragraph("")
-    
+
+    def _chat_interaction_fragments(self, chat: Dict[str, Any], interaction_num: int) -> Iterator[str]:
+        """Streaming counterpart of _add_chat_interaction."""
+        yield heading_xml(f'Interaction {interaction_num}', 2)
+        yield paragraph_xml(f"Time: {chat.get('timestamp', datetime.now())}")
+
+        if chat.get('model_used'):
+            yield paragraph_xml(f"Model: {chat['model_used']}")
+        if chat.get('query_type'):
+            yield paragraph_xml(f"Type: {chat['query_type']}")
+
+        yield heading_xml('User Query:', 3)
+        yield paragraph_xml(chat.get('user_query', 'No query recorded'), style='Quote')
+
+        yield heading_xml('AI Response:', 3)
+        yield paragraph_xml(chat.get('response', 'No response recorded'), style='Quote')
+
+        if chat.get('response_time_ms'):
+            yield paragraph_xml(f"Response Time: {chat['response_time_ms']/1000:.2f} seconds")
+
+        yield paragraph_xml("")
+
     def _add_agent_responses(self, doc: Document, agent_responses: Dict[str, Any]):
         """Add agent responses to the document."""
         for i, (agent_name, response) in enumerate(agent_responses.items(), 1):
@@ -1164,8 +1270,7 @@ class WordExportService:
             bytes: Word document content
         """
         try:
-            doc = Document()
-            self._setup_document_styles(doc)
+            doc = self._new_document()
 
             # Title
             title = doc.add_heading(f'Test Cards: {test_plan_title}', 0)
@@ -1187,10 +1292,8 @@ class WordExportService:
             table.style = 'Table Grid'
 
             # Header row
-            headers = ['Test ID', 'Test Title', 'Requirement ID', 'Requirement', 'Test Procedures',
-                       'Status', 'Pass', 'Fail', 'Notes']
             header_cells = table.rows[0].cells
-            for i, header in enumerate(headers):
+            for i, header in enumerate(self.TEST_CARD_HEADERS):
                 header_cells[i].text = header
                 # Bold header text
                 for paragraph in header_cells[i].paragraphs:
@@ -1199,53 +1302,16 @@ class WordExportService:
 
             # Add test cards
             for card in test_cards:
-                metadata = card.get('metadata', {})
-                content = card.get('content', '')
-
                 row_cells = table.add_row().cells
-
-                # Test ID
-                row_cells[0].text = metadata.get('test_id', 'N/A')
-
-                # Test Title (use document_name which is what we actually store)
-                row_cells[1].text = metadata.get('document_name', metadata.get('test_title', 'N/A'))
-
-                # Requirement ID
-                row_cells[2].text = metadata.get('requirement_id', 'N/A')
-
-                # Requirement Text
-                requirement_text = metadata.get('requirement_text', 'N/A')
-                if requirement_text and len(requirement_text) > 300:
-                    requirement_text = requirement_text[:297] + "..."
-                row_cells[3].text = requirement_text
-
-                # Test Procedures - parse markdown table to extract just the procedures column
-                procedures_text = self._extract_procedures_from_markdown_table(content) if content else 'N/A'
-                if len(procedures_text) > 500:
-                    procedures_text = procedures_text[:497] + "..."
-                row_cells[4].text = procedures_text
-
-                # Status (execution_status as text, not checkbox)
-                execution_status = metadata.get('execution_status', 'not_executed')
-                row_cells[5].text = execution_status.replace('_', ' ').title()
-
-                # Pass checkbox
-                passed = metadata.get('passed', 'false')
-                row_cells[6].text = '☑' if str(passed).lower() == 'true' else '☐'
-
-                # Fail checkbox
-                failed = metadata.get('failed', 'false')
-                row_cells[7].text = '☑' if str(failed).lower() == 'true' else '☐'
-
-                # Notes
-                row_cells[8].text = metadata.get('notes', '')
+                for i, value in enumerate(self._test_card_row_values(card)):
+                    row_cells[i].text = value
 
             # Add table borders
             self._set_table_borders(table)
 
             doc.add_paragraph("")
-            doc.add_paragraph("Instructions: Update the Status field, fill in Pass/Fail checkboxes (☐/☑), and add notes during test execution.")
-            doc.add_paragraph("Status values: Not Executed, In Progress, Completed, Failed")
+            doc.add_paragraph(self.TEST_CARD_INSTRUCTIONS)
+            doc.add_paragraph(self.TEST_CARD_STATUS_VALUES)
 
             return self._document_to_bytes(doc)
 
@@ -1253,6 +1319,85 @@ class WordExportService:
             logger.error(f"Failed to export test cards to Word: {str(e)}")
             raise e
 
+    def stream_test_cards_to_word(
+        self,
+        test_cards: Iterable[Dict[str, Any]],
+        total_cards: int,
+        test_plan_title: str = "Test Plan"
+    ) -> Iterator[bytes]:
+        """
+        Stream test cards as a Word document with bounded memory.
+
+        Produces the same table layout as export_test_cards_to_word, but rows are
+        written to the zip stream as the test_cards iterable is consumed.
+
+        Args:
+            test_cards: Iterable of test card dictionaries (may be a lazy generator)
+            total_cards: Total number of test cards, shown in the header
+            test_plan_title: Title of the test plan
+
+        Returns:
+            Iterator[bytes]: Consecutive chunks of the .docx package
+        """
+        def fragments():
+            yield heading_xml(f'Test Cards: {test_plan_title}', 0)
+            yield paragraph_xml(f"Generated: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')}")
+            yield paragraph_xml(f"Total Test Cards: {total_cards}")
+            yield paragraph_xml("")
+
+            if not total_cards:
+                yield paragraph_xml("No test cards available.")
+                return
+
+            yield table_open_xml(len(self.TEST_CARD_HEADERS), bordered=True)
+            yield table_row_xml(self.TEST_CARD_HEADERS, bold=True)
+            exported = 0
+            for card in test_cards:
+                yield table_row_xml(self._test_card_row_values(card))
+                exported += 1
+            yield table_close_xml()
+
+            yield paragraph_xml("")
+            yield paragraph_xml(self.TEST_CARD_INSTRUCTIONS)
+            yield paragraph_xml(self.TEST_CARD_STATUS_VALUES)
+            logger.info(f"Streamed {exported} test cards to Word document")
+
+        return self._streaming_writer().iter_bytes(fragments())
+
+    def _test_card_row_values(self, card: Dict[str, Any]) -> List[str]:
+        """Cell values for one test card row, in TEST_CARD_HEADERS order."""
+        metadata = card.get('metadata', {})
+        content = card.get('content', '')
+
+        # Requirement Text
+        requirement_text = metadata.get('requirement_text', 'N/A')
+        if requirement_text and len(requirement_text) > 300:
+            requirement_text = requirement_text[:297] + "..."
+
+        # Test Procedures - parse markdown table to extract just the procedures column
+        procedures_text = self._extract_procedures_from_markdown_table(content) if content else 'N/A'
+        if len(procedures_text) > 500:
+            procedures_text = procedures_text[:497] + "..."
+
+        # Status (execution_status as text, not checkbox)
+        execution_status = metadata.get('execution_status', 'not_executed')
+
+        passed = metadata.get('passed', 'false')
+        failed = metadata.get('failed', 'false')
+
+        return [
+            metadata.get('test_id', 'N/A'),
+            # Test Title (use document_name which is what we actually store)
+            metadata.get('document_name', metadata.get('test_title', 'N/A')),
+            metadata.get('requirement_id', 'N/A'),
+            requirement_text,
+            procedures_text,
+            execution_status.replace('_', ' ').title(),
+            '☑' if str(passed).lower() == 'true' else '☐',
+            '☑' if str(failed).lower() == 'true' else '☐',
+            metadata.get('notes', ''),
+        ]
+
     def _extract_procedures_from_markdown_table(self, markdown_table: str) -> str:
         """
         Extract test procedures text from markdown table.
@@ -1322,13 +1467,49 @@ class WordExportService:
             tbl_borders.append(element)
         tbl_pr.append(tbl_borders)
 
-    def _document_to_bytes(self, doc: Document) -> bytes:
+    @staticmethod
+    def _document_to_bytes(doc: Document) -> bytes:
         """Convert Document object to bytes."""
         doc_io = BytesIO()
         doc.save(doc_io)
         doc_io.seek(0)
         return doc_io.getvalue()
 
+    @classmethod
+    def get_style_template(cls) -> bytes:
+        """
+        Get the prebuilt style template package.
+
+        Styles and margins are applied once per process to an empty Document and
+        the saved package bytes are kept; every export then loads a fresh copy
+        of those bytes instead of repeating the style setup.
+
+        Returns:
+            bytes: Empty, fully styled .docx package
+        """
+        global _STYLE_TEMPLATE_BYTES
+        if _STYLE_TEMPLATE_BYTES is None:
+            with _STYLE_TEMPLATE_LOCK:
+                if _STYLE_TEMPLATE_BYTES is None:
+                    start_time = datetime.now()
+                    template = Document()
+                    cls._setup_document_styles(template)
+                    _STYLE_TEMPLATE_BYTES = cls._document_to_bytes(template)
+                    elapsed_ms = (datetime.now() - start_time).total_seconds() * 1000
+                    logger.info(f"Built Word style template ({len(_STYLE_TEMPLATE_BYTES)} bytes) in {elapsed_ms:.0f}ms")
+        return _STYLE_TEMPLATE_BYTES
+
+    def _new_document(self) -> Document:
+        """Create a new Document by cloning the prebuilt style template."""
+        return Document(BytesIO(self.get_style_template()))
+
+    def _streaming_writer(self) -> StreamingDocxWriter:
+        """Get the streaming writer backed by the prebuilt style template."""
+        global _STREAMING_WRITER
+        if _STREAMING_WRITER is None:
+            _STREAMING_WRITER = StreamingDocxWriter(self.get_style_template())
+        return _STREAMING_WRITER
+
     def cleanup_temp_files(self):
         """Clean up temporary files."""
         try:
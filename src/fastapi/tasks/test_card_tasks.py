@@ -127,13 +127,28 @@ def generate_test_cards(
             meta={"status": "Parsing test plan into sections..."}
         )
 
-        # Generate test cards
+        # Generate test cards (progress is reported per section)
         logger.info(f"[{job_id}] Generating test cards...")
+
+        def report_section_progress(completed: int, total: int, section_title: str):
+            message = f"Processed section {completed}/{total}: {section_title}"
+            redis_client.hset(f"testcard_job:{job_id}:meta", mapping={
+                "sections_processed": str(completed),
+                "total_sections": str(total),
+                "progress_message": message,
+                "last_updated_at": datetime.now().isoformat()
+            })
+            self.update_state(
+                state="PROGRESS",
+                meta={"status": message, "sections_processed": completed, "total_sections": total}
+            )
+
         test_cards = test_card_service.generate_test_cards_from_test_plan(
             test_plan_id=test_plan_id,
             test_plan_content=test_plan_content,
             test_plan_title=test_plan_title,
-            format=format
+            format=format,
+            progress_callback=report_section_progress
         )
 
         if not test_cards:
@@ -0,0 +1,16 @@
+"""
+Shared pytest setup.
+
+The application imports its packages relative to src/fastapi (services,
+repositories, models, ...) and the model registry from src/llm_config, so
+both directories go on sys.path.
+"""
+
+import sys
+from pathlib import Path
+
+FASTAPI_ROOT = Path(__file__).resolve().parent.parent
+
+for path in (FASTAPI_ROOT, FASTAPI_ROOT.parent):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
@@ -0,0 +1,95 @@
+"""Tests for keyset cursors and get_page in repositories/base.py."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import Column, DateTime, Integer, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from core.exceptions import ValidationException
+from repositories.base import BaseRepository, decode_cursor, encode_cursor
+
+Base = declarative_base()
+
+
+class Event(Base):
+    __tablename__ = "events"
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=True)
+
+
+@pytest.fixture
+def repo():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    yield BaseRepository(Event, db)
+    db.close()
+
+
+def add_events(repo, created):
+    repo.db.add_all(Event(id=i, created_at=ts) for i, ts in created)
+    repo.db.commit()
+
+
+def page_through(repo, limit):
+    query = repo.db.query(Event)
+    ids, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = repo.get_page(query, Event.created_at, limit=limit, cursor=cursor)
+        ids.extend(row.id for row in rows)
+        pages += 1
+        if cursor is None:
+            return ids, pages
+
+
+def test_cursor_round_trip():
+    moment = datetime(2026, 3, 1, 12, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(moment, 42)) == (moment, 42)
+
+
+def test_cursor_round_trip_with_null_sort_value():
+    assert decode_cursor(encode_cursor(None, 7)) == (None, 7)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(datetime(2026, 1, 1), 1)[:-3]])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValidationException):
+        decode_cursor(cursor)
+
+
+def test_pages_cover_every_row_newest_first(repo):
+    base = datetime(2026, 1, 1)
+    # Ties on created_at are broken by id
+    add_events(repo, [(i, base + timedelta(minutes=i // 2)) for i in range(1, 12)])
+
+    ids, pages = page_through(repo, limit=3)
+
+    assert ids == [11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1]
+    assert pages == 4
+
+
+def test_exact_multiple_of_limit_has_no_empty_trailing_page(repo):
+    base = datetime(2026, 1, 1)
+    add_events(repo, [(i, base + timedelta(hours=i)) for i in range(1, 7)])
+
+    ids, pages = page_through(repo, limit=3)
+
+    assert ids == [6, 5, 4, 3, 2, 1]
+    assert pages == 2
+
+
+def test_null_sort_values_come_first_and_are_paged_through(repo):
+    base = datetime(2026, 1, 1)
+    add_events(repo, [
+        (1, base), (2, None), (3, base + timedelta(days=1)),
+        (4, None), (5, None), (6, base + timedelta(days=2)),
+    ])
+
+    # A page boundary inside the NULL rows and one on the last NULL row
+    assert page_through(repo, limit=2)[0] == [5, 4, 2, 6, 3, 1]
+    assert page_through(repo, limit=3)[0] == [5, 4, 2, 6, 3, 1]
@@ -0,0 +1,179 @@
+"""Tests for the streaming chat endpoint and response caching in api/chat_api.py."""
+
+import json
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("langchain_core")
+pytest.importorskip("langchain_huggingface")
+pytest.importorskip("chromadb")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+API_ROOT = Path(__file__).resolve().parent.parent / "api"
+
+
+@pytest.fixture
+def chat_api(monkeypatch):
+    # The api package imports every router, and core.database / services.database
+    # connect to Postgres on import; load chat_api on its own against stand-ins
+    api = types.ModuleType("api")
+    api.__path__ = [str(API_ROOT)]
+    core_database = types.ModuleType("core.database")
+    core_database.SessionLocal = None
+    core_database.get_db = lambda: None
+    legacy_database = types.ModuleType("services.database")
+    legacy_database.log_agent_session = legacy_database.complete_agent_session = None
+
+    monkeypatch.setitem(sys.modules, "api", api)
+    monkeypatch.setitem(sys.modules, "core.database", core_database)
+    monkeypatch.setitem(sys.modules, "services.database", legacy_database)
+    for name in ("api.chat_api", "core.dependencies", "services.persistence_queue", "services.rag_service"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+    import api.chat_api as module
+    from services.chat_cache_service import ChatResponseCache
+
+    model_config = types.SimpleNamespace(model_id="test-model")
+    monkeypatch.setattr(module, "validate_chat_model", lambda name: (model_config, None, ""))
+    monkeypatch.setattr(module, "get_chat_response_cache", lambda: ChatResponseCache(None))
+    return module
+
+
+@pytest.fixture
+def history(chat_api, monkeypatch):
+    entries = []
+    monkeypatch.setattr(chat_api.persistence_queue, "add_chat_entry", lambda **kwargs: entries.append(kwargs))
+    return entries
+
+
+@pytest.fixture
+def client(chat_api):
+    app = FastAPI()
+    app.include_router(chat_api.chat_api_router)
+    # The services connect to ChromaDB and load embeddings on init; the tests
+    # stub the methods they use
+    app.dependency_overrides[chat_api.get_rag_service] = lambda: chat_api.RAGService.__new__(chat_api.RAGService)
+    app.dependency_overrides[chat_api.get_llm_service] = lambda: chat_api.LLMService.__new__(chat_api.LLMService)
+    return TestClient(app)
+
+
+def stream_events(client, payload):
+    with client.stream("POST", "/chat/stream", json=payload) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = "".join(response.iter_text())
+
+    events = []
+    for block in body.split("\n\n"):
+        if block.strip():
+            event_line, data_line = block.split("\n")
+            events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+
+def test_direct_stream_sends_metadata_tokens_then_done(chat_api, client, history, monkeypatch):
+    monkeypatch.setattr(chat_api.LLMInvoker, "stream", lambda **kwargs: iter(["Hel", "lo", "!"]))
+
+    events = stream_events(client, {"query": "hi", "model_name": "m", "session_id": "s-1"})
+
+    assert [name for name, _ in events] == ["metadata", "token", "token", "token", "done"]
+    assert events[0][1]["session_id"] == "s-1"
+    assert events[0][1]["cached"] is False
+    assert [data["text"] for name, data in events if name == "token"] == ["Hel", "lo", "!"]
+    assert set(events[-1][1]) == {"response_time_ms", "first_token_ms"}
+    assert len(history) == 1
+    assert history[0]["response"] == "Hello!"
+    assert history[0]["collection_name"] is None
+
+
+def test_rag_stream_reports_sources_before_tokens(chat_api, client, history, monkeypatch):
+    def stream_query_with_rag(self, query_text, collection_name, model_name):
+        assert collection_name == "policies"
+        metadata = [
+            {"metadata": {"document_name": "a.pdf"}},
+            {"metadata": {"document_name": "b.pdf"}},
+            {"metadata": {"document_name": "a.pdf"}},
+        ]
+        return metadata, "[1] a.pdf", iter(["Per ", "policy."])
+
+    monkeypatch.setattr(chat_api.RAGService, "stream_query_with_rag", stream_query_with_rag)
+
+    events = stream_events(client, {
+        "query": "rules?", "model_name": "m", "query_type": "rag", "collection_name": "policies"
+    })
+
+    assert [name for name, _ in events] == ["metadata", "token", "token", "done"]
+    assert events[0][1]["source_documents"] == ["a.pdf", "b.pdf"]
+    assert events[0][1]["documents_found"] == 3
+    assert events[0][1]["formatted_citations"] == "[1] a.pdf"
+    assert len(history) == 1
+    assert history[0]["response"] == "Per policy."
+    assert history[0]["collection_name"] == "policies"
+
+
+def test_failure_mid_stream_sends_error_and_writes_no_history(chat_api, client, history, monkeypatch):
+    def failing_stream(**kwargs):
+        yield "partial"
+        raise RuntimeError("provider dropped the connection")
+
+    monkeypatch.setattr(chat_api.LLMInvoker, "stream", failing_stream)
+
+    events = stream_events(client, {"query": "hi", "model_name": "m"})
+
+    assert [name for name, _ in events] == ["metadata", "token", "error"]
+    assert "provider dropped the connection" in events[-1][1]["detail"]
+    assert history == []
+
+
+def test_setup_failure_is_a_regular_http_error(chat_api, client, history, monkeypatch):
+    def no_collection(self, **kwargs):
+        raise ValueError("Collection not found")
+
+    monkeypatch.setattr(chat_api.RAGService, "stream_query_with_rag", no_collection)
+
+    response = client.post("/chat/stream", json={
+        "query": "rules?", "model_name": "m", "query_type": "rag", "collection_name": "missing"
+    })
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Collection not found"
+    assert history == []
+
+
+@pytest.fixture
+def response_cache(chat_api, monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    from services.chat_cache_service import ChatResponseCache
+
+    cache = ChatResponseCache(fakeredis.FakeRedis(decode_responses=True))
+    monkeypatch.setattr(chat_api, "get_chat_response_cache", lambda: cache)
+    return cache
+
+
+@pytest.mark.parametrize("query_type,cached", [("direct", True), ("rag", False)])
+def test_only_direct_queries_use_the_response_cache(chat_api, client, history, response_cache, monkeypatch,
+                                                    query_type, cached):
+    calls = []
+
+    def stream(**kwargs):
+        calls.append(kwargs)
+        return iter([f"answer {len(calls)}"])
+
+    monkeypatch.setattr(chat_api.LLMInvoker, "stream", stream)
+    monkeypatch.setattr(chat_api.LLMInvoker, "invoke", lambda **kwargs: next(stream(**kwargs)))
+    # A RAG query without a collection falls through to the model directly
+    payload = {"query": "What is TCP?", "model_name": "m", "query_type": query_type}
+
+    client.post("/chat", json=payload)
+    events = stream_events(client, payload)
+
+    assert events[0][1]["cached"] is cached
+    assert len(calls) == (1 if cached else 2)
+    assert [data["text"] for name, data in events if name == "token"] == ["answer 1" if cached else "answer 2"]
@@ -0,0 +1,45 @@
+"""Tests for the direct-chat response cache key in services/chat_cache_service.py."""
+
+import pytest
+
+pytest.importorskip("redis")
+
+from services.chat_cache_service import normalize_query, response_cache_key
+
+
+@pytest.mark.parametrize("first, second", [
+    ("Is x > y?", "Is x < y?"),
+    ("What is C++?", "What is C#?"),
+    ("compute 2-3", "compute 2+3"),
+    ("What does a/b mean?", "What does a*b mean?"),
+    ("Is 3.5 > 3?", "Is 35 > 3?"),
+    ("What's the MTU?", "Whats the MTU?"),
+])
+def test_different_questions_do_not_collide(first, second):
+    assert normalize_query(first) != normalize_query(second)
+    assert response_cache_key(first, "gpt-4o", None) != response_cache_key(second, "gpt-4o", None)
+
+
+@pytest.mark.parametrize("variant", [
+    "what is the mtu of ethernet",
+    "What is the MTU of Ethernet?",
+    "  What is the   MTU of\tEthernet ?? ",
+    "WHAT IS THE MTU OF ETHERNET.",
+    "What is the ＭＴＵ of Ethernet?",  # full-width letters (NFKC)
+])
+def test_trivial_variants_share_a_key(variant):
+    assert normalize_query(variant) == "what is the mtu of ethernet"
+
+
+def test_key_includes_model_and_temperature():
+    query = "What is the MTU?"
+
+    keys = {
+        response_cache_key(query, "gpt-4o", None),
+        response_cache_key(query, "gpt-4o", 0.2),
+        response_cache_key(query, "gpt-4o", 0.7),
+        response_cache_key(query, "llama3.1:8b", None),
+    }
+
+    assert len(keys) == 4
+    assert response_cache_key(query, "gpt-4o", 0.7).startswith("chat_response:gpt-4o:0.7:")
@@ -0,0 +1,68 @@
+"""Tests for the exact image content key in services/image_description_cache.py."""
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+ImageDraw = pytest.importorskip("PIL.ImageDraw")
+
+from services.image_description_cache import image_content_hash
+
+
+def _sparse_image(path, draw):
+    """Save a white 800x600 image with a little black ink on it."""
+    img = Image.new("RGB", (800, 600), "white")
+    draw(ImageDraw.Draw(img))
+    img.save(path)
+    return str(path)
+
+
+def test_sparse_images_do_not_collide(tmp_path):
+    paths = [
+        _sparse_image(tmp_path / "dot.png", lambda d: d.point((400, 300), fill="black")),
+        _sparse_image(tmp_path / "text.png", lambda d: d.text((300, 300), "x", fill=(200, 200, 200))),
+        _sparse_image(tmp_path / "rule.png", lambda d: d.line((0, 5, 799, 5), fill=(230, 230, 230))),
+    ]
+    hashes = [image_content_hash(p) for p in paths]
+
+    assert len(set(hashes)) == 3
+
+
+def test_blank_and_near_blank_images_differ(tmp_path):
+    blank = _sparse_image(tmp_path / "blank.png", lambda d: None)
+    dot = _sparse_image(tmp_path / "dot.png", lambda d: d.point((400, 300), fill="black"))
+
+    assert image_content_hash(blank) != image_content_hash(dot)
+
+
+def test_same_pixels_in_another_format_share_a_key(tmp_path):
+    png = _sparse_image(tmp_path / "logo.png", lambda d: d.ellipse((100, 100, 300, 200), fill="navy"))
+    bmp = tmp_path / "logo.bmp"
+    Image.open(png).save(bmp)
+
+    assert image_content_hash(png) == image_content_hash(str(bmp))
+
+
+def test_size_is_part_of_the_key(tmp_path):
+    small = tmp_path / "small.png"
+    Image.new("RGB", (400, 300), "white").save(small)
+    large = tmp_path / "large.png"
+    Image.new("RGB", (800, 600), "white").save(large)
+
+    assert image_content_hash(str(small)).split("-")[0] == "400x300"
+    assert image_content_hash(str(small)) != image_content_hash(str(large))
+
+
+def test_slightly_different_pixels_get_their_own_key(tmp_path):
+    original = _sparse_image(tmp_path / "logo.png", lambda d: d.ellipse((100, 100, 300, 200), fill="navy"))
+    jpeg = tmp_path / "logo.jpg"
+    Image.open(original).save(jpeg, quality=95)
+
+    # Exact match only: a lossy re-encode is a different image
+    assert image_content_hash(original) != image_content_hash(str(jpeg))
+
+
+def test_unreadable_file_has_no_key(tmp_path):
+    bogus = tmp_path / "not_an_image.png"
+    bogus.write_bytes(b"not an image")
+
+    assert image_content_hash(str(bogus)) is None
@@ -0,0 +1,120 @@
+"""Tests for the leased Redis queue in services/image_description_queue.py."""
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")  # fakeredis needs it for Lua scripts
+
+from services import image_description_queue as q
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+def _queue(redis_client, processor=lambda *args: None, lease_seconds=60, on_give_up=None):
+    queue = q.ImageDescriptionQueue(redis_client, processor, lease_seconds=lease_seconds, on_give_up=on_give_up)
+    # Keep the worker thread out of the tests
+    queue.start = lambda: None
+    return queue
+
+
+def test_claim_moves_task_to_processing(redis_client):
+    queue = _queue(redis_client)
+    queue.enqueue("docs", "chunk_1", ["openai"])
+
+    member = queue.claim()
+
+    assert member == "docs|chunk_1"
+    assert redis_client.zcard(q.QUEUE_KEY) == 0
+    assert redis_client.zscore(q.PROCESSING_KEY, member) is not None
+    assert queue.claim() is None
+
+
+def test_processed_task_is_acknowledged(redis_client):
+    calls = []
+    queue = _queue(redis_client, processor=lambda *args: calls.append(args))
+    queue.enqueue("docs", "chunk_1", ["openai"])
+
+    queue._process(queue.claim())
+
+    assert calls == [("docs", "chunk_1", ["openai"])]
+    assert redis_client.zcard(q.PROCESSING_KEY) == 0
+    assert not redis_client.exists(q.TASK_KEY_PREFIX + "docs|chunk_1")
+
+
+def test_failed_task_is_requeued_until_attempts_run_out(redis_client, monkeypatch):
+    monkeypatch.setattr(q, "IMAGE_DESCRIPTION_MAX_ATTEMPTS", 2)
+
+    def fail(*args):
+        raise RuntimeError("vision backend down")
+
+    given_up = []
+    queue = _queue(redis_client, processor=fail, on_give_up=lambda *args: given_up.append(args))
+    queue.enqueue("docs", "chunk_1", [])
+
+    queue._process(queue.claim())
+    assert redis_client.zrange(q.QUEUE_KEY, 0, -1) == ["docs|chunk_1"]
+    assert redis_client.zcard(q.PROCESSING_KEY) == 0
+    assert given_up == []
+
+    queue._process(queue.claim())
+    assert given_up == [("docs", "chunk_1")]
+    assert redis_client.zcard(q.QUEUE_KEY) == 0
+    assert redis_client.zcard(q.PROCESSING_KEY) == 0
+    assert not redis_client.exists(q.TASK_KEY_PREFIX + "docs|chunk_1")
+
+
+def test_expired_lease_is_requeued(redis_client):
+    queue = _queue(redis_client, lease_seconds=-1)
+    queue.enqueue("docs", "chunk_1", [])
+    member = queue.claim()
+
+    # The worker died before acknowledging the task
+    assert queue.requeue_expired() == 1
+    assert redis_client.zrange(q.QUEUE_KEY, 0, -1) == [member]
+    assert redis_client.zcard(q.PROCESSING_KEY) == 0
+    assert redis_client.hget(q.TASK_KEY_PREFIX + member, "attempts") == "1"
+
+
+def test_live_lease_is_kept(redis_client):
+    queue = _queue(redis_client, lease_seconds=600)
+    queue.enqueue("docs", "chunk_1", [])
+    queue.claim()
+
+    assert queue.requeue_expired() == 0
+    assert redis_client.zcard(q.PROCESSING_KEY) == 1
+
+
+def test_task_that_keeps_losing_its_worker_is_dropped(redis_client, monkeypatch):
+    monkeypatch.setattr(q, "IMAGE_DESCRIPTION_MAX_ATTEMPTS", 2)
+    given_up = []
+    queue = _queue(redis_client, lease_seconds=-1, on_give_up=lambda *args: given_up.append(args))
+    queue.enqueue("docs", "chunk_1", [])
+
+    queue.claim()
+    queue.requeue_expired()
+    assert given_up == []
+    queue.claim()
+    assert queue.requeue_expired() == 1
+
+    assert given_up == [("docs", "chunk_1")]
+    assert redis_client.zcard(q.QUEUE_KEY) == 0
+    assert redis_client.zcard(q.PROCESSING_KEY) == 0
+    assert not redis_client.exists(q.TASK_KEY_PREFIX + "docs|chunk_1")
+
+
+def test_failing_give_up_callback_does_not_stop_the_worker(redis_client, monkeypatch):
+    monkeypatch.setattr(q, "IMAGE_DESCRIPTION_MAX_ATTEMPTS", 1)
+
+    def fail(*args):
+        raise RuntimeError("chroma down")
+
+    queue = _queue(redis_client, processor=fail, on_give_up=fail)
+    queue.enqueue("docs", "chunk_1", [])
+
+    queue._process(queue.claim())
+
+    assert redis_client.zcard(q.PROCESSING_KEY) == 0
+    assert not redis_client.exists(q.TASK_KEY_PREFIX + "docs|chunk_1")
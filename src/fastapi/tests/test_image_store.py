@@ -0,0 +1,55 @@
+"""Tests for thumbnail caching in services/image_store.py."""
+
+import io
+import os
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+pytest.importorskip("redis")
+
+from services.image_store import ImageStore
+
+
+def encode(color, fmt):
+    buf = io.BytesIO()
+    Image.new("RGB", (400, 200), color).save(buf, format=fmt)
+    return buf.getvalue()
+
+
+def test_legacy_files_differing_only_by_extension_get_separate_thumbnails(tmp_path):
+    store = ImageStore(str(tmp_path))
+    (tmp_path / "foo.png").write_bytes(encode((255, 0, 0), "PNG"))
+    (tmp_path / "foo.jpg").write_bytes(encode((0, 0, 255), "JPEG"))
+
+    png_thumb = store.thumbnail(store.resolve("foo.png"), 128)
+    jpg_thumb = store.thumbnail(store.resolve("foo.jpg"), 128)
+
+    assert png_thumb != jpg_thumb
+    with Image.open(png_thumb) as im:
+        assert im.size == (128, 64)
+        r, g, b = im.getpixel((10, 10))
+        assert r > 200 and b < 50
+    with Image.open(jpg_thumb) as im:
+        r, g, b = im.getpixel((10, 10))
+        assert b > 200 and r < 50
+
+
+def test_thumbnail_width_is_rounded_up_and_reused(tmp_path):
+    store = ImageStore(str(tmp_path))
+    blob = store.put(encode((0, 255, 0), "PNG"), "png")
+
+    first = store.thumbnail(blob, 200)
+    assert first.endswith("_w256.jpg")
+    assert store.thumbnail(blob, 256) == first
+
+
+def test_thumbnails_are_deleted_with_their_blob(tmp_path, monkeypatch):
+    monkeypatch.setattr("services.image_store.IMAGE_STORE_GC_GRACE_SECONDS", 0)
+    store = ImageStore(str(tmp_path))
+    blob = store.put(encode((0, 255, 0), "PNG"), "png")
+    thumb = store.thumbnail(blob, 128)
+
+    assert store._delete_blob(os.path.basename(blob))
+    assert not os.path.exists(blob)
+    assert not os.path.exists(thumb)
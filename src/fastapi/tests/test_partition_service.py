@@ -0,0 +1,103 @@
+"""Tests for partition creation and retention in services/partition_service.py."""
+
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from services import partition_service
+
+
+class RecordingSession:
+    """Collects the SQL a maintenance call would run."""
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+
+
+@pytest.fixture
+def partitions(monkeypatch):
+    existing = []
+    monkeypatch.setattr(partition_service, "list_partitions", lambda db, table: list(existing))
+    return existing
+
+
+def test_ensure_creates_current_and_premade_months_across_year_end(partitions, monkeypatch):
+    monkeypatch.setattr(partition_service, "PARTITION_PREMAKE_MONTHS", 2)
+    db = RecordingSession()
+
+    created = partition_service.ensure_partitions(db, "chat_history", now=datetime(2026, 11, 30, 23, 59, 59, 999999))
+
+    assert created == ["chat_history_p202611", "chat_history_p202612", "chat_history_p202701"]
+    assert db.statements[1] == (
+        "CREATE TABLE IF NOT EXISTS chat_history_p202612 PARTITION OF chat_history "
+        "FOR VALUES FROM ('2026-12-01 00:00:00') TO ('2027-01-01 00:00:00')"
+    )
+
+
+def test_ensure_skips_months_already_covered(partitions, monkeypatch):
+    monkeypatch.setattr(partition_service, "PARTITION_PREMAKE_MONTHS", 3)
+    partitions.extend([
+        ("chat_history_p202601", datetime(2026, 2, 1)),
+        ("chat_history_p202602", datetime(2026, 3, 1)),
+        ("chat_history_default", None),
+    ])
+
+    created = partition_service.ensure_partitions(RecordingSession(), "chat_history", now=datetime(2026, 1, 1))
+
+    assert created == ["chat_history_p202603", "chat_history_p202604"]
+
+
+def test_ensure_starts_after_a_legacy_partition_ending_mid_month(partitions, monkeypatch):
+    monkeypatch.setattr(partition_service, "PARTITION_PREMAKE_MONTHS", 1)
+    partitions.append(("chat_history_legacy", datetime(2026, 5, 17, 8, 30)))
+    db = RecordingSession()
+
+    created = partition_service.ensure_partitions(db, "chat_history", now=datetime(2026, 5, 20))
+
+    assert created == ["chat_history_p202605", "chat_history_p202606"]
+    assert "FROM ('2026-05-17 08:30:00') TO ('2026-06-01 00:00:00')" in db.statements[0]
+
+
+def test_drop_is_disabled_without_retention(partitions, monkeypatch):
+    monkeypatch.setattr(partition_service, "PARTITION_RETENTION_MONTHS", 0)
+    partitions.append(("chat_history_p200001", datetime(2000, 2, 1)))
+
+    assert partition_service.drop_expired_partitions(RecordingSession(), "chat_history") == []
+
+
+def test_drop_removes_partitions_ending_at_or_before_the_cutoff(partitions, monkeypatch):
+    monkeypatch.setattr(partition_service, "PARTITION_RETENTION_MONTHS", 2)
+    partitions.extend([
+        ("chat_history_legacy", datetime(2025, 12, 14)),
+        ("chat_history_p202512", datetime(2026, 1, 1)),
+        ("chat_history_p202601", datetime(2026, 2, 1)),
+        ("chat_history_p202602", datetime(2026, 3, 1)),
+        ("chat_history_default", None),
+    ])
+    db = RecordingSession()
+
+    # Cutoff is the first of January: December ends exactly on it, January does not
+    dropped = partition_service.drop_expired_partitions(db, "chat_history", now=datetime(2026, 3, 31, 23, 59))
+
+    assert dropped == ["chat_history_legacy", "chat_history_p202512"]
+    assert db.statements == [
+        "DROP TABLE IF EXISTS chat_history_legacy",
+        "DROP TABLE IF EXISTS chat_history_p202512",
+    ]
+
+
+def test_drop_cutoff_crosses_year_start(partitions, monkeypatch):
+    monkeypatch.setattr(partition_service, "PARTITION_RETENTION_MONTHS", 1)
+    partitions.extend([
+        ("chat_history_p202511", datetime(2025, 12, 1)),
+        ("chat_history_p202512", datetime(2026, 1, 1)),
+    ])
+
+    dropped = partition_service.drop_expired_partitions(RecordingSession(), "chat_history", now=datetime(2026, 1, 1))
+
+    assert dropped == ["chat_history_p202511"]
@@ -0,0 +1,65 @@
+"""Tests for image encoding in services/pdf_extraction_engine.py."""
+
+import io
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+Image = pytest.importorskip("PIL.Image")
+
+from services.pdf_extraction_engine import extract_page_images
+
+
+def make_pdf(image_dict: str, data: bytes) -> "fitz.Document":
+    """One-page PDF drawing a single image XObject."""
+    doc = fitz.open()
+    page = doc.new_page(width=200, height=200)
+
+    image_xref = doc.get_new_xref()
+    doc.update_object(image_xref, image_dict)
+    doc.update_stream(image_xref, data)
+    doc.xref_set_key(page.xref, "Resources", f"<< /XObject << /Im0 {image_xref} 0 R >> >>")
+
+    contents_xref = doc.get_new_xref()
+    doc.update_object(contents_xref, "<<>>")
+    doc.update_stream(contents_xref, b"q 100 0 0 100 50 50 cm 0 0 0 rg /Im0 Do Q")
+    doc.xref_set_key(page.xref, "Contents", f"{contents_xref} 0 R")
+
+    return fitz.open("pdf", doc.tobytes())
+
+
+def test_stencil_mask_is_rendered_black_on_white():
+    # 1 bit per pixel, 0 = painted: left half painted, right half clear
+    data = bytes([0x00, 0xFF] * 16)
+    doc = make_pdf(
+        "<< /Type /XObject /Subtype /Image /Width 16 /Height 16 "
+        "/ImageMask true /BitsPerComponent 1 >>",
+        data,
+    )
+
+    images = extract_page_images(doc, doc[0])
+
+    assert len(images) == 1
+    image = images[0]
+    assert image.ext == "png"
+    assert (image.width_px, image.height_px) == (16, 16)
+
+    img = Image.open(io.BytesIO(image.data))
+    assert img.mode == "L"
+    assert img.getpixel((0, 0)) == 0
+    assert img.getpixel((15, 0)) == 255
+
+
+def test_rgb_image_is_encoded_as_png():
+    doc = make_pdf(
+        "<< /Type /XObject /Subtype /Image /Width 2 /Height 1 "
+        "/ColorSpace /DeviceRGB /BitsPerComponent 8 >>",
+        bytes([255, 0, 0, 0, 0, 255]),
+    )
+
+    images = extract_page_images(doc, doc[0])
+
+    img = Image.open(io.BytesIO(images[0].data))
+    assert img.mode == "RGB"
+    assert img.getpixel((0, 0)) == (255, 0, 0)
+    assert img.getpixel((1, 0)) == (0, 0, 255)
@@ -0,0 +1,126 @@
+"""Tests for write_records batching and per-record retry in services/persistence_queue.py."""
+
+import sys
+import types
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+
+class FakeSession:
+    """Records what a write does; fails commit when a poisoned value was added."""
+
+    def __init__(self, log):
+        self.log = log
+        self.added = []
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def commit(self):
+        if any(getattr(obj, "user_query", None) == "poison" for obj in self.added):
+            raise RuntimeError("constraint violation")
+        self.log.append(("commit", [obj.user_query for obj in self.added]))
+
+    def rollback(self):
+        self.log.append(("rollback", len(self.added)))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def pq(monkeypatch):
+    # core.database connects to Postgres on import; the writer only needs SessionLocal
+    database = types.ModuleType("core.database")
+    database.SessionLocal = None
+    monkeypatch.setitem(sys.modules, "core.database", database)
+    monkeypatch.delitem(sys.modules, "services.persistence_queue", raising=False)
+
+    import services.persistence_queue as module
+    return module
+
+
+@pytest.fixture
+def applied(pq, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        pq, "apply_agent_performance",
+        lambda db, agent_id, count, time_sum, successes: calls.append((agent_id, count, time_sum, successes))
+    )
+    return calls
+
+
+def chat(pq, query):
+    return pq.PendingRecord(pq.CHAT_ENTRY, {
+        "user_query": query,
+        "response": "answer",
+        "model_used": "test-model",
+        "collection_name": None,
+        "query_type": "direct",
+        "response_time_ms": 10,
+        "session_id": "s1",
+    })
+
+
+def performance(pq, agent_id, response_time_ms, success=True):
+    return pq.PendingRecord(pq.PERFORMANCE, {
+        "agent_id": agent_id,
+        "response_time_ms": response_time_ms,
+        "success": success,
+    })
+
+
+def test_performance_is_summed_per_agent_in_id_order(pq, applied):
+    pq.write_records(FakeSession([]), [
+        performance(pq, 7, 100),
+        performance(pq, 3, 50, success=False),
+        performance(pq, 7, 300, success=False),
+        performance(pq, 7, None),
+    ])
+
+    assert applied == [(3, 1, 50, 0), (7, 3, 400, 2)]
+
+
+def test_compliance_results_count_towards_performance(pq, applied):
+    db = FakeSession([])
+    pq.write_records(db, [
+        pq.PendingRecord(pq.COMPLIANCE_RESULT, {
+            "agent_id": 4,
+            "data_sample": "x",
+            "confidence_score": 0.9,
+            "reason": "ok",
+            "raw_response": "ok",
+            "processing_method": "test",
+            "response_time_ms": 120,
+            "model_used": "test-model",
+        }),
+        performance(pq, 4, 80, success=False),
+    ])
+
+    assert len(db.added) == 1
+    assert applied == [(4, 2, 200, 1)]
+
+
+def test_batch_is_committed_in_one_transaction(pq, applied):
+    log = []
+    queue = pq.PersistenceQueue(lambda: FakeSession(log), enabled=False)
+
+    queue._write([chat(pq, "a"), chat(pq, "b"), chat(pq, "c")])
+
+    assert log == [("commit", ["a", "b", "c"])]
+
+
+def test_failed_batch_is_retried_record_by_record(pq, applied):
+    log = []
+    queue = pq.PersistenceQueue(lambda: FakeSession(log), enabled=False)
+
+    queue._write([chat(pq, "a"), chat(pq, "poison"), chat(pq, "c")])
+
+    assert log == [
+        ("rollback", 3),
+        ("commit", ["a"]),
+        ("rollback", 1),
+        ("commit", ["c"]),
+    ]
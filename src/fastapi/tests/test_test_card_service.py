@@ -0,0 +1,100 @@
+"""Tests for section fan-out in services/test_card_service.py."""
+
+import time
+
+import pytest
+
+from services.test_card_service import TestCardService
+
+
+def slow_square(n):
+    # Later items finish first on a pool
+    time.sleep(0.01 * (5 - n))
+    if n == 3:
+        raise ValueError("bad section")
+    return n * n
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_results_keep_input_order_and_failures_are_none(max_workers):
+    progress = []
+
+    results = TestCardService(None)._run_sections(
+        [0, 1, 2, 3, 4],
+        slow_square,
+        title_of=lambda n: f"Section {n}",
+        max_workers=max_workers,
+        progress_callback=lambda done, total, title: progress.append((done, total, title)),
+    )
+
+    assert results == [0, 1, 4, None, 16]
+    assert [done for done, _, _ in progress] == [1, 2, 3, 4, 5]
+    assert {title for _, _, title in progress} == {f"Section {n}" for n in range(5)}
+    assert all(total == 5 for _, total, _ in progress)
+
+
+def test_single_worker_runs_inline_in_order():
+    seen = []
+
+    TestCardService(None)._run_sections(
+        ["a", "b", "c"],
+        seen.append,
+        title_of=str,
+        max_workers=1,
+    )
+
+    assert seen == ["a", "b", "c"]
+
+
+def test_failing_progress_callback_is_ignored():
+    def broken(*args):
+        raise RuntimeError("redis down")
+
+    results = TestCardService(None)._run_sections(
+        [1, 2], lambda n: n, title_of=str, max_workers=1, progress_callback=broken
+    )
+
+    assert results == [1, 2]
+
+
+class FakeCollection:
+    """In-memory stand-in for the parts of a ChromaDB collection the writer uses."""
+
+    def __init__(self, cards):
+        self.cards = dict(cards)
+        self.writes = []
+
+    def get(self, ids, include):
+        found = [doc_id for doc_id in ids if doc_id in self.cards]
+        return {
+            "ids": found,
+            "documents": [self.cards[doc_id][0] for doc_id in found],
+            "metadatas": [dict(self.cards[doc_id][1]) for doc_id in found],
+        }
+
+    def update(self, ids, metadatas):
+        self.writes.append(("update", ids))
+        for doc_id, meta in zip(ids, metadatas):
+            self.cards[doc_id] = (self.cards[doc_id][0], meta)
+
+    def upsert(self, ids, documents, metadatas):
+        self.writes.append(("upsert", ids))
+        self.cards.update(zip(ids, zip(documents, metadatas)))
+
+
+def test_null_metadata_patch_is_rejected_not_dropped():
+    collection = FakeCollection({
+        "tc-1": ("Step 1", {"status": "failed", "notes": "flaky"}),
+        "tc-2": ("Step 2", {"status": "failed"}),
+    })
+
+    results = TestCardService(None).bulk_write_test_cards(collection, [
+        {"document_id": "tc-1", "metadata": {"status": "passed", "notes": None}},
+        {"document_id": "tc-2", "metadata": {"status": "passed"}},
+    ])
+
+    assert results[0]["status"] == "failed"
+    assert "notes" in results[0]["error"]
+    assert results[1]["status"] == "updated"
+    assert collection.writes == [("update", ["tc-2"])]
+    assert collection.cards["tc-1"][1] == {"status": "failed", "notes": "flaky"}
@@ -0,0 +1,46 @@
+"""Tests for label extraction in services/test_plan_parser.build_test_rule."""
+
+from services.test_plan_parser import build_test_rule
+
+
+def test_expected_result_on_the_label_line():
+    rule = build_test_rule(1, "1. Verify login\n   Expected Result: The dashboard opens.")
+
+    assert rule.expected_results == "The dashboard opens."
+
+
+def test_expected_result_on_the_line_after_the_label():
+    rule = build_test_rule(1, "1. Expected Result:\n   The system responds.")
+
+    assert rule.expected_results == "The system responds."
+
+
+def test_expected_result_skips_blank_lines_after_the_label():
+    rule = build_test_rule(2, "2. Check the alarm\n   Expected Result:\n\n   The alarm sounds within 2 s.")
+
+    assert rule.expected_results == "The alarm sounds within 2 s."
+
+
+def test_acceptance_criteria_on_the_label_line_end_at_a_blank_line():
+    rule = build_test_rule(
+        3,
+        "3. Measure output\n   Acceptance Criteria: Output within 5%\n   of nominal\n\nNotes follow"
+    )
+
+    assert rule.acceptance_criteria == "Output within 5%\n   of nominal"
+
+
+def test_acceptance_criteria_on_the_lines_after_the_label():
+    rule = build_test_rule(
+        4,
+        "4. Measure output\n   Acceptance Criteria:\n\n   Output within 5%\n   of nominal\n\nNotes follow"
+    )
+
+    assert rule.acceptance_criteria == "Output within 5%\n   of nominal"
+
+
+def test_missing_labels_fall_back_to_derived_text():
+    rule = build_test_rule(5, "5. The device shall report its status. Verify the status page loads.")
+
+    assert rule.expected_results == "shall report its status."
+    assert rule.title.startswith("The device shall report")
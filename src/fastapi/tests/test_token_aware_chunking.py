@@ -0,0 +1,147 @@
+"""Tests for TokenAwareChunker and token_histogram in services/token_aware_chunking.py."""
+
+import re
+
+import pytest
+
+from services.token_aware_chunking import TokenAwareChunker, token_histogram
+
+_WORD = re.compile(r"\S+")
+
+
+class WordTokenizer:
+    """Fast-tokenizer stand-in: one token per whitespace-separated word."""
+
+    is_fast = True
+
+    def __call__(self, texts, add_special_tokens=False, return_offsets_mapping=False, **kwargs):
+        if isinstance(texts, str):
+            words = list(_WORD.finditer(texts))
+            encoded = {"input_ids": list(range(len(words)))}
+            if return_offsets_mapping:
+                encoded["offset_mapping"] = [(m.start(), m.end()) for m in words]
+            return encoded
+        return {"input_ids": [list(range(len(_WORD.findall(text)))) for text in texts]}
+
+
+def words(n, prefix="w"):
+    return " ".join(f"{prefix}{i}" for i in range(n))
+
+
+def document(*sections):
+    """
+    Build content and section spans from (heading, body) pairs.
+
+    The first pair's heading may be None for the untitled introduction.
+    """
+    content, spans = "", []
+    for heading, body in sections:
+        if content:
+            content += "\n"
+        header_start = len(content)
+        if heading is not None:
+            content += heading + "\n"
+        body_start = len(content)
+        content += body
+        spans.append((heading or "Introduction", header_start, body_start, len(content)))
+    return content, spans
+
+
+def chunk(content, spans, max_tokens=20, overlap_tokens=0, min_tokens=0):
+    chunker = TokenAwareChunker(WordTokenizer(), max_tokens, overlap_tokens, min_tokens)
+    return list(chunker.iter_chunks(content, spans))
+
+
+def test_blocks_are_packed_up_to_max_tokens():
+    body = "\n\n".join(words(6, p) for p in "abcde")
+    content, spans = document((None, body))
+
+    chunks = chunk(content, spans, max_tokens=20)
+
+    assert [c["token_count"] for c in chunks] == [18, 12]
+    assert chunks[0]["content"] == "\n\n".join(words(6, p) for p in "abc")
+    assert [c["chunk_index"] for c in chunks] == [0, 1]
+    assert all(c["token_count"] <= 20 for c in chunks)
+
+
+def test_trailing_blocks_are_carried_as_overlap():
+    body = "\n\n".join(words(6, p) for p in "abcde")
+    content, spans = document((None, body))
+
+    chunks = chunk(content, spans, max_tokens=20, overlap_tokens=6)
+
+    assert chunks[1]["content"].startswith("c0 c1")
+    assert chunks[1]["start_position"] < chunks[0]["end_position"]
+    assert chunks[1]["token_count"] == 18
+
+
+def test_oversized_blocks_are_split_at_lines_then_tokens():
+    lines = "\n".join(words(8, p) for p in "abcd")
+    one_line = words(50, "x")
+    content, spans = document((None, lines + "\n\n" + one_line))
+
+    chunks = chunk(content, spans, max_tokens=20)
+
+    assert all(c["token_count"] <= 20 for c in chunks)
+    assert chunks[0]["content"] == "\n".join(words(8, p) for p in "ab")
+    # Every word lands in exactly one chunk
+    assert " ".join(c["content"] for c in chunks).split() == content.split()
+
+
+def test_small_fragments_merge_within_a_section():
+    content, spans = document(("1 Intro", words(12, "a") + "\n\n" + words(12, "b") + "\n\n" + words(3, "c")))
+
+    chunks = chunk(content, spans, max_tokens=20, min_tokens=5)
+
+    # "1 Intro" + a (14) | b (12) + c (3) merged because c is under min_tokens
+    assert [c["token_count"] for c in chunks] == [14, 15]
+    assert chunks[1]["content"].endswith("c2")
+
+
+def test_small_sections_are_not_merged_into_the_previous_section():
+    content, spans = document(
+        ("1.1 Purpose", words(10, "p")),
+        ("1.2 Scope", "short."),
+    )
+
+    chunks = chunk(content, spans, max_tokens=40, min_tokens=10)
+
+    assert [(c["section_number"], c["section_title"]) for c in chunks] == [
+        (1, "1.1 Purpose"),
+        (2, "1.2 Scope"),
+    ]
+    assert chunks[1]["content"] == "1.2 Scope\nshort."
+
+
+def test_heading_stays_with_the_start_of_an_overflowing_body():
+    content, spans = document(("2 Requirements", "\n" + words(30, "r")))
+
+    chunks = chunk(content, spans, max_tokens=20)
+
+    assert chunks[0]["content"].startswith("2 Requirements\n\nr0 ")
+    assert chunks[0]["token_count"] == 20
+    assert all(c["token_count"] <= 20 for c in chunks)
+    assert " ".join(c["content"] for c in chunks).split() == content.split()
+
+
+def test_images_are_attached_to_the_chunk_containing_their_marker():
+    content, spans = document((None, words(10, "a") + " [IMG1]\n\n" + words(15, "b") + " [IMG2]"))
+    images = [{"position_marker": "[IMG1]"}, {"position_marker": "[IMG2]"}, {"position_marker": "[GONE]"}]
+
+    chunker = TokenAwareChunker(WordTokenizer(), 20, 0, 0)
+    chunks = list(chunker.iter_chunks(content, spans, images))
+
+    assert [c["images"] for c in chunks] == [[images[0]], [images[1]]]
+    assert all(c["has_images"] for c in chunks)
+
+
+@pytest.mark.parametrize("counts,bucket,expected", [
+    ([], 64, {}),
+    ([0, 63, 64, 127, 128, 500], 64, {"0-63": 2, "64-127": 2, "128-191": 1, "448-511": 1}),
+    ([5, 3, 10], 10, {"0-9": 2, "10-19": 1}),
+])
+def test_token_histogram_buckets(counts, bucket, expected):
+    histogram = token_histogram(counts, bucket)
+
+    assert histogram == expected
+    assert list(histogram) == list(expected)
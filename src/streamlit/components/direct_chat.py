@@ -34,6 +34,61 @@ def display_citations(formatted_citations: str = ""):
     with st.expander("Sources and Citations", expanded=True):
         st.markdown(formatted_citations)
 
+def stream_chat_answer(query: str, model_label: str, model: str, use_rag: bool, collection_name: str = None):
+    """
+    Render a chat answer incrementally as the backend streams it.
+
+    Citations arrive before the first token and are shown below the answer
+    while it is still being written.
+    """
+    status = st.empty()
+    status.info(f"{model_label} is thinking...")
+    answer_placeholder = st.empty()
+    citations_container = st.container()
+
+    answer = ""
+    metadata: Dict[str, Any] = {}
+    done: Dict[str, Any] = {}
+    error = None
+
+    for event, data in chat_service.stream_message(
+        query=query,
+        model=model,
+        use_rag=use_rag,
+        collection_name=collection_name
+    ):
+        if event == "metadata":
+            metadata = data
+            with citations_container:
+                display_citations(data.get("formatted_citations") or "")
+        elif event == "token":
+            if not answer:
+                status.empty()
+            answer += data.get("text", "")
+            answer_placeholder.markdown(answer + "▌")
+        elif event == "done":
+            done = data
+        elif event == "error":
+            error = data.get("detail", "Unknown error")
+
+    status.empty()
+    answer_placeholder.markdown(answer)
+
+    if error:
+        st.error(f"Generation failed: {error}")
+        return
+
+    st.success("Analysis Complete")
+    if done.get("response_time_ms"):
+        timing = f"Response time: {done['response_time_ms']/1000:.2f}s"
+        if done.get("first_token_ms") is not None:
+            timing += f" (first token after {done['first_token_ms']/1000:.2f}s)"
+        st.caption(timing)
+    if metadata.get("cached") and metadata.get("cached_at"):
+        st.caption(f"Answered from cache (generated {metadata['cached_at'][:16].replace('T', ' ')} UTC)")
+    if metadata.get("session_id"):
+        st.caption(f"Session ID: {metadata['session_id']}")
+
 def Direct_Chat():
     if "collections" not in st.session_state:
         st.session_state.collections = fetch_collections()
@@ -111,12 +166,12 @@ def Direct_Chat():
             elif use_rag and not collection_name:
                 st.error("Please select a collection for RAG mode.")
             else:
-                with st.spinner(f"{mode} is analyzing..."):
-                    try:
-                        # If document_id is set, use document evaluation endpoint
-                        # Otherwise use regular chat endpoint
-                        if document_id:
-                            # Document-specific evaluation
+                try:
+                    # If document_id is set, use document evaluation endpoint
+                    # Otherwise stream the answer from the chat endpoint
+                    if document_id:
+                        # Document-specific evaluation
+                        with st.spinner(f"{mode} is analyzing..."):
                             data = chat_service.evaluate_document(
                                 document_id=document_id,
                                 collection_name=collection_name,
@@ -124,47 +179,38 @@ def Direct_Chat():
                                 model_name=model_key_map[mode],
                                 top_k=5
                             )
-                            answer = data.get("response", "")
-                            rt_ms = data.get("response_time_ms", 0)
-                            session_id = data.get("session_id", "N/A")
-                            formatted_citations = data.get("formatted_citations", "")
+                        answer = data.get("response", "")
+                        rt_ms = data.get("response_time_ms", 0)
+                        session_id = data.get("session_id", "N/A")
+                        formatted_citations = data.get("formatted_citations", "")
 
-                            st.success("Analysis Complete (Document-Specific)")
+                        st.success("Analysis Complete (Document-Specific)")
 
-                            # Debug information
-                            st.info(f"Response length: {len(answer) if answer else 0} characters")
+                        # Debug information
+                        st.info(f"Response length: {len(answer) if answer else 0} characters")
 
-                            if answer and len(answer.strip()) > 0:
-                                st.markdown("### Analysis Results")
-                                st.markdown(answer)
-                            else:
-                                st.warning("No response generated or response is empty.")
-                                st.write("**Full response data:**")
-                                st.json(data)
-
-                            st.caption(f"Response time: {rt_ms/1000:.2f}s")
-                            st.caption(f"Session ID: {session_id}")
-                            display_citations(formatted_citations)
+                        if answer and len(answer.strip()) > 0:
+                            st.markdown("### Analysis Results")
+                            st.markdown(answer)
                         else:
-                            # Regular chat (with optional RAG across entire collection)
-                            response = chat_service.send_message(
-                                query=user_input,
-                                model=model_key_map[mode],
-                                use_rag=use_rag,
-                                collection_name=collection_name
-                            )
-                            st.success("Analysis Complete:")
-                            st.markdown(response.response)
-                            if response.response_time_ms:
-                                st.caption(f"Response time: {response.response_time_ms/1000:.2f}s")
-                            if hasattr(response, 'session_id') and response.session_id:
-                                st.caption(f"Session ID: {response.session_id}")
-
-                            # Display citations if available (RAG mode)
-                            formatted_citations = getattr(response, 'formatted_citations', '') or ''
-                            display_citations(formatted_citations)
-                    except Exception as e:
-                        st.error(f"Request failed: {e}")
+                            st.warning("No response generated or response is empty.")
+                            st.write("**Full response data:**")
+                            st.json(data)
+
+                        st.caption(f"Response time: {rt_ms/1000:.2f}s")
+                        st.caption(f"Session ID: {session_id}")
+                        display_citations(formatted_citations)
+                    else:
+                        # Regular chat (with optional RAG across entire collection)
+                        stream_chat_answer(
+                            query=user_input,
+                            model_label=mode,
+                            model=model_key_map[mode],
+                            use_rag=use_rag,
+                            collection_name=collection_name
+                        )
+                except Exception as e:
+                    st.error(f"Request failed: {e}")
 
     with doc_upload_tab:
         st.header("Upload Documents for RAG")
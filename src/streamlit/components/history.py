@@ -10,8 +10,19 @@ FASTAPI = config.endpoints.api
 CHROMADB_API = config.endpoints.vectordb
 CHAT_ENDPOINT = config.endpoints.chat
 HISTORY_ENDPOINT = config.endpoints.history
+SEARCH_ENDPOINT = config.endpoints.history_search
 EVALUATE_ENDPOINT = f"{config.endpoints.api}/evaluate_doc"
 
+# Entries fetched per "load more" (keyset page size on the server)
+HISTORY_PAGE_SIZE = 50
+# Entries fetched per request when loading the whole history for export
+EXPORT_PAGE_SIZE = 100
+# Full-text search results fetched per "more results"
+SEARCH_PAGE_SIZE = 20
+
+QUERY_TYPE_FILTERS = ["All", "direct", "rag", "rag_agent", "rag_debate_sequence",
+                      "legal_research", "document_evaluation"]
+
 
 def format_timestamp(timestamp_str: str) -> str:
     """Convert timestamp string to readable format"""
@@ -85,29 +96,157 @@ def get_query_type_badge(rec: dict) -> str:
     return f'<span style="color: {color}; font-weight: bold;">{display_type}</span>'
 
 
+def fetch_history_page(cursor: str = None, filters: dict = None, limit: int = HISTORY_PAGE_SIZE):
+    """
+    Fetch one page of chat history, newest first.
+
+    Args:
+        cursor: next_cursor from the previous page (None for the first page)
+        filters: Server-side filters (query_type, collection_name, model_used)
+        limit: Page size
+
+    Returns:
+        Tuple of (entries, next_cursor)
+    """
+    params = {"limit": limit}
+    if cursor:
+        params["cursor"] = cursor
+    params.update({k: v for k, v in (filters or {}).items() if v})
+
+    response = api_client.get(HISTORY_ENDPOINT, params=params, timeout=10)
+    # API returns {success, message, timestamp, data, next_cursor, has_more}
+    if isinstance(response, dict):
+        return response.get('data', []), response.get('next_cursor')
+    return response, None
+
+
+def fetch_all_history(filters: dict = None):
+    """
+    Fetch every chat history entry matching the filters, newest first.
+
+    Follows next_cursor until the server reports no more pages.
+
+    Args:
+        filters: Server-side filters (query_type, collection_name, model_used)
+
+    Returns:
+        List of entries
+    """
+    entries, cursor = fetch_history_page(filters=filters, limit=EXPORT_PAGE_SIZE)
+    while cursor:
+        page, cursor = fetch_history_page(cursor=cursor, filters=filters, limit=EXPORT_PAGE_SIZE)
+        entries.extend(page)
+    return entries
+
+
+def fetch_search_page(text: str, offset: int = 0, filters: dict = None):
+    """
+    Fetch one page of full-text search results over all chat history.
+
+    Args:
+        text: Search text ("exact phrase", OR, -excluded words)
+        offset: next_offset from the previous page
+        filters: Server-side filters (query_type, collection_name, model_used)
+
+    Returns:
+        Tuple of (results, next_offset); results are best match first and
+        carry highlighted query_headline/response_headline snippets
+    """
+    params = {"q": text, "limit": SEARCH_PAGE_SIZE, "offset": offset}
+    params.update({k: v for k, v in (filters or {}).items() if v})
+
+    response = api_client.get(SEARCH_ENDPOINT, params=params, timeout=10)
+    # API returns {success, message, timestamp, query, data, next_offset, has_more}
+    return response.get('data', []), response.get('next_offset')
+
+
+def render_search_results(search_query: str, filters: dict, pref):
+    """Show ranked full-text search results (all history, not just loaded pages)."""
+    search_key = (search_query, tuple(sorted(filters.items())))
+    if st.session_state.get(pref("search_key")) != search_key:
+        try:
+            with st.spinner("Searching chat history..."):
+                results, next_offset = fetch_search_page(search_query, filters=filters)
+        except Exception as e:
+            st.error(f"Search failed: {e}")
+            return
+        st.session_state[pref("search_key")] = search_key
+        st.session_state[pref("search_results")] = results
+        st.session_state[pref("search_next_offset")] = next_offset
+
+    results = st.session_state[pref("search_results")]
+    next_offset = st.session_state[pref("search_next_offset")]
+
+    if not results:
+        st.warning(f"No conversations match '{search_query}'")
+        return
+
+    st.subheader(
+        f"Search results ({len(results)}{'+' if next_offset is not None else ''} "
+        f"match{'es' if len(results) != 1 else ''})"
+    )
+    st.markdown("---")
+
+    for idx, rec in enumerate(results, start=1):
+        title = generate_conversation_title(rec.get('query_headline', '').replace('**', ''))
+        with st.expander(f"{title} - {format_timestamp(rec['timestamp'])}", expanded=idx <= 3):
+            st.markdown(get_query_type_badge(rec), unsafe_allow_html=True)
+            st.caption(f"**Model**: {rec.get('model_used', 'N/A')}"
+                       + (f"  |  **Collection**: {rec['collection_name']}" if rec.get('collection_name') else ""))
+            st.markdown("**Question:**")
+            st.markdown(rec.get('query_headline', ''))
+            st.markdown("**Response:**")
+            st.markdown(f"... {rec.get('response_headline', '')} ...")
+
+    if next_offset is not None:
+        if st.button("More results", key=pref("search_more"), use_container_width=True):
+            try:
+                with st.spinner("Searching chat history..."):
+                    more, next_offset = fetch_search_page(search_query, next_offset, filters)
+                st.session_state[pref("search_results")] = results + more
+                st.session_state[pref("search_next_offset")] = next_offset
+                st.rerun()
+            except Exception as e:
+                st.error(f"Search failed: {e}")
+
+
 def Chat_History(key_prefix: str = "",):
     def pref(k): return f"{key_prefix}_{k}" if key_prefix else k
 
     with st.container(border=False, key=pref("history_container")):
         st.header("Chat History")
 
-        # Auto-load history on first visit
+        # Server-side filters; changing one starts over from the newest entry
+        fcol1, fcol2, fcol3 = st.columns(3)
+        with fcol1:
+            query_type = st.selectbox("Query type:", QUERY_TYPE_FILTERS, key=pref("filter_query_type"))
+        with fcol2:
+            collection_name = st.text_input("Collection:", key=pref("filter_collection"))
+        with fcol3:
+            model_used = st.text_input("Model:", key=pref("filter_model"))
+        filters = {
+            "query_type": None if query_type == "All" else query_type,
+            "collection_name": collection_name.strip() or None,
+            "model_used": model_used.strip() or None
+        }
+        if st.session_state.get(pref("history_filters")) != filters:
+            st.session_state[pref("history_filters")] = filters
+            st.session_state[pref("history_loaded")] = False
+
+        # Auto-load the first page on first visit
         if pref("history_loaded") not in st.session_state:
             st.session_state[pref("history_loaded")] = False
 
         if not st.session_state[pref("history_loaded")]:
             try:
                 with st.spinner("Loading chat history..."):
-                    response = api_client.get(HISTORY_ENDPOINT, timeout=10)
-                    # Extract data from response (API returns {success, message, timestamp, data})
-                    hist = response.get('data', []) if isinstance(response, dict) else response
+                    hist, next_cursor = fetch_history_page(filters=filters)
                     st.session_state[pref("chat_history_data")] = hist
+                    st.session_state[pref("history_cursor")] = next_cursor
                     st.session_state[pref("history_loaded")] = True
 
                 if not hist:
                     st.info("No history found.")
-                else:
-                    st.success(f"Loaded {len(hist)} chat entries")
             except Exception as e:
                 st.error(f"Failed to load history: {e}")
                 st.session_state[pref("history_loaded")] = True  # Mark as loaded even on error to prevent infinite loops
@@ -131,14 +270,13 @@ def Chat_History(key_prefix: str = "",):
 
         st.divider()
 
-        # Handle refreshing chat history
+        # Handle refreshing chat history (back to the newest page)
         if refresh_history:
             try:
                 with st.spinner("Refreshing chat history..."):
-                    response = api_client.get(HISTORY_ENDPOINT, timeout=10)
-                    # Extract data from response (API returns {success, message, timestamp, data})
-                    hist = response.get('data', []) if isinstance(response, dict) else response
+                    hist, next_cursor = fetch_history_page(filters=filters)
                     st.session_state[pref("chat_history_data")] = hist
+                    st.session_state[pref("history_cursor")] = next_cursor
 
                 if not hist:
                     st.info("No history found.")
@@ -147,92 +285,34 @@ def Chat_History(key_prefix: str = "",):
             except Exception as e:
                 st.error(f"Failed to refresh history: {e}")
 
+        # Full-text search runs on the server over all history (not just loaded pages)
+        search_query = st.text_input(
+            "Search conversations:",
+            placeholder='Words, "exact phrase", OR, -exclude...',
+            key=pref("search_input")
+        ).strip()
+
         # Display chat history if available
         chat_data = st.session_state.get(pref("chat_history_data"))
-        if chat_data:
-            # Initialize pagination state
-            if pref("current_page") not in st.session_state:
-                st.session_state[pref("current_page")] = 1
-            if pref("items_per_page") not in st.session_state:
-                st.session_state[pref("items_per_page")] = 20
+        if search_query:
+            render_search_results(search_query, filters, pref)
+        elif chat_data:
             if pref("custom_titles") not in st.session_state:
                 st.session_state[pref("custom_titles")] = {}
-            if pref("search_query") not in st.session_state:
-                st.session_state[pref("search_query")] = ""
-
-            # Search and filter
-            search_query = st.text_input(
-                "Search conversations:",
-                value=st.session_state[pref("search_query")],
-                placeholder="Search by title, question, or response content...",
-                key=pref("search_input")
+
+            # Header with loaded count
+            has_more = st.session_state.get(pref("history_cursor")) is not None
+            display_count = len(chat_data)
+            st.subheader(
+                f"Chat History ({display_count}{'+' if has_more else ''} "
+                f"conversation{'s' if display_count != 1 else ''})"
             )
-            st.session_state[pref("search_query")] = search_query
-
-            # Filter conversations based on search
-            filtered_data = chat_data
-            if search_query:
-                search_lower = search_query.lower()
-                filtered_data = [
-                    rec for rec in chat_data
-                    if search_lower in rec.get('user_query', '').lower() or
-                       search_lower in rec.get('response', '').lower()
-                ]
-                if not filtered_data:
-                    st.warning(f"No conversations found matching '{search_query}'")
-                else:
-                    st.info(f"Found {len(filtered_data)} conversation(s) matching '{search_query}'")
-
-            # Header with total count
-            display_count = len(filtered_data) if search_query else len(chat_data)
-            st.subheader(f"Chat History ({display_count} conversation{'s' if display_count != 1 else ''})")
-
-            # Pagination controls
-            col1, col2, col3, col4 = st.columns([2, 2, 2, 2])
-
-            with col1:
-                items_per_page_options = [10, 20, 50, len(chat_data)]
-                items_per_page_labels = ["10 per page", "20 per page", "50 per page", "Show All"]
-                selected_index = st.selectbox(
-                    "Items per page:",
-                    range(len(items_per_page_options)),
-                    format_func=lambda x: items_per_page_labels[x],
-                    index=1,  # Default to 20
-                    key=pref("items_per_page_select")
-                )
-                items_per_page = items_per_page_options[selected_index]
-                st.session_state[pref("items_per_page")] = items_per_page
-
-            # Calculate pagination based on filtered data
-            total_pages = max(1, (len(filtered_data) + items_per_page - 1) // items_per_page)
-            current_page = st.session_state[pref("current_page")]
-
-            # Ensure current page is within valid range
-            if current_page > total_pages:
-                current_page = total_pages
-                st.session_state[pref("current_page")] = current_page
-
-            with col2:
-                st.metric("Page", f"{current_page} of {total_pages}")
-
-            with col3:
-                if st.button("Previous", key=pref("prev_page"), disabled=current_page <= 1):
-                    st.session_state[pref("current_page")] = max(1, current_page - 1)
-                    st.rerun()
-
-            with col4:
-                if st.button("Next", key=pref("next_page"), disabled=current_page >= total_pages):
-                    st.session_state[pref("current_page")] = min(total_pages, current_page + 1)
-                    st.rerun()
 
             st.markdown("---")
 
-            # Calculate slice for current page
-            # Reverse the data first to show newest first
-            reversed_data = list(reversed(filtered_data))
-            start_idx = (current_page - 1) * items_per_page
-            end_idx = min(start_idx + items_per_page, len(reversed_data))
-            conversations_to_show = reversed_data[start_idx:end_idx]
+            # Entries arrive newest first; older pages are appended below
+            start_idx = 0
+            conversations_to_show = chat_data
 
             # Display conversations for current page
             for idx, rec in enumerate(conversations_to_show, start=start_idx + 1):
@@ -310,17 +390,31 @@ def Chat_History(key_prefix: str = "",):
                     st.markdown("**Response:**")
                     st.markdown(rec['response'])
 
+            # Infinite scroll: the next keyset page is appended to the loaded list
+            if has_more:
+                if st.button("Load older conversations", key=pref("load_more"), use_container_width=True):
+                    try:
+                        with st.spinner("Loading older conversations..."):
+                            older, next_cursor = fetch_history_page(
+                                st.session_state[pref("history_cursor")],
+                                st.session_state[pref("history_filters")]
+                            )
+                        st.session_state[pref("chat_history_data")] = chat_data + older
+                        st.session_state[pref("history_cursor")] = next_cursor
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Failed to load more history: {e}")
+
         # Handle export to Word
         if export_word:
-            # Get chat history data if not already loaded
+            # Load the rest of the history unless every page is already loaded
             export_data = st.session_state.get(pref("chat_history_data"))
-            if not export_data:
+            if not export_data or st.session_state.get(pref("history_cursor")):
                 try:
                     with st.spinner("Loading chat history..."):
-                        response = api_client.get(HISTORY_ENDPOINT, timeout=10)
-                        # Extract data from response
-                        export_data = response.get('data', []) if isinstance(response, dict) else response
+                        export_data = fetch_all_history(filters=filters)
                         st.session_state[pref("chat_history_data")] = export_data
+                        st.session_state[pref("history_cursor")] = None
                 except Exception as e:
                     st.error(f"Failed to load history: {e}")
                     export_data = None
@@ -330,7 +424,7 @@ def Chat_History(key_prefix: str = "",):
                     with st.spinner("Generating Word document..."):
                         export_response = api_client.post(
                             f"{FASTAPI}/doc_gen/export-chat-history-word",
-                            params={"limit": 100},
+                            params={"limit": len(export_data)},
                             timeout=30
                         )
 
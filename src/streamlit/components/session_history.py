@@ -13,6 +13,11 @@ from datetime import datetime, timedelta
 from config.settings import config
 from lib.api.client import api_client
 
+# Sessions fetched per "load more"
+SESSION_PAGE_SIZE = 25
+# Response search results fetched per "more results"
+SEARCH_PAGE_SIZE = 20
+
 
 def render_session_history():
     """Main entry point for session history dashboard"""
@@ -31,6 +36,7 @@ def render_session_history():
     with col2:
         if st.button("Refresh Data", type="primary"):
             st.cache_data.clear()
+            st.session_state.pop("recent_sessions", None)
             st.rerun()
 
     # Convert time range to days
@@ -148,12 +154,90 @@ def render_overview_tab(days: int):
         st.error(f"Failed to load analytics: {e}")
 
 
+def fetch_session_page(filters: dict, cursor: str = None):
+    """Fetch one page of session history (newest first) and the cursor for the next one"""
+    params = {"limit": SESSION_PAGE_SIZE}
+    if cursor:
+        params["cursor"] = cursor
+    params.update({k: v for k, v in filters.items() if v})
+
+    history = api_client.get(
+        f"{config.fastapi_url}/api/analytics/session-history",
+        params=params,
+        timeout=10
+    )
+    return history.get("sessions", []), history.get("next_cursor")
+
+
+def fetch_response_search(text: str, days: int, offset: int = 0):
+    """Full-text search over agent responses in the time range; returns (results, next_offset)"""
+    params = {"q": text, "limit": SEARCH_PAGE_SIZE, "offset": offset}
+    if days < 9999:
+        # Bounding the time range lets the server skip older partitions
+        params["since"] = (datetime.utcnow() - timedelta(days=days)).isoformat()
+
+    found = api_client.get(
+        f"{config.fastapi_url}/api/analytics/response-search",
+        params=params,
+        timeout=10
+    )
+    return found.get("results", []), found.get("next_offset")
+
+
+def render_response_search(search_text: str, days: int):
+    """Ranked agent response matches with highlighted snippets"""
+    search_key = (search_text, days)
+    if st.session_state.get("response_search_key") != search_key:
+        results, next_offset = fetch_response_search(search_text, days)
+        st.session_state["response_search_key"] = search_key
+        st.session_state["response_search_results"] = results
+        st.session_state["response_search_next_offset"] = next_offset
+
+    results = st.session_state["response_search_results"]
+    next_offset = st.session_state["response_search_next_offset"]
+
+    if not results:
+        st.info(f"No agent responses match '{search_text}' in the selected time range")
+        return
+
+    st.caption(f"Showing {len(results)}{'+' if next_offset is not None else ''} best matches")
+
+    for idx, result in enumerate(results):
+        with st.expander(
+            f"**{result.get('agent_name') or 'Unknown agent'}** - {result.get('created_at', '')} "
+            f"({result.get('model_used', 'N/A')})",
+            expanded=(idx == 0)
+        ):
+            st.markdown(f"... {result.get('headline', '')} ...")
+            st.caption(f"Session: {result.get('session_id')}")
+            if st.button("View Full Details", key=f"search_details_{result.get('agent_response_id')}"):
+                view_session_details(result.get('session_id'))
+
+    if next_offset is not None and st.button("More results", key="response_search_more", use_container_width=True):
+        more, next_offset = fetch_response_search(search_text, days, next_offset)
+        st.session_state["response_search_results"] = results + more
+        st.session_state["response_search_next_offset"] = next_offset
+        st.rerun()
+
+
 def render_recent_sessions_tab(days: int):
     """Recent sessions list with details"""
     st.subheader("Recent Sessions")
 
-    # Filter options
-    col1, col2 = st.columns(2)
+    search_text = st.text_input(
+        "Search agent responses",
+        placeholder='Words, "exact phrase", OR, -exclude...',
+        key="response_search_input"
+    ).strip()
+    if search_text:
+        try:
+            render_response_search(search_text, days)
+        except Exception as e:
+            st.error(f"Search failed: {e}")
+        return
+
+    # Filter options (applied server-side)
+    col1, col2, col3 = st.columns(3)
     with col1:
         session_type_filter = st.selectbox(
             "Filter by Type",
@@ -162,7 +246,10 @@ def render_recent_sessions_tab(days: int):
         )
 
     with col2:
-        limit = st.number_input("Max Sessions", min_value=10, max_value=500, value=50, step=10)
+        collection_filter = st.text_input("Collection", key="session_collection_filter")
+
+    with col3:
+        model_filter = st.text_input("Model", key="session_model_filter")
 
     try:
         # Map UI selection to enum value
@@ -174,21 +261,27 @@ def render_recent_sessions_tab(days: int):
             "RAG Debate": "rag_debate"
         }
 
-        session_type_param = type_map.get(session_type_filter)
+        filters = {
+            "session_type": type_map.get(session_type_filter),
+            "collection_name": collection_filter.strip() or None,
+            "model_used": model_filter.strip() or None
+        }
 
-        # Fetch session history
-        url = f"{config.fastapi_url}/api/analytics/session-history?limit={limit}"
-        if session_type_param:
-            url += f"&session_type={session_type_param}"
+        # First page on load or when a filter changes; later pages are appended
+        if st.session_state.get("recent_sessions_filters") != filters or "recent_sessions" not in st.session_state:
+            sessions, next_cursor = fetch_session_page(filters)
+            st.session_state["recent_sessions"] = sessions
+            st.session_state["recent_sessions_cursor"] = next_cursor
+            st.session_state["recent_sessions_filters"] = filters
 
-        history = api_client.get(url, timeout=10)
-        sessions = history.get("sessions", [])
+        sessions = st.session_state["recent_sessions"]
 
         if not sessions:
             st.info("No sessions found for the selected criteria")
             return
 
-        st.caption(f"Showing {len(sessions)} most recent sessions")
+        has_more = st.session_state.get("recent_sessions_cursor") is not None
+        st.caption(f"Showing {len(sessions)}{'+' if has_more else ''} most recent sessions")
 
         # Display sessions
         for idx, session in enumerate(sessions):
@@ -234,6 +327,13 @@ def render_recent_sessions_tab(days: int):
                 if st.button(f"View Full Details", key=f"details_{session.get('session_id')}"):
                     view_session_details(session.get('session_id'))
 
+        # Infinite scroll: append the next keyset page
+        if has_more and st.button("Load older sessions", key="load_more_sessions", use_container_width=True):
+            older, next_cursor = fetch_session_page(filters, st.session_state["recent_sessions_cursor"])
+            st.session_state["recent_sessions"] = sessions + older
+            st.session_state["recent_sessions_cursor"] = next_cursor
+            st.rerun()
+
     except Exception as e:
         st.error(f"Failed to load session history: {e}")
 
@@ -248,8 +348,8 @@ def view_session_details(session_id: str):
 
         st.subheader(f"Session Details: {session_id}")
 
-        # Responses
-        responses = details.get('responses', [])
+        # Responses (each carries its own citations)
+        responses = details.get('agent_responses', [])
         if responses:
             st.markdown(f"**{len(responses)} Agent Response(s):**")
 
@@ -257,7 +357,7 @@ def view_session_details(session_id: str):
                 with st.container():
                     st.markdown(f"**Response {idx}** - Agent: {response.get('agent_name', 'Unknown')}")
                     st.write(f"Model: {response.get('model_used', 'N/A')} | "
-                            f"Time: {response.get('response_time_ms', 0)/1000:.2f}s | "
+                            f"Time: {(response.get('response_time_ms') or 0)/1000:.2f}s | "
                             f"RAG: {'Yes' if response.get('rag_used') else 'No'}")
 
                     if response.get('rag_used'):
@@ -267,17 +367,18 @@ def view_session_details(session_id: str):
                         "Response Text",
                         response.get('response_text', 'No response'),
                         height=150,
-                        key=f"response_{idx}"
+                        key=f"response_{session_id}_{idx}"
                     )
-                    st.markdown("---")
 
-        # Citations
-        citations = details.get('citations', [])
-        if citations:
-            st.markdown(f"**{len(citations)} Citation(s):**")
-            for citation in citations:
-                st.write(f"- {citation.get('document_name', 'Unknown')} "
-                        f"(Relevance: {citation.get('similarity_score', 0):.2f})")
+                    citations = response.get('citations', [])
+                    if citations:
+                        st.markdown(f"**{len(citations)} Citation(s):**")
+                        for citation in citations:
+                            location = f", page {citation['page_number']}" if citation.get('page_number') else ""
+                            st.write(f"- {citation.get('source_file') or 'Unknown'}{location} "
+                                    f"(Distance: {citation.get('distance', 0):.3f}, "
+                                    f"{citation.get('quality_tier') or 'Unknown'})")
+                    st.markdown("---")
 
     except Exception as e:
         st.error(f"Failed to load session details: {e}")
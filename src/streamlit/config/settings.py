@@ -14,7 +14,9 @@ class APIEndpoints:
     api: str
     vectordb: str
     chat: str
+    chat_stream: str
     history: str
+    history_search: str
     health: str
     legal_assist: str
     doc_gen: str
@@ -47,7 +49,9 @@ class AppConfig:
             api=f"{self.fastapi_url}/api",
             vectordb=f"{self.fastapi_url}/api/vectordb",
             chat=f"{self.fastapi_url}/api/chat",
+            chat_stream=f"{self.fastapi_url}/api/chat/stream",
             history=f"{self.fastapi_url}/api/chat/history",
+            history_search=f"{self.fastapi_url}/api/chat/search",
             health=f"{self.fastapi_url}/api/health",
             legal_assist=f"{self.fastapi_url}/api/legal-assist",
             doc_gen=f"{self.fastapi_url}/api/doc_gen",
@@ -1,5 +1,6 @@
+import json
 import requests
-from typing import Dict, Any, Optional, List, Callable
+from typing import Dict, Any, Optional, List, Callable, Iterator, Tuple
 from dataclasses import dataclass
 import streamlit as st
 from config.settings import config
@@ -132,6 +133,40 @@ class APIClient:
         except Exception as e:
             self._handle_error(e, url, show_errors)
 
+    def stream_events(
+        self,
+        endpoint: str,
+        data: Optional[Dict[str, Any]] = None,
+        timeout: int = 300,
+        show_errors: bool = True
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """POST JSON and yield (event, data) pairs from a Server-Sent Events response as they arrive"""
+        url = self._build_url(endpoint)
+        try:
+            with self.session.post(
+                url,
+                json=data,
+                timeout=timeout,
+                stream=True,
+                headers={'Accept': 'text/event-stream'}
+            ) as response:
+                response.raise_for_status()
+                event, data_lines = "message", []
+                for line in response.iter_lines(decode_unicode=True):
+                    if line:
+                        field, _, value = line.partition(":")
+                        value = value[1:] if value.startswith(" ") else value
+                        if field == "event":
+                            event = value
+                        elif field == "data":
+                            data_lines.append(value)
+                    elif data_lines:
+                        # A blank line ends the event
+                        yield event, json.loads("\n".join(data_lines))
+                        event, data_lines = "message", []
+        except Exception as e:
+            self._handle_error(e, url, show_errors)
+
     def put(
         self,
         endpoint: str,
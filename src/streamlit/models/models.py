@@ -140,6 +140,8 @@ class ChatResponse(BaseModel):
     model_used: Optional[str] = None
     sources: Optional[List[Dict[str, Any]]] = None
     metadata: Optional[Dict[str, Any]] = None
+    cached: bool = False
+    cached_at: Optional[datetime] = None
 
     class Config:
         json_schema_extra = {
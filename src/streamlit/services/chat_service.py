@@ -1,4 +1,4 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator, Tuple
 from lib.api.client import api_client
 from config.settings import config
 from models.models import ChatRequest, ChatResponse, ChatMessage
@@ -9,16 +9,16 @@ class ChatService:
         self.client = api_client
         self.endpoints = config.endpoints
 
-    def send_message(
+    def _build_request_data(
         self,
         query: str,
-        model: str,  # Keep parameter name for backward compatibility
-        use_rag: bool = False,
-        collection_name: Optional[str] = None,
-        temperature: float = 0.7,
-        max_tokens: Optional[int] = None,
-        top_k: int = 5
-    ) -> ChatResponse:
+        model: str,
+        use_rag: bool,
+        collection_name: Optional[str],
+        temperature: float,
+        max_tokens: Optional[int],
+        top_k: int
+    ) -> Dict[str, Any]:
         # Create request object using Streamlit's ChatRequest model
         request = ChatRequest(
             query=query,
@@ -42,6 +42,22 @@ class ChatService:
         request_data.pop('use_rag', None)  # Remove use_rag as API doesn't use it
         request_data.pop('top_k', None)  # Remove top_k as it's not in API schema
 
+        return request_data
+
+    def send_message(
+        self,
+        query: str,
+        model: str,  # Keep parameter name for backward compatibility
+        use_rag: bool = False,
+        collection_name: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        top_k: int = 5
+    ) -> ChatResponse:
+        request_data = self._build_request_data(
+            query, model, use_rag, collection_name, temperature, max_tokens, top_k
+        )
+
         # Send request
         response_data = self.client.post(
             self.endpoints.chat,
@@ -52,6 +68,29 @@ class ChatService:
         # Parse response
         return ChatResponse(**response_data)
 
+    def stream_message(
+        self,
+        query: str,
+        model: str,
+        use_rag: bool = False,
+        collection_name: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        top_k: int = 5
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Stream a chat answer as (event, data) pairs: "metadata" (citations,
+        session), then "token" chunks, then "done" or "error".
+        """
+        request_data = self._build_request_data(
+            query, model, use_rag, collection_name, temperature, max_tokens, top_k
+        )
+        return self.client.stream_events(
+            self.endpoints.chat_stream,
+            data=request_data,
+            timeout=300
+        )
+
     def get_chat_history(
         self,
         session_id: Optional[str] = None,
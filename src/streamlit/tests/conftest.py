@@ -0,0 +1,14 @@
+"""
+Shared pytest setup.
+
+The Streamlit app imports its packages relative to src/streamlit (lib,
+config, components, ...), so that directory goes on sys.path.
+"""
+
+import sys
+from pathlib import Path
+
+STREAMLIT_ROOT = Path(__file__).resolve().parent.parent
+
+if str(STREAMLIT_ROOT) not in sys.path:
+    sys.path.insert(0, str(STREAMLIT_ROOT))
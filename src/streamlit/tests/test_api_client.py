@@ -0,0 +1,110 @@
+"""Tests for Server-Sent Events parsing in lib/api/client.py."""
+
+import pytest
+
+requests = pytest.importorskip("requests")
+pytest.importorskip("streamlit")
+
+from lib.api.client import APIClient
+
+
+class FakeStreamResponse:
+    """Streams pre-split lines the way requests' iter_lines(decode_unicode=True) does."""
+
+    def __init__(self, lines, status_code=200):
+        self.lines = lines
+        self.status_code = status_code
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} error", response=self)
+
+    def iter_lines(self, decode_unicode=False):
+        yield from self.lines
+
+
+@pytest.fixture
+def client_with(monkeypatch):
+    def make(lines, status_code=200):
+        client = APIClient()
+        calls = []
+
+        def post(url, **kwargs):
+            calls.append((url, kwargs))
+            return FakeStreamResponse(lines, status_code)
+
+        monkeypatch.setattr(client.session, "post", post)
+        return client, calls
+
+    return make
+
+
+def test_events_are_parsed_in_order(client_with):
+    client, calls = client_with([
+        "event: token",
+        'data: {"text": "Hel"}',
+        "",
+        "event: token",
+        'data: {"text": "lo"}',
+        "",
+        "event: done",
+        'data: {"response_time_ms": 12}',
+        "",
+    ])
+
+    events = list(client.stream_events("/chat/stream", data={"query": "hi"}))
+
+    assert events == [
+        ("token", {"text": "Hel"}),
+        ("token", {"text": "lo"}),
+        ("done", {"response_time_ms": 12}),
+    ]
+    url, kwargs = calls[0]
+    assert url.endswith("/chat/stream")
+    assert kwargs["stream"] is True
+    assert kwargs["json"] == {"query": "hi"}
+    assert kwargs["headers"]["Accept"] == "text/event-stream"
+
+
+def test_multiline_data_comments_and_default_event(client_with):
+    client, _ = client_with([
+        ": keep-alive",
+        "data:{\"a\":",
+        "data: [1, 2]}",
+        "",
+        "",
+        "event: meta",
+        "id: 7",
+        'data: {"b": true}',
+        "",
+    ])
+
+    assert list(client.stream_events("/chat/stream")) == [
+        ("message", {"a": [1, 2]}),
+        ("meta", {"b": True}),
+    ]
+
+
+def test_unterminated_trailing_event_is_discarded(client_with):
+    client, _ = client_with([
+        "event: token",
+        'data: {"text": "a"}',
+        "",
+        "event: token",
+        'data: {"text": "b"}',
+    ])
+
+    assert list(client.stream_events("/chat/stream")) == [("token", {"text": "a"})]
+
+
+def test_http_error_is_raised(client_with):
+    client, _ = client_with([], status_code=503)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        list(client.stream_events("/chat/stream", show_errors=False))
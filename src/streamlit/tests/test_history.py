@@ -0,0 +1,30 @@
+"""Tests for chat history paging in components/history.py."""
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("streamlit")
+
+from components import history
+
+
+def test_fetch_all_history_follows_cursors_until_exhausted(monkeypatch):
+    pages = {
+        None: {"data": [{"id": 5}, {"id": 4}], "next_cursor": "c1"},
+        "c1": {"data": [{"id": 3}, {"id": 2}], "next_cursor": "c2"},
+        "c2": {"data": [{"id": 1}], "next_cursor": None},
+    }
+    calls = []
+
+    def get(url, params=None, **kwargs):
+        calls.append(params)
+        return pages[params.get("cursor")]
+
+    monkeypatch.setattr(history.api_client, "get", get)
+
+    entries = history.fetch_all_history(filters={"query_type": "rag", "model_used": None})
+
+    assert [e["id"] for e in entries] == [5, 4, 3, 2, 1]
+    assert [params.get("cursor") for params in calls] == [None, "c1", "c2"]
+    assert all(params["limit"] == history.EXPORT_PAGE_SIZE for params in calls)
+    assert all(params["query_type"] == "rag" and "model_used" not in params for params in calls)